@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+File: app_pool.py
+Author: Your Name / Tên của bạn
+Description: Chứa class ExcelAppPool để chạy nhiều công việc (job) xử lý workbook song song
+             trên N tiến trình Excel chạy ẩn, được giữ sẵn (warm) giữa các job.
+
+Lưu ý:
+    - Mỗi tiến trình Excel được tạo và chỉ được dùng trong một luồng (worker thread) riêng,
+      vì đối tượng COM gắn với luồng đã tạo ra nó. Công việc vẫn chạy song song thực sự
+      vì mỗi luồng điều khiển một tiến trình Excel riêng biệt.
+    - Hàm job nhận đối tượng ExcelApp làm tham số đầu tiên.
+
+--- CHANGELOG ---
+Version 0.3.0 (2026-10-17):
+    - Sửa lỗi luồng worker bị dừng (các job sau không bao giờ hoàn thành) khi không khởi động được
+      Excel cho một job, hoặc khi Excel chết sau một job thành công: job hiện tại báo lỗi, tiến trình
+      được thay mới ở job kế tiếp.
+
+Version 0.2.0 (2026-10-17):
+    - Dùng logging (log_utils.py) thay cho print().
+
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo class ExcelAppPool với các phương thức: .submit(), .map(), .shutdown().
+    - Tự động thay mới (recycle) tiến trình Excel sau max_jobs_per_app job hoặc khi bị treo/crash.
+-------------------
+"""
+
+import logging
+import os
+import queue
+import signal
+import threading
+from concurrent.futures import Future
+from .excelapp import ExcelApp
+
+try:
+    import pythoncom
+except ImportError:
+    pythoncom = None
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class ExcelAppPool:
+    """
+    Nhóm (pool) gồm nhiều tiến trình Excel chạy ẩn dùng để xử lý nhiều file song song.
+
+    Ví dụ:
+        with ExcelAppPool(size=4) as pool:
+            results = pool.map(lambda app, path: app.open(path).sheet_names, paths)
+    """
+
+    def __init__(self, size=2, max_jobs_per_app=50, app_factory=None, engine='xlwings', warm=True):
+        """
+        Khởi tạo pool và (mặc định) khởi động sẵn các tiến trình Excel.
+
+        Args:
+            size (int): Số tiến trình Excel chạy song song.
+            max_jobs_per_app (int or None): Số job tối đa cho một tiến trình trước khi được thay mới,
+                                            tránh rò rỉ bộ nhớ của Excel. None để không giới hạn.
+            app_factory (callable, optional): Hàm không tham số trả về một ExcelApp mới. Mặc định tạo
+                                              ExcelApp chạy ẩn với các tùy chọn tăng tốc
+                                              (screen_updating=False, display_alerts=False,
+                                              calculation='manual').
+            engine (str): Engine dùng cho app_factory mặc định ('xlwings' hoặc 'file').
+            warm (bool): True để khởi động các tiến trình ngay, False để chỉ tạo khi có job đầu tiên.
+        """
+        if size < 1:
+            raise ValueError("size phải lớn hơn 0.")
+        self.size = size
+        self.max_jobs_per_app = max_jobs_per_app
+        self._app_factory = app_factory or (lambda: ExcelApp(
+            visible=False, screen_updating=False, display_alerts=False,
+            calculation='manual', engine=engine))
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {'jobs': 0, 'failed': 0, 'apps_started': 0, 'recycled': 0, 'crashes': 0}
+        self._closed = False
+
+        logger.info("Khởi tạo pool gồm %s tiến trình Excel...", size)
+        ready = [threading.Event() for _ in range(size)] if warm else []
+        self._workers = []
+        for i in range(size):
+            worker = threading.Thread(target=self._worker_loop, args=(ready[i] if warm else None,),
+                                      name=f'ExcelAppPool-{i + 1}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        for event in ready:
+            event.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    # --- Properties ---
+    @property
+    def stats(self):
+        """Thống kê: số job đã chạy, số job lỗi, số tiến trình đã khởi động/thay mới/bị crash."""
+        with self._lock:
+            return dict(self._stats)
+
+    # --- Methods ---
+    def submit(self, func, *args, **kwargs):
+        """
+        Đưa một job vào hàng đợi. Job được gọi dưới dạng func(app, *args, **kwargs).
+
+        Returns:
+            concurrent.futures.Future: Kết quả của job.
+        """
+        if self._closed:
+            raise RuntimeError("Pool đã bị đóng.")
+        future = Future()
+        self._jobs.put((future, func, args, kwargs))
+        return future
+
+    def map(self, func, paths, return_exceptions=False, timeout=None):
+        """
+        Chạy func(app, path) cho từng đường dẫn trên các tiến trình của pool.
+
+        Args:
+            func (callable): Hàm xử lý một file, nhận (app, path).
+            paths (iterable): Danh sách đường dẫn (hoặc tham số bất kỳ) cần xử lý.
+            return_exceptions (bool): True để trả về đối tượng lỗi tại vị trí của job bị lỗi
+                                      thay vì ném lỗi ngay.
+            timeout (float, optional): Thời gian chờ tối đa (giây) cho mỗi kết quả.
+
+        Returns:
+            list: Kết quả theo đúng thứ tự của paths.
+        """
+        futures = [self.submit(func, path) for path in paths]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result(timeout=timeout))
+            except Exception as e:
+                if not return_exceptions:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+                results.append(e)
+        return results
+
+    def shutdown(self, wait=True):
+        """Dừng nhận job mới, chờ các job đang có hoàn thành và đóng tất cả tiến trình Excel."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._jobs.put(_STOP)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+        logger.info("Đã đóng pool Excel. Thống kê: %s", self.stats)
+
+    # --- Worker ---
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _start_app(self):
+        """(Hàm nội bộ) Tạo một tiến trình Excel mới cho luồng hiện tại."""
+        app = self._app_factory()
+        self._count('apps_started')
+        return app
+
+    @staticmethod
+    def _is_alive(app):
+        """(Hàm nội bộ) Kiểm tra tiến trình Excel còn phản hồi hay không."""
+        try:
+            app.workbook_names
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_books(app):
+        """(Hàm nội bộ) Đóng (không lưu) các workbook mà job để lại, trả tiến trình về trạng thái sạch."""
+        for book in app.workbooks:
+            try:
+                book.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _dispose(app):
+        """(Hàm nội bộ) Đóng tiến trình Excel; buộc dừng theo PID nếu tiến trình không phản hồi."""
+        pid = app.pid
+        try:
+            app.quit()
+        except Exception:
+            if pid:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except OSError:
+                    pass
+
+    def _worker_loop(self, ready):
+        """(Hàm nội bộ) Vòng lặp của một worker: giữ một tiến trình Excel và xử lý lần lượt các job."""
+        if pythoncom is not None:
+            pythoncom.CoInitialize()
+        app = None
+        jobs_done = 0
+        try:
+            if ready is not None:
+                try:
+                    app = self._start_app()
+                except Exception as e:
+                    logger.error("Không thể khởi động tiến trình Excel cho pool. Lỗi: %s", e)
+                finally:
+                    ready.set()
+
+            while True:
+                job = self._jobs.get()
+                if job is _STOP:
+                    break
+                future, func, args, kwargs = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                try:
+                    if app is None:
+                        app = self._start_app()
+                        jobs_done = 0
+                    result = func(app, *args, **kwargs)
+                except BaseException as e:
+                    self._count('failed')
+                    future.set_exception(e)
+                    if app is None:
+                        # Không khởi động được Excel: job này lỗi, job sau sẽ thử khởi động lại
+                        continue
+                    if not self._is_alive(app):
+                        logger.warning("Tiến trình Excel không còn phản hồi, sẽ khởi động tiến trình mới.")
+                        self._count('crashes')
+                        self._dispose(app)
+                        app = None
+                        continue
+                else:
+                    future.set_result(result)
+                finally:
+                    self._count('jobs')
+
+                jobs_done += 1
+                try:
+                    self._close_books(app)
+                except Exception as e:
+                    logger.warning("Không thể dọn tiến trình Excel sau job (%s), sẽ khởi động tiến trình mới.", e)
+                    self._count('crashes')
+                    self._dispose(app)
+                    app = None
+                    continue
+                if self.max_jobs_per_app and jobs_done >= self.max_jobs_per_app:
+                    self._count('recycled')
+                    self._dispose(app)
+                    app = None
+        finally:
+            if app is not None:
+                self._dispose(app)
+            if pythoncom is not None:
+                pythoncom.CoUninitialize()
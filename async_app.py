@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+File: async_app.py
+Author: Your Name / Tên của bạn
+Description: Chứa class AsyncExcelApp để dùng thư viện từ code asyncio (ví dụ web service) mà không
+             chặn event loop.
+
+Cách hoạt động:
+    - Đối tượng COM của Excel chỉ dùng được trên luồng đã tạo ra nó, nên AsyncExcelApp tạo ExcelApp
+      trên một luồng riêng (worker) và mọi thao tác đều được chuyển sang luồng đó.
+    - Mỗi thao tác (open, save, đọc/ghi Range, to_pdf, ...) được đưa vào hàng đợi ngay khi gọi và trả về
+      một đối tượng awaitable. Hàng đợi có độ ưu tiên (số nhỏ chạy trước); cùng độ ưu tiên thì chạy
+      theo thứ tự gọi.
+    - Pipelining: có thể gọi nhiều thao tác rồi mới await (hoặc dùng asyncio.gather), luồng worker xử lý
+      liên tục mà không phải chờ event loop giữa các thao tác.
+    - Workbook/Sheet/Range trả về được bọc thành AsyncWorkbook/AsyncSheet/AsyncRange; đối tượng thật
+      chỉ được truy cập trên luồng worker.
+
+Lưu ý:
+    - Các thao tác phụ thuộc nhau (ghi rồi lưu) nên dùng cùng độ ưu tiên, hoặc await thao tác trước.
+    - Trên Linux (không có Excel) dùng engine='file' hoặc app_factory trả về ExcelApp với backend thay thế.
+
+Ví dụ:
+    async with AsyncExcelApp(engine='file') as excel:
+        book = await excel.open('report.xlsx')
+        sheet = book.sheet('Data')
+        sheet.range('A1').set_value('Tổng')                  # Không cần await ngay
+        total, _ = await asyncio.gather(sheet.range('B1').get_value(), book.save())
+
+--- CHANGELOG ---
+Version 0.2.0 (2026-10-17):
+    - AsyncWorkbook.to_pdf() nhận thêm tham số sheets; thêm AsyncRange.to_pdf().
+
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo class AsyncExcelApp và các lớp bọc AsyncWorkbook, AsyncSheet, AsyncRange.
+-------------------
+"""
+
+import asyncio
+import itertools
+import logging
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from .excelapp import ExcelApp
+from .workbook import Workbook
+from .sheet import Sheet
+from .range import Range
+
+try:
+    import pythoncom
+except ImportError:
+    pythoncom = None
+
+logger = logging.getLogger(__name__)
+
+# Độ ưu tiên của thao tác (số nhỏ chạy trước)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+_STOP = object()
+
+
+class AsyncExcelApp:
+    """
+    Giao diện asyncio cho ExcelApp, với một luồng worker riêng giữ tiến trình Excel.
+    """
+
+    def __init__(self, app_factory=None, engine='xlwings', visible=False, screen_updating=False,
+                 display_alerts=False, calculation='automatic'):
+        """
+        Khởi động luồng worker và tạo ExcelApp trên luồng đó.
+
+        Args:
+            app_factory (callable, optional): Hàm không tham số trả về một ExcelApp mới (được gọi trên
+                                              luồng worker). Mặc định tạo ExcelApp với các tùy chọn bên dưới.
+            engine (str or AppBackend): Engine cho app_factory mặc định ('xlwings' hoặc 'file').
+            visible, screen_updating, display_alerts, calculation: Tùy chọn của ExcelApp mặc định.
+        """
+        self._app_factory = app_factory or (lambda: ExcelApp(
+            visible=visible, screen_updating=screen_updating, display_alerts=display_alerts,
+            calculation=calculation, engine=engine))
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._stats = {'operations': 0, 'failed': 0, 'cancelled': 0, 'busy_seconds': 0.0,
+                       'queue_seconds': 0.0, 'max_queue_depth': 0}
+        self._closed = False
+        self._stopped = Future()
+        self._app = None
+
+        ready = threading.Event()
+        startup_error = []
+        self._worker = threading.Thread(target=self._worker_loop, args=(ready, startup_error),
+                                        name='AsyncExcelApp', daemon=True)
+        self._worker.start()
+        ready.wait()
+        if startup_error:
+            self._worker.join()
+            raise startup_error[0]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    # --- Properties ---
+    @property
+    def stats(self):
+        """Thống kê: số thao tác, số lỗi/bị hủy, thời gian bận của worker, tổng thời gian chờ trong hàng đợi."""
+        with self._lock:
+            return dict(self._stats)
+
+    @property
+    def pending(self):
+        """Số thao tác đang chờ trong hàng đợi."""
+        return self._queue.qsize()
+
+    # --- Methods ---
+    def submit(self, func, *args, priority=PRIORITY_NORMAL, **kwargs):
+        """
+        Đưa func(app, *args, **kwargs) vào hàng đợi của luồng worker.
+
+        Returns:
+            concurrent.futures.Future: Kết quả (Workbook/Sheet/Range được bọc thành đối tượng Async*).
+        """
+        if self._closed:
+            raise RuntimeError("AsyncExcelApp đã bị đóng.")
+        future = Future()
+        entry = (priority, next(self._sequence), time.perf_counter(), future, func, args, kwargs)
+        self._queue.put(entry)
+        depth = self._queue.qsize()
+        with self._lock:
+            if depth > self._stats['max_queue_depth']:
+                self._stats['max_queue_depth'] = depth
+        return future
+
+    def call(self, func, *args, priority=PRIORITY_NORMAL, **kwargs):
+        """Phiên bản awaitable của submit(): await excel.call(lambda app: app.workbook_names)."""
+        return asyncio.wrap_future(self.submit(func, *args, priority=priority, **kwargs),
+                                   loop=asyncio.get_running_loop())
+
+    def open(self, path, password=None, read_only=False, priority=PRIORITY_NORMAL):
+        """Mở workbook. Trả về awaitable cho ra AsyncWorkbook."""
+        return self.call(lambda app: app.open(path, password=password, read_only=read_only), priority=priority)
+
+    def new(self, priority=PRIORITY_NORMAL):
+        """Tạo workbook mới. Trả về awaitable cho ra AsyncWorkbook."""
+        return self.call(lambda app: app.new(), priority=priority)
+
+    def workbook_names(self, priority=PRIORITY_NORMAL):
+        """Danh sách tên các workbook đang mở (awaitable)."""
+        return self.call(lambda app: app.workbook_names, priority=priority)
+
+    def convert_to_xlsx(self, source_path, destination_path=None, priority=PRIORITY_NORMAL):
+        """Chuyển đổi file sang .xlsx (không mở lại file kết quả). Trả về awaitable cho ra đường dẫn."""
+        return self.call(lambda app: app.convert_to_xlsx(source_path, destination_path, reopen=False),
+                         priority=priority)
+
+    def shutdown(self, wait=True):
+        """Dừng nhận thao tác mới, chạy nốt các thao tác đang chờ rồi đóng ExcelApp."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put((math.inf, next(self._sequence), 0.0, _STOP, None, (), {}))
+        if wait:
+            self._worker.join()
+
+    async def aclose(self):
+        """Phiên bản asyncio của shutdown(): chờ luồng worker kết thúc mà không chặn event loop."""
+        self.shutdown(wait=False)
+        await asyncio.wrap_future(self._stopped, loop=asyncio.get_running_loop())
+
+    # --- Worker ---
+    def _worker_loop(self, ready, startup_error):
+        """(Hàm nội bộ) Vòng lặp của luồng worker: tạo ExcelApp và xử lý lần lượt các thao tác."""
+        if pythoncom is not None:
+            pythoncom.CoInitialize()
+        try:
+            try:
+                self._app = self._app_factory()
+            except BaseException as e:
+                logger.error("Không thể khởi động Excel cho AsyncExcelApp. Lỗi: %s", e)
+                startup_error.append(e)
+                self._closed = True
+                return
+            finally:
+                ready.set()
+
+            while True:
+                _, _, queued_at, future, func, args, kwargs = self._queue.get()
+                if future is _STOP:
+                    break
+                if not future.set_running_or_notify_cancel():
+                    with self._lock:
+                        self._stats['cancelled'] += 1
+                    continue
+                start = time.perf_counter()
+                try:
+                    result = _wrap(self, func(self._app, *args, **kwargs))
+                except BaseException as e:
+                    failed = True
+                    future.set_exception(e)
+                else:
+                    failed = False
+                    future.set_result(result)
+                end = time.perf_counter()
+                with self._lock:
+                    self._stats['operations'] += 1
+                    self._stats['failed'] += failed
+                    self._stats['busy_seconds'] += end - start
+                    self._stats['queue_seconds'] += start - queued_at
+        finally:
+            if self._app is not None:
+                try:
+                    self._app.quit()
+                except Exception as e:
+                    logger.warning("Lỗi khi đóng Excel của AsyncExcelApp: %s", e)
+                self._app = None
+            if pythoncom is not None:
+                pythoncom.CoUninitialize()
+            logger.info("Đã dừng AsyncExcelApp. Thống kê: %s", self.stats)
+            self._stopped.set_result(None)
+
+
+def _wrap(owner, result):
+    """(Hàm nội bộ) Bọc Workbook/Sheet/Range (hoặc list các đối tượng này) thành đối tượng Async* tương ứng."""
+    if isinstance(result, Workbook):
+        return AsyncWorkbook(owner, result)
+    if isinstance(result, Sheet):
+        return AsyncSheet(owner, result)
+    if isinstance(result, Range):
+        return AsyncRange(owner, result)
+    if isinstance(result, list) and result and isinstance(result[0], (Workbook, Sheet, Range)):
+        return [_wrap(owner, item) for item in result]
+    return result
+
+
+class _AsyncProxy:
+    """
+    (Nội bộ) Lớp cơ sở của các đối tượng Async*: giữ đối tượng thật (hoặc hàm tạo ra nó, được gọi
+    lần đầu trên luồng worker) và chuyển mọi thao tác sang luồng worker.
+    """
+    def __init__(self, owner, target=None, resolve=None):
+        self._owner = owner
+        self._target = target
+        self._resolve = resolve
+
+    def _get(self):
+        """(Chỉ gọi trên luồng worker) Trả về đối tượng thật."""
+        if self._target is None:
+            self._target = self._resolve()
+            self._resolve = None
+        return self._target
+
+    def run(self, func, *args, priority=PRIORITY_NORMAL, **kwargs):
+        """Chạy func(đối tượng thật, *args, **kwargs) trên luồng worker (awaitable)."""
+        return self._owner.call(lambda app: func(self._get(), *args, **kwargs), priority=priority)
+
+
+class AsyncWorkbook(_AsyncProxy):
+    """Workbook dùng từ asyncio. Các phương thức trả về awaitable."""
+
+    def sheet(self, specifier):
+        """Trả về AsyncSheet (sheet thật được lấy trên luồng worker ở thao tác đầu tiên)."""
+        return AsyncSheet(self._owner, resolve=lambda: self._get().sheet(specifier))
+
+    def sheet_names(self, priority=PRIORITY_NORMAL):
+        return self.run(lambda book: book.sheet_names, priority=priority)
+
+    def save(self, priority=PRIORITY_NORMAL):
+        return self.run(lambda book: book.save(), priority=priority)
+
+    def save_as(self, new_path, priority=PRIORITY_NORMAL):
+        return self.run(lambda book: book.save_as(new_path), priority=priority)
+
+    def close(self, save_changes=False, priority=PRIORITY_NORMAL):
+        return self.run(lambda book: book.close(save_changes=save_changes), priority=priority)
+
+    def calculate(self, scope='full', priority=PRIORITY_NORMAL):
+        return self.run(lambda book: book.calculate(scope=scope), priority=priority)
+
+    def to_pdf(self, output_path=None, quality='standard', sheets=None, priority=PRIORITY_NORMAL):
+        return self.run(lambda book: book.to_pdf(output_path, quality=quality, sheets=sheets), priority=priority)
+
+
+class AsyncSheet(_AsyncProxy):
+    """Sheet dùng từ asyncio. Các phương thức trả về awaitable."""
+
+    def range(self, cell1, cell2=None):
+        """Trả về AsyncRange (vùng thật được lấy trên luồng worker ở thao tác đầu tiên)."""
+        return AsyncRange(self._owner, resolve=lambda: self._get().range(cell1, cell2))
+
+    def name(self, priority=PRIORITY_NORMAL):
+        return self.run(lambda sheet: sheet.name, priority=priority)
+
+    def used_range(self, priority=PRIORITY_NORMAL):
+        return self.run(lambda sheet: sheet.used_range, priority=priority)
+
+    def append_rows(self, rows, chunk_size=1000, start_row=None, column=1, priority=PRIORITY_NORMAL):
+        return self.run(lambda sheet: sheet.append_rows(rows, chunk_size=chunk_size, start_row=start_row,
+                                                        column=column), priority=priority)
+
+    def clear(self, priority=PRIORITY_NORMAL):
+        return self.run(lambda sheet: sheet.clear(), priority=priority)
+
+
+class AsyncRange(_AsyncProxy):
+    """Range dùng từ asyncio. Các phương thức trả về awaitable."""
+
+    def get_value(self, priority=PRIORITY_NORMAL):
+        return self.run(lambda rng: rng.value, priority=priority)
+
+    def set_value(self, data, priority=PRIORITY_NORMAL):
+        def write(rng):
+            rng.value = data
+        return self.run(write, priority=priority)
+
+    def get_formula(self, priority=PRIORITY_NORMAL):
+        return self.run(lambda rng: rng.formula, priority=priority)
+
+    def set_formula(self, formula_string, priority=PRIORITY_NORMAL):
+        def write(rng):
+            rng.formula = formula_string
+        return self.run(write, priority=priority)
+
+    def to_numpy(self, dtype=None, priority=PRIORITY_NORMAL):
+        return self.run(lambda rng: rng.to_numpy(dtype=dtype), priority=priority)
+
+    def clear_contents(self, priority=PRIORITY_NORMAL):
+        return self.run(lambda rng: rng.clear_contents(), priority=priority)
+
+    def to_pdf(self, output_path, quality='standard', priority=PRIORITY_NORMAL):
+        return self.run(lambda rng: rng.to_pdf(output_path, quality=quality), priority=priority)
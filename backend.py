@@ -0,0 +1,950 @@
+# -*- coding: utf-8 -*-
+"""
+File: backend.py
+Author: Your Name / Tên của bạn
+Description: Định nghĩa giao diện backend nằm bên dưới các class ExcelApp, Workbook,
+             Sheet, Range, Shape và cài đặt backend dùng xlwings (Excel thật qua COM).
+             Backend dạng file (không cần Excel) nằm trong file_backend.py.
+
+--- CHANGELOG ---
+Version 0.14.0 (2026-10-17):
+    - XlwingsBook.is_ready(): khi Excel ở chế độ tính toán thủ công (mặc định của ExcelAppPool), chỉ kiểm tra
+      Application.Ready; CalculationState ở trạng thái xlPending cho tới lần tính lại kế tiếp nên trước đây
+      việc chờ (ví dụ trước khi xuất PDF) luôn hết thời gian.
+
+Version 0.13.0 (2026-10-17):
+    - XlwingsBook.delete_names(): chỉ ghi lại file khi workbook không ở chế độ chỉ đọc và đã lưu,
+      không có thay đổi (không còn tự lưu các thay đổi khác của người dùng); ngược lại xóa qua COM.
+      Workbook được mở lại với mật khẩu và chế độ chỉ đọc ban đầu, các đối tượng XlwingsSheet/Range/Shape
+      đang dùng được trỏ lại sang workbook vừa mở.
+
+Version 0.12.0 (2026-10-17):
+    - XlwingsBook.sheet_metadata(): khi workbook đã lưu và không có thay đổi, tên và trạng thái hiển thị
+      của tất cả sheet được đọc một lượt từ workbook.xml thay vì 2 lần gọi COM cho mỗi sheet.
+
+Version 0.11.0 (2026-10-17):
+    - Thêm BookBackend.is_ready(): Excel đã sẵn sàng (không bận, không còn tính toán dở) hay chưa.
+    - BookBackend.export_pdf() nhận thêm tham số sheets: chỉ xuất các sheet được chọn mà không cần
+      kích hoạt cửa sổ (xlwings tạm ẩn các sheet còn lại trong lúc xuất).
+    - Thêm RangeBackend.export_pdf(): xuất một vùng ra PDF.
+
+Version 0.10.0 (2026-10-17):
+    - Thêm SheetBackend.calculate() (tính toán lại một sheet) và BookBackend.saved
+      (workbook không có thay đổi chưa lưu).
+
+Version 0.9.0 (2026-10-17):
+    - Thêm BookBackend.delete_names(): xóa nhiều Named Range trong một lần gọi.
+    - XlwingsBook.get_names() đọc một lượt từ workbook.xml khi workbook đã lưu và không có thay đổi;
+      XlwingsBook.delete_names() xóa số lượng lớn bằng cách ghi lại khối <definedNames> của file
+      (lưu, đóng, ghi lại, mở lại) thay vì xóa từng tên qua COM.
+
+Version 0.8.0 (2026-10-17):
+    - Thêm SheetBackend.apply_styles(): áp dụng nhiều định dạng, mỗi định dạng một lần gọi cho mỗi
+      vùng nhiều phần (chia theo giới hạn độ dài địa chỉ).
+    - Thêm hằng STYLE_ATTRIBUTES.
+
+Version 0.7.0 (2026-10-17):
+    - Thêm SheetBackend.union_range(): một vùng gồm nhiều khối để định dạng/merge trong một lần gọi
+      (xlwings dùng Range('A1:B2,D4:E5') của Excel, backend khác áp dụng lần lượt từng khối).
+
+Version 0.6.0 (2026-10-17):
+    - Thêm BookBackend.sheet_metadata(): đọc tên và trạng thái hiển thị của tất cả sheet trong một lượt.
+
+Version 0.5.0 (2026-10-17):
+    - Thêm AppBackend.book_count(): đếm số book đang mở bằng một lần gọi.
+
+Version 0.4.0 (2026-10-17):
+    - Thêm SheetBackend.next_free_row() và SheetBackend.write_row_block() làm nền cho việc
+      ghi nối tiếp (append) theo khối.
+    - AppBackend.new_book() nhận thêm tham số write_only (chỉ engine 'file' hỗ trợ).
+
+Version 0.3.0 (2026-10-17):
+    - Thêm SheetBackend.iter_row_blocks(): đọc sheet theo từng khối dòng bằng các lát cắt vùng,
+      chỉ đọc các cột được yêu cầu (gom các cột liền kề để giảm số lần gọi).
+
+Version 0.2.0 (2026-10-17):
+    - Thêm get_array()/set_array() vào RangeBackend để đọc/ghi cả khối dưới dạng mảng NumPy.
+
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo các giao diện AppBackend, BookBackend, SheetBackend, RangeBackend, ShapeBackend.
+    - Cài đặt backend xlwings: XlwingsApp, XlwingsBook, XlwingsSheet, XlwingsRange, XlwingsShape.
+    - Thêm hàm create_app_backend() để chọn engine ('xlwings' hoặc 'file').
+-------------------
+"""
+
+import weakref
+import zipfile
+from pathlib import Path
+from .converters import to_object_array, array_to_rows
+from .formula_scanner import column_index, get_sheet_parts
+from .cell_blocks import block_address, chunk_union_addresses
+from .named_ranges import read_names, remove_defined_names
+
+try:
+    import xlwings as xw
+except ImportError:
+    xw = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Các thuộc tính định dạng được hỗ trợ bởi RangeBackend.apply_style()
+STYLE_ATTRIBUTES = ('font_bold', 'font_italic', 'font_color', 'interior_color', 'number_format')
+
+# Từ số lượng này, XlwingsBook.delete_names() ghi lại workbook.xml thay vì xóa từng tên qua COM
+BULK_NAME_THRESHOLD = 500
+
+# Hằng số COM: Application.CalculationState (xlDone), Application.Calculation (xlCalculationManual)
+# và Worksheet.Visible (xlSheetVisible/xlSheetHidden)
+_XL_CALCULATION_DONE = 0
+_XL_CALCULATION_MANUAL = -4135
+_XL_SHEET_VISIBLE = -1
+_XL_SHEET_HIDDEN = 0
+
+
+class BackendNotSupportedError(NotImplementedError):
+    """Thao tác không được hỗ trợ bởi backend hiện tại (ví dụ: xuất PDF khi không có Excel)."""
+
+
+# =====================================================================
+# Giao diện chung
+# =====================================================================
+class AppBackend:
+    """
+    Giao diện của một tiến trình ứng dụng.
+
+    Thuộc tính bắt buộc: engine, visible, screen_updating, display_alerts, calculation,
+    books (list BookBackend), active_book (BookBackend hoặc None).
+    """
+    engine = None
+
+    def book_count(self):
+        """Số book đang mở (rẻ hơn việc duyệt qua books)."""
+        return len(self.books)
+
+    def get_book(self, specifier):
+        """Lấy một book đang mở theo tên hoặc index. Ném lỗi nếu không tìm thấy."""
+        raise NotImplementedError
+
+    def open_book(self, path, password=None, read_only=False):
+        raise NotImplementedError
+
+    def new_book(self, write_only=False):
+        """Tạo book mới. write_only=True: book chỉ dùng để ghi nối tiếp, dữ liệu được stream ra file."""
+        raise NotImplementedError
+
+    def quit(self):
+        raise NotImplementedError
+
+
+class BookBackend:
+    """
+    Giao diện của một workbook.
+
+    Thuộc tính bắt buộc: name, fullname, sheets (list SheetBackend).
+    """
+    def get_sheet(self, specifier):
+        """Lấy một sheet theo tên hoặc index (0-based). Ném lỗi nếu không tìm thấy."""
+        raise NotImplementedError
+
+    def sheet_metadata(self):
+        """Trả về list (sheet, tên, đang hiển thị) theo thứ tự của các sheet."""
+        return [(sheet, sheet.name, sheet.visible) for sheet in self.sheets]
+
+    def add_sheet(self, name, before=None, after=None):
+        raise NotImplementedError
+
+    def save(self, path=None):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+    def activate(self):
+        raise BackendNotSupportedError("activate")
+
+    def calculate(self):
+        raise BackendNotSupportedError("calculate")
+
+    @property
+    def saved(self):
+        """True nếu workbook không có thay đổi chưa lưu (nội dung trùng với file trên đĩa)."""
+        return False
+
+    def is_ready(self):
+        """True nếu ứng dụng sẵn sàng nhận lệnh (không bận, không còn tính toán dở)."""
+        return True
+
+    def protect(self, password=None):
+        raise BackendNotSupportedError("protect")
+
+    def unprotect(self, password=None):
+        raise BackendNotSupportedError("unprotect")
+
+    def get_names(self):
+        """Trả về list dict {'name', 'refers_to', 'scope', 'is_visible'} của tất cả Named Range."""
+        raise NotImplementedError
+
+    def add_name(self, name, refers_to):
+        raise NotImplementedError
+
+    def delete_name(self, name):
+        raise NotImplementedError
+
+    def delete_names(self, names):
+        """
+        Xóa nhiều Named Range. Mặc định gọi delete_name() cho từng tên.
+
+        Returns:
+            list: Các tuple (tên, thông báo lỗi) của những tên không xóa được.
+        """
+        failed = []
+        for name in names:
+            try:
+                self.delete_name(name)
+            except Exception as e:
+                failed.append((name, str(e)))
+        return failed
+
+    def resolve_name(self, name):
+        """Trả về RangeBackend mà Named Range trỏ tới."""
+        raise NotImplementedError
+
+    def link_sources(self):
+        """Trả về list các nguồn liên kết ngoài (đường dẫn file)."""
+        raise BackendNotSupportedError("link_sources")
+
+    def break_link(self, source):
+        raise BackendNotSupportedError("break_link")
+
+    def export_pdf(self, path, quality='standard', sheets=None):
+        """Xuất workbook (hoặc chỉ các sheet có tên trong sheets) ra PDF."""
+        raise BackendNotSupportedError("export_pdf")
+
+
+class SheetBackend:
+    """
+    Giao diện của một worksheet.
+
+    Thuộc tính bắt buộc: name (đọc/ghi), index (1-based), visible (đọc/ghi),
+    used_range (RangeBackend), shapes (list ShapeBackend).
+    """
+    def range(self, cell1, cell2=None):
+        """Lấy vùng theo địa chỉ ('A1', 'A1:C3') hoặc theo tọa độ (dòng, cột) 1-based."""
+        raise NotImplementedError
+
+    def delete(self):
+        raise NotImplementedError
+
+    def activate(self):
+        raise BackendNotSupportedError("activate")
+
+    def clear(self):
+        raise NotImplementedError
+
+    def autofit(self):
+        raise BackendNotSupportedError("autofit")
+
+    def calculate(self):
+        """Tính toán lại các công thức của sheet này."""
+        raise BackendNotSupportedError("calculate")
+
+    def iter_row_blocks(self, chunk_size=1000, columns=None):
+        """
+        Đọc used_range theo từng khối chunk_size dòng, mỗi khối đọc bằng một lần gọi
+        cho mỗi nhóm cột liền kề.
+
+        Args:
+            chunk_size (int): Số dòng mỗi khối.
+            columns (list, optional): Các cột cần đọc ('A', 'C' hoặc 1, 3). Mặc định: tất cả.
+
+        Yields:
+            tuple: (số thứ tự dòng đầu của khối, list các dòng).
+        """
+        used = self.used_range
+        first_row, first_col = used.row, used.column
+        nrows, ncols = used.shape
+        if columns is None:
+            wanted = list(range(first_col, first_col + ncols))
+        else:
+            wanted = [column_index(c) if isinstance(c, str) else int(c) for c in columns]
+
+        runs = []
+        for col in sorted(set(wanted)):
+            if runs and runs[-1][1] == col - 1:
+                runs[-1][1] = col
+            else:
+                runs.append([col, col])
+
+        last_row = first_row + nrows - 1
+        for start in range(first_row, last_row + 1, chunk_size):
+            end = min(start + chunk_size - 1, last_row)
+            by_col = {}
+            for run_start, run_end in runs:
+                block = self.range((start, run_start), (end, run_end)).get_values()
+                for j, col in enumerate(range(run_start, run_end + 1)):
+                    by_col[col] = [row[j] for row in block]
+            yield start, [[by_col[col][i] for col in wanted] for i in range(end - start + 1)]
+
+    def union_range(self, blocks):
+        """
+        Vùng gồm nhiều khối (dòng đầu, cột đầu, dòng cuối, cột cuối) để áp dụng định dạng hoặc merge
+        cho tất cả trong một lần gọi. Người gọi chịu trách nhiệm giữ độ dài địa chỉ trong giới hạn
+        (cell_blocks.chunk_union_addresses). Mặc định: áp dụng lần lượt cho từng khối.
+        """
+        return MultiAreaRange([self.range((b[0], b[1]), (b[2], b[3])) for b in blocks])
+
+    def apply_styles(self, style_blocks):
+        """
+        Áp dụng nhiều định dạng cho nhiều khối ô.
+
+        Args:
+            style_blocks (list): List (dict định dạng cho apply_style(), list khối), áp dụng theo thứ tự.
+
+        Returns:
+            int: Số lần gọi backend đã thực hiện.
+        """
+        calls = 0
+        for style, blocks in style_blocks:
+            for chunk in chunk_union_addresses(blocks):
+                self.union_range(chunk).apply_style(**style)
+                calls += 1
+        return calls
+
+    def next_free_row(self):
+        """Số thứ tự dòng trống đầu tiên nằm dưới used_range (1 nếu sheet trống)."""
+        used = self.used_range
+        nrows, ncols = used.shape
+        if nrows == 1 and ncols == 1 and used.get_values()[0][0] is None:
+            return used.row
+        return used.row + nrows
+
+    def write_row_block(self, start_row, start_col, rows):
+        """
+        Ghi một khối dòng (list 2 chiều, các dòng có thể dài ngắn khác nhau) trong một lần gọi.
+        """
+        width = max((len(row) for row in rows), default=0)
+        if not rows or width == 0:
+            return
+        padded = [list(row) + [None] * (width - len(row)) for row in rows]
+        block = self.range((start_row, start_col), (start_row + len(rows) - 1, start_col + width - 1))
+        block.set_values(padded)
+
+
+class RangeBackend:
+    """
+    Giao diện của một vùng ô.
+
+    Thuộc tính bắt buộc: value, formula (đọc/ghi, cùng quy ước hình dạng với xlwings:
+    một ô -> giá trị đơn, một dòng/cột -> list 1 chiều, còn lại -> list 2 chiều),
+    address ('$A$1:$B$2'), row, column, shape (số dòng, số cột), sheet_name.
+    """
+    def get_values(self):
+        """Đọc toàn bộ vùng dưới dạng list 2 chiều trong một lần gọi."""
+        raise NotImplementedError
+
+    def set_values(self, rows):
+        """Ghi một list 2 chiều bắt đầu từ ô trên cùng bên trái trong một lần gọi."""
+        raise NotImplementedError
+
+    def get_formulas(self):
+        """Đọc công thức của toàn bộ vùng dưới dạng list 2 chiều trong một lần gọi."""
+        raise NotImplementedError
+
+    def get_array(self):
+        """Đọc toàn bộ vùng thành mảng NumPy 2 chiều (kiểu object, ô trống là None)."""
+        return to_object_array(self.get_values())
+
+    def set_array(self, arr):
+        """Ghi một mảng NumPy bắt đầu từ ô trên cùng bên trái trong một lần gọi."""
+        self.set_values(array_to_rows(arr))
+
+    def clear(self):
+        raise NotImplementedError
+
+    def clear_contents(self):
+        raise NotImplementedError
+
+    def copy_to(self, destination):
+        raise NotImplementedError
+
+    def export_pdf(self, path, quality='standard'):
+        raise BackendNotSupportedError("export_pdf")
+
+    def apply_style(self, font_bold=None, font_italic=None, font_color=None, interior_color=None, number_format=None):
+        raise NotImplementedError
+
+    def merge(self):
+        raise NotImplementedError
+
+    def unmerge(self):
+        raise NotImplementedError
+
+    def autofit(self):
+        raise BackendNotSupportedError("autofit")
+
+
+class MultiAreaRange(RangeBackend):
+    """Vùng nhiều phần dùng cho backend không hỗ trợ union: chuyển tiếp thao tác tới từng vùng con."""
+    def __init__(self, areas):
+        self._areas = areas
+
+    @property
+    def address(self):
+        return ','.join(area.address for area in self._areas)
+
+    def clear(self):
+        for area in self._areas:
+            area.clear()
+
+    def clear_contents(self):
+        for area in self._areas:
+            area.clear_contents()
+
+    def apply_style(self, font_bold=None, font_italic=None, font_color=None, interior_color=None, number_format=None):
+        for area in self._areas:
+            area.apply_style(font_bold=font_bold, font_italic=font_italic, font_color=font_color,
+                             interior_color=interior_color, number_format=number_format)
+
+    def merge(self):
+        for area in self._areas:
+            area.merge()
+
+    def unmerge(self):
+        for area in self._areas:
+            area.unmerge()
+
+
+class ShapeBackend:
+    """
+    Giao diện của một đối tượng đồ họa.
+
+    Thuộc tính bắt buộc (đọc/ghi): name, text, left, top, width, height.
+    """
+    def delete(self):
+        raise NotImplementedError
+
+    def copy(self):
+        raise BackendNotSupportedError("copy")
+
+
+# =====================================================================
+# Backend xlwings (Excel thật qua COM)
+# =====================================================================
+class XlwingsApp(AppBackend):
+    """Backend dùng một tiến trình Excel thật thông qua xlwings."""
+    engine = 'xlwings'
+
+    def __init__(self, visible=True, add_book=False, xlw_app=None):
+        if xlw_app is None:
+            if xw is None:
+                raise ImportError("'xlwings' is not installed. Please install it using: pip install xlwings, or use engine='file'.")
+            xlw_app = xw.App(visible=visible, add_book=add_book)
+        self._xlw_app = xlw_app
+
+    @property
+    def pid(self):
+        return self._xlw_app.pid
+
+    @property
+    def visible(self):
+        return self._xlw_app.visible
+
+    @visible.setter
+    def visible(self, value):
+        self._xlw_app.visible = value
+
+    @property
+    def screen_updating(self):
+        return self._xlw_app.screen_updating
+
+    @screen_updating.setter
+    def screen_updating(self, value):
+        self._xlw_app.screen_updating = value
+
+    @property
+    def display_alerts(self):
+        return self._xlw_app.display_alerts
+
+    @display_alerts.setter
+    def display_alerts(self, value):
+        self._xlw_app.display_alerts = value
+
+    @property
+    def calculation(self):
+        return self._xlw_app.calculation
+
+    @calculation.setter
+    def calculation(self, value):
+        self._xlw_app.calculation = value
+
+    @property
+    def books(self):
+        return [XlwingsBook(b) for b in self._xlw_app.books]
+
+    def book_count(self):
+        return self._xlw_app.books.count
+
+    @property
+    def active_book(self):
+        xlw_book = self._xlw_app.books.active
+        return XlwingsBook(xlw_book) if xlw_book else None
+
+    def get_book(self, specifier):
+        return XlwingsBook(self._xlw_app.books[specifier])
+
+    def open_book(self, path, password=None, read_only=False):
+        xlw_book = self._xlw_app.books.open(str(path), password=password, read_only=read_only, ignore_read_only_recommended=True)
+        return XlwingsBook(xlw_book, password=password)
+
+    def new_book(self, write_only=False):
+        if write_only:
+            raise BackendNotSupportedError("Chế độ write_only chỉ hỗ trợ engine 'file'.")
+        return XlwingsBook(self._xlw_app.books.add())
+
+    def quit(self):
+        self._xlw_app.quit()
+
+
+class XlwingsBook(BookBackend):
+    def __init__(self, xlw_book, password=None):
+        self._xlw_book = xlw_book
+        self._password = password
+        # Các sheet đã tạo từ book này, được trỏ lại sang book mới khi book phải đóng và mở lại
+        self._live_sheets = weakref.WeakSet()
+
+    def _track(self, sheet):
+        self._live_sheets.add(sheet)
+        return sheet
+
+    @property
+    def name(self):
+        return self._xlw_book.name
+
+    @property
+    def fullname(self):
+        return self._xlw_book.fullname
+
+    @property
+    def sheets(self):
+        return [self._track(XlwingsSheet(s)) for s in self._xlw_book.sheets]
+
+    def get_sheet(self, specifier):
+        return self._track(XlwingsSheet(self._xlw_book.sheets[specifier]))
+
+    def sheet_metadata(self):
+        sheets = self.sheets
+        path = self._saved_package()
+        if path is not None:
+            try:
+                with zipfile.ZipFile(path) as zf:
+                    # Chỉ worksheet, cùng thứ tự với Worksheets của Excel (bỏ qua chart sheet)
+                    parts = [(name, state) for name, part, state in get_sheet_parts(zf)
+                             if '/worksheets/' in '/' + part]
+            except Exception:
+                parts = None
+            if parts is not None and len(parts) == len(sheets):
+                return [(sheet, name, state == 'visible') for sheet, (name, state) in zip(sheets, parts)]
+        return [(sheet, sheet.name, sheet.visible) for sheet in sheets]
+
+    def add_sheet(self, name, before=None, after=None):
+        before_sheet = self._xlw_book.sheets[before] if before is not None else None
+        after_sheet = self._xlw_book.sheets[after] if after is not None else None
+        return self._track(XlwingsSheet(self._xlw_book.sheets.add(name, before=before_sheet, after=after_sheet)))
+
+    def save(self, path=None):
+        self._xlw_book.save(str(path) if path else None)
+
+    def close(self):
+        self._xlw_book.close()
+
+    def activate(self):
+        self._xlw_book.activate()
+
+    def calculate(self):
+        self._xlw_book.api.Calculate()
+
+    def protect(self, password=None):
+        self._xlw_book.api.Protect(Password=password)
+
+    def unprotect(self, password=None):
+        self._xlw_book.api.Unprotect(Password=password)
+
+    @property
+    def saved(self):
+        return bool(self._xlw_book.api.Saved)
+
+    def _saved_package(self):
+        """(Hàm nội bộ) Đường dẫn file .xlsx/.xlsm nếu workbook đã lưu và không có thay đổi, ngược lại None."""
+        path = Path(self._xlw_book.fullname)
+        if self.saved and path.is_file() and zipfile.is_zipfile(path):
+            return path
+        return None
+
+    def get_names(self):
+        path = self._saved_package()
+        if path is not None:
+            # Một lượt đọc workbook.xml thay vì 4 lần gọi COM cho mỗi tên
+            return read_names(path)
+        names_list = []
+        for name in self._xlw_book.api.Names:
+            names_list.append({
+                'name': name.Name,
+                'refers_to': name.RefersTo,
+                'scope': name.Parent.Name,
+                'is_visible': name.Visible
+            })
+        return names_list
+
+    def add_name(self, name, refers_to):
+        self._xlw_book.names.add(name, refers_to)
+
+    def delete_name(self, name):
+        self._xlw_book.api.Names(name).Delete()
+
+    def delete_names(self, names):
+        names = list(names)
+        path = self._rewritable_package() if len(names) >= BULK_NAME_THRESHOLD else None
+        if path is None:
+            return super().delete_names(names)
+        self._reopen_after(lambda: remove_defined_names(path, names), path)
+        return []
+
+    def _rewritable_package(self):
+        """
+        (Hàm nội bộ) Đường dẫn file nếu có thể ghi lại trực tiếp: workbook không ở chế độ chỉ đọc,
+        đã lưu và không có thay đổi (không lưu thay cho người dùng). Ngược lại None.
+        """
+        try:
+            if self._xlw_book.api.ReadOnly:
+                return None
+            return self._saved_package()
+        except Exception:
+            return None
+
+    def _reopen_after(self, rewrite, path):
+        """
+        (Hàm nội bộ) Đóng workbook, gọi rewrite() để ghi lại file, rồi mở lại với mật khẩu và chế độ
+        chỉ đọc ban đầu. Các XlwingsSheet (và vùng/shape của chúng) đang dùng được trỏ sang book mới.
+        """
+        read_only = bool(self._xlw_book.api.ReadOnly)
+        locations = [(sheet, sheet._xlw_sheet.name, [(child, child._locate()) for child in list(sheet._children)])
+                     for sheet in list(self._live_sheets)]
+        app = self._xlw_book.app
+        self._xlw_book.close()
+        try:
+            rewrite()
+        finally:
+            self._xlw_book = app.books.open(str(path), password=self._password, read_only=read_only,
+                                            ignore_read_only_recommended=True)
+            for sheet, name, children in locations:
+                try:
+                    sheet._xlw_sheet = self._xlw_book.sheets[name]
+                except Exception:
+                    continue  # Sheet không còn tồn tại trong file
+                for child, location in children:
+                    try:
+                        child._relocate(sheet._xlw_sheet, location)
+                    except Exception:
+                        pass
+
+    def resolve_name(self, name):
+        return XlwingsRange(self._xlw_book.names[name].refers_to_range)
+
+    def link_sources(self):
+        links = self._xlw_book.api.LinkSources(1)  # 1 = xlExcelLinks
+        return list(links) if links else []
+
+    def break_link(self, source):
+        self._xlw_book.api.BreakLink(Name=source, Type=1)
+
+    def is_ready(self):
+        api = self._xlw_book.app.api
+        if not api.Ready:
+            return False
+        # Ở chế độ thủ công, thay đổi chưa tính lại giữ CalculationState = xlPending cho tới khi gọi tính lại
+        return api.Calculation == _XL_CALCULATION_MANUAL or api.CalculationState == _XL_CALCULATION_DONE
+
+    def export_pdf(self, path, quality='standard', sheets=None):
+        quality_val = 0 if quality == 'standard' else 1
+        if not sheets:
+            self._xlw_book.api.ExportAsFixedFormat(0, str(path), Quality=quality_val)
+            return
+        # Sheet bị ẩn không được xuất: tạm ẩn các sheet không chọn thay vì chọn (Select) nhóm sheet,
+        # việc chọn sheet đòi hỏi kích hoạt cửa sổ workbook.
+        selected = set(sheets)
+        missing = selected - {s.name for s in self._xlw_book.sheets}
+        if missing:
+            raise KeyError(f"Không tìm thấy sheet: {', '.join(sorted(missing))}")
+        changed = []
+        try:
+            for sheet in self._xlw_book.sheets:
+                visible = sheet.api.Visible
+                wanted = _XL_SHEET_VISIBLE if sheet.name in selected else _XL_SHEET_HIDDEN
+                if (visible == _XL_SHEET_VISIBLE) != (wanted == _XL_SHEET_VISIBLE):
+                    changed.append((sheet, visible))
+            # Hiện các sheet được chọn trước, để workbook luôn có ít nhất một sheet hiển thị
+            changed.sort(key=lambda item: item[1] == _XL_SHEET_VISIBLE)
+            for sheet, visible in changed:
+                sheet.api.Visible = _XL_SHEET_HIDDEN if visible == _XL_SHEET_VISIBLE else _XL_SHEET_VISIBLE
+            self._xlw_book.api.ExportAsFixedFormat(0, str(path), Quality=quality_val)
+        finally:
+            for sheet, visible in reversed(changed):
+                sheet.api.Visible = visible
+
+
+class XlwingsSheet(SheetBackend):
+    def __init__(self, xlw_sheet):
+        self._xlw_sheet = xlw_sheet
+        # Các vùng/shape đã tạo từ sheet này (xem XlwingsBook._reopen_after())
+        self._children = weakref.WeakSet()
+
+    def _track(self, child):
+        self._children.add(child)
+        return child
+
+    @property
+    def name(self):
+        return self._xlw_sheet.name
+
+    @name.setter
+    def name(self, value):
+        self._xlw_sheet.name = value
+
+    @property
+    def index(self):
+        return self._xlw_sheet.index
+
+    @property
+    def visible(self):
+        return self._xlw_sheet.api.Visible == -1  # -1 = xlSheetVisible
+
+    @visible.setter
+    def visible(self, value):
+        self._xlw_sheet.api.Visible = -1 if value else 0
+
+    @property
+    def used_range(self):
+        return self._track(XlwingsRange(self._xlw_sheet.used_range))
+
+    @property
+    def shapes(self):
+        return [self._track(XlwingsShape(s)) for s in self._xlw_sheet.shapes]
+
+    def range(self, cell1, cell2=None):
+        if cell2 is None:
+            return self._track(XlwingsRange(self._xlw_sheet.range(cell1)))
+        return self._track(XlwingsRange(self._xlw_sheet.range(cell1, cell2)))
+
+    def union_range(self, blocks):
+        # Excel hiểu địa chỉ nhiều vùng ngăn cách bằng dấu phẩy; thao tác trên vùng này là một lần gọi COM
+        return self._track(XlwingsRange(self._xlw_sheet.range(','.join(block_address(b) for b in blocks))))
+
+    def delete(self):
+        self._xlw_sheet.delete()
+
+    def activate(self):
+        self._xlw_sheet.activate()
+
+    def clear(self):
+        self._xlw_sheet.clear()
+
+    def autofit(self):
+        self._xlw_sheet.autofit()
+
+    def calculate(self):
+        self._xlw_sheet.api.Calculate()
+
+
+class XlwingsRange(RangeBackend):
+    def __init__(self, xlw_range):
+        self._xlw_range = xlw_range
+
+    def _locate(self):
+        return self._xlw_range.address
+
+    def _relocate(self, xlw_sheet, address):
+        self._xlw_range = xlw_sheet.range(address)
+
+    @property
+    def value(self):
+        return self._xlw_range.value
+
+    @value.setter
+    def value(self, data):
+        self._xlw_range.value = data
+
+    @property
+    def formula(self):
+        return self._xlw_range.formula
+
+    @formula.setter
+    def formula(self, formula_string):
+        self._xlw_range.formula = formula_string
+
+    def get_values(self):
+        return self._xlw_range.options(ndim=2).value
+
+    def set_values(self, rows):
+        self._xlw_range.options(ndim=2).value = rows
+
+    def get_array(self):
+        # Dùng bộ chuyển đổi NumPy có sẵn của xlwings, tránh dựng list lồng nhau ở phía Python
+        if np is None:
+            return super().get_array()
+        arr = self._xlw_range.options(np.array, ndim=2).value
+        return arr if arr.dtype == object else arr.astype(object)
+
+    def get_formulas(self):
+        formulas = self._xlw_range.formula
+        if isinstance(formulas, str):
+            return [[formulas]]
+        return [list(row) for row in formulas]
+
+    @property
+    def address(self):
+        return self._xlw_range.address
+
+    @property
+    def row(self):
+        return self._xlw_range.row
+
+    @property
+    def column(self):
+        return self._xlw_range.column
+
+    @property
+    def shape(self):
+        return self._xlw_range.shape
+
+    @property
+    def sheet_name(self):
+        return self._xlw_range.sheet.name
+
+    def clear(self):
+        self._xlw_range.clear()
+
+    def clear_contents(self):
+        self._xlw_range.clear_contents()
+
+    def copy_to(self, destination):
+        self._xlw_range.copy(destination._xlw_range)
+
+    def export_pdf(self, path, quality='standard'):
+        quality_val = 0 if quality == 'standard' else 1
+        self._xlw_range.api.ExportAsFixedFormat(0, str(path), Quality=quality_val)
+
+    def apply_style(self, font_bold=None, font_italic=None, font_color=None, interior_color=None, number_format=None):
+        if font_bold is not None:
+            self._xlw_range.font.bold = font_bold
+        if font_italic is not None:
+            self._xlw_range.font.italic = font_italic
+        if font_color:
+            self._xlw_range.font.color = font_color
+        if interior_color:
+            self._xlw_range.color = interior_color
+        if number_format:
+            self._xlw_range.number_format = number_format
+
+    def merge(self):
+        self._xlw_range.merge()
+
+    def unmerge(self):
+        self._xlw_range.unmerge()
+
+    def autofit(self):
+        self._xlw_range.autofit()
+
+
+class XlwingsShape(ShapeBackend):
+    def __init__(self, xlw_shape):
+        self._xlw_shape = xlw_shape
+
+    def _locate(self):
+        return self._xlw_shape.name
+
+    def _relocate(self, xlw_sheet, name):
+        self._xlw_shape = xlw_sheet.shapes[name]
+
+    @property
+    def name(self):
+        return self._xlw_shape.name
+
+    @name.setter
+    def name(self, value):
+        self._xlw_shape.name = value
+
+    @property
+    def text(self):
+        return self._xlw_shape.text
+
+    @text.setter
+    def text(self, value):
+        self._xlw_shape.text = value
+
+    @property
+    def left(self):
+        return self._xlw_shape.left
+
+    @left.setter
+    def left(self, value):
+        self._xlw_shape.left = value
+
+    @property
+    def top(self):
+        return self._xlw_shape.top
+
+    @top.setter
+    def top(self, value):
+        self._xlw_shape.top = value
+
+    @property
+    def width(self):
+        return self._xlw_shape.width
+
+    @width.setter
+    def width(self, value):
+        self._xlw_shape.width = value
+
+    @property
+    def height(self):
+        return self._xlw_shape.height
+
+    @height.setter
+    def height(self, value):
+        self._xlw_shape.height = value
+
+    def delete(self):
+        self._xlw_shape.delete()
+
+    def copy(self):
+        self._xlw_shape.api.Copy()
+
+
+# =====================================================================
+# Factory
+# =====================================================================
+def create_app_backend(engine='xlwings', visible=True, add_book=False):
+    """
+    Tạo backend ứng dụng theo tên engine.
+
+    Args:
+        engine (str or AppBackend): 'xlwings' (Excel thật), 'file' (đọc/ghi trực tiếp file,
+                                    không cần Excel) hoặc một đối tượng AppBackend có sẵn.
+        visible (bool): Chỉ có tác dụng với engine 'xlwings'.
+        add_book (bool): True để tạo sẵn một workbook mới.
+    """
+    if isinstance(engine, AppBackend):
+        return engine
+    if engine == 'xlwings':
+        return XlwingsApp(visible=visible, add_book=add_book)
+    if engine == 'file':
+        from .file_backend import FileApp
+        app = FileApp()
+        if add_book:
+            app.new_book()
+        return app
+    raise ValueError(f"Engine không hợp lệ: '{engine}'. Chọn 'xlwings' hoặc 'file'.")
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+File: batch_convert.py
+Author: Your Name / Tên của bạn
+Description: Chuyển đổi hàng loạt file (.xls, .xlsm, ...) sang .xlsx song song trên nhiều
+             tiến trình Excel (ExcelAppPool), bỏ qua các file đã được chuyển đổi.
+
+--- CHANGELOG ---
+Version 0.2.0 (2026-10-17):
+    - Dùng logging (log_utils.py) thay cho print().
+
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo module với hàm convert_many().
+-------------------
+"""
+
+import logging
+import time
+from pathlib import Path
+from .app_pool import ExcelAppPool
+
+logger = logging.getLogger(__name__)
+
+
+def convert_with_app(app, source, destination):
+    """Bộ chuyển đổi mặc định: dùng ExcelApp.convert_to_xlsx() và không mở lại file kết quả."""
+    if app.convert_to_xlsx(source, destination, reopen=False) is None:
+        raise RuntimeError(f"Không thể chuyển đổi '{source}' (xem thông báo ERROR ở trên).")
+
+
+def _timed_convert(app, job, converter):
+    """(Hàm nội bộ) Chạy một job chuyển đổi trong worker và đo thời gian."""
+    start = time.perf_counter()
+    converter(app, job['source'], job['destination'])
+    return time.perf_counter() - start
+
+
+def convert_many(sources, dest_dir, workers=2, converter=None, pool=None, app_factory=None,
+                 engine='xlwings', overwrite=False):
+    """
+    Chuyển đổi nhiều file sang .xlsx, chia đều cho các tiến trình Excel chạy song song.
+
+    File đích là dest_dir/<tên file nguồn>.xlsx. File nguồn có file đích mới hơn sẽ được bỏ qua
+    (trừ khi overwrite=True). Các file lớn được đưa vào hàng đợi trước để các worker kết thúc
+    gần như cùng lúc.
+
+    Args:
+        sources (iterable): Danh sách đường dẫn file nguồn.
+        dest_dir (str or Path): Thư mục chứa file kết quả (tự tạo nếu chưa có).
+        workers (int): Số tiến trình Excel chạy song song (khi không truyền pool).
+        converter (callable, optional): Hàm converter(app, source, destination) thực hiện chuyển đổi
+                                        một file và ném lỗi nếu thất bại. Mặc định: convert_with_app.
+        pool (ExcelAppPool, optional): Pool có sẵn để dùng. Nếu không truyền, một pool tạm thời
+                                       được tạo và đóng sau khi xong.
+        app_factory (callable, optional): Truyền cho ExcelAppPool khi tạo pool tạm thời.
+        engine (str): Engine của pool tạm thời ('xlwings' hoặc 'file').
+        overwrite (bool): True để chuyển đổi lại cả các file đã có kết quả mới hơn.
+
+    Returns:
+        list: Báo cáo theo đúng thứ tự của sources, mỗi phần tử là dict
+              {'source', 'destination', 'status' ('converted'|'skipped'|'failed'),
+               'seconds', 'error'}.
+    """
+    dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    converter = converter or convert_with_app
+
+    report = []
+    seen = {}
+    for source in sources:
+        source = Path(source).resolve()
+        destination = (dest_dir / source.name).with_suffix('.xlsx').resolve()
+        if destination in seen:
+            raise ValueError(f"'{source}' và '{seen[destination]}' cùng cho ra file '{destination.name}'.")
+        seen[destination] = source
+        report.append({'source': source, 'destination': destination, 'status': None,
+                       'seconds': 0.0, 'error': None})
+
+    pending = []
+    for job in report:
+        if not job['source'].is_file():
+            job['status'] = 'failed'
+            job['error'] = "Không tìm thấy file nguồn."
+        elif (not overwrite and job['destination'].is_file()
+              and job['destination'].stat().st_mtime >= job['source'].stat().st_mtime):
+            job['status'] = 'skipped'
+        else:
+            pending.append(job)
+    pending.sort(key=lambda j: j['source'].stat().st_size, reverse=True)
+
+    logger.info("Chuyển đổi %s file (%s file bỏ qua/lỗi) với %s worker...",
+                len(pending), len(report) - len(pending), pool.size if pool else workers)
+    start = time.perf_counter()
+    own_pool = pool is None and bool(pending)
+    if own_pool:
+        pool = ExcelAppPool(size=min(workers, len(pending)), app_factory=app_factory, engine=engine)
+    try:
+        futures = [(job, pool.submit(_timed_convert, job, converter)) for job in pending]
+        for job, future in futures:
+            try:
+                job['seconds'] = future.result()
+                job['status'] = 'converted'
+            except Exception as e:
+                job['status'] = 'failed'
+                job['error'] = str(e)
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+    counts = {status: sum(1 for job in report if job['status'] == status)
+              for status in ('converted', 'skipped', 'failed')}
+    logger.info("Hoàn tất sau %.2fs - chuyển đổi: %s, bỏ qua: %s, lỗi: %s.",
+                time.perf_counter() - start, counts['converted'], counts['skipped'], counts['failed'])
+    return report
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+File: benchmarks/bench_named_ranges.py
+Author: Your Name / Tên của bạn
+Description: So sánh cách quản lý Named Range từng tên một (đọc, lọc bằng _is_valid_named_range,
+             xóa từng tên) với cách hàng loạt của named_ranges.py trên một file có nhiều tên
+             được sinh ngẫu nhiên.
+
+Chạy từ thư mục cha của package:
+    python -m <tên package>.benchmarks.bench_named_ranges --names 100000
+
+Với engine 'xlwings', cách từng tên một cần 4 lần gọi COM để đọc và 1 lần để xóa mỗi tên;
+benchmark in ra số lần gọi ước tính này bên cạnh thời gian đo được trên engine 'file'.
+
+--- CHANGELOG ---
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo benchmark Named Range từng tên một so với hàng loạt.
+-------------------
+"""
+
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+import zipfile
+from xml.sax.saxutils import escape
+from openpyxl import Workbook as OpenpyxlWorkbook
+from ..excelapp import ExcelApp
+from ..named_ranges import read_names, select_names, remove_defined_names
+
+
+def _legacy_is_valid(name_str):
+    """Bộ lọc cũ: 3 lần so khớp regex cho mỗi tên."""
+    if name_str.startswith('_xlfn'):
+        return False
+    if not bool(re.match(r'^[A-Za-z_][A-Za-z0-9_]*$', name_str)):
+        return False
+    if re.match(r'^[A-Za-z]{3}\d', name_str):
+        return False
+    return True
+
+
+def _legacy_select(names):
+    """Vòng lọc cũ của Workbook.delete_all_named_ranges()."""
+    selected = []
+    for name in names:
+        name_str = name['name'].split('!')[-1]
+        if _legacy_is_valid(name_str) and not ("Print_Area" in name_str or "Print_Titles" in name_str):
+            selected.append(name['name'])
+    return selected
+
+
+def make_workbook(path, count, sheets=3, seed=0):
+    """Tạo file .xlsx có count Named Range ngẫu nhiên (ghi thẳng khối <definedNames> vào workbook.xml)."""
+    wb = OpenpyxlWorkbook()
+    wb.active.title = 'Sheet0'
+    for i in range(1, sheets):
+        wb.create_sheet(f'Sheet{i}')
+    wb.save(path)
+
+    rng = random.Random(seed)
+    parts = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.05:
+            name = f'_xlfn.FUNC{i}'
+        elif kind < 0.10:
+            name = f'ABC{i}'  # Giống địa chỉ ô
+        else:
+            name = f'Junk_{i}'
+        target = '#REF!' if kind > 0.8 else f'Sheet{rng.randrange(sheets)}!$A${rng.randrange(1, 1000)}'
+        local = f' localSheetId="{rng.randrange(sheets)}"' if rng.random() < 0.2 else ''
+        parts.append(f'<definedName name="{name}"{local}>{escape(target)}</definedName>')
+    block = ('<definedNames>' + ''.join(parts) + '</definedNames>').encode()
+
+    tmp = path + '.tmp'
+    with zipfile.ZipFile(path) as zin, zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as zout:
+        for info in zin.infolist():
+            data = zin.read(info)
+            if info.filename == 'xl/workbook.xml':
+                data = re.sub(rb'<definedNames\s*/>', b'', data).replace(b'</sheets>', b'</sheets>' + block, 1)
+            zout.writestr(info, data)
+    os.replace(tmp, path)
+
+
+def _timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<45} {elapsed * 1000:10.1f} ms")
+    return elapsed, result
+
+
+def run(count):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'names.xlsx')
+        make_workbook(path, count)
+        print(f"Benchmark {count} Named Range ({os.path.getsize(path) / 1e6:.1f} MB):")
+
+        app = ExcelApp(visible=False, screen_updating=False, display_alerts=False, engine='file')
+        try:
+            print("Từng tên một:")
+            load_time, book = _timed("Đọc: nạp workbook (openpyxl)",
+                                     lambda: app.open(path))
+            read_time, names = _timed("Đọc: get_names()", book._impl.get_names)
+            filter_time, legacy = _timed("Lọc: _is_valid_named_range() từng tên", lambda: _legacy_select(names))
+
+            def delete_one_by_one():
+                for name in legacy:
+                    book._impl.delete_name(name)
+                book.save()
+            delete_time, _ = _timed("Xóa: delete_name() từng tên + lưu", delete_one_by_one)
+            book.close()
+            legacy_total = load_time + read_time + filter_time + delete_time
+        finally:
+            app.quit()
+
+        make_workbook(path, count)
+        print("Hàng loạt:")
+        bulk_read, names = _timed("Đọc: read_names() từ workbook.xml", lambda: read_names(path))
+        bulk_filter, selected = _timed("Lọc: select_names() (regex biên dịch sẵn)", lambda: select_names(names))
+        bulk_delete, removed = _timed("Xóa: remove_defined_names()", lambda: remove_defined_names(path, selected))
+        bulk_total = bulk_read + bulk_filter + bulk_delete
+
+        assert len(selected) == len(legacy) == removed
+        print(f"  Đã xóa {removed}/{len(names)} tên. Tổng: {legacy_total:.2f}s -> {bulk_total:.2f}s "
+              f"(x{legacy_total / bulk_total:.1f})")
+        print(f"  Số lần gọi COM ước tính với engine 'xlwings': {4 * len(names) + len(legacy)} -> 0")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--names', type=int, default=100000)
+    args = parser.parse_args()
+    run(args.names)
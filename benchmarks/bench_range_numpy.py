@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+File: benchmarks/bench_range_numpy.py
+Author: Your Name / Tên của bạn
+Description: So sánh tốc độ đọc/ghi cả khối giữa Range.value (list lồng nhau)
+             và Range.to_numpy()/from_numpy().
+
+Chạy từ thư mục cha của package:
+    python -m <tên package>.benchmarks.bench_range_numpy --rows 100000 --cols 10 --engine file
+
+--- CHANGELOG ---
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo benchmark Range.value so với Range.to_numpy()/from_numpy().
+-------------------
+"""
+
+import argparse
+import time
+import numpy as np
+from ..excelapp import ExcelApp
+from ..formula_scanner import column_letter
+
+
+def _timed(label, func, repeat):
+    """(Hàm nội bộ) Chạy func nhiều lần và in thời gian tốt nhất."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<40} {best * 1000:10.1f} ms")
+    return best
+
+
+def run(rows, cols, engine='file', repeat=3):
+    data = np.random.default_rng(0).random((rows, cols))
+    data[::7, 0] = np.nan  # Một số ô trống
+    address = f"A1:{column_letter(cols)}{rows}"
+
+    app = ExcelApp(visible=False, screen_updating=False, display_alerts=False, engine=engine)
+    try:
+        sheet = app.new().sheet(0)
+        rng = sheet.range(address)
+        print(f"Benchmark {rows} dòng x {cols} cột (engine='{engine}'):")
+
+        write_value = _timed("Ghi: Range.value = list", lambda: setattr(rng, 'value', data.tolist()), repeat)
+        write_numpy = _timed("Ghi: Range.from_numpy(arr)", lambda: rng.from_numpy(data), repeat)
+        read_value = _timed("Đọc: np.array(Range.value, float)",
+                            lambda: np.array([[np.nan if v is None else v for v in row] for row in rng.value], dtype=float),
+                            repeat)
+        read_numpy = _timed("Đọc: Range.to_numpy(float)", lambda: rng.to_numpy(float), repeat)
+
+        print(f"  Tăng tốc ghi: x{write_value / write_numpy:.2f}, đọc: x{read_value / read_numpy:.2f}")
+    finally:
+        app.quit()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--cols', type=int, default=10)
+    parser.add_argument('--engine', default='file')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.rows, args.cols, engine=args.engine, repeat=args.repeat)
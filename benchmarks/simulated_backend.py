@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+File: benchmarks/simulated_backend.py
+Author: Your Name / Tên của bạn
+Description: Backend mô phỏng Excel trong cùng tiến trình cho benchmark: dùng engine 'file' để xử lý
+             dữ liệu thật và cộng thêm độ trễ của mỗi lần gọi theo một mô hình chi phí COM
+             (chi phí cố định mỗi lần gọi + chi phí theo số ô truyền qua).
+
+Mô hình được gắn qua cơ chế profiler của ExcelApp (ExcelApp(engine='file', profiler=SimulatedLatency())),
+nên mọi lần gọi backend của Workbook/Sheet/Range/Shape đều được tính. Mặc định độ trễ chỉ được cộng dồn
+vào đồng hồ mô phỏng (simulated_seconds), không ngủ thật; sleep=True để ngủ đúng thời gian đó.
+
+--- CHANGELOG ---
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo class SimulatedLatency và hàm create_simulated_app().
+-------------------
+"""
+
+import time
+from ..excelapp import ExcelApp
+from ..profiler import Profiler
+
+# Chi phí ước lượng của một lần gọi COM tới Excel đang chạy ẩn (giây) và của mỗi ô được truyền qua
+DEFAULT_CALL_LATENCY = 0.0005
+DEFAULT_CELL_LATENCY = 2e-7
+
+
+class SimulatedLatency(Profiler):
+    """
+    Profiler cộng thêm độ trễ mô phỏng cho mỗi lần gọi backend.
+
+    Args:
+        call_latency (float): Độ trễ cố định của một lần gọi (giây).
+        cell_latency (float): Độ trễ thêm cho mỗi ô được đọc/ghi (giây).
+        sleep (bool): True để ngủ thật theo độ trễ mô phỏng (đo được bằng đồng hồ thường).
+        op_latency (dict, optional): Độ trễ riêng theo tên thao tác, ví dụ {'Book.save': 0.05}.
+    """
+    def __init__(self, call_latency=DEFAULT_CALL_LATENCY, cell_latency=DEFAULT_CELL_LATENCY, sleep=False,
+                 op_latency=None):
+        self.call_latency = call_latency
+        self.cell_latency = cell_latency
+        self.sleep = sleep
+        self.op_latency = dict(op_latency or {})
+        super().__init__(trace=False)
+
+    def reset(self):
+        super().reset()
+        self.simulated_seconds = 0.0
+        self.calls = 0
+
+    def _record(self, name, start, end, cells=0, error=False):
+        super()._record(name, start, end, cells, error)
+        cost = self.op_latency.get(name, self.call_latency) + cells * self.cell_latency
+        self.simulated_seconds += cost
+        self.calls += 1
+        if self.sleep:
+            time.sleep(cost)
+
+
+def create_simulated_app(**latency):
+    """Tạo ExcelApp dùng engine 'file' với độ trễ mô phỏng. Trả về (app, SimulatedLatency)."""
+    model = SimulatedLatency(**latency)
+    app = ExcelApp(visible=False, screen_updating=False, display_alerts=False, engine='file', profiler=model)
+    model.reset()  # Không tính các lần gọi khi khởi tạo ứng dụng
+    return app, model
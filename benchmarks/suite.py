@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+File: benchmarks/suite.py
+Author: Your Name / Tên của bạn
+Description: Bộ benchmark các thao tác chính (xóa sheet an toàn, dọn Named Range, đọc/ghi khối,
+             chuyển đổi file, phá vỡ liên kết ngoài) trên workbook tổng hợp, chạy với engine 'file'
+             và với backend mô phỏng độ trễ COM ('simulated'). Kết quả được lưu ra JSON để so sánh
+             giữa các lần chạy, kèm bước kiểm tra hồi quy theo ngưỡng.
+
+Chạy từ thư mục cha của package:
+    python -m <tên package>.benchmarks.suite --output results.json
+    python -m <tên package>.benchmarks.suite --output new.json --baseline results.json --threshold 0.2
+
+Mã thoát 1 nếu có hồi quy so với baseline: thời gian (trung vị) tăng quá threshold (và quá
+--min-delta giây, để bỏ qua nhiễu của các thao tác rất nhanh), hoặc số lần gọi backend tăng
+(số lần gọi của backend mô phỏng là tất định nên mọi mức tăng đều được báo).
+
+--- CHANGELOG ---
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo bộ benchmark với các kịch bản: safe_delete, named_range_cleanup, bulk_read, bulk_write,
+      conversion, break_links.
+-------------------
+"""
+
+import argparse
+import datetime as dt
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from ..excelapp import ExcelApp
+from ..external_links import break_links_in_file
+from ..log_utils import configure_logging
+from .synthetic import generate_workbook
+from .simulated_backend import create_simulated_app
+
+ENGINES = ('file', 'simulated')
+
+
+# --- Scenarios ---
+# Mỗi kịch bản nhận (app, path, spec) với path là một bản sao mới của workbook tổng hợp.
+def scenario_safe_delete(app, path, spec):
+    book = app.open(path)
+    book.delete_sheet('Sheet1', safe=True)
+    book.save()
+    book.close()
+
+
+def scenario_named_range_cleanup(app, path, spec):
+    book = app.open(path)
+    book.delete_all_named_ranges(broken_only=True)
+    book.save()
+    book.close()
+
+
+def scenario_bulk_read(app, path, spec):
+    book = app.open(path)
+    for sheet in book.sheets:
+        sheet.range(f"A1:E{spec['rows']}").value
+    book.close()
+
+
+def scenario_bulk_write(app, path, spec):
+    book = app.open(path)
+    data = [[r * 5 + c for c in range(5)] for r in range(spec['rows'])]
+    for sheet in book.sheets:
+        sheet.range(f"A1:E{spec['rows']}").value = data
+    book.save()
+    book.close()
+
+
+def scenario_conversion(app, path, spec):
+    destination = Path(path).with_name('converted.xlsx')
+    if app.convert_to_xlsx(path, destination, reopen=False) is None:
+        raise RuntimeError("Chuyển đổi thất bại.")
+
+
+def scenario_break_links(app, path, spec):
+    """Phá vỡ liên kết ngoài trực tiếp trên file (không dùng app)."""
+    break_links_in_file(path)
+
+
+SCENARIOS = {
+    'safe_delete': (scenario_safe_delete, ENGINES),
+    'named_range_cleanup': (scenario_named_range_cleanup, ENGINES),
+    'bulk_read': (scenario_bulk_read, ENGINES),
+    'bulk_write': (scenario_bulk_write, ENGINES),
+    'conversion': (scenario_conversion, ENGINES),
+    'break_links': (scenario_break_links, ('offline',)),
+}
+
+
+# --- Runner ---
+def _run_once(func, engine, source, spec, work_dir):
+    """(Hàm nội bộ) Chạy một kịch bản trên một bản sao mới của file. Trả về (giây, số lần gọi, giây mô phỏng)."""
+    path = Path(work_dir) / 'case.xlsx'
+    shutil.copyfile(source, path)
+    if engine == 'simulated':
+        app, model = create_simulated_app()
+    elif engine == 'file':
+        app, model = ExcelApp(visible=False, screen_updating=False, display_alerts=False, engine='file'), None
+    else:
+        app, model = None, None
+    try:
+        start = time.perf_counter()
+        func(app, path, spec)
+        wall = time.perf_counter() - start
+    finally:
+        if app is not None:
+            app.quit()
+    if model is None:
+        return wall, None, 0.0
+    return wall + model.simulated_seconds, model.calls, model.simulated_seconds
+
+
+def run_suite(scenarios=None, engines=ENGINES, repeat=3, sheets=5, formulas=2000, names=500,
+              external_links=3, cross_ref_density=0.3, rows=200, seed=0):
+    """
+    Chạy bộ benchmark.
+
+    Args:
+        scenarios (list, optional): Tên các kịch bản cần chạy. Mặc định: tất cả (SCENARIOS).
+        engines (tuple): Các engine cần chạy ('file', 'simulated'). 'break_links' luôn chạy 'offline'.
+        repeat (int): Số lần chạy mỗi kịch bản (mỗi lần trên một bản sao mới của file).
+        Các tham số còn lại: xem synthetic.generate_workbook().
+
+    Returns:
+        dict: {'meta': {...}, 'results': [{'scenario', 'engine', 'runs', 'seconds_min', 'seconds_median',
+               'backend_calls', 'simulated_seconds', 'error'}]}.
+    """
+    params = {'sheets': sheets, 'formulas': formulas, 'names': names, 'external_links': external_links,
+              'cross_ref_density': cross_ref_density, 'rows': rows, 'seed': seed, 'repeat': repeat}
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = Path(tmp_dir) / 'synthetic.xlsx'
+        spec = generate_workbook(source, sheets=sheets, formulas=formulas, names=names,
+                                 external_links=external_links, cross_ref_density=cross_ref_density,
+                                 rows=rows, seed=seed)
+        spec['rows'] = rows
+        work_dir = Path(tmp_dir) / 'work'
+        work_dir.mkdir()
+
+        for name in scenarios or SCENARIOS:
+            func, supported = SCENARIOS[name]
+            for engine in supported:
+                if engine != 'offline' and engine not in engines:
+                    continue
+                entry = {'scenario': name, 'engine': engine, 'runs': [], 'backend_calls': None,
+                         'simulated_seconds': 0.0, 'error': None}
+                try:
+                    for _ in range(repeat):
+                        seconds, calls, simulated = _run_once(func, engine, source, spec, work_dir)
+                        entry['runs'].append(seconds)
+                        entry['backend_calls'], entry['simulated_seconds'] = calls, simulated
+                except Exception as e:
+                    entry['error'] = f"{type(e).__name__}: {e}"
+                if entry['runs']:
+                    entry['seconds_min'] = min(entry['runs'])
+                    entry['seconds_median'] = statistics.median(entry['runs'])
+                results.append(entry)
+                _print_entry(entry)
+
+    spec['path'] = source.name
+    meta = {'timestamp': dt.datetime.now().isoformat(timespec='seconds'), 'python': sys.version.split()[0],
+            'platform': platform.platform(), 'params': params, 'workbook': spec}
+    return {'meta': meta, 'results': results}
+
+
+def _print_entry(entry):
+    label = f"{entry['scenario']} [{entry['engine']}]"
+    if entry['error']:
+        print(f"  {label:<36} LỖI: {entry['error']}")
+        return
+    calls = f"{entry['backend_calls']:>7} lần gọi" if entry['backend_calls'] is not None else ''
+    print(f"  {label:<36} {entry['seconds_median'] * 1000:10.1f} ms  {calls}")
+
+
+# --- Regression check ---
+def _key(entry):
+    return entry['scenario'], entry['engine']
+
+
+def compare_results(current, baseline, threshold=0.2, min_delta=0.005):
+    """
+    So sánh kết quả với một lần chạy trước.
+
+    Args:
+        current (dict): Kết quả của run_suite().
+        baseline (dict): Kết quả của lần chạy trước (đọc từ JSON).
+        threshold (float): Mức tăng tương đối tối đa của thời gian trung vị (0.2 = 20%).
+        min_delta (float): Mức tăng tuyệt đối tối thiểu (giây) để coi là hồi quy.
+
+    Returns:
+        list: Các hồi quy, mỗi phần tử là dict {'scenario', 'engine', 'metric', 'baseline', 'current', 'ratio'}.
+    """
+    previous = {_key(entry): entry for entry in baseline.get('results', [])}
+    regressions = []
+    for entry in current['results']:
+        old = previous.get(_key(entry))
+        if old is None or old.get('error'):
+            continue
+        if entry.get('error'):
+            regressions.append({'scenario': entry['scenario'], 'engine': entry['engine'], 'metric': 'error',
+                                'baseline': None, 'current': entry['error'], 'ratio': None})
+            continue
+        before, after = old['seconds_median'], entry['seconds_median']
+        if after > before * (1 + threshold) and after - before > min_delta:
+            regressions.append({'scenario': entry['scenario'], 'engine': entry['engine'], 'metric': 'seconds_median',
+                                'baseline': before, 'current': after, 'ratio': after / before if before else None})
+        if old.get('backend_calls') is not None and entry.get('backend_calls') is not None \
+                and entry['backend_calls'] > old['backend_calls']:
+            regressions.append({'scenario': entry['scenario'], 'engine': entry['engine'], 'metric': 'backend_calls',
+                                'baseline': old['backend_calls'], 'current': entry['backend_calls'],
+                                'ratio': entry['backend_calls'] / old['backend_calls'] if old['backend_calls'] else None})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help="File JSON kết quả.")
+    parser.add_argument('--baseline', help="File JSON của lần chạy trước để kiểm tra hồi quy.")
+    parser.add_argument('--threshold', type=float, default=0.2)
+    parser.add_argument('--min-delta', type=float, default=0.005)
+    parser.add_argument('--scenarios', nargs='*', choices=list(SCENARIOS))
+    parser.add_argument('--engines', nargs='*', default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--sheets', type=int, default=5)
+    parser.add_argument('--formulas', type=int, default=2000)
+    parser.add_argument('--names', type=int, default=500)
+    parser.add_argument('--external-links', type=int, default=3)
+    parser.add_argument('--cross-ref-density', type=float, default=0.3)
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    configure_logging('WARNING')
+    print(f"Benchmark: {args.sheets} sheet, {args.formulas} công thức, {args.names} Named Range, "
+          f"{args.external_links} liên kết ngoài, lặp {args.repeat} lần:")
+    report = run_suite(scenarios=args.scenarios, engines=tuple(args.engines), repeat=args.repeat,
+                       sheets=args.sheets, formulas=args.formulas, names=args.names,
+                       external_links=args.external_links, cross_ref_density=args.cross_ref_density,
+                       rows=args.rows, seed=args.seed)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"Đã ghi kết quả ra '{args.output}'.")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        if baseline.get('meta', {}).get('params') != report['meta']['params']:
+            print("Cảnh báo: tham số của baseline khác lần chạy này, kết quả so sánh có thể không chính xác.")
+        regressions = compare_results(report, baseline, threshold=args.threshold, min_delta=args.min_delta)
+        for item in regressions:
+            ratio = f" (x{item['ratio']:.2f})" if item['ratio'] else ''
+            print(f"  HỒI QUY {item['scenario']} [{item['engine']}] {item['metric']}: "
+                  f"{item['baseline']} -> {item['current']}{ratio}")
+        if regressions:
+            return 1
+        print("Không có hồi quy so với baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+File: benchmarks/synthetic.py
+Author: Your Name / Tên của bạn
+Description: Sinh workbook tổng hợp (synthetic) cho benchmark: số sheet, số ô công thức, số Named Range,
+             số liên kết ngoài và mật độ tham chiếu chéo giữa các sheet đều điều chỉnh được;
+             cùng seed luôn cho ra cùng một file.
+
+Cấu trúc file được sinh:
+    - Mỗi sheet 'Sheet<i>' có một khối dữ liệu số ở A1:E<rows>.
+    - Công thức được chia đều cho các sheet, đặt ở cột G trở đi. Mỗi công thức tham chiếu dữ liệu
+      của chính sheet đó, hoặc (với xác suất cross_ref_density) của một sheet khác, hoặc
+      (với xác suất external_ref_density, khi có liên kết ngoài) một file nguồn bên ngoài '[n]Data!A1'.
+    - Named Range toàn cục/cục bộ, khoảng 20% trỏ tới #REF!.
+    - Liên kết ngoài được ghi thành các part xl/externalLinks/externalLink<n>.xml như Excel.
+
+--- CHANGELOG ---
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo module với hàm generate_workbook().
+-------------------
+"""
+
+import os
+import random
+import re
+import zipfile
+from openpyxl import Workbook as OpenpyxlWorkbook
+from openpyxl.workbook.defined_name import DefinedName
+
+_NS_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_NS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_EXTERNAL_LINK_TYPE = _NS_REL + '/externalLink'
+_EXTERNAL_PATH_TYPE = _NS_REL + '/externalLinkPath'
+_EXTERNAL_LINK_CONTENT = 'application/vnd.openxmlformats-officedocument.spreadsheetml.externalLink+xml'
+_DATA_COLUMNS = 'ABCDE'
+
+
+def generate_workbook(path, sheets=5, formulas=1000, names=100, external_links=0, cross_ref_density=0.3,
+                      external_ref_density=0.05, rows=200, seed=0):
+    """
+    Sinh một file .xlsx tổng hợp.
+
+    Args:
+        path (str or Path): File kết quả.
+        sheets (int): Số sheet.
+        formulas (int): Tổng số ô công thức (chia đều cho các sheet).
+        names (int): Số Named Range.
+        external_links (int): Số file nguồn liên kết ngoài.
+        cross_ref_density (float): Tỉ lệ công thức tham chiếu sang một sheet khác (0..1).
+        external_ref_density (float): Tỉ lệ công thức tham chiếu liên kết ngoài (khi external_links > 0).
+        rows (int): Số dòng của khối dữ liệu trên mỗi sheet.
+        seed (int): Seed của bộ sinh số ngẫu nhiên.
+
+    Returns:
+        dict: Mô tả file đã sinh {'path', 'sheets', 'formulas', 'cross_sheet_formulas',
+              'external_formulas', 'names', 'broken_names', 'external_links', 'bytes'}.
+    """
+    rng = random.Random(seed)
+    path = str(path)
+    wb = OpenpyxlWorkbook()
+    sheet_names = [f'Sheet{i}' for i in range(sheets)]
+    wb.active.title = sheet_names[0]
+    for name in sheet_names[1:]:
+        wb.create_sheet(name)
+
+    for ws in wb.worksheets:
+        for r in range(1, rows + 1):
+            ws.append([rng.randint(1, 1000) for _ in _DATA_COLUMNS])
+
+    cross_count = external_count = 0
+    per_sheet = formulas // sheets if sheets else 0
+    extra = formulas - per_sheet * sheets
+    for index, ws in enumerate(wb.worksheets):
+        count = per_sheet + (1 if index < extra else 0)
+        for k in range(count):
+            row, col = k % rows + 1, 7 + k // rows
+            pick = rng.random()
+            r1 = rng.randint(1, rows)
+            r2 = min(rows, r1 + rng.randint(0, 20))
+            column = rng.choice(_DATA_COLUMNS)
+            if external_links and pick < external_ref_density:
+                formula = f"=[{rng.randint(1, external_links)}]Data!$A${r1}*2"
+                external_count += 1
+            elif sheets > 1 and pick < external_ref_density + cross_ref_density:
+                other = rng.choice([n for n in sheet_names if n != ws.title])
+                formula = f"=SUM({other}!{column}{r1}:{column}{r2})+{column}{r1}"
+                cross_count += 1
+            else:
+                formula = f"=SUM({column}{r1}:{column}{r2})*2"
+            ws.cell(row, col, formula)
+
+    broken = 0
+    for i in range(names):
+        if rng.random() < 0.2:
+            target = '#REF!'
+            broken += 1
+        else:
+            target = f"{rng.choice(sheet_names)}!${rng.choice(_DATA_COLUMNS)}${rng.randint(1, rows)}"
+        defined = DefinedName(f'Name_{i}', attr_text=target)
+        if rng.random() < 0.2:
+            wb.worksheets[rng.randrange(sheets)].defined_names[defined.name] = defined
+        else:
+            wb.defined_names[defined.name] = defined
+
+    wb.save(path)
+    if external_links:
+        _add_external_links(path, external_links)
+    return {'path': path, 'sheets': sheets, 'formulas': formulas, 'cross_sheet_formulas': cross_count,
+            'external_formulas': external_count, 'names': names, 'broken_names': broken,
+            'external_links': external_links, 'bytes': os.path.getsize(path)}
+
+
+def _add_external_links(path, count):
+    """(Hàm nội bộ) Thêm count part externalLink (file nguồn 'source<n>.xlsx', sheet 'Data') vào gói."""
+    parts = {}
+    references = []
+    relationships = []
+    overrides = []
+    for n in range(1, count + 1):
+        rel_id = f'rIdExt{n}'
+        parts[f'xl/externalLinks/externalLink{n}.xml'] = (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<externalLink xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}"><externalBook r:id="rId1">'
+            f'<sheetNames><sheetName val="Data"/></sheetNames><sheetDataSet><sheetData sheetId="0"/>'
+            f'</sheetDataSet></externalBook></externalLink>').encode()
+        parts[f'xl/externalLinks/_rels/externalLink{n}.xml.rels'] = (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{_EXTERNAL_PATH_TYPE}" Target="source{n}.xlsx" '
+            f'TargetMode="External"/></Relationships>').encode()
+        references.append(f'<externalReference r:id="{rel_id}"/>')
+        relationships.append(f'<Relationship Id="{rel_id}" Type="{_EXTERNAL_LINK_TYPE}" '
+                             f'Target="externalLinks/externalLink{n}.xml"/>')
+        overrides.append(f'<Override PartName="/xl/externalLinks/externalLink{n}.xml" '
+                         f'ContentType="{_EXTERNAL_LINK_CONTENT}"/>')
+
+    tmp = path + '.tmp'
+    with zipfile.ZipFile(path) as zin, zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as zout:
+        for info in zin.infolist():
+            data = zin.read(info)
+            if info.filename == 'xl/workbook.xml':
+                if b'xmlns:r=' not in data[:data.index(b'>', data.index(b'<workbook'))]:
+                    data = data.replace(b'<workbook ', f'<workbook xmlns:r="{_NS_REL}" '.encode(), 1)
+                block = ('<externalReferences>' + ''.join(references) + '</externalReferences>').encode()
+                data = re.sub(rb'(</sheets>)', lambda m: m.group(1) + block, data, count=1)
+            elif info.filename == 'xl/_rels/workbook.xml.rels':
+                data = data.replace(b'</Relationships>', ''.join(relationships).encode() + b'</Relationships>')
+            elif info.filename == '[Content_Types].xml':
+                data = data.replace(b'</Types>', ''.join(overrides).encode() + b'</Types>')
+            zout.writestr(info, data)
+        for name, data in parts.items():
+            zout.writestr(name, data)
+    os.replace(tmp, path)
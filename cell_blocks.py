@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+File: cell_blocks.py
+Author: Your Name / Tên của bạn
+Description: Gom các ô rời rạc thành các khối hình chữ nhật liền kề để đọc/ghi
+             theo khối, giảm số lần gọi COM sang Excel.
+
+--- CHANGELOG ---
+Version 0.5.0 (2026-10-17):
+    - freeze_formula_cells(): 'com_calls' chỉ đếm các lần gọi đã thực hiện (khối bị lỗi khi đọc
+      không còn được tính thêm lần ghi).
+
+Version 0.4.0 (2026-10-17):
+    - Lỗi của từng khối trong freeze_formula_cells() được ghi ở mức DEBUG thay vì in ra từng dòng
+      (người gọi ghi dòng tổng kết).
+
+Version 0.3.0 (2026-10-17):
+    - Thêm parse_block() và chunk_union_addresses() để ghép nhiều khối thành vùng nhiều phần
+      (union) với độ dài địa chỉ không vượt giới hạn của Excel.
+
+Version 0.2.0 (2026-10-17):
+    - freeze_formula_cells() làm việc với giao diện BookBackend (get_sheet/get_values/set_values).
+
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo module với các hàm: parse_coord(), group_cells_into_blocks(),
+      block_address(), freeze_formula_cells().
+-------------------
+"""
+
+import logging
+import re
+from .formula_scanner import column_index, column_letter
+
+logger = logging.getLogger(__name__)
+
+_COORD_RE = re.compile(r'^\$?([A-Za-z]+)\$?(\d+)$')
+_BLOCK_RE = re.compile(r'^\$?([A-Za-z]+)\$?(\d+)(?::\$?([A-Za-z]+)\$?(\d+))?$')
+
+# Độ dài tối đa của chuỗi địa chỉ truyền cho Range() của Excel
+MAX_UNION_ADDRESS_LENGTH = 255
+
+
+def parse_coord(coord):
+    """Chuyển tọa độ dạng 'B3' (hoặc '$B$3') thành tuple (dòng, cột) 1-based."""
+    match = _COORD_RE.match(coord)
+    if not match:
+        raise ValueError(f"Tọa độ ô không hợp lệ: '{coord}'")
+    return int(match.group(2)), column_index(match.group(1))
+
+
+def block_address(block):
+    """Chuyển một khối (dòng đầu, cột đầu, dòng cuối, cột cuối) thành địa chỉ dạng 'A1:C5'."""
+    first_row, first_col, last_row, last_col = block
+    top_left = f"{column_letter(first_col)}{first_row}"
+    if (first_row, first_col) == (last_row, last_col):
+        return top_left
+    return f"{top_left}:{column_letter(last_col)}{last_row}"
+
+
+def parse_block(cell1, cell2=None):
+    """
+    Chuyển địa chỉ ('B3', 'A1:C5', '$A$1:$C$5') hoặc tọa độ (dòng, cột) thành khối
+    (dòng đầu, cột đầu, dòng cuối, cột cuối). Trả về None nếu không phân tích được
+    (ví dụ: Named Range, cả cột 'A:A').
+    """
+    bounds = []
+    for cell in (cell1, cell2):
+        if cell is None:
+            continue
+        if isinstance(cell, tuple) and len(cell) == 2:
+            bounds.append((cell[0], cell[1], cell[0], cell[1]))
+            continue
+        match = _BLOCK_RE.match(cell) if isinstance(cell, str) else None
+        if not match:
+            return None
+        first_row, first_col = int(match.group(2)), column_index(match.group(1))
+        if match.group(3):
+            last_row, last_col = int(match.group(4)), column_index(match.group(3))
+        else:
+            last_row, last_col = first_row, first_col
+        bounds.append((min(first_row, last_row), min(first_col, last_col),
+                       max(first_row, last_row), max(first_col, last_col)))
+    if not bounds:
+        return None
+    return (min(b[0] for b in bounds), min(b[1] for b in bounds),
+            max(b[2] for b in bounds), max(b[3] for b in bounds))
+
+
+def chunk_union_addresses(blocks, max_length=MAX_UNION_ADDRESS_LENGTH):
+    """
+    Chia các khối thành các nhóm sao cho địa chỉ ghép ('A1:B2,D4:E5,...') của mỗi nhóm
+    không dài quá max_length ký tự.
+
+    Returns:
+        list: Các nhóm khối (list các khối).
+    """
+    chunks, current, length = [], [], 0
+    for block in blocks:
+        part_length = len(block_address(block))
+        extra = part_length + (1 if current else 0)
+        if current and length + extra > max_length:
+            chunks.append(current)
+            current, length = [], 0
+            extra = part_length
+        current.append(block)
+        length += extra
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def group_cells_into_blocks(cells):
+    """
+    Gom các ô thành các khối hình chữ nhật liền kề.
+
+    Bước 1: trên mỗi dòng, gom các cột liên tiếp thành một đoạn (row-run).
+    Bước 2: nối các đoạn có cùng khoảng cột nằm trên các dòng liên tiếp (column-run).
+
+    Args:
+        cells (iterable): Các tọa độ dạng 'B3' hoặc tuple (dòng, cột).
+
+    Returns:
+        list: Danh sách khối (dòng đầu, cột đầu, dòng cuối, cột cuối), sắp xếp theo vị trí.
+    """
+    rows = {}
+    for cell in cells:
+        row, col = parse_coord(cell) if isinstance(cell, str) else cell
+        rows.setdefault(row, set()).add(col)
+
+    blocks = []
+    open_blocks = {}  # (cột đầu, cột cuối) -> vị trí khối trong 'blocks'
+    for row in sorted(rows):
+        cols = sorted(rows[row])
+        run_start = prev = cols[0]
+        runs = []
+        for col in cols[1:]:
+            if col != prev + 1:
+                runs.append((run_start, prev))
+                run_start = col
+            prev = col
+        runs.append((run_start, prev))
+
+        for run in runs:
+            pos = open_blocks.get(run)
+            if pos is not None and blocks[pos][2] == row - 1:
+                first_row, first_col, _, last_col = blocks[pos]
+                blocks[pos] = (first_row, first_col, row, last_col)
+            else:
+                open_blocks[run] = len(blocks)
+                blocks.append((row, run[0], row, run[1]))
+    return sorted(blocks)
+
+
+def freeze_formula_cells(book_impl, cells):
+    """
+    Thay công thức bằng giá trị hiện tại, đọc một lần và ghi một lần cho mỗi khối liền kề.
+
+    Args:
+        book_impl (BookBackend): Backend của workbook (hoặc một backend giả lập ghi nhận số lần gọi).
+        cells (list): Danh sách dict {'sheet': tên sheet, 'coord': tọa độ ô}.
+
+    Returns:
+        dict: Thống kê {'cells', 'blocks', 'com_calls', 'fixed', 'failed'} trong đó
+              'fixed'/'failed' là danh sách các ô đã xử lý thành công/thất bại.
+    """
+    by_sheet = {}
+    for item in cells:
+        by_sheet.setdefault(item['sheet'], []).append(item['coord'])
+
+    stats = {'cells': len(cells), 'blocks': 0, 'com_calls': 0, 'fixed': [], 'failed': []}
+    for sheet_name, coords in by_sheet.items():
+        sheet_impl = book_impl.get_sheet(sheet_name)
+        stats['com_calls'] += 1
+        coord_lookup = {parse_coord(coord): coord for coord in coords}
+
+        for block in group_cells_into_blocks(coord_lookup):
+            first_row, first_col, last_row, last_col = block
+            block_cells = [
+                {'sheet': sheet_name, 'coord': coord_lookup[(row, col)]}
+                for row in range(first_row, last_row + 1)
+                for col in range(first_col, last_col + 1)
+            ]
+            stats['blocks'] += 1
+            try:
+                rng = sheet_impl.range((first_row, first_col), (last_row, last_col))
+                stats['com_calls'] += 1
+                values = rng.get_values()
+                stats['com_calls'] += 1
+                rng.set_values(values)
+                stats['fixed'].extend(block_cells)
+            except Exception as e:
+                logger.debug("Lỗi khi thay thế khối %s!%s: %s", sheet_name, block_address(block), e)
+                stats['failed'].extend(block_cells)
+    return stats
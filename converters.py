@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+File: converters.py
+Author: Your Name / Tên của bạn
+Description: Chuyển đổi dữ liệu giữa vùng ô và mảng NumPy theo kiểu dữ liệu chỉ định,
+             với quy tắc rõ ràng cho ô trống và ngày tháng.
+
+Quy tắc chuyển đổi (to_typed_array):
+    - dtype=None/object : giữ nguyên giá trị, ô trống là None.
+    - float             : ô trống -> NaN, True/False -> 1.0/0.0, ngày -> số serial của Excel,
+                          chuỗi số -> số; chuỗi khác -> ValueError.
+    - int               : ô trống -> ValueError (dùng float nếu có ô trống).
+    - bool              : ô trống -> False.
+    - datetime64        : ô trống -> NaT, số -> đọc như số serial ngày của Excel.
+    - str               : ô trống -> ''.
+
+--- CHANGELOG ---
+Version 0.2.0 (2026-10-17):
+    - array_to_rows(): NaN/NaT nằm trong mảng kiểu object (ví dụ cột DataFrame có kiểu hỗn hợp)
+      cũng được ghi thành ô trống.
+    - Thêm hàm array_extent(): số dòng, số cột mà một mảng chiếm khi được ghi.
+
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo module với các hàm: to_object_array(), to_typed_array(), array_to_rows(),
+      excel_serial_to_datetime(), datetime_to_excel_serial().
+-------------------
+"""
+
+import datetime as dt
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+EXCEL_EPOCH = dt.datetime(1899, 12, 30)
+
+
+def _require_numpy():
+    """(Hàm nội bộ) Ném lỗi rõ ràng nếu chưa cài NumPy."""
+    if np is None:
+        raise ImportError("'numpy' is not installed. Please install it using: pip install numpy")
+
+
+def excel_serial_to_datetime(serial):
+    """Chuyển số serial ngày của Excel (hệ 1900) thành datetime."""
+    return EXCEL_EPOCH + dt.timedelta(days=float(serial))
+
+
+def datetime_to_excel_serial(value):
+    """Chuyển date/datetime thành số serial ngày của Excel (hệ 1900)."""
+    if not isinstance(value, dt.datetime):
+        value = dt.datetime(value.year, value.month, value.day)
+    delta = value.replace(tzinfo=None) - EXCEL_EPOCH
+    return delta.days + delta.seconds / 86400 + delta.microseconds / 86400e6
+
+
+def to_object_array(rows):
+    """Chuyển list 2 chiều thành mảng NumPy kiểu object có đúng hình dạng (số dòng, số cột)."""
+    _require_numpy()
+    nrows = len(rows)
+    ncols = max((len(row) for row in rows), default=0)
+    arr = np.empty((nrows, ncols), dtype=object)
+    for i, row in enumerate(rows):
+        arr[i, :len(row)] = row
+    return arr
+
+
+def _convert_each(obj, convert):
+    """(Hàm nội bộ) Áp dụng hàm chuyển đổi cho từng phần tử, báo lỗi kèm vị trí ô."""
+    out = np.empty(obj.shape, dtype=object)
+    for idx, value in np.ndenumerate(obj):
+        try:
+            out[idx] = convert(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Không thể chuyển giá trị {value!r} tại vị trí {idx}: {e}") from None
+    return out
+
+
+def _to_float_value(value):
+    if value is None or value == '':
+        return np.nan
+    if isinstance(value, (dt.date, dt.datetime)):
+        return datetime_to_excel_serial(value)
+    return float(value)
+
+
+def _to_datetime_value(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return excel_serial_to_datetime(value)
+    if isinstance(value, (dt.date, dt.datetime)):
+        return value
+    raise TypeError("không phải ngày tháng")
+
+
+def to_typed_array(obj, dtype=None):
+    """
+    Chuyển mảng object (hoặc list 2 chiều) sang mảng NumPy có kiểu dữ liệu chỉ định.
+
+    Args:
+        obj (numpy.ndarray or list): Dữ liệu 2 chiều.
+        dtype (str or numpy.dtype, optional): Kiểu dữ liệu đích. None để giữ kiểu object.
+    """
+    _require_numpy()
+    if not isinstance(obj, np.ndarray):
+        obj = to_object_array(obj)
+    if dtype is None or np.dtype(dtype) == np.dtype(object):
+        return obj.astype(object, copy=False)
+
+    dtype = np.dtype(dtype)
+    if obj.dtype == dtype:
+        return obj
+    if obj.dtype != object:
+        return obj.astype(dtype)
+
+    empty = np.equal(obj, None)
+    kind = dtype.kind
+    if kind == 'f':
+        try:
+            return obj.astype(dtype)
+        except (TypeError, ValueError):
+            return _convert_each(obj, _to_float_value).astype(dtype)
+    if kind in 'iu':
+        if empty.any():
+            raise ValueError(f"Vùng có ô trống, không biểu diễn được bằng kiểu {dtype}. Hãy dùng kiểu float.")
+        return obj.astype(dtype)
+    if kind == 'b':
+        filled = obj.copy()
+        filled[empty] = False
+        return filled.astype(dtype)
+    if kind == 'M':
+        return _convert_each(obj, _to_datetime_value).astype(dtype)
+    if kind in 'US':
+        filled = obj.copy()
+        filled[empty] = ''
+        return filled.astype(dtype)
+    return obj.astype(dtype)
+
+
+def _as_2d(arr):
+    """(Hàm nội bộ) Mảng 2 chiều theo quy ước ghi: mảng 1 chiều là một dòng, giá trị đơn là một ô."""
+    arr = np.asarray(arr)
+    if arr.ndim == 0:
+        return arr.reshape(1, 1)
+    if arr.ndim == 1:
+        return arr.reshape(1, -1)
+    if arr.ndim > 2:
+        raise ValueError(f"Chỉ hỗ trợ mảng 1 hoặc 2 chiều, nhận được {arr.ndim} chiều.")
+    return arr
+
+
+def _is_missing(value):
+    """(Hàm nội bộ) True với NaN/NaT (các giá trị khác chính nó) khi không có pandas."""
+    try:
+        return bool(value != value)
+    except Exception:
+        return False
+
+
+def array_extent(arr):
+    """Trả về (số dòng, số cột) mà mảng chiếm khi được ghi bằng array_to_rows()."""
+    _require_numpy()
+    return _as_2d(arr).shape
+
+
+def array_to_rows(arr):
+    """
+    Chuyển mảng NumPy thành list 2 chiều sẵn sàng để ghi: NaN/NaT -> ô trống (kể cả trong mảng
+    kiểu object), datetime64 -> datetime. Mảng 1 chiều được ghi thành một dòng (giống quy ước của xlwings).
+    """
+    _require_numpy()
+    arr = _as_2d(arr)
+
+    kind = arr.dtype.kind
+    if kind == 'f':
+        obj = arr.astype(object)
+        obj[np.isnan(arr)] = None
+    elif kind == 'M':
+        obj = arr.astype('datetime64[us]').astype(object)
+    elif kind == 'O':
+        obj = arr.copy()
+        if pd is not None:
+            missing = pd.isna(obj)
+        else:
+            missing = np.frompyfunc(_is_missing, 1, 1)(obj).astype(bool)
+        obj[missing] = None
+    else:
+        obj = arr.astype(object)
+    return obj.tolist()
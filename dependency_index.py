@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+File: dependency_index.py
+Author: Your Name / Tên của bạn
+Description: Chứa class SheetDependencyIndex - chỉ mục ngược "tên sheet -> các ô có công thức
+             tham chiếu đến sheet đó", được xây dựng trong một lần quét duy nhất.
+
+--- CHANGELOG ---
+Version 0.2.0 (2026-10-17):
+    - Thêm .dependent_sheets(): các sheet có công thức tham chiếu đến một sheet (dùng cho tính toán
+      lại theo vùng thay đổi).
+
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo class SheetDependencyIndex.
+    - Hỗ trợ tên sheet có dấu nháy, tham chiếu 3-D (Sheet1:Sheet3!A1) và Named Range.
+    - Cập nhật tăng dần khi xóa sheet hoặc khi các ô được thay bằng giá trị.
+-------------------
+"""
+
+import re
+
+# Tham chiếu đến sheet: 'Tên có dấu cách'!A1 hoặc Ten_Sheet!A1 (kể cả dạng 3-D Sheet1:Sheet3!A1)
+_QUOTED_REF_RE = re.compile(r"'((?:[^']|'')+)'!")
+_PLAIN_REF_RE = re.compile(r"(?<![\w.\]'!])([^\W\d][\w.]*(?::[^\W\d][\w.]*)?)!")
+_STRING_LITERAL_RE = re.compile(r'"(?:[^"]|"")*"')
+_IDENTIFIER_RE = re.compile(r"(?<![\w.!'\]\\])([A-Za-z_\\][\w.\\]*)(?![\w.(!])")
+
+
+def _strip_string_literals(formula):
+    """(Hàm nội bộ) Xóa nội dung các chuỗi "..." trong công thức để tránh nhận diện nhầm."""
+    if '"' not in formula:
+        return formula
+    return _STRING_LITERAL_RE.sub('""', formula)
+
+
+class SheetDependencyIndex:
+    """
+    Chỉ mục ngược các phụ thuộc giữa sheet: với mỗi tên sheet (không phân biệt hoa thường),
+    lưu danh sách các ô (sheet, tọa độ) có công thức tham chiếu đến sheet đó.
+    """
+    def __init__(self, sheet_order, defined_names=None):
+        """
+        Args:
+            sheet_order (list): Tên các sheet theo đúng thứ tự trong workbook (dùng để mở rộng tham chiếu 3-D).
+            defined_names (iterable, optional): Các tuple (tên, phạm vi, chuỗi tham chiếu) của Named Range.
+        """
+        self._sheet_order = list(sheet_order)
+        self._positions = {name.lower(): i for i, name in enumerate(self._sheet_order)}
+        self._dependents = {}       # tên sheet (lower) -> {(sheet, coord): None} (tập có thứ tự)
+        self._cell_targets = {}     # (sheet, coord) -> tập tên sheet (lower) mà ô tham chiếu
+        self._cells_by_sheet = {}   # tên sheet chứa ô (lower) -> tập (sheet, coord)
+        self._name_targets = self._resolve_defined_names(defined_names or [])
+
+    def __repr__(self):
+        return f"<SheetDependencyIndex [{len(self._cell_targets)} cells, {len(self._dependents)} sheets]>"
+
+    def __len__(self):
+        return len(self._cell_targets)
+
+    # --- Building ---
+    @classmethod
+    def build(cls, formulas, sheet_order, defined_names=None):
+        """
+        Xây dựng chỉ mục trong một lần duyệt duy nhất.
+
+        Args:
+            formulas (iterable): Các tuple (tên sheet, tọa độ, chuỗi công thức).
+            sheet_order (list): Tên các sheet theo thứ tự.
+            defined_names (iterable, optional): Các tuple (tên, phạm vi, chuỗi tham chiếu).
+        """
+        index = cls(sheet_order, defined_names)
+        for sheet_name, coord, formula in formulas:
+            index.add_formula(sheet_name, coord, formula)
+        return index
+
+    def _expand(self, ref):
+        """(Hàm nội bộ) Mở rộng một tham chiếu (có thể là 3-D) thành tập tên sheet (lower)."""
+        if ':' not in ref:
+            return {ref.lower()}
+        first, last = (part.lower() for part in ref.split(':', 1))
+        start, end = self._positions.get(first), self._positions.get(last)
+        if start is None or end is None:
+            return {first, last}
+        if start > end:
+            start, end = end, start
+        return {name.lower() for name in self._sheet_order[start:end + 1]}
+
+    def _direct_targets(self, formula):
+        """(Hàm nội bộ) Tập tên sheet (lower) được tham chiếu trực tiếp trong công thức."""
+        targets = set()
+        if '!' not in formula:
+            return targets
+        for quoted in _QUOTED_REF_RE.findall(formula):
+            if '[' in quoted or ']' in quoted:
+                continue  # Tham chiếu đến workbook ngoài
+            targets |= self._expand(quoted.replace("''", "'"))
+        for plain in _PLAIN_REF_RE.findall(formula):
+            targets |= self._expand(plain)
+        return targets
+
+    def _resolve_defined_names(self, defined_names):
+        """(Hàm nội bộ) Tính tập sheet mà mỗi Named Range trỏ tới (kể cả tên lồng nhau)."""
+        raw = {}
+        for name, scope, refers_to in defined_names:
+            if not name:
+                continue
+            refers_to = _strip_string_literals(str(refers_to).lstrip('='))
+            raw.setdefault(name.lower(), []).append(refers_to)
+
+        resolved = {}
+
+        def resolve(key, depth=0):
+            if key in resolved:
+                return resolved[key]
+            resolved[key] = set()  # Chặn vòng lặp tham chiếu
+            targets = set()
+            for refers_to in raw[key]:
+                targets |= self._direct_targets(refers_to)
+                if depth < 16:
+                    for ident in _IDENTIFIER_RE.findall(refers_to):
+                        if ident.lower() in raw and ident.lower() != key:
+                            targets |= resolve(ident.lower(), depth + 1)
+            resolved[key] = targets
+            return targets
+
+        for key in raw:
+            resolve(key)
+        return {key: targets for key, targets in resolved.items() if targets}
+
+    def referenced_sheets(self, formula):
+        """Trả về tập tên sheet (lower) mà một công thức tham chiếu đến, trực tiếp hoặc qua Named Range."""
+        formula = _strip_string_literals(str(formula).lstrip('='))
+        targets = self._direct_targets(formula)
+        if self._name_targets:
+            for ident in _IDENTIFIER_RE.findall(formula):
+                targets |= self._name_targets.get(ident.lower(), set())
+        return targets
+
+    def add_formula(self, sheet_name, coord, formula):
+        """Thêm (hoặc cập nhật) một ô có công thức vào chỉ mục."""
+        cell = (sheet_name, coord)
+        if cell in self._cell_targets:
+            self.discard_cells([cell])
+        targets = self.referenced_sheets(formula)
+        targets.discard(sheet_name.lower())  # Tham chiếu đến chính sheet chứa ô không phải là liên kết chéo
+        if not targets:
+            return
+        self._cell_targets[cell] = targets
+        self._cells_by_sheet.setdefault(sheet_name.lower(), set()).add(cell)
+        for target in targets:
+            self._dependents.setdefault(target, {})[cell] = None
+
+    # --- Queries ---
+    def cells_referencing(self, sheet_names, exclude_targets=True):
+        """
+        Lấy các ô có công thức tham chiếu đến một trong các sheet.
+
+        Args:
+            sheet_names (str or list): Tên (các) sheet mục tiêu.
+            exclude_targets (bool): Nếu True, bỏ qua các ô nằm trên chính các sheet mục tiêu.
+
+        Returns:
+            list: Danh sách dict {'sheet': tên sheet, 'coord': tọa độ ô}, không trùng lặp.
+        """
+        if isinstance(sheet_names, str):
+            sheet_names = [sheet_names]
+        keys = {name.lower() for name in sheet_names}
+        found = {}
+        for key in keys:
+            for cell in self._dependents.get(key, ()):
+                if exclude_targets and cell[0].lower() in keys:
+                    continue
+                found[cell] = None
+        return [{'sheet': sheet, 'coord': coord} for sheet, coord in found]
+
+    def dependent_sheets(self, sheet_name):
+        """
+        Lấy các sheet (khác sheet_name) có ít nhất một ô công thức tham chiếu đến sheet_name.
+
+        Returns:
+            set: Tên các sheet phụ thuộc (giữ nguyên hoa thường như trong workbook).
+        """
+        key = sheet_name.lower()
+        return {sheet for sheet, _ in self._dependents.get(key, ()) if sheet.lower() != key}
+
+    # --- Incremental updates ---
+    def discard_cells(self, cells):
+        """
+        Loại bỏ các ô khỏi chỉ mục (ví dụ sau khi công thức đã được thay bằng giá trị).
+
+        Args:
+            cells (iterable): Các dict {'sheet', 'coord'} hoặc tuple (sheet, coord).
+        """
+        for cell in cells:
+            if isinstance(cell, dict):
+                cell = (cell['sheet'], cell['coord'])
+            targets = self._cell_targets.pop(cell, None)
+            if targets is None:
+                continue
+            for target in targets:
+                dependents = self._dependents.get(target)
+                if dependents is not None:
+                    dependents.pop(cell, None)
+                    if not dependents:
+                        del self._dependents[target]
+            on_sheet = self._cells_by_sheet.get(cell[0].lower())
+            if on_sheet is not None:
+                on_sheet.discard(cell)
+
+    def remove_sheets(self, sheet_names):
+        """Cập nhật chỉ mục sau khi các sheet đã bị xóa khỏi workbook."""
+        if isinstance(sheet_names, str):
+            sheet_names = [sheet_names]
+        for name in sheet_names:
+            key = name.lower()
+            self.discard_cells(list(self._cells_by_sheet.pop(key, ())))
+            self._dependents.pop(key, None)
+        removed = {name.lower() for name in sheet_names}
+        self._sheet_order = [name for name in self._sheet_order if name.lower() not in removed]
+        self._positions = {name.lower(): i for i, name in enumerate(self._sheet_order)}
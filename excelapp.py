@@ -5,6 +5,48 @@ Author: Your Name / Tên của bạn
 Description: Chứa class ExcelApp để quản lý toàn bộ tiến trình Excel.
 
 --- CHANGELOG ---
+Version 0.13.0 (2026-10-17):
+    - .wait_for_workbook(): min_count phải lớn hơn hoặc bằng 1 (min_count=0 khi không có book nào
+      đang mở trước đây gây IndexError).
+
+Version 0.12.0 (2026-10-17):
+    - Dùng logging (log_utils.py) thay cho print(), định dạng thông điệp trễ.
+
+Version 0.11.0 (2026-10-17):
+    - Thêm tham số profiler vào __init__: đo các lần gọi backend bằng một Profiler (profiler.py).
+      Không truyền profiler thì backend không bị bọc, không tốn thêm chi phí.
+
+Version 0.10.0 (2026-10-17):
+    - Thêm thuộc tính .calculation để đọc/đặt chế độ tính toán ('automatic', 'manual', ...).
+
+Version 0.9.0 (2026-10-17):
+    - Đối tượng Workbook được giữ (tham chiếu yếu) theo đường dẫn: cùng một book luôn trả về cùng
+      một đối tượng, giữ nguyên các cache của nó (chỉ mục phụ thuộc, thông tin sheet).
+    - .workbooks dùng chỉ mục book thay vì đọc lại danh sách book mỗi lần.
+
+Version 0.8.0 (2026-10-17):
+    - Thêm chỉ mục đường dẫn -> workbook, cập nhật khi open/new/close/save_as và được đối chiếu
+      với số book thực tế. .open() kiểm tra file đã mở trong O(1), không truy cập hệ thống file.
+
+Version 0.7.0 (2026-10-17):
+    - .wait_for_workbook() dùng thời gian chờ tăng dần (exponential backoff) bắt đầu từ vài mili giây
+      thay vì chờ cố định 1 giây, chỉ đọc lại danh sách tên book khi số lượng book thay đổi.
+    - Hỗ trợ chờ theo nhiều điều kiện: name_pattern (regex), path, min_count.
+    - Thêm .wait_for_workbook_async() cho asyncio.
+
+Version 0.6.0 (2026-10-17):
+    - .convert_to_xlsx() nhận thêm tham số reopen: False để không mở lại file kết quả
+      (trả về đường dẫn), tránh nạp lại toàn bộ file khi chỉ cần chuyển đổi.
+
+Version 0.5.0 (2026-10-17):
+    - .new() nhận thêm tham số write_only để tạo workbook chỉ ghi nối tiếp (engine 'file').
+    - Thêm thuộc tính .pid.
+
+Version 0.4.0 (2026-10-17):
+    - Thêm tham số engine vào __init__: 'xlwings' (Excel thật, mặc định) hoặc 'file'
+      (đọc/ghi trực tiếp file bằng openpyxl, không cần Excel, chạy được trên Linux).
+    - ExcelApp làm việc với giao diện backend thay vì gọi trực tiếp xlwings.
+
 Version 0.3.0 (2025-08-08):
     - Thêm các tùy chọn tăng tốc vào __init__: screen_updating, display_alerts, calculation.
     - Thêm các thuộc tính tiện lợi: .workbooks, .workbook_names.
@@ -18,18 +60,26 @@ Version 0.1.0 (2025-08-08):
 -------------------
 """
 
-import xlwings as xw
+import asyncio
+import logging
 import os
+import re
 import time
+import weakref
 from pathlib import Path
+from .backend import xw, create_app_backend
 from .workbook import Workbook  # Sử dụng import tương đối
+from .log_utils import SUCCESS
+
+logger = logging.getLogger(__name__)
 
 class ExcelApp:
     """
     Lớp quản lý chính, đại diện cho một tiến trình (instance) của ứng dụng Excel.
     """
 
-    def __init__(self, visible=True, add_book=False, screen_updating=True, display_alerts=True, calculation='automatic'):
+    def __init__(self, visible=True, add_book=False, screen_updating=True, display_alerts=True, calculation='automatic', engine='xlwings',
+                 profiler=None):
         """
         Khởi tạo và cấu hình ứng dụng Excel.
 
@@ -39,20 +89,31 @@ class ExcelApp:
             screen_updating (bool): True để Excel cập nhật màn hình. Tắt (False) để tăng tốc độ.
             display_alerts (bool): True để hiển thị cảnh báo của Excel. Tắt (False) để bỏ qua.
             calculation (str): Chế độ tính toán ('automatic', 'manual'). 'manual' giúp tăng tốc.
+            engine (str or AppBackend): 'xlwings' để điều khiển Excel thật, 'file' để làm việc
+                                        trực tiếp với file mà không cần Excel.
+            profiler (Profiler, optional): Đo mọi lần gọi backend của ứng dụng này
+                                           (xem profiler.py).
         """
-        print("INFO: Khởi tạo tiến trình Excel...")
+        logger.info("Khởi tạo tiến trình Excel...")
         try:
-            self._app = xw.App(visible=visible, add_book=add_book)
+            self._app = create_app_backend(engine, visible=visible, add_book=add_book)
+            self.profiler = profiler
+            if profiler is not None:
+                self._app = profiler.wrap(self._app)
+            self._book_index = {}
+            self._workbook_wrappers = weakref.WeakValueDictionary()
+            self._rebuild_book_index()
             
             # Áp dụng các tùy chọn hiệu suất
             self._app.screen_updating = screen_updating
             self._app.display_alerts = display_alerts
             self._app.calculation = calculation
             
-            print(f"INFO: Cấu hình Excel - ScreenUpdating: {screen_updating}, DisplayAlerts: {display_alerts}, Calculation: {calculation}")
+            logger.info("Cấu hình Excel - ScreenUpdating: %s, DisplayAlerts: %s, Calculation: %s",
+                        screen_updating, display_alerts, calculation)
 
         except Exception as e:
-            print(f"ERROR: Không thể khởi tạo Excel. Vui lòng kiểm tra cài đặt của bạn. Lỗi: {e}")
+            logger.error("Không thể khởi tạo Excel. Vui lòng kiểm tra cài đặt của bạn. Lỗi: %s", e)
             raise
 
     def __enter__(self):
@@ -76,77 +137,253 @@ class ExcelApp:
         self.quit()
 
     # --- Properties ---
+    @property
+    def engine(self):
+        """Tên engine đang dùng ('xlwings' hoặc 'file')."""
+        return self._app.engine
+
+    @property
+    def pid(self):
+        """PID của tiến trình Excel (None với engine 'file')."""
+        return self._app.pid if self._app else None
+
+    @property
+    def calculation(self):
+        """Lấy hoặc đặt chế độ tính toán của Excel ('automatic', 'manual', 'semiautomatic')."""
+        return self._app.calculation
+
+    @calculation.setter
+    def calculation(self, value):
+        self._app.calculation = value
+
     @property
     def workbooks(self):
         """Trả về một danh sách các đối tượng Workbook đang được quản lý."""
-        return [Workbook(book, self) for book in self._app.books]
+        if len(self._book_index) != self._app.book_count():
+            self._rebuild_book_index()
+        return [self._wrap_book(book, key) for key, book in self._book_index.items()]
 
     @property
     def workbook_names(self):
         """Trả về một danh sách tên của các workbook đang mở."""
         return [book.name for book in self._app.books]
 
+    # --- Book Index ---
+    @staticmethod
+    def _book_key(fullname):
+        """(Hàm nội bộ) Khóa chuẩn hóa của một book: đường dẫn tuyệt đối (chỉ xử lý chuỗi) hoặc tên book chưa lưu."""
+        fullname = str(fullname)
+        if os.path.isabs(fullname):
+            return os.path.normcase(os.path.normpath(fullname))
+        return fullname.lower()
+
+    def _rebuild_book_index(self):
+        """(Hàm nội bộ) Dựng lại chỉ mục từ danh sách book thực tế."""
+        self._book_index = {self._book_key(book.fullname): book for book in self._app.books}
+
+    def _find_open_book(self, key):
+        """(Hàm nội bộ) Tìm book đang mở theo khóa. Chỉ mục được dựng lại nếu lệch với số book thực tế."""
+        if len(self._book_index) != self._app.book_count():
+            self._rebuild_book_index()
+        book = self._book_index.get(key)
+        if book is None:
+            return None
+        try:
+            if self._book_key(book.fullname) == key:
+                return book
+        except Exception:
+            pass
+        # Book đã bị đóng/đổi tên bên ngoài thư viện
+        self._rebuild_book_index()
+        return self._book_index.get(key)
+
+    def _wrap_book(self, book_impl, key=None):
+        """(Hàm nội bộ) Trả về đối tượng Workbook duy nhất ứng với một book."""
+        if key is None:
+            key = self._book_key(book_impl.fullname)
+        workbook = self._workbook_wrappers.get(key)
+        if workbook is None:
+            workbook = Workbook(book_impl, self)
+            self._workbook_wrappers[key] = workbook
+        return workbook
+
+    def _on_book_opened(self, book_impl):
+        """(Hàm nội bộ) Ghi nhận book mới mở/tạo vào chỉ mục."""
+        self._book_index[self._book_key(book_impl.fullname)] = book_impl
+
+    def _on_book_closed(self, fullname):
+        """(Hàm nội bộ) Gỡ book đã đóng khỏi chỉ mục."""
+        key = self._book_key(fullname)
+        self._book_index.pop(key, None)
+        self._workbook_wrappers.pop(key, None)
+
+    def _on_book_renamed(self, old_fullname, book_impl):
+        """(Hàm nội bộ) Cập nhật chỉ mục sau khi book được lưu với tên mới."""
+        workbook = self._workbook_wrappers.get(self._book_key(old_fullname))
+        self._on_book_closed(old_fullname)
+        self._on_book_opened(book_impl)
+        if workbook is not None:
+            self._workbook_wrappers[self._book_key(book_impl.fullname)] = workbook
+
     # --- Methods ---
     def open(self, path, password=None, read_only=False):
         """Mở một workbook."""
-        file_path = Path(path).resolve()
-        for book in self._app.books:
-            if Path(book.fullname).resolve() == file_path:
-                return Workbook(book, self)
+        file_path = os.path.abspath(path)
+        key = self._book_key(file_path)
+        book = self._find_open_book(key)
+        if book is not None:
+            return self._wrap_book(book, key)
         try:
-            xlw_book = self._app.books.open(file_path, password=password, read_only=read_only, ignore_read_only_recommended=True)
-            return Workbook(xlw_book, self)
+            book_impl = self._app.open_book(Path(file_path), password=password, read_only=read_only)
+            self._on_book_opened(book_impl)
+            return self._wrap_book(book_impl)
         except Exception as e:
-            print(f"ERROR: Không thể mở workbook tại '{file_path}'. Lỗi: {e}")
+            logger.error("Không thể mở workbook tại '%s'. Lỗi: %s", file_path, e)
             return None
 
-    def new(self):
-        """Tạo một workbook mới."""
-        xlw_book = self._app.books.add()
-        return Workbook(xlw_book, self)
+    def new(self, write_only=False):
+        """
+        Tạo một workbook mới.
+
+        Args:
+            write_only (bool): Chỉ hỗ trợ engine 'file'. True để tạo workbook chỉ dùng để ghi
+                               nối tiếp bằng Sheet.append_rows(): các dòng được stream thẳng ra
+                               file nên bộ nhớ không tăng theo số dòng. Chưa có sheet nào,
+                               hãy tạo bằng add_sheet() rồi lưu bằng save_as() (một lần).
+        """
+        book_impl = self._app.new_book(write_only=write_only)
+        self._on_book_opened(book_impl)
+        return self._wrap_book(book_impl)
 
     def get_workbook(self, specifier=None):
         """Lấy một workbook đã mở."""
         if not self._app.books: return None
         if specifier is None: return self.get_active_workbook()
         try:
-            return Workbook(self._app.books[specifier], self)
+            return self._wrap_book(self._app.get_book(specifier))
         except Exception:
             return None
 
     def get_active_workbook(self):
         """Lấy workbook đang active."""
-        if self._app.books.active:
-            return Workbook(self._app.books.active, self)
+        book_impl = self._app.active_book
+        if book_impl:
+            return self._wrap_book(book_impl)
         return None
 
-    def wait_for_workbook(self, title_contains=None, title_is=None, timeout=30):
-        """Chờ một workbook xuất hiện."""
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            for book in self._app.books:
-                if (title_is and book.name == title_is) or (title_contains and title_contains in book.name):
-                    return Workbook(book, self)
-            time.sleep(1)
-        return None
+    def wait_for_workbook(self, title_contains=None, title_is=None, timeout=30, name_pattern=None,
+                          path=None, min_count=None, initial_delay=0.005, max_delay=0.5):
+        """
+        Chờ một workbook xuất hiện. Khi truyền nhiều điều kiện, workbook phải thỏa mãn tất cả.
+
+        Thời gian chờ giữa các lần kiểm tra tăng dần từ initial_delay đến max_delay. Mỗi lần kiểm tra
+        chỉ đếm số book; danh sách tên book chỉ được đọc lại khi số lượng thay đổi (hoặc định kỳ
+        khi đã chờ ở mức max_delay, để nhận ra book được đổi tên).
+
+        Args:
+            title_contains (str, optional): Tên workbook chứa chuỗi này.
+            title_is (str, optional): Tên workbook đúng bằng chuỗi này.
+            timeout (float): Thời gian chờ tối đa (giây).
+            name_pattern (str or re.Pattern, optional): Tên workbook khớp biểu thức chính quy (re.search).
+            path (str or Path, optional): Đường dẫn đầy đủ của workbook.
+            min_count (int, optional): Số workbook đang mở tối thiểu (>= 1). Nếu chỉ có điều kiện này,
+                                       trả về workbook mở sau cùng.
+            initial_delay (float): Thời gian chờ đầu tiên (giây).
+            max_delay (float): Thời gian chờ tối đa giữa hai lần kiểm tra (giây).
+
+        Returns:
+            Workbook: Workbook thỏa mãn điều kiện, None nếu hết thời gian chờ.
+        """
+        poll = self._poll_workbook(title_contains, title_is, timeout, name_pattern, path, min_count,
+                                   initial_delay, max_delay)
+        try:
+            while True:
+                time.sleep(next(poll))
+        except StopIteration as done:
+            return done.value
 
-    def convert_to_xlsx(self, source_path, destination_path=None):
-        """Chuyển đổi file sang định dạng .xlsx."""
+    async def wait_for_workbook_async(self, title_contains=None, title_is=None, timeout=30, name_pattern=None,
+                                      path=None, min_count=None, initial_delay=0.005, max_delay=0.5):
+        """Phiên bản asyncio của wait_for_workbook(), nhường event loop trong lúc chờ."""
+        poll = self._poll_workbook(title_contains, title_is, timeout, name_pattern, path, min_count,
+                                   initial_delay, max_delay)
+        try:
+            while True:
+                await asyncio.sleep(next(poll))
+        except StopIteration as done:
+            return done.value
+
+    def _poll_workbook(self, title_contains, title_is, timeout, name_pattern, path, min_count,
+                       initial_delay, max_delay):
+        """
+        (Hàm nội bộ) Generator kiểm tra điều kiện: yield thời gian cần chờ trước lần kiểm tra tiếp theo,
+        return Workbook tìm được (hoặc None khi hết thời gian chờ).
+        """
+        if isinstance(name_pattern, str):
+            name_pattern = re.compile(name_pattern)
+        target_path = os.path.normcase(os.path.abspath(path)) if path else None
+        has_book_condition = any(c is not None for c in (title_contains, title_is, name_pattern, target_path))
+        if not has_book_condition and min_count is None:
+            raise ValueError("Cần ít nhất một điều kiện chờ.")
+        if min_count is not None and min_count < 1:
+            raise ValueError("min_count phải lớn hơn hoặc bằng 1.")
+
+        def matches(name, fullname):
+            return ((title_is is None or name == title_is)
+                    and (title_contains is None or title_contains in name)
+                    and (name_pattern is None or name_pattern.search(name))
+                    and (target_path is None or os.path.normcase(os.path.abspath(fullname)) == target_path))
+
+        deadline = time.monotonic() + timeout
+        delay = initial_delay
+        snapshot, snapshot_count = [], None
+        while True:
+            count = self._app.book_count()
+            if count != snapshot_count or delay >= max_delay:
+                # Chỉ đọc lại tên các book khi cần
+                snapshot = [(book, book.name, book.fullname) for book in self._app.books]
+                snapshot_count = count
+                if snapshot and (min_count is None or count >= min_count):
+                    if not has_book_condition:
+                        return self._wrap_book(snapshot[-1][0], self._book_key(snapshot[-1][2]))
+                    for book, name, fullname in snapshot:
+                        if matches(name, fullname):
+                            return self._wrap_book(book, self._book_key(fullname))
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            yield min(delay, remaining)
+            delay = min(delay * 2, max_delay)
+
+    def convert_to_xlsx(self, source_path, destination_path=None, reopen=True):
+        """
+        Chuyển đổi file sang định dạng .xlsx.
+
+        Args:
+            source_path (str or Path): File nguồn (.xls, .xlsm, .csv, ...).
+            destination_path (str or Path, optional): File đích. Mặc định: cùng tên, đuôi .xlsx.
+            reopen (bool): True để mở lại và trả về Workbook của file kết quả,
+                           False để chỉ trả về đường dẫn file kết quả.
+
+        Returns:
+            Workbook or Path: Kết quả chuyển đổi, None nếu thất bại.
+        """
         source_path = Path(source_path)
         if not destination_path:
             destination_path = source_path.with_suffix('.xlsx')
         else:
             destination_path = Path(destination_path)
         
-        temp_xlw_book = None
+        temp_book = None
         try:
-            temp_xlw_book = self._app.books.open(source_path)
-            temp_xlw_book.save(destination_path)
-            temp_xlw_book.close()
-            return self.open(destination_path)
+            temp_book = self._app.open_book(source_path)
+            temp_book.save(destination_path)
+            temp_book.close()
+            return self.open(destination_path) if reopen else destination_path
         except Exception as e:
-            print(f"ERROR: Quá trình chuyển đổi thất bại. Lỗi: {e}")
-            if temp_xlw_book: temp_xlw_book.close()
+            logger.error("Quá trình chuyển đổi thất bại. Lỗi: %s", e)
+            if temp_book: temp_book.close()
             return None
 
     def quit(self):
@@ -154,16 +391,18 @@ class ExcelApp:
         if self._app:
             self._app.quit()
             self._app = None
+            self._book_index = {}
+            self._workbook_wrappers = weakref.WeakValueDictionary()
 
     # --- Static Methods for Process Management ---
     @staticmethod
     def kill_all_processes():
         """(Phương thức tĩnh) Buộc đóng TẤT CẢ các tiến trình 'excel.exe'."""
-        print("WARNING: Đang thực hiện buộc đóng TẤT CẢ các tiến trình Excel...")
+        logger.warning("Đang thực hiện buộc đóng TẤT CẢ các tiến trình Excel...")
         try:
             os.system('taskkill /F /IM excel.exe')
         except Exception as e:
-            print(f"ERROR: Không thể thực thi lệnh taskkill. Lỗi: {e}")
+            logger.error("Không thể thực thi lệnh taskkill. Lỗi: %s", e)
 
     @staticmethod
     def kill_hidden_processes():
@@ -171,7 +410,10 @@ class ExcelApp:
         (Phương thức tĩnh) Chỉ tìm và buộc đóng các tiến trình Excel đang chạy ẩn (headless).
         An toàn hơn kill_all_processes vì nó không ảnh hưởng đến các file Excel người dùng đang mở.
         """
-        print("INFO: Đang tìm và đóng các tiến trình Excel chạy ẩn...")
+        logger.info("Đang tìm và đóng các tiến trình Excel chạy ẩn...")
+        if xw is None:
+            logger.error("Cần cài đặt 'xlwings' để tìm các tiến trình Excel.")
+            return
         killed_pids = []
         try:
             # Lấy danh sách tất cả các app đang chạy mà xlwings có thể thấy
@@ -179,7 +421,7 @@ class ExcelApp:
             for app in running_apps:
                 if not app.visible:
                     pid = app.pid
-                    print(f"INFO: Tìm thấy tiến trình ẩn với PID: {pid}. Đang đóng...")
+                    logger.info("Tìm thấy tiến trình ẩn với PID: %s. Đang đóng...", pid)
                     try:
                         app.quit() # Thử đóng nhẹ nhàng trước
                     except Exception:
@@ -188,9 +430,9 @@ class ExcelApp:
                     killed_pids.append(pid)
             
             if not killed_pids:
-                print("INFO: Không tìm thấy tiến trình Excel nào đang chạy ẩn.")
+                logger.info("Không tìm thấy tiến trình Excel nào đang chạy ẩn.")
             else:
-                print(f"SUCCESS: Đã đóng thành công các tiến trình ẩn có PID: {killed_pids}")
+                logger.log(SUCCESS, "Đã đóng thành công các tiến trình ẩn có PID: %s", killed_pids)
 
         except Exception as e:
-            print(f"ERROR: Đã xảy ra lỗi khi tìm và đóng tiến trình ẩn. Lỗi: {e}")
+            logger.error("Đã xảy ra lỗi khi tìm và đóng tiến trình ẩn. Lỗi: %s", e)
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+File: external_links.py
+Author: Your Name / Tên của bạn
+Description: Tìm và phá vỡ liên kết ngoài (external link) trực tiếp trên file .xlsx/.xlsm, không cần
+             Excel: công thức tham chiếu tới file khác được thay bằng giá trị đã lưu cache, các part
+             externalLinks/*.xml cùng relationship của chúng được loại bỏ khỏi gói.
+
+Lưu ý:
+    - Các part XML được ghi lại ở mức văn bản (bytes), không phân tích/ghi lại bằng ElementTree,
+      để giữ nguyên tiền tố namespace (mc:Ignorable, x14ac:...) mà Excel yêu cầu.
+    - Named Range trỏ tới file khác được chuyển thành '#REF!' (xóa sau bằng
+      Workbook.delete_all_named_ranges(broken_only=True) nếu cần).
+    - calcChain.xml bị loại bỏ vì có thể còn tham chiếu tới các ô không còn công thức;
+      Excel sẽ tự dựng lại khi mở file.
+    - Công thức trong biểu đồ, định dạng có điều kiện, data validation không được xử lý.
+
+--- CHANGELOG ---
+Version 0.2.0 (2026-10-17):
+    - Dùng logging (log_utils.py) thay cho print().
+
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo module với các hàm: list_external_links(), break_links_in_file(), break_links_many().
+-------------------
+"""
+
+import logging
+import posixpath
+import re
+import shutil
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from xml.etree.ElementTree import parse
+from .formula_scanner import (NS_MAIN, NS_REL, NS_PKG_REL, get_workbook_part, get_workbook_rels,
+                              get_sheet_parts, rewrite_package)
+
+logger = logging.getLogger(__name__)
+
+EXTERNAL_LINK_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/externalLink'
+CALC_CHAIN_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/calcChain'
+
+_EXTERNAL_INDEX = re.compile(rb'\[(\d+)\]')
+_CELL = re.compile(rb'<c\b([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+_FORMULA = re.compile(rb'<f\b([^>]*?)(?:/>|>(.*?)</f>)', re.S)
+_VALUE = re.compile(rb'<v>(.*?)</v>', re.S)
+_SHARED_INDEX = re.compile(rb'\bsi="(\d+)"')
+_CELL_TYPE = re.compile(rb'\st="[^"]*"')
+_EXTERNAL_REFERENCES = re.compile(
+    rb'<((?:[\w.-]+:)?)externalReferences\b[^>]*?(?:/>|>.*?</\1externalReferences>)', re.S)
+_DEFINED_NAME_TEXT = re.compile(rb'(<(?:[\w.-]+:)?definedName\b[^>]*>)(.*?)(</(?:[\w.-]+:)?definedName>)', re.S)
+_RELATIONSHIP = re.compile(rb'<Relationship\b[^>]*?/>')
+_OVERRIDE = re.compile(rb'<Override\b[^>]*?/>')
+_ATTRIBUTE = re.compile(rb'([\w:]+)\s*=\s*"([^"]*)"')
+
+
+def _rels_path(part):
+    """(Hàm nội bộ) Đường dẫn file .rels của một part."""
+    return posixpath.join(posixpath.dirname(part), '_rels', posixpath.basename(part) + '.rels')
+
+
+def _link_target(zf, part):
+    """(Hàm nội bộ) Đường dẫn file nguồn (TargetMode="External") của một part externalLink."""
+    try:
+        with zf.open(_rels_path(part)) as fh:
+            for rel in parse(fh).getroot().iter(f'{NS_PKG_REL}Relationship'):
+                if rel.get('TargetMode') == 'External':
+                    return rel.get('Target')
+    except KeyError:
+        pass
+    return None
+
+
+def _external_links(zf):
+    """(Hàm nội bộ) Danh sách liên kết ngoài theo thứ tự trong workbook.xml (chỉ số [n] trong công thức)."""
+    workbook_part = get_workbook_part(zf)
+    rels = get_workbook_rels(zf)
+    with zf.open(workbook_part) as fh:
+        root = parse(fh).getroot()
+    links = []
+    for index, ref in enumerate(root.iter(f'{NS_MAIN}externalReference'), start=1):
+        rel_id = ref.get(f'{NS_REL}id')
+        rel_type, part = rels.get(rel_id, (None, None))
+        if rel_type != EXTERNAL_LINK_TYPE:
+            continue
+        links.append({'index': index, 'part': part, 'rel_id': rel_id, 'target': _link_target(zf, part)})
+    return links
+
+
+def list_external_links(path):
+    """
+    Liệt kê các liên kết ngoài của file mà không cần mở Excel.
+
+    Args:
+        path (str or Path): Đường dẫn đến file .xlsx/.xlsm.
+
+    Returns:
+        list: Danh sách dict {'index' (số n trong '[n]Sheet1!A1'), 'part', 'rel_id', 'target'}.
+    """
+    with zipfile.ZipFile(path) as zf:
+        return _external_links(zf)
+
+
+def _has_external_ref(formula, indexes):
+    """(Hàm nội bộ) True nếu chuỗi công thức (bytes) có tham chiếu '[n]' tới một liên kết ngoài."""
+    return any(int(n) in indexes for n in _EXTERNAL_INDEX.findall(formula))
+
+
+def _freeze_sheet_xml(xml, indexes):
+    """
+    (Hàm nội bộ) Thay các công thức tham chiếu liên kết ngoài bằng giá trị cache trong XML của một sheet.
+
+    Returns:
+        tuple: (XML mới, số công thức đã thay).
+    """
+    # Lượt 1: các công thức dùng chung (shared) có ô gốc tham chiếu liên kết ngoài
+    shared = set()
+    for match in _FORMULA.finditer(xml):
+        if match.group(2) and b'shared' in match.group(1) and _has_external_ref(match.group(2), indexes):
+            si = _SHARED_INDEX.search(match.group(1))
+            if si:
+                shared.add(si.group(1))
+
+    count = 0
+
+    def freeze_cell(cell):
+        nonlocal count
+        body = cell.group(2)
+        if not body or b'<f' not in body:
+            return cell.group(0)
+        formula = _FORMULA.search(body)
+        if formula is None:
+            return cell.group(0)
+        attrs = formula.group(1)
+        si = _SHARED_INDEX.search(attrs) if b'shared' in attrs else None
+        if not ((formula.group(2) and _has_external_ref(formula.group(2), indexes))
+                or (si is not None and si.group(1) in shared)):
+            return cell.group(0)
+
+        count += 1
+        cell_attrs = cell.group(1)
+        value = _VALUE.search(body)
+        type_match = re.search(rb'\st="([^"]*)"', cell_attrs)
+        cell_type = type_match.group(1) if type_match else b'n'
+        if value is None:
+            return b'<c' + _CELL_TYPE.sub(b'', cell_attrs) + b'/>'
+        if cell_type == b'str':
+            # Kết quả chuỗi của công thức -> chuỗi nội tuyến
+            return (b'<c' + _CELL_TYPE.sub(b'', cell_attrs) + b' t="inlineStr"><is><t xml:space="preserve">'
+                    + value.group(1) + b'</t></is></c>')
+        return b'<c' + cell_attrs + b'>' + value.group(0) + b'</c>'
+
+    new_xml = _CELL.sub(freeze_cell, xml)
+    return new_xml, count
+
+
+def _strip_relationships(xml, should_drop):
+    """(Hàm nội bộ) Loại bỏ các phần tử <Relationship> thỏa should_drop(dict thuộc tính)."""
+    def replace(match):
+        attrs = {k: v for k, v in _ATTRIBUTE.findall(match.group(0))}
+        return b'' if should_drop(attrs) else match.group(0)
+    return _RELATIONSHIP.sub(replace, xml)
+
+
+def break_links_in_file(path, destination=None):
+    """
+    Phá vỡ tất cả liên kết ngoài của một file .xlsx/.xlsm mà không cần Excel.
+
+    Công thức tham chiếu tới file khác được thay bằng giá trị Excel đã lưu cache lần cuối,
+    Named Range trỏ tới file khác được chuyển thành '#REF!', các part externalLinks/*.xml,
+    relationship và khai báo content type tương ứng (cùng calcChain.xml) bị loại bỏ.
+
+    Args:
+        path (str or Path): File nguồn (không được mở trong Excel nếu ghi đè).
+        destination (str or Path, optional): File kết quả. Mặc định: ghi đè lên file nguồn.
+
+    Returns:
+        dict: {'links': danh sách đường dẫn nguồn đã phá vỡ, 'formulas': số công thức đã thay,
+               'names': số Named Range đã chuyển thành #REF!}. File không có liên kết ngoài
+               không bị ghi lại (chỉ được sao chép nếu có destination).
+    """
+    path = Path(path)
+    with zipfile.ZipFile(path) as zf:
+        links = _external_links(zf)
+        result = {'links': [link['target'] for link in links], 'formulas': 0, 'names': 0}
+        if not links:
+            if destination is not None:
+                shutil.copyfile(path, destination)
+            return result
+        indexes = {link['index'] for link in links}
+        link_parts = {link['part'] for link in links}
+        link_rel_ids = {link['rel_id'].encode() for link in links}
+        names = set(zf.namelist())
+        replacements = {}
+
+        for _, part, _ in get_sheet_parts(zf):
+            if 'chartsheets/' in part or part not in names:
+                continue
+            xml = zf.read(part)
+            if b'[' not in xml:
+                continue
+            new_xml, count = _freeze_sheet_xml(xml, indexes)
+            if count:
+                replacements[part] = new_xml
+                result['formulas'] += count
+
+        # workbook.xml: bỏ <externalReferences>, Named Range trỏ ra ngoài -> #REF!
+        workbook_part = get_workbook_part(zf)
+
+        def break_name(match):
+            if _has_external_ref(match.group(2), indexes):
+                result['names'] += 1
+                return match.group(1) + b'#REF!' + match.group(3)
+            return match.group(0)
+        workbook_xml = _EXTERNAL_REFERENCES.sub(b'', zf.read(workbook_part), count=1)
+        replacements[workbook_part] = _DEFINED_NAME_TEXT.sub(break_name, workbook_xml)
+
+        # Relationship của workbook: bỏ externalLink và calcChain
+        rels = get_workbook_rels(zf)
+        calc_chain_parts = {part for rel_type, part in rels.values() if rel_type == CALC_CHAIN_TYPE}
+        workbook_rels = _rels_path(workbook_part)
+        replacements[workbook_rels] = _strip_relationships(
+            zf.read(workbook_rels),
+            lambda attrs: attrs.get(b'Id') in link_rel_ids or attrs.get(b'Type') == CALC_CHAIN_TYPE.encode())
+
+        # [Content_Types].xml: bỏ khai báo của các part bị loại bỏ
+        dropped = link_parts | calc_chain_parts
+        dropped_names = {('/' + part).encode() for part in dropped}
+        replacements['[Content_Types].xml'] = _OVERRIDE.sub(
+            lambda m: b'' if dict(_ATTRIBUTE.findall(m.group(0))).get(b'PartName') in dropped_names
+            else m.group(0), zf.read('[Content_Types].xml'))
+
+        drop = dropped | {_rels_path(part) for part in dropped}
+
+    rewrite_package(path, replacements, drop=drop, destination=destination)
+    return result
+
+
+def _break_links_job(source, destination):
+    """(Hàm nội bộ) Job chạy trong tiến trình con: phá vỡ liên kết của một file và đo thời gian."""
+    start = time.perf_counter()
+    result = break_links_in_file(source, destination)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def break_links_many(sources, dest_dir=None, workers=None, pattern='*.xls[xm]'):
+    """
+    Phá vỡ liên kết ngoài của nhiều file song song trên nhiều tiến trình (không cần Excel).
+
+    Args:
+        sources (str, Path or iterable): Một thư mục (các file khớp pattern bên trong) hoặc danh sách file.
+        dest_dir (str or Path, optional): Thư mục chứa file kết quả (cùng tên file nguồn).
+                                          Mặc định: ghi đè lên file nguồn.
+        workers (int, optional): Số tiến trình chạy song song. Mặc định: số CPU.
+        pattern (str): Mẫu tên file khi sources là thư mục.
+
+    Returns:
+        list: Báo cáo theo đúng thứ tự file, mỗi phần tử là dict
+              {'source', 'destination', 'status' ('broken'|'unchanged'|'failed'),
+               'links', 'formulas', 'names', 'seconds', 'error'}.
+    """
+    if isinstance(sources, (str, Path)) and Path(sources).is_dir():
+        sources = sorted(p for p in Path(sources).glob(pattern) if not p.name.startswith('~$'))
+    if dest_dir is not None:
+        dest_dir = Path(dest_dir)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+
+    report = []
+    for source in sources:
+        source = Path(source).resolve()
+        destination = (dest_dir / source.name).resolve() if dest_dir is not None else source
+        report.append({'source': source, 'destination': destination, 'status': None, 'links': [],
+                       'formulas': 0, 'names': 0, 'seconds': 0.0, 'error': None})
+
+    logger.info("Phá vỡ liên kết ngoài của %s file...", len(report))
+    start = time.perf_counter()
+    if report:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [(job, executor.submit(_break_links_job, job['source'],
+                                             job['destination'] if dest_dir is not None else None))
+                       for job in report]
+            for job, future in futures:
+                try:
+                    job.update(future.result())
+                    job['status'] = 'broken' if job['links'] else 'unchanged'
+                except Exception as e:
+                    job['status'] = 'failed'
+                    job['error'] = str(e)
+
+    counts = {status: sum(1 for job in report if job['status'] == status)
+              for status in ('broken', 'unchanged', 'failed')}
+    logger.info("Hoàn tất sau %.2fs - đã phá vỡ: %s, không có liên kết: %s, lỗi: %s.",
+                time.perf_counter() - start, counts['broken'], counts['unchanged'], counts['failed'])
+    return report
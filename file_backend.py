@@ -0,0 +1,687 @@
+# -*- coding: utf-8 -*-
+"""
+File: file_backend.py
+Author: Your Name / Tên của bạn
+Description: Backend dạng file (engine='file'): đọc/ghi trực tiếp file .xlsx/.xlsm bằng openpyxl,
+             không cần Excel, chạy được trên Linux và song song trong nhiều tiến trình.
+
+Lưu ý:
+    - Giá trị (value) của ô có công thức là giá trị Excel đã lưu cache lần cuối trong file.
+    - Các thao tác cần Excel (tính toán lại, xuất PDF, phá vỡ liên kết ngoài) sẽ ném
+      BackendNotSupportedError.
+    - openpyxl không giữ lại shape/hình vẽ khi lưu file.
+
+--- CHANGELOG ---
+Version 0.7.0 (2026-10-17):
+    - Thêm FileBook.saved: True khi workbook chưa được nạp (nội dung chính là file trên đĩa).
+
+Version 0.6.0 (2026-10-17):
+    - FileBook.get_names() đọc trực tiếp workbook.xml khi workbook chưa được nạp.
+    - FileBook.delete_names(): xóa nhiều tên trong một lượt, mỗi sheet phạm vi chỉ được tìm một lần.
+
+Version 0.5.0 (2026-10-17):
+    - FileSheet.apply_styles(): dùng bảng style dùng chung, mỗi tổ hợp (style cũ, định dạng mới)
+      chỉ được tính một lần rồi gán lại cho các ô khác thay vì tạo font/fill cho từng ô.
+
+Version 0.4.0 (2026-10-17):
+    - Hỗ trợ workbook mới ở chế độ write_only: các dòng được ghi nối tiếp và stream thẳng ra
+      XML của sheet (openpyxl write-only), bộ nhớ không tăng theo số dòng.
+    - FileSheet.next_free_row() và FileSheet.write_row_block() cho việc ghi nối tiếp theo khối.
+
+Version 0.3.0 (2026-10-17):
+    - Workbook mở ở chế độ chỉ đọc (read_only=True) được nạp trễ: danh sách sheet đọc trực tiếp
+      từ workbook.xml, chỉ nạp toàn bộ bằng openpyxl khi thực sự cần.
+    - FileSheet.iter_row_blocks() đọc stream XML của sheet khi workbook chưa được nạp.
+
+Version 0.2.0 (2026-10-17):
+    - FileRange.get_array() điền trực tiếp vào mảng NumPy, không dựng list trung gian.
+
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo các class FileApp, FileBook, FileSheet, FileRange.
+    - Hỗ trợ mở/tạo/lưu workbook, đọc/ghi giá trị và công thức, quản lý sheet,
+      Named Range, định dạng cơ bản, merge/unmerge.
+-------------------
+"""
+
+from copy import copy
+from pathlib import Path
+import zipfile
+from .backend import AppBackend, BookBackend, SheetBackend, RangeBackend, BackendNotSupportedError
+from .formula_scanner import get_sheet_parts
+from .sheet_stream import iter_row_chunks
+from .named_ranges import read_names
+
+try:
+    from openpyxl import Workbook as OpenpyxlWorkbook, load_workbook
+    from openpyxl.formula.translate import Translator
+    from openpyxl.styles import PatternFill
+    from openpyxl.styles.cell_style import StyleArray
+    from openpyxl.utils.cell import get_column_letter, range_boundaries, quote_sheetname
+    from openpyxl.workbook.defined_name import DefinedName
+    from openpyxl.workbook.protection import WorkbookProtection
+except ImportError:
+    load_workbook = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _to_argb(color):
+    """(Hàm nội bộ) Chuyển màu dạng '#RRGGBB' hoặc (r, g, b) sang chuỗi ARGB của openpyxl."""
+    if isinstance(color, (tuple, list)):
+        return 'FF' + ''.join(f'{int(c):02X}' for c in color[:3])
+    color = str(color).lstrip('#').upper()
+    return color if len(color) == 8 else 'FF' + color
+
+
+def _style_cell(cell, fill, font_bold=None, font_italic=None, font_color=None, number_format=None):
+    """(Hàm nội bộ) Áp dụng định dạng cho một ô của openpyxl (fill đã được dựng sẵn hoặc None)."""
+    if font_bold is not None or font_italic is not None or font_color:
+        font = copy(cell.font)
+        if font_bold is not None:
+            font.bold = font_bold
+        if font_italic is not None:
+            font.italic = font_italic
+        if font_color:
+            font.color = _to_argb(font_color)
+        cell.font = font
+    if fill is not None:
+        cell.fill = fill
+    if number_format:
+        cell.number_format = number_format
+
+
+def _rows_from_data(data):
+    """(Hàm nội bộ) Chuẩn hóa dữ liệu ghi (giá trị đơn, list 1 chiều, list 2 chiều) thành list 2 chiều."""
+    if isinstance(data, (list, tuple)):
+        if data and all(isinstance(row, (list, tuple)) for row in data):
+            return [list(row) for row in data]
+        return [list(data)]
+    return None
+
+
+class FileApp(AppBackend):
+    """Backend không cần Excel, quản lý các workbook được nạp trực tiếp từ file."""
+    engine = 'file'
+
+    def __init__(self):
+        if load_workbook is None:
+            raise ImportError("'openpyxl' is not installed. Please install it using: pip install openpyxl")
+        self._books = []
+        self._active = None
+        self._new_counter = 0
+        self.pid = None
+        # Các tùy chọn chỉ có ý nghĩa với Excel thật, được lưu lại để giữ cùng giao diện
+        self.visible = False
+        self.screen_updating = False
+        self.display_alerts = False
+        self.calculation = 'manual'
+
+    @property
+    def books(self):
+        return list(self._books)
+
+    def book_count(self):
+        return len(self._books)
+
+    @property
+    def active_book(self):
+        return self._active
+
+    def get_book(self, specifier):
+        if isinstance(specifier, int):
+            return self._books[specifier]
+        for book in self._books:
+            if book.name.lower() == str(specifier).lower() or book.fullname == str(specifier):
+                return book
+        raise KeyError(f"Không tìm thấy workbook '{specifier}'.")
+
+    def open_book(self, path, password=None, read_only=False):
+        if password:
+            raise BackendNotSupportedError("Engine 'file' không mở được file có mật khẩu.")
+        book = FileBook(self, path=Path(path), read_only=read_only)
+        self._books.append(book)
+        self._active = book
+        return book
+
+    def new_book(self, write_only=False):
+        self._new_counter += 1
+        book = FileBook(self, name=f'Book{self._new_counter}', write_only=write_only)
+        self._books.append(book)
+        self._active = book
+        return book
+
+    def quit(self):
+        self._books.clear()
+        self._active = None
+
+    def _remove(self, book):
+        """(Hàm nội bộ) Gỡ một book khỏi danh sách khi đóng."""
+        if book in self._books:
+            self._books.remove(book)
+        if self._active is book:
+            self._active = self._books[-1] if self._books else None
+
+
+class FileBook(BookBackend):
+    def __init__(self, app, path=None, read_only=False, name=None, write_only=False):
+        self._app = app
+        self._path = path
+        self._read_only = read_only
+        self._write_only = write_only
+        # Dòng kế tiếp sẽ được ghi của từng sheet write-only (openpyxl không theo dõi giá trị này)
+        self._stream_next_rows = {}
+        self._cached_wb = None
+        self._loaded_wb = None
+        if path is not None:
+            self._name = path.name
+            if not (read_only and zipfile.is_zipfile(path)):
+                self._loaded_wb = load_workbook(path, keep_vba=path.suffix.lower() == '.xlsm')
+        else:
+            self._loaded_wb = OpenpyxlWorkbook(write_only=write_only)
+            self._name = name
+
+    @property
+    def _wb(self):
+        """(Nội bộ) Workbook của openpyxl, được nạp khi cần lần đầu (với book chỉ đọc)."""
+        if self._loaded_wb is None:
+            self._loaded_wb = load_workbook(self._path, keep_vba=self._path.suffix.lower() == '.xlsm')
+        return self._loaded_wb
+
+    @property
+    def is_loaded(self):
+        """True nếu toàn bộ workbook đã được nạp vào bộ nhớ."""
+        return self._loaded_wb is not None
+
+    @property
+    def saved(self):
+        return self._path is not None and not self.is_loaded
+
+    def _sheet_parts(self):
+        """(Hàm nội bộ) Danh sách (tên, part, trạng thái) đọc trực tiếp từ file, không nạp workbook."""
+        with zipfile.ZipFile(self._path) as zf:
+            return get_sheet_parts(zf)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def fullname(self):
+        return str(self._path) if self._path else self._name
+
+    @property
+    def sheets(self):
+        if not self.is_loaded:
+            return [FileSheet(self, title=name, state=state)
+                    for name, part, state in self._sheet_parts() if 'chartsheets/' not in part]
+        return [FileSheet(self, ws) for ws in self._wb.worksheets]
+
+    def _find_worksheet(self, specifier):
+        """(Hàm nội bộ) Tìm worksheet của openpyxl theo tên (không phân biệt hoa thường) hoặc index."""
+        if isinstance(specifier, int):
+            return self._wb.worksheets[specifier]
+        for ws in self._wb.worksheets:
+            if ws.title.lower() == str(specifier).lower():
+                return ws
+        raise KeyError(f"Không tìm thấy sheet '{specifier}'.")
+
+    def get_sheet(self, specifier):
+        if not self.is_loaded:
+            sheets = self.sheets
+            if isinstance(specifier, int):
+                return sheets[specifier]
+            for sheet in sheets:
+                if sheet.name.lower() == str(specifier).lower():
+                    return sheet
+            raise KeyError(f"Không tìm thấy sheet '{specifier}'.")
+        return FileSheet(self, self._find_worksheet(specifier))
+
+    def add_sheet(self, name, before=None, after=None):
+        worksheets = self._wb.worksheets
+        if before is not None:
+            position = worksheets.index(self._find_worksheet(before))
+        elif after is not None:
+            position = worksheets.index(self._find_worksheet(after)) + 1
+        elif self._write_only:
+            position = len(worksheets)
+        else:
+            # Giống Excel: sheet mới được chèn trước sheet đang active
+            position = worksheets.index(self._wb.active) if self._wb.active in worksheets else len(worksheets)
+        return FileSheet(self, self._wb.create_sheet(name, position))
+
+    def save(self, path=None):
+        target = Path(path) if path else self._path
+        if target is None:
+            raise ValueError("Workbook mới cần được lưu với một đường dẫn cụ thể (save_as).")
+        if self._read_only and path is None:
+            raise PermissionError(f"Workbook '{self.name}' được mở ở chế độ chỉ đọc.")
+        # openpyxl không ghi lại giá trị cache của công thức, cần đọc từ file gốc trước khi lưu
+        self._load_cached_values()
+        self._wb.save(target)
+        if path:
+            self._path = target
+            self._name = target.name
+            self._read_only = False
+
+    def close(self):
+        self._app._remove(self)
+
+    def activate(self):
+        self._app._active = self
+
+    def protect(self, password=None):
+        protection = WorkbookProtection(lockStructure=True)
+        if password:
+            protection.workbookPassword = password
+        self._wb.security = protection
+
+    def unprotect(self, password=None):
+        self._wb.security = None
+
+    # --- Named Ranges ---
+    def get_names(self):
+        if not self.is_loaded:
+            return read_names(self._path)
+        names_list = []
+        for name, defn in self._wb.defined_names.items():
+            names_list.append({
+                'name': name,
+                'refers_to': '=' + (defn.attr_text or ''),
+                'scope': self.name,
+                'is_visible': not defn.hidden
+            })
+        for ws in self._wb.worksheets:
+            for name, defn in ws.defined_names.items():
+                names_list.append({
+                    'name': f"{quote_sheetname(ws.title)}!{name}",
+                    'refers_to': '=' + (defn.attr_text or ''),
+                    'scope': ws.title,
+                    'is_visible': not defn.hidden
+                })
+        return names_list
+
+    def add_name(self, name, refers_to):
+        self._wb.defined_names[name] = DefinedName(name, attr_text=str(refers_to).lstrip('='))
+
+    def _name_container(self, name):
+        """(Hàm nội bộ) Trả về (dict chứa tên, tên không có phạm vi) cho tên toàn cục hoặc cục bộ 'Sheet1!Ten'."""
+        if '!' in name:
+            sheet_part, local_name = name.rsplit('!', 1)
+            ws = self._find_worksheet(sheet_part.strip("'").replace("''", "'"))
+            return ws.defined_names, local_name
+        return self._wb.defined_names, name
+
+    def delete_name(self, name):
+        container, key = self._name_container(name)
+        del container[key]
+
+    def delete_names(self, names):
+        containers = {}
+        failed = []
+        for name in names:
+            sheet_part, key = name.rsplit('!', 1) if '!' in name else (None, name)
+            try:
+                if sheet_part not in containers:
+                    containers[sheet_part] = self._name_container(name)[0]
+                del containers[sheet_part][key]
+            except KeyError as e:
+                failed.append((name, str(e)))
+        return failed
+
+    def resolve_name(self, name):
+        container, key = self._name_container(name)
+        for sheet_title, coord in container[key].destinations:
+            return self.get_sheet(sheet_title).range(coord.replace('$', ''))
+        raise KeyError(f"Named Range '{name}' không trỏ tới một vùng ô.")
+
+    def link_sources(self):
+        return [link.file_link.Target for link in self._wb._external_links if link.file_link is not None]
+
+    # --- Cached values ---
+    def _load_cached_values(self):
+        """(Hàm nội bộ) Nạp (một lần) giá trị cache của các công thức từ file gốc."""
+        if self._cached_wb is None and self._path is not None and self._path.is_file():
+            self._cached_wb = load_workbook(self._path, data_only=True)
+        return self._cached_wb
+
+    def _cached_value(self, sheet_title, row, column):
+        """(Hàm nội bộ) Giá trị Excel đã tính và lưu cho một ô công thức, None nếu không có."""
+        cached_wb = self._load_cached_values()
+        if cached_wb is None or sheet_title not in cached_wb.sheetnames:
+            return None
+        cell = cached_wb[sheet_title]._cells.get((row, column))
+        return cell.value if cell is not None else None
+
+
+class FileSheet(SheetBackend):
+    def __init__(self, book, ws=None, title=None, state='visible'):
+        self._book = book
+        self._ws_obj = ws
+        self._title = title
+        self._state = state
+
+    @property
+    def _ws(self):
+        """(Nội bộ) Worksheet của openpyxl; nạp workbook nếu cần."""
+        if self._ws_obj is None:
+            self._ws_obj = self._book._find_worksheet(self._title)
+        return self._ws_obj
+
+    def __eq__(self, other):
+        return isinstance(other, FileSheet) and other._book is self._book and other.name == self.name
+
+    def __hash__(self):
+        return hash((id(self._book), self.name))
+
+    @property
+    def name(self):
+        if self._ws_obj is None and not self._book.is_loaded:
+            return self._title
+        return self._ws.title
+
+    @name.setter
+    def name(self, value):
+        self._ws.title = value
+
+    @property
+    def index(self):
+        return self._book._wb.worksheets.index(self._ws) + 1
+
+    @property
+    def visible(self):
+        if self._ws_obj is None and not self._book.is_loaded:
+            return self._state == 'visible'
+        return self._ws.sheet_state == 'visible'
+
+    @visible.setter
+    def visible(self, value):
+        self._ws.sheet_state = 'visible' if value else 'hidden'
+
+    def _check_not_write_only(self):
+        """(Hàm nội bộ) Sheet write-only chỉ hỗ trợ ghi nối tiếp."""
+        if self._book._write_only:
+            raise BackendNotSupportedError("Sheet ở chế độ write_only chỉ hỗ trợ append_rows().")
+
+    @property
+    def used_range(self):
+        self._check_not_write_only()
+        ws = self._ws
+        return FileRange(self, ws.min_row, ws.min_column, ws.max_row, ws.max_column)
+
+    @property
+    def shapes(self):
+        return []
+
+    def range(self, cell1, cell2=None):
+        self._check_not_write_only()
+        bounds = []
+        for cell in (cell1, cell2):
+            if cell is None:
+                continue
+            if isinstance(cell, tuple):
+                bounds.append((cell[0], cell[1], cell[0], cell[1]))
+            else:
+                min_col, min_row, max_col, max_row = range_boundaries(str(cell).replace('$', ''))
+                bounds.append((min_row, min_col, max_row, max_col))
+        first_row = min(b[0] for b in bounds)
+        first_col = min(b[1] for b in bounds)
+        last_row = max(b[2] for b in bounds)
+        last_col = max(b[3] for b in bounds)
+        return FileRange(self, first_row, first_col, last_row, last_col)
+
+    def delete(self):
+        self._book._wb.remove(self._ws)
+
+    def activate(self):
+        self._book._wb.active = self._ws
+
+    def clear(self):
+        ws = self._ws
+        for merged in list(ws.merged_cells.ranges):
+            ws.unmerge_cells(merged.coord)
+        ws._cells.clear()
+
+    def autofit(self):
+        self.used_range.autofit()
+
+    def iter_row_blocks(self, chunk_size=1000, columns=None):
+        if not self._book.is_loaded:
+            # Đọc stream trực tiếp từ file, không nạp workbook vào bộ nhớ
+            yield from iter_row_chunks(self._book._path, self.name, chunk_size=chunk_size, columns=columns)
+            return
+        yield from super().iter_row_blocks(chunk_size=chunk_size, columns=columns)
+
+    def apply_styles(self, style_blocks):
+        ws = self._ws
+        calls = 0
+        for style, blocks in style_blocks:
+            interior_color = style.get('interior_color')
+            fill = PatternFill(fill_type='solid', fgColor=_to_argb(interior_color)) if interior_color else None
+            font_style = {k: style.get(k) for k in ('font_bold', 'font_italic', 'font_color', 'number_format')}
+            # style cũ của ô -> style mới sau khi áp dụng định dạng (các chỉ số trong bảng style dùng chung)
+            table = {}
+            for first_row, first_col, last_row, last_col in blocks:
+                for row in range(first_row, last_row + 1):
+                    for col in range(first_col, last_col + 1):
+                        cell = ws.cell(row=row, column=col)
+                        key = tuple(cell._style) if cell._style is not None else ()
+                        new_style = table.get(key)
+                        if new_style is None:
+                            _style_cell(cell, fill, **font_style)
+                            table[key] = copy(cell._style)
+                        else:
+                            cell._style = copy(new_style)
+            calls += 1
+        return calls
+
+    def next_free_row(self):
+        if self._book._write_only:
+            return self._book._stream_next_rows.get(self.name, 1)
+        ws = self._ws
+        return ws.max_row + 1 if ws._cells else 1
+
+    def write_row_block(self, start_row, start_col, rows):
+        if not self._book._write_only:
+            super().write_row_block(start_row, start_col, rows)
+            return
+        ws = self._ws
+        next_row = self.next_free_row()
+        if start_row < next_row:
+            raise ValueError(f"Sheet write-only chỉ ghi nối tiếp được từ dòng {next_row} trở đi.")
+        for _ in range(start_row - next_row):
+            ws.append([])
+        prefix = [None] * (start_col - 1)
+        for row in rows:
+            ws.append(prefix + list(row))
+        self._book._stream_next_rows[self.name] = start_row + len(rows)
+
+
+class FileRange(RangeBackend):
+    def __init__(self, sheet, first_row, first_col, last_row, last_col):
+        self._sheet = sheet
+        self._ws = sheet._ws
+        self._first_row, self._first_col = first_row, first_col
+        self._last_row, self._last_col = last_row, last_col
+
+    def _coords(self):
+        """(Hàm nội bộ) Duyệt các tọa độ (dòng, cột) trong vùng theo từng dòng."""
+        for row in range(self._first_row, self._last_row + 1):
+            for col in range(self._first_col, self._last_col + 1):
+                yield row, col
+
+    def _existing_cells(self):
+        """(Hàm nội bộ) Các ô đã tồn tại trong vùng (không tạo thêm ô rỗng)."""
+        cells = self._ws._cells
+        for coord in self._coords():
+            cell = cells.get(coord)
+            if cell is not None:
+                yield cell
+
+    def _shape_like_xlwings(self, rows):
+        """(Hàm nội bộ) Một ô -> giá trị đơn, một dòng/cột -> list 1 chiều, còn lại -> list 2 chiều."""
+        nrows, ncols = self.shape
+        if nrows == 1 and ncols == 1:
+            return rows[0][0]
+        if nrows == 1:
+            return rows[0]
+        if ncols == 1:
+            return [row[0] for row in rows]
+        return rows
+
+    def _write(self, data):
+        """(Hàm nội bộ) Ghi dữ liệu theo quy ước của xlwings."""
+        ws = self._ws
+        rows = _rows_from_data(data)
+        if rows is None:
+            for row, col in self._coords():
+                ws.cell(row=row, column=col).value = data
+            return
+        for i, row_values in enumerate(rows):
+            for j, value in enumerate(row_values):
+                ws.cell(row=self._first_row + i, column=self._first_col + j).value = value
+
+    # --- Values & Formulas ---
+    @property
+    def value(self):
+        return self._shape_like_xlwings(self.get_values())
+
+    @value.setter
+    def value(self, data):
+        self._write(data)
+
+    @property
+    def formula(self):
+        formulas = self.get_formulas()
+        if len(formulas) == 1 and len(formulas[0]) == 1:
+            return formulas[0][0]
+        return tuple(tuple(row) for row in formulas)
+
+    @formula.setter
+    def formula(self, formula_string):
+        self._write(formula_string)
+
+    def get_values(self):
+        cells = self._ws._cells
+        title = self._ws.title
+        rows = []
+        for row in range(self._first_row, self._last_row + 1):
+            row_values = []
+            for col in range(self._first_col, self._last_col + 1):
+                cell = cells.get((row, col))
+                if cell is None:
+                    row_values.append(None)
+                elif cell.data_type == 'f':
+                    row_values.append(self._sheet._book._cached_value(title, row, col))
+                else:
+                    row_values.append(cell.value)
+            rows.append(row_values)
+        return rows
+
+    def set_values(self, rows):
+        self._write([list(row) for row in rows])
+
+    def get_array(self):
+        if np is None:
+            return super().get_array()
+        title = self._ws.title
+        book = self._sheet._book
+        arr = np.empty(self.shape, dtype=object)
+        for cell in self._existing_cells():
+            value = cell.value
+            if cell.data_type == 'f':
+                value = book._cached_value(title, cell.row, cell.column)
+            arr[cell.row - self._first_row, cell.column - self._first_col] = value
+        return arr
+
+    def get_formulas(self):
+        cells = self._ws._cells
+        rows = []
+        for row in range(self._first_row, self._last_row + 1):
+            row_formulas = []
+            for col in range(self._first_col, self._last_col + 1):
+                cell = cells.get((row, col))
+                value = cell.value if cell is not None else None
+                if value is None:
+                    row_formulas.append('')
+                elif cell.data_type == 'f':
+                    row_formulas.append(value if isinstance(value, str) else '=' + value.text.lstrip('='))
+                else:
+                    row_formulas.append(str(value))
+            rows.append(row_formulas)
+        return rows
+
+    # --- Geometry ---
+    @property
+    def address(self):
+        top_left = f"${get_column_letter(self._first_col)}${self._first_row}"
+        if self.shape == (1, 1):
+            return top_left
+        return f"{top_left}:${get_column_letter(self._last_col)}${self._last_row}"
+
+    @property
+    def row(self):
+        return self._first_row
+
+    @property
+    def column(self):
+        return self._first_col
+
+    @property
+    def shape(self):
+        return self._last_row - self._first_row + 1, self._last_col - self._first_col + 1
+
+    @property
+    def sheet_name(self):
+        return self._ws.title
+
+    # --- Content Management ---
+    def clear(self):
+        for cell in self._existing_cells():
+            cell.value = None
+            cell._style = StyleArray()
+
+    def clear_contents(self):
+        for cell in self._existing_cells():
+            cell.value = None
+
+    def copy_to(self, destination):
+        dest_ws = destination._ws
+        row_offset = destination.row - self._first_row
+        col_offset = destination.column - self._first_col
+        for cell in list(self._existing_cells()):
+            target = dest_ws.cell(row=cell.row + row_offset, column=cell.column + col_offset)
+            value = cell.value
+            if cell.data_type == 'f' and isinstance(value, str):
+                value = Translator(value, origin=cell.coordinate).translate_formula(target.coordinate)
+            target.value = value
+            target._style = copy(cell._style)
+
+    # --- Formatting ---
+    def apply_style(self, font_bold=None, font_italic=None, font_color=None, interior_color=None, number_format=None):
+        fill = PatternFill(fill_type='solid', fgColor=_to_argb(interior_color)) if interior_color else None
+        ws = self._ws
+        for row, col in self._coords():
+            _style_cell(ws.cell(row=row, column=col), fill, font_bold=font_bold, font_italic=font_italic,
+                        font_color=font_color, number_format=number_format)
+
+    def merge(self):
+        self._ws.merge_cells(start_row=self._first_row, start_column=self._first_col,
+                             end_row=self._last_row, end_column=self._last_col)
+
+    def unmerge(self):
+        for merged in list(self._ws.merged_cells.ranges):
+            if (merged.min_row <= self._last_row and merged.max_row >= self._first_row
+                    and merged.min_col <= self._last_col and merged.max_col >= self._first_col):
+                self._ws.unmerge_cells(merged.coord)
+
+    def autofit(self):
+        """Ước lượng độ rộng cột theo độ dài nội dung (không có engine hiển thị như Excel)."""
+        widths = {}
+        for cell in self._existing_cells():
+            if cell.value is not None:
+                widths[cell.column] = max(widths.get(cell.column, 0), len(str(cell.value)))
+        for col, width in widths.items():
+            self._ws.column_dimensions[get_column_letter(col)].width = width + 2
@@ -0,0 +1,1547 @@
+# -*- coding: utf-8 -*-
+"""
+File: formula_eval.py
+Author: Your Name / Tên của bạn
+Description: Bộ tính công thức thuần Python (không cần Excel) để tính toán lại workbook sau khi thay
+             đổi dữ liệu đầu vào, ví dụ chạy nhiều kịch bản (scenario) trên Linux.
+
+Cách hoạt động:
+    - Mỗi công thức được phân tích một lần thành cây cú pháp rồi biên dịch thành hàm Python.
+    - Đồ thị phụ thuộc giữa các ô được xây dựng một lần khi nạp, kèm theo thứ tự tính (topo).
+    - Khi thay đổi ô đầu vào, chỉ các ô nằm phía sau (phụ thuộc trực tiếp hoặc gián tiếp) được tính lại,
+      theo đúng thứ tự phụ thuộc.
+    - Giá trị của mỗi sheet được lưu trong các mảng NumPy (giá trị, loại ô, giá trị số); các hàm trên
+      vùng (SUM, SUMIFS, MATCH, ...) được tính bằng phép toán vector trên các mảng này.
+
+Phạm vi hỗ trợ:
+    - Toán tử: + - * / ^ & % so sánh (= <> < > <= >=), phép toán trên vùng/mảng.
+    - Tham chiếu: ô, vùng, cả cột/cả dòng, tham chiếu sang sheet khác, Named Range (toàn cục/cục bộ).
+    - Hàm: xem FUNCTIONS (SUM, IF, VLOOKUP, HLOOKUP, INDEX, MATCH, SUMIF(S), COUNTIF(S), AVERAGEIF(S),
+      SUMPRODUCT, IFERROR, ROUND, ...). Hàm chưa hỗ trợ trả về #NAME? và được liệt kê trong
+      FormulaModel.unsupported_functions.
+    - Chưa hỗ trợ: tham chiếu động (INDIRECT, OFFSET), tham chiếu 3-D, liên kết ngoài, mảng động (spill).
+      Tham chiếu vòng được tính một lần với giá trị hiện có (giống Excel khi tắt tính lặp).
+
+--- CHANGELOG ---
+Version 0.3.0 (2026-10-17):
+    - FormulaModel.from_file(): nếu có ô công thức không có giá trị cache (file được tạo không qua Excel,
+      ví dụ bằng openpyxl), toàn bộ công thức được tính lại một lần sau khi nạp; trước đây các ô này
+      đọc ra None cho tới khi gọi recalculate().
+
+Version 0.2.0 (2026-10-17):
+    - Dùng logging (log_utils.py) thay cho print().
+
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo module với class FormulaModel và các hàm cơ bản.
+-------------------
+"""
+
+import datetime as dt
+import logging
+import math
+import re
+import time
+from bisect import bisect_left, bisect_right
+from .formula_scanner import column_index
+from .converters import datetime_to_excel_serial
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+MAX_ROW = 1048576
+MAX_COL = 16384
+
+# Loại ô trong mảng kinds của SheetGrid
+BLANK, NUMBER, TEXT, BOOL, ERROR = 0, 1, 2, 3, 4
+
+
+class ExcelError:
+    """Giá trị lỗi của Excel (#DIV/0!, #N/A, ...)."""
+    __slots__ = ('code',)
+
+    def __init__(self, code):
+        self.code = code
+
+    def __repr__(self):
+        return self.code
+
+    def __eq__(self, other):
+        return isinstance(other, ExcelError) and other.code == self.code
+
+    def __hash__(self):
+        return hash(self.code)
+
+
+ERRORS = {code: ExcelError(code) for code in
+          ('#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A')}
+DIV0, VALUE, REF, NAME, NUM, NA = (ERRORS[c] for c in ('#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A'))
+
+
+class FormulaError(Exception):
+    """Lỗi cú pháp khi phân tích công thức."""
+
+
+# --- Tokenizer & Parser ---
+_SHEET_PREFIX = r"(?:'(?:[^']|'')+'|[A-Za-z_\\][\w.]*)!"
+_TOKEN_RE = re.compile(rf"""
+    (?P<ws>\s+)
+  | (?P<string>"(?:[^"]|"")*")
+  | (?P<error>\#(?:NULL!|DIV/0!|VALUE!|REF!|NAME\?|NUM!|N/A))
+  | (?P<ref>(?P<sheet>{_SHEET_PREFIX})?
+        (?P<addr>\$?[A-Za-z]{{1,3}}\$?\d+(?::\$?[A-Za-z]{{1,3}}\$?\d+)?
+               |\$?[A-Za-z]{{1,3}}:\$?[A-Za-z]{{1,3}}
+               |\$?\d+:\$?\d+)
+        (?![\w(.!]))
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<func>(?:_xlfn\.|_xlws\.)?[A-Za-z_][\w.]*(?=\())
+  | (?P<name>(?:{_SHEET_PREFIX})?[A-Za-z_\\][\w.]*)
+  | (?P<op><=|>=|<>|[-+*/^&=<>%,()])
+""", re.X)
+_ADDR_CELL_RE = re.compile(r'^\$?([A-Za-z]{1,3})\$?(\d+)$')
+_ADDR_COLS_RE = re.compile(r'^\$?([A-Za-z]{1,3}):\$?([A-Za-z]{1,3})$')
+_ADDR_ROWS_RE = re.compile(r'^\$?(\d+):\$?(\d+)$')
+
+_BINARY_PRECEDENCE = {'=': 1, '<>': 1, '<': 1, '>': 1, '<=': 1, '>=': 1,
+                      '&': 2, '+': 3, '-': 3, '*': 4, '/': 4, '^': 5}
+_PREFIX_PRECEDENCE = 6
+_POSTFIX_PRECEDENCE = 7
+
+
+def _unquote_sheet(prefix):
+    """(Hàm nội bộ) "'My Sheet'!" -> 'My Sheet'."""
+    sheet = prefix[:-1]
+    if sheet.startswith("'"):
+        sheet = sheet[1:-1].replace("''", "'")
+    return sheet
+
+
+def parse_address(addr):
+    """
+    Chuyển địa chỉ ('B3', '$A$1:C5', 'A:C', '2:4') thành khối (dòng đầu, cột đầu, dòng cuối, cột cuối).
+    Trả về None nếu địa chỉ vượt quá giới hạn của Excel.
+    """
+    parts = addr.split(':')
+    match = _ADDR_COLS_RE.match(addr)
+    if match:
+        c1, c2 = column_index(match.group(1)), column_index(match.group(2))
+        block = (1, min(c1, c2), MAX_ROW, max(c1, c2))
+    elif _ADDR_ROWS_RE.match(addr):
+        r1, r2 = int(parts[0].lstrip('$')), int(parts[1].lstrip('$'))
+        block = (min(r1, r2), 1, max(r1, r2), MAX_COL)
+    else:
+        cells = []
+        for part in parts:
+            match = _ADDR_CELL_RE.match(part)
+            if not match:
+                return None
+            cells.append((int(match.group(2)), column_index(match.group(1))))
+        (r1, c1), (r2, c2) = cells[0], cells[-1]
+        block = (min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2))
+    if block[0] < 1 or block[2] > MAX_ROW or block[1] < 1 or block[3] > MAX_COL:
+        return None
+    return block
+
+
+def tokenize(formula):
+    """Tách công thức (không có dấu '=' đầu) thành list tuple (loại, giá trị)."""
+    tokens = []
+    pos = 0
+    while pos < len(formula):
+        match = _TOKEN_RE.match(formula, pos)
+        if match is None:
+            raise FormulaError(f"Không phân tích được công thức tại vị trí {pos}: {formula!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        if kind == 'ws':
+            continue
+        text = match.group(kind)
+        if kind == 'ref':
+            sheet = _unquote_sheet(match.group('sheet')) if match.group('sheet') else None
+            block = parse_address(match.group('addr'))
+            if block is None:  # Ví dụ 'TAX2020': vượt quá cột XFD -> là tên
+                tokens.append(('name', (sheet, match.group('addr'))))
+            else:
+                tokens.append(('ref', (sheet, block)))
+        elif kind == 'name':
+            sheet = None
+            if '!' in text:
+                prefix, text = text.rsplit('!', 1)
+                sheet = _unquote_sheet(prefix + '!')
+            tokens.append(('name', (sheet, text)))
+        else:
+            tokens.append((kind, text))
+    return tokens
+
+
+class _Parser:
+    """(Nội bộ) Parser Pratt cho công thức Excel, tạo cây cú pháp dạng tuple."""
+
+    def __init__(self, formula):
+        self.tokens = tokenize(formula)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, op):
+        kind, text = self.take()
+        if kind != 'op' or text != op:
+            raise FormulaError(f"Thiếu '{op}'.")
+
+    def parse(self):
+        node = self.expression(0)
+        if self.pos != len(self.tokens):
+            raise FormulaError(f"Ký tự thừa: {self.peek()[1]!r}")
+        return node
+
+    def expression(self, min_precedence):
+        node = self.prefix()
+        while True:
+            kind, text = self.peek()
+            if kind != 'op':
+                break
+            if text == '%' and _POSTFIX_PRECEDENCE >= min_precedence:
+                self.take()
+                node = ('pct', node)
+                continue
+            precedence = _BINARY_PRECEDENCE.get(text)
+            if precedence is None or precedence < min_precedence:
+                break
+            self.take()
+            node = ('bin', text, node, self.expression(precedence + 1))
+        return node
+
+    def prefix(self):
+        kind, text = self.take()
+        if kind == 'number':
+            return ('const', float(text))
+        if kind == 'string':
+            return ('const', text[1:-1].replace('""', '"'))
+        if kind == 'error':
+            return ('const', ERRORS[text])
+        if kind == 'ref':
+            return ('ref',) + text
+        if kind == 'name':
+            sheet, name = text
+            if sheet is None and name.upper() in ('TRUE', 'FALSE'):
+                return ('const', name.upper() == 'TRUE')
+            return ('name', sheet, name)
+        if kind == 'func':
+            return self.call(text)
+        if kind == 'op':
+            if text == '(':
+                node = self.expression(0)
+                self.expect(')')
+                return node
+            if text in ('-', '+'):
+                operand = self.expression(_PREFIX_PRECEDENCE)
+                return ('neg', operand) if text == '-' else operand
+        raise FormulaError(f"Ký tự không mong đợi: {text!r}")
+
+    def call(self, name):
+        name = name.upper()
+        for prefix in ('_XLFN.', '_XLWS.'):
+            if name.startswith(prefix):
+                name = name[len(prefix):]
+        self.expect('(')
+        args = []
+        if self.peek() == ('op', ')'):
+            self.take()
+            return ('func', name, args)
+        while True:
+            if self.peek() in (('op', ','), ('op', ')')):
+                args.append(('missing',))
+            else:
+                args.append(self.expression(0))
+            kind, text = self.take()
+            if kind == 'op' and text == ')':
+                return ('func', name, args)
+            if kind != 'op' or text != ',':
+                raise FormulaError(f"Thiếu ',' hoặc ')' trong lời gọi hàm {name}.")
+
+
+def parse_formula(formula):
+    """Phân tích công thức (có hoặc không có '=' đầu) thành cây cú pháp dạng tuple."""
+    return _Parser(formula[1:] if formula.startswith('=') else formula).parse()
+
+
+# --- Storage ---
+def _kind_of(value):
+    """(Hàm nội bộ) Loại ô của một giá trị."""
+    if value is None or value == '':
+        return BLANK
+    if isinstance(value, bool):
+        return BOOL
+    if isinstance(value, (int, float)):
+        return NUMBER
+    if isinstance(value, ExcelError):
+        return ERROR
+    return TEXT
+
+
+def _normalize(value):
+    """(Hàm nội bộ) Chuẩn hóa giá trị đọc từ workbook: ngày -> số serial, chuỗi lỗi -> ExcelError."""
+    if isinstance(value, (dt.datetime, dt.date)):
+        return datetime_to_excel_serial(value)
+    if isinstance(value, dt.time):
+        return (value.hour * 3600 + value.minute * 60 + value.second) / 86400
+    if isinstance(value, str) and value in ERRORS:
+        return ERRORS[value]
+    if np is not None and isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class SheetGrid:
+    """
+    Giá trị của một sheet dưới dạng 3 mảng NumPy song song (1-based theo chỉ số Excel):
+    values (object), kinds (int8: BLANK/NUMBER/TEXT/BOOL/ERROR), numbers (float64, NaN nếu không phải số).
+    """
+    def __init__(self, name, nrows=1, ncols=1):
+        self.name = name
+        self.version = 0
+        self._cache = {}
+        self._cache_version = 0
+        self._allocate(max(nrows, 1), max(ncols, 1))
+
+    def _allocate(self, nrows, ncols):
+        values = np.empty((nrows + 1, ncols + 1), dtype=object)
+        kinds = np.zeros((nrows + 1, ncols + 1), dtype=np.int8)
+        numbers = np.full((nrows + 1, ncols + 1), np.nan)
+        if hasattr(self, 'values'):
+            old_rows, old_cols = self.values.shape
+            values[:old_rows, :old_cols] = self.values
+            kinds[:old_rows, :old_cols] = self.kinds
+            numbers[:old_rows, :old_cols] = self.numbers
+        self.values, self.kinds, self.numbers = values, kinds, numbers
+        self.nrows, self.ncols = nrows, ncols
+
+    def get(self, row, col):
+        if row > self.nrows or col > self.ncols:
+            return None
+        return self.values[row, col]
+
+    def set(self, row, col, value):
+        if row > self.nrows or col > self.ncols:
+            self._allocate(max(row, self.nrows * 2 if row > self.nrows else self.nrows),
+                           max(col, self.ncols * 2 if col > self.ncols else self.ncols))
+        kind = _kind_of(value)
+        self.values[row, col] = None if kind == BLANK else value
+        self.kinds[row, col] = kind
+        self.numbers[row, col] = value if kind == NUMBER else np.nan
+        self.version += 1
+
+    def cached(self, key, build):
+        """Cache dẫn xuất (chỉ mục tra cứu, chuỗi chữ thường) của một vùng, hủy khi sheet thay đổi."""
+        if self._cache_version != self.version:
+            self._cache.clear()
+            self._cache_version = self.version
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = build()
+            return value
+
+
+class RangeRef:
+    """Tham chiếu tới một vùng ô, đọc dữ liệu dưới dạng lát cắt của các mảng trong SheetGrid."""
+    __slots__ = ('grid', 'r1', 'c1', 'r2', 'c2')
+
+    def __init__(self, grid, r1, c1, r2, c2):
+        self.grid, self.r1, self.c1, self.r2, self.c2 = grid, r1, c1, r2, c2
+
+    def __repr__(self):
+        return f"<RangeRef {self.grid.name}!R{self.r1}C{self.c1}:R{self.r2}C{self.c2}>"
+
+    @property
+    def shape(self):
+        """Kích thước đã thu gọn theo phần có dữ liệu của sheet (ô ngoài phần này đều trống)."""
+        return (max(min(self.r2, self.grid.nrows) - self.r1 + 1, 0),
+                max(min(self.c2, self.grid.ncols) - self.c1 + 1, 0))
+
+    @property
+    def declared_shape(self):
+        return (self.r2 - self.r1 + 1, self.c2 - self.c1 + 1)
+
+    def _slice(self, arr, shape, fill):
+        rows, cols = shape if shape is not None else self.shape
+        r2 = min(self.r1 + rows - 1, self.grid.nrows)
+        c2 = min(self.c1 + cols - 1, self.grid.ncols)
+        part = arr[self.r1:r2 + 1, self.c1:c2 + 1]
+        if part.shape == (rows, cols):
+            return part
+        padded = np.full((rows, cols), fill, dtype=arr.dtype)
+        padded[:part.shape[0], :part.shape[1]] = part
+        return padded
+
+    def values(self, shape=None):
+        return self._slice(self.grid.values, shape, None)
+
+    def kinds(self, shape=None):
+        return self._slice(self.grid.kinds, shape, BLANK)
+
+    def numbers(self, shape=None):
+        return self._slice(self.grid.numbers, shape, np.nan)
+
+    def cell(self, i, j):
+        """Giá trị tại vị trí (i, j) 0-based trong vùng."""
+        return self.grid.get(self.r1 + i, self.c1 + j)
+
+    def first_error(self, shape=None):
+        kinds = self.kinds(shape)
+        if (kinds == ERROR).any():
+            i, j = np.argwhere(kinds == ERROR)[0]
+            return self.cell(i, j)
+        return None
+
+    def lowered_texts(self, shape=None):
+        """Mảng object: chuỗi chữ thường với ô kiểu TEXT, None với ô khác (có cache)."""
+        shape = shape or self.shape
+        key = ('lower', self.r1, self.c1, shape)
+
+        def build():
+            values, kinds = self.values(shape), self.kinds(shape)
+            out = np.empty(shape, dtype=object)
+            mask = kinds == TEXT
+            out[mask] = [str(v).lower() for v in values[mask]]
+            return out
+        return self.grid.cached(key, build)
+
+
+# --- Coercion helpers ---
+def _scalar(value):
+    """(Hàm nội bộ) Giá trị đơn của một vùng/mảng 1 ô; vùng nhiều ô -> #VALUE!."""
+    if isinstance(value, RangeRef):
+        if value.declared_shape == (1, 1):
+            return value.cell(0, 0)
+        return VALUE
+    if np is not None and isinstance(value, np.ndarray):
+        if value.size == 1:
+            return _python_value(value.reshape(-1)[0])
+        return VALUE
+    return value
+
+
+def _python_value(value):
+    if np is not None and isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return VALUE
+    return value
+
+
+def _to_number(value):
+    value = _scalar(value)
+    if value is None:
+        return 0.0
+    if isinstance(value, bool):
+        return 1.0 if value else 0.0
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, ExcelError):
+        return value
+    try:
+        return float(str(value).strip().replace(',', ''))
+    except ValueError:
+        return VALUE
+
+
+def _to_bool(value):
+    value = _scalar(value)
+    if value is None:
+        return False
+    if isinstance(value, ExcelError):
+        return value
+    if isinstance(value, (bool, int, float)):
+        return bool(value)
+    text = str(value).upper()
+    if text in ('TRUE', 'FALSE'):
+        return text == 'TRUE'
+    return VALUE
+
+
+def _format_number(value):
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _to_text(value):
+    value = _scalar(value)
+    if value is None:
+        return ''
+    if isinstance(value, ExcelError):
+        return value
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (int, float)):
+        return _format_number(value)
+    return str(value)
+
+
+def _float_array(value):
+    """(Hàm nội bộ) Chuyển vùng/mảng thành mảng float cho phép toán vector (ô trống = 0, chữ = NaN)."""
+    if isinstance(value, RangeRef):
+        kinds = value.kinds()
+        arr = np.where(kinds == BLANK, 0.0, value.numbers())
+        if (kinds == BOOL).any():
+            arr[kinds == BOOL] = value.values()[kinds == BOOL].astype(float)
+        return arr
+    if value.dtype == object:
+        return np.array([[_num_or_nan(v) for v in row] for row in value], dtype=float).reshape(value.shape)
+    return value.astype(float)
+
+
+def _num_or_nan(value):
+    number = _to_number(value)
+    return np.nan if isinstance(number, ExcelError) else number
+
+
+def _is_array(value):
+    return isinstance(value, RangeRef) or (np is not None and isinstance(value, np.ndarray))
+
+
+def _first_error(*values):
+    for value in values:
+        if isinstance(value, ExcelError):
+            return value
+    return None
+
+
+# --- Operators ---
+def _compare_scalars(op, a, b):
+    error = _first_error(a, b)
+    if error:
+        return error
+    rank = {float: 0, int: 0, str: 1, bool: 2}
+    if a is None:
+        a = '' if isinstance(b, str) else (False if isinstance(b, bool) else 0.0)
+    if b is None:
+        b = '' if isinstance(a, str) else (False if isinstance(a, bool) else 0.0)
+    ra, rb = rank.get(type(a), 1), rank.get(type(b), 1)
+    if ra != rb:
+        a, b = ra, rb
+    elif ra == 1:
+        a, b = str(a).lower(), str(b).lower()
+    if op == '=':
+        return a == b
+    if op == '<>':
+        return a != b
+    if op == '<':
+        return a < b
+    if op == '>':
+        return a > b
+    if op == '<=':
+        return a <= b
+    return a >= b
+
+
+def _arith_scalars(op, a, b):
+    a, b = _to_number(a), _to_number(b)
+    error = _first_error(a, b)
+    if error:
+        return error
+    if op == '+':
+        return a + b
+    if op == '-':
+        return a - b
+    if op == '*':
+        return a * b
+    if op == '/':
+        return DIV0 if b == 0 else a / b
+    try:
+        result = float(a) ** b
+    except (OverflowError, ZeroDivisionError):
+        return NUM
+    return NUM if isinstance(result, complex) else result
+
+
+def _binary(op, a, b):
+    """(Hàm nội bộ) Toán tử hai ngôi, tính vector khi một trong hai vế là vùng/mảng."""
+    if op == '&':
+        a, b = _to_text(a), _to_text(b)
+        return _first_error(a, b) or a + b
+    if not (_is_array(a) or _is_array(b)):
+        if op in _COMPARISONS:
+            return _compare_scalars(op, _scalar(a), _scalar(b))
+        return _arith_scalars(op, a, b)
+    if op in _COMPARISONS:
+        left = a.values() if isinstance(a, RangeRef) else a
+        right = b.values() if isinstance(b, RangeRef) else b
+        compare = np.frompyfunc(lambda x, y: _compare_scalars(op, _python_value(x), _python_value(y)), 2, 1)
+        return compare(left, right)
+    left = _float_array(a) if _is_array(a) else _to_number(a)
+    right = _float_array(b) if _is_array(b) else _to_number(b)
+    error = _first_error(left, right)
+    if error:
+        return error
+    with np.errstate(all='ignore'):
+        if op == '+':
+            return left + right
+        if op == '-':
+            return left - right
+        if op == '*':
+            return left * right
+        if op == '/':
+            return np.where(right == 0, np.nan, left / np.where(right == 0, 1, right))
+        return np.power(left, right)
+
+
+_COMPARISONS = ('=', '<>', '<', '>', '<=', '>=')
+
+
+# --- Function helpers ---
+def _iter_values(args):
+    """(Hàm nội bộ) Duyệt các tham số: vùng/mảng -> ('array', ...), giá trị đơn -> ('scalar', giá trị)."""
+    for arg in args:
+        if _is_array(arg):
+            yield 'array', arg
+        elif arg is not _MISSING:
+            yield 'scalar', arg
+
+
+def _collect_numbers(args):
+    """
+    (Hàm nội bộ) Gom các giá trị số theo quy tắc của SUM/AVERAGE/MIN/MAX: trong vùng chỉ lấy ô số,
+    tham số trực tiếp được chuyển đổi (TRUE=1, chuỗi số). Trả về (mảng float, lỗi hoặc None).
+    """
+    parts = []
+    for kind, arg in _iter_values(args):
+        if kind == 'array':
+            if isinstance(arg, RangeRef):
+                error = arg.first_error()
+                if error is not None:
+                    return None, error
+                kinds = arg.kinds()
+                parts.append(arg.numbers()[kinds == NUMBER])
+            else:
+                arr = _float_array(arg) if arg.dtype != float else arg
+                if np.isnan(arr).any():
+                    return None, VALUE
+                parts.append(arr.reshape(-1))
+        else:
+            number = _to_number(arg)
+            if isinstance(number, ExcelError):
+                return None, number
+            parts.append(np.array([number], dtype=float))
+    return (np.concatenate(parts) if parts else np.empty(0)), None
+
+
+def _criteria_mask(rng, criterion, shape):
+    """(Hàm nội bộ) Mảng bool: ô nào của vùng thỏa điều kiện kiểu SUMIF ('>=10', 'abc*', 5, ...)."""
+    criterion = _scalar(criterion)
+    if isinstance(rng, RangeRef):
+        kinds, numbers, values = rng.kinds(shape), rng.numbers(shape), rng.values(shape)
+    else:
+        values = rng
+        kinds = np.frompyfunc(lambda v: _kind_of(_python_value(v)), 1, 1)(values).astype(np.int8)
+        numbers = np.where(kinds == NUMBER, _float_array(values), np.nan)
+
+    if isinstance(criterion, bool):
+        return (kinds == BOOL) & (values == criterion)
+    if isinstance(criterion, (int, float)):
+        return (kinds == NUMBER) & (numbers == criterion)
+    if isinstance(criterion, ExcelError):
+        return (kinds == ERROR) & (values == criterion)
+    text = '' if criterion is None else str(criterion)
+    match = re.match(r'^(<=|>=|<>|<|>|=)?(.*)$', text, re.S)
+    op, operand = match.group(1) or '=', match.group(2)
+
+    try:
+        number = float(operand)
+    except ValueError:
+        number = None
+    if number is not None:
+        with np.errstate(invalid='ignore'):
+            hit = (kinds == NUMBER) & {'=': numbers == number, '<>': numbers != number, '<': numbers < number,
+                                       '>': numbers > number, '<=': numbers <= number,
+                                       '>=': numbers >= number}[op]
+        return ~((kinds == NUMBER) & (numbers == number)) if op == '<>' else hit
+    if operand.upper() in ('TRUE', 'FALSE') and op in ('=', '<>'):
+        hit = (kinds == BOOL) & (values == (operand.upper() == 'TRUE'))
+        return ~hit if op == '<>' else hit
+    if operand == '':
+        blank = kinds == BLANK
+        return blank if op == '=' else ~blank
+
+    lowered = rng.lowered_texts(shape) if isinstance(rng, RangeRef) else np.array(
+        [[str(v).lower() if k == TEXT else None for v, k in zip(vr, kr)] for vr, kr in zip(values, kinds)],
+        dtype=object).reshape(values.shape)
+    is_text = kinds == TEXT
+    target = operand.lower()
+    if op in ('=', '<>'):
+        if '*' in target or '?' in target:
+            pattern = re.compile(_wildcard_regex(target), re.S)
+            hit = np.zeros(values.shape, dtype=bool)
+            hit[is_text] = [pattern.fullmatch(v) is not None for v in lowered[is_text]]
+        else:
+            hit = is_text & (lowered == target)
+        return ~hit if op == '<>' else hit
+    hit = np.zeros(values.shape, dtype=bool)
+    compare = {'<': str.__lt__, '>': str.__gt__, '<=': str.__le__, '>=': str.__ge__}[op]
+    hit[is_text] = [compare(v, target) for v in lowered[is_text]]
+    return hit
+
+
+def _wildcard_regex(pattern):
+    """(Hàm nội bộ) Mẫu ký tự đại diện của Excel (*, ?, ~) -> regex."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '~' and i + 1 < len(pattern):
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        out.append('.*' if ch == '*' else '.' if ch == '?' else re.escape(ch))
+        i += 1
+    return ''.join(out)
+
+
+def _lookup_key(value):
+    """(Hàm nội bộ) Khóa so khớp chính xác: số/chuỗi (không phân biệt hoa thường)/bool."""
+    if isinstance(value, bool):
+        return ('b', value)
+    if isinstance(value, (int, float)):
+        return ('n', float(value))
+    if value is None:
+        return None
+    return ('t', str(value).lower())
+
+
+def _vector(rng):
+    """(Hàm nội bộ) Vùng 1 chiều -> (RangeRef, hướng 'col'|'row', độ dài khai báo)."""
+    rows, cols = rng.declared_shape
+    if cols == 1:
+        return 'col', rows
+    if rows == 1:
+        return 'row', cols
+    return None, 0
+
+
+def _exact_position(rng, lookup):
+    """(Hàm nội bộ) Vị trí 0-based đầu tiên trong vùng 1 chiều có giá trị bằng lookup, None nếu không có."""
+    if isinstance(lookup, str) and ('*' in lookup or '?' in lookup):
+        mask = _criteria_mask(rng, '=' + lookup, rng.shape).reshape(-1)
+        hits = np.flatnonzero(mask)
+        return int(hits[0]) if hits.size else None
+
+    def build():
+        index = {}
+        for pos, value in enumerate(rng.values().reshape(-1)):
+            key = _lookup_key(value)
+            if key is not None and key not in index:
+                index[key] = pos
+        return index
+    index = rng.grid.cached(('exact', rng.r1, rng.c1, rng.r2, rng.c2), build)
+    return index.get(_lookup_key(lookup))
+
+
+def _approx_position(rng, lookup, descending=False):
+    """
+    (Hàm nội bộ) Tìm kiếm gần đúng trên vùng đã sắp xếp (tìm nhị phân): tăng dần -> vị trí của giá trị
+    lớn nhất <= lookup; giảm dần -> vị trí của giá trị nhỏ nhất >= lookup. None nếu không có.
+    """
+    kinds = rng.kinds().reshape(-1)
+    if isinstance(lookup, (int, float)) and not isinstance(lookup, bool):
+        positions = np.flatnonzero(kinds == NUMBER)
+        keys = rng.numbers().reshape(-1)[positions]
+        target = float(lookup)
+    else:
+        positions = np.flatnonzero(kinds == TEXT)
+        keys = rng.lowered_texts().reshape(-1)[positions].tolist()
+        target = str(lookup).lower()
+    if descending:
+        if isinstance(keys, list):
+            found = len(keys) - bisect_left(keys[::-1], target) - 1
+        else:
+            found = int(np.searchsorted(-keys, -target, side='right')) - 1
+    else:
+        found = (bisect_right(keys, target) if isinstance(keys, list)
+                 else int(np.searchsorted(keys, target, side='right'))) - 1
+    return int(positions[found]) if 0 <= found < len(positions) else None
+
+
+# --- Functions ---
+_MISSING = object()
+
+
+def fn_sum(*args):
+    numbers, error = _collect_numbers(args)
+    return error or float(numbers.sum())
+
+
+def fn_average(*args):
+    numbers, error = _collect_numbers(args)
+    if error:
+        return error
+    return DIV0 if numbers.size == 0 else float(numbers.mean())
+
+
+def fn_min(*args):
+    numbers, error = _collect_numbers(args)
+    return error or (float(numbers.min()) if numbers.size else 0.0)
+
+
+def fn_max(*args):
+    numbers, error = _collect_numbers(args)
+    return error or (float(numbers.max()) if numbers.size else 0.0)
+
+
+def fn_count(*args):
+    total = 0
+    for kind, arg in _iter_values(args):
+        if kind == 'array':
+            total += int((arg.kinds() == NUMBER).sum()) if isinstance(arg, RangeRef) else int(
+                (~np.isnan(_float_array(arg))).sum())
+        elif not isinstance(_to_number(arg), ExcelError):
+            total += 1
+    return float(total)
+
+
+def fn_counta(*args):
+    total = 0
+    for kind, arg in _iter_values(args):
+        if kind == 'array':
+            total += int((arg.kinds() != BLANK).sum()) if isinstance(arg, RangeRef) else arg.size
+        elif arg is not None:
+            total += 1
+    return float(total)
+
+
+def fn_countblank(rng):
+    rows, cols = rng.declared_shape
+    return float(rows * cols - int((rng.kinds() != BLANK).sum()))
+
+
+def fn_sumproduct(*arrays):
+    result = None
+    for arr in arrays:
+        values = _float_array(arr) if _is_array(arr) else np.array([[_num_or_nan(arr)]])
+        if isinstance(arr, RangeRef):
+            values = np.where(arr.kinds() == NUMBER, values, 0.0)
+        if result is not None and values.shape != result.shape:
+            return VALUE
+        result = values if result is None else result * values
+    if result is None:
+        return VALUE
+    return VALUE if np.isnan(result).any() else float(result.sum())
+
+
+def _declared(rng):
+    return rng.declared_shape if isinstance(rng, RangeRef) else rng.shape
+
+
+def _common_shape(*ranges):
+    """(Hàm nội bộ) Kích thước chung (đã thu gọn) của các vùng có cùng kích thước khai báo."""
+    declared = {_declared(r) for r in ranges if _is_array(r)}
+    if len(declared) != 1:
+        return None
+    rows = max(r.shape[0] for r in ranges if _is_array(r))
+    cols = max(r.shape[1] for r in ranges if _is_array(r))
+    return rows, cols
+
+
+def _ifs(target, pairs, aggregate):
+    ranges = [target] + list(pairs[::2]) if target is not None else list(pairs[::2])
+    if any(not _is_array(r) for r in ranges):
+        return VALUE
+    shape = _common_shape(*ranges)
+    if shape is None:
+        return VALUE
+    mask = np.ones(shape, dtype=bool)
+    for rng, criterion in zip(pairs[::2], pairs[1::2]):
+        mask &= _criteria_mask(rng, criterion, shape)
+    if aggregate == 'count':
+        return float(mask.sum())
+    if isinstance(target, RangeRef):
+        kinds = target.kinds(shape)
+        if (mask & (kinds == ERROR)).any():
+            return target.first_error(shape)
+        selected = target.numbers(shape)[mask & (kinds == NUMBER)]
+    else:
+        selected = _float_array(target)[mask]
+        selected = selected[~np.isnan(selected)]
+    if aggregate == 'sum':
+        return float(selected.sum())
+    return DIV0 if selected.size == 0 else float(selected.mean())
+
+
+def fn_sumifs(sum_range, *pairs):
+    return _ifs(sum_range, pairs, 'sum')
+
+
+def fn_sumif(rng, criterion, sum_range=_MISSING):
+    if sum_range is _MISSING:
+        sum_range = rng
+    elif isinstance(sum_range, RangeRef) and isinstance(rng, RangeRef):
+        rows, cols = rng.declared_shape  # Excel dùng kích thước của vùng điều kiện
+        sum_range = RangeRef(sum_range.grid, sum_range.r1, sum_range.c1,
+                             sum_range.r1 + rows - 1, sum_range.c1 + cols - 1)
+    return _ifs(sum_range, (rng, criterion), 'sum')
+
+
+def fn_countifs(*pairs):
+    return _ifs(None, pairs, 'count')
+
+
+def fn_countif(rng, criterion):
+    return _ifs(None, (rng, criterion), 'count')
+
+
+def fn_averageifs(avg_range, *pairs):
+    return _ifs(avg_range, pairs, 'average')
+
+
+def fn_averageif(rng, criterion, avg_range=_MISSING):
+    return _ifs(rng if avg_range is _MISSING else avg_range, (rng, criterion), 'average')
+
+
+def fn_vlookup(lookup, table, col_index, approximate=True):
+    return _table_lookup(lookup, table, col_index, approximate, vertical=True)
+
+
+def fn_hlookup(lookup, table, row_index, approximate=True):
+    return _table_lookup(lookup, table, row_index, approximate, vertical=False)
+
+
+def _table_lookup(lookup, table, index, approximate, vertical):
+    lookup = _scalar(lookup)
+    index = _to_number(index)
+    approximate = _to_bool(approximate) if approximate is not _MISSING else True
+    error = _first_error(lookup, index, approximate)
+    if error:
+        return error
+    if not isinstance(table, RangeRef):
+        return VALUE
+    index = int(index)
+    rows, cols = table.declared_shape
+    if index < 1:
+        return VALUE
+    if index > (cols if vertical else rows):
+        return REF
+    if vertical:
+        key_range = RangeRef(table.grid, table.r1, table.c1, table.r2, table.c1)
+    else:
+        key_range = RangeRef(table.grid, table.r1, table.c1, table.r1, table.c2)
+    if lookup is None:
+        return NA
+    pos = _approx_position(key_range, lookup) if approximate else _exact_position(key_range, lookup)
+    if pos is None:
+        return NA
+    return table.cell(pos, index - 1) if vertical else table.cell(index - 1, pos)
+
+
+def fn_match(lookup, rng, match_type=1.0):
+    lookup = _scalar(lookup)
+    match_type = _to_number(match_type) if match_type is not _MISSING else 1.0
+    error = _first_error(lookup, match_type)
+    if error:
+        return error
+    if not isinstance(rng, RangeRef) or _vector(rng)[0] is None:
+        return NA
+    if match_type == 0:
+        pos = _exact_position(rng, lookup)
+    else:
+        pos = _approx_position(rng, lookup, descending=match_type < 0)
+    return NA if pos is None else float(pos + 1)
+
+
+def fn_index(rng, row=_MISSING, col=_MISSING):
+    row = 0 if row is _MISSING else _to_number(row)
+    col = 0 if col is _MISSING else _to_number(col)
+    error = _first_error(row, col)
+    if error:
+        return error
+    row, col = int(row), int(col)
+    if isinstance(rng, RangeRef):
+        rows, cols = rng.declared_shape
+        if rows == 1 and col == 0 and cols > 1:
+            row, col = 1, row  # Vùng 1 dòng: INDEX(A1:E1, 3) -> cột thứ 3
+        elif cols == 1 and col == 0:
+            col = 1
+        if row < 0 or col < 0 or row > rows or col > cols:
+            return REF
+        r1, r2 = (rng.r1, rng.r2) if row == 0 else (rng.r1 + row - 1,) * 2
+        c1, c2 = (rng.c1, rng.c2) if col == 0 else (rng.c1 + col - 1,) * 2
+        return RangeRef(rng.grid, r1, c1, r2, c2)
+    if _is_array(rng):
+        arr = rng if rng.ndim == 2 else rng.reshape(1, -1)
+        if arr.shape[0] == 1 and col == 0:
+            row, col = 1, row
+        elif arr.shape[1] == 1 and col == 0:
+            col = 1
+        if not (1 <= row <= arr.shape[0] and 1 <= col <= arr.shape[1]):
+            return REF
+        return _python_value(arr[row - 1, col - 1])
+    return rng if row in (0, 1) and col in (0, 1) else REF
+
+
+def _round_with(func):
+    def round_fn(number, digits=0.0):
+        number, digits = _to_number(number), _to_number(digits) if digits is not _MISSING else 0.0
+        error = _first_error(number, digits)
+        if error:
+            return error
+        factor = 10.0 ** int(digits)
+        return func(number * factor) / factor
+    return round_fn
+
+
+def _round_half_away(x):
+    return math.floor(abs(x) + 0.5 + 1e-9) * (1 if x >= 0 else -1)
+
+
+def _numeric(func):
+    """(Hàm nội bộ) Bọc một hàm số học một/nhiều tham số: chuyển đổi sang số và lan truyền lỗi."""
+    def wrapper(*args):
+        numbers = [_to_number(a) for a in args if a is not _MISSING]
+        error = _first_error(*numbers)
+        if error:
+            return error
+        try:
+            return func(*numbers)
+        except (ValueError, OverflowError):
+            return NUM
+        except ZeroDivisionError:
+            return DIV0
+    return wrapper
+
+
+def _excel_mod(a, b):
+    if b == 0:
+        raise ZeroDivisionError
+    return a - b * math.floor(a / b)
+
+
+def _text_fn(func):
+    def wrapper(*args):
+        texts = [_to_text(args[0])] + [_to_number(a) for a in args[1:] if a is not _MISSING]
+        error = _first_error(*texts)
+        return error or func(*texts)
+    return wrapper
+
+
+def fn_and(*args):
+    result = True
+    for kind, arg in _iter_values(args):
+        values = arg.values().reshape(-1) if isinstance(arg, RangeRef) else (
+            arg.reshape(-1) if kind == 'array' else [arg])
+        for value in values:
+            value = _python_value(value)
+            if value is None or (isinstance(value, str) and kind == 'array'):
+                continue
+            value = _to_bool(value)
+            if isinstance(value, ExcelError):
+                return value
+            result = result and value
+    return result
+
+
+def fn_or(*args):
+    result = False
+    for kind, arg in _iter_values(args):
+        values = arg.values().reshape(-1) if isinstance(arg, RangeRef) else (
+            arg.reshape(-1) if kind == 'array' else [arg])
+        for value in values:
+            value = _python_value(value)
+            if value is None or (isinstance(value, str) and kind == 'array'):
+                continue
+            value = _to_bool(value)
+            if isinstance(value, ExcelError):
+                return value
+            result = result or value
+    return result
+
+
+def fn_not(value):
+    value = _to_bool(value)
+    return value if isinstance(value, ExcelError) else not value
+
+
+def fn_concatenate(*args):
+    parts = []
+    for arg in args:
+        if isinstance(arg, RangeRef):
+            texts = [_to_text(v) for v in arg.values().reshape(-1)]
+        else:
+            texts = [_to_text(arg)]
+        error = _first_error(*texts)
+        if error:
+            return error
+        parts.extend(texts)
+    return ''.join(parts)
+
+
+def fn_value(text):
+    return _to_number(text)
+
+
+FUNCTIONS = {
+    'SUM': fn_sum, 'AVERAGE': fn_average, 'MIN': fn_min, 'MAX': fn_max,
+    'COUNT': fn_count, 'COUNTA': fn_counta, 'COUNTBLANK': fn_countblank,
+    'SUMPRODUCT': fn_sumproduct,
+    'SUMIF': fn_sumif, 'SUMIFS': fn_sumifs, 'COUNTIF': fn_countif, 'COUNTIFS': fn_countifs,
+    'AVERAGEIF': fn_averageif, 'AVERAGEIFS': fn_averageifs,
+    'VLOOKUP': fn_vlookup, 'HLOOKUP': fn_hlookup, 'MATCH': fn_match, 'INDEX': fn_index,
+    'AND': fn_and, 'OR': fn_or, 'NOT': fn_not,
+    'ROUND': _round_with(_round_half_away),
+    'ROUNDUP': _round_with(lambda x: math.ceil(x - 1e-9) if x >= 0 else math.floor(x + 1e-9)),
+    'ROUNDDOWN': _round_with(math.trunc),
+    'INT': _numeric(lambda x: float(math.floor(x))),
+    'ABS': _numeric(abs), 'SQRT': _numeric(math.sqrt), 'EXP': _numeric(math.exp),
+    'LN': _numeric(math.log), 'LOG10': _numeric(math.log10),
+    'LOG': _numeric(lambda x, base=10.0: math.log(x, base)),
+    'POWER': _numeric(lambda x, y: float(x) ** y), 'MOD': _numeric(_excel_mod),
+    'SIGN': _numeric(lambda x: float((x > 0) - (x < 0))),
+    'PI': lambda: math.pi,
+    'TRUE': lambda: True, 'FALSE': lambda: False, 'NA': lambda: NA,
+    'CONCATENATE': fn_concatenate, 'CONCAT': fn_concatenate,
+    'LEN': _text_fn(lambda s: float(len(s))),
+    'LEFT': _text_fn(lambda s, n=1.0: s[:int(n)]),
+    'RIGHT': _text_fn(lambda s, n=1.0: s[len(s) - int(n):] if int(n) else ''),
+    'MID': _text_fn(lambda s, start, n: s[int(start) - 1:int(start) - 1 + int(n)]),
+    'UPPER': _text_fn(str.upper), 'LOWER': _text_fn(str.lower),
+    'TRIM': _text_fn(lambda s: ' '.join(s.split())),
+    'VALUE': fn_value,
+    'ISBLANK': lambda v: _scalar(v) is None,
+    'ISNUMBER': lambda v: isinstance(_scalar(v), (int, float)) and not isinstance(_scalar(v), bool),
+    'ISTEXT': lambda v: isinstance(_scalar(v), str),
+    'ISERROR': lambda v: isinstance(_scalar(v), ExcelError),
+    'ISNA': lambda v: _scalar(v) == NA,
+}
+
+# Các hàm được xử lý riêng trong bước biên dịch (đánh giá lười các nhánh)
+_LAZY_FUNCTIONS = ('IF', 'IFERROR', 'IFNA', 'CHOOSE')
+
+
+# --- Model ---
+class FormulaModel:
+    """
+    Mô hình tính toán của một workbook: giá trị các ô, công thức đã biên dịch và đồ thị phụ thuộc.
+
+    Ví dụ:
+        model = FormulaModel.from_file('pricing.xlsx')
+        for rate in (0.03, 0.04, 0.05):
+            model.set_value('Input!B2', rate)        # Chỉ tính lại các ô phía sau Input!B2
+            print(rate, model.get_value('Summary!C10'))
+    """
+
+    def __init__(self):
+        if np is None:
+            raise ImportError("'numpy' is not installed. Please install it using: pip install numpy")
+        self._grids = {}            # tên sheet (lower) -> SheetGrid
+        self._sheet_order = []
+        self._formulas = {}         # (sheet lower, dòng, cột) -> chuỗi công thức
+        self._compiled = {}         # (sheet lower, dòng, cột) -> hàm không tham số
+        self._names = {}            # (sheet lower hoặc None, tên lower) -> chuỗi tham chiếu
+        self._compiled_names = {}
+        self._order = []            # thứ tự tính (topo) của các ô công thức
+        self._position = {}
+        self._cell_dependents = {}  # ô -> list ô công thức tham chiếu trực tiếp
+        self._range_dependents = {} # sheet lower -> {cột: list (r1, r2, c1, c2, ô công thức)}
+        self._wide_dependents = {}  # sheet lower -> list (r1, r2, c1, c2, ô công thức) của vùng rộng
+        self._formula_rows = {}     # sheet lower -> {cột: list dòng có công thức (đã sắp xếp)}
+        self.unsupported_functions = set()
+        self.cycles = set()
+        self.last_recalc = None
+
+    def __repr__(self):
+        return f"<FormulaModel [{len(self._grids)} sheets, {len(self._formulas)} formulas]>"
+
+    # --- Building ---
+    @classmethod
+    def from_file(cls, path):
+        """
+        Nạp mô hình từ file .xlsx/.xlsm bằng openpyxl: công thức và giá trị đã lưu cache của các ô.
+        Nếu có ô công thức không có giá trị cache (file không được lưu bởi Excel), mọi công thức được
+        tính lại một lần sau khi nạp.
+        """
+        from openpyxl import load_workbook
+
+        formulas_wb = load_workbook(path)
+        values_wb = load_workbook(path, data_only=True)
+        model = cls()
+        missing_cache = False
+        for ws in formulas_wb.worksheets:
+            cached = values_wb[ws.title]
+            model._add_sheet(ws.title, ws.max_row, ws.max_column)
+            for row in ws.iter_rows():
+                for cell in row:
+                    value = cell.value
+                    if value is None:
+                        continue
+                    if cell.data_type == 'f':
+                        text = value if isinstance(value, str) else '=' + str(getattr(value, 'text', '')).lstrip('=')
+                        model._formulas[(ws.title.lower(), cell.row, cell.column)] = text
+                        value = cached.cell(cell.row, cell.column).value
+                        missing_cache = missing_cache or value is None
+                    model._grids[ws.title.lower()].set(cell.row, cell.column, _normalize(value))
+            for name, defn in ws.defined_names.items():
+                model._names[(ws.title.lower(), name.lower())] = defn.attr_text
+        for name, defn in formulas_wb.defined_names.items():
+            model._names[(None, name.lower())] = defn.attr_text
+        model._build()
+        if missing_cache:
+            model.recalculate()
+        return model
+
+    @classmethod
+    def from_workbook(cls, workbook):
+        """
+        Nạp mô hình từ một Workbook đang mở (engine bất kỳ): mỗi sheet đọc công thức và giá trị
+        của used_range bằng 2 lần gọi backend.
+        """
+        workbook._flush_batch()
+        model = cls()
+        for sheet in workbook.sheets:
+            used = sheet._impl.used_range
+            first_row, first_col = used.row, used.column
+            values = used.get_values()
+            formulas = used.get_formulas()
+            if not isinstance(values, list) or (values and not isinstance(values[0], list)):
+                values, formulas = [[values]] if not isinstance(values, list) else [values], \
+                    [[formulas]] if not isinstance(formulas, list) else [formulas]
+            grid = model._add_sheet(sheet.name, first_row + len(values) - 1,
+                                    first_col + max((len(r) for r in values), default=1) - 1)
+            key = sheet.name.lower()
+            for i, row in enumerate(values):
+                for j, value in enumerate(row):
+                    formula = formulas[i][j] if i < len(formulas) and j < len(formulas[i]) else None
+                    if isinstance(formula, str) and formula.startswith('='):
+                        model._formulas[(key, first_row + i, first_col + j)] = formula
+                    if value is not None:
+                        grid.set(first_row + i, first_col + j, _normalize(value))
+        for name in workbook._impl.get_names():
+            full_name = name['name']
+            scope = None
+            if '!' in full_name:
+                sheet_part, full_name = full_name.rsplit('!', 1)
+                scope = _unquote_sheet(sheet_part + '!').lower()
+            model._names[(scope, full_name.lower())] = str(name['refers_to']).lstrip('=')
+        model._build()
+        return model
+
+    def _add_sheet(self, name, nrows, ncols):
+        grid = SheetGrid(name, nrows, ncols)
+        self._grids[name.lower()] = grid
+        self._sheet_order.append(name)
+        return grid
+
+    def _build(self):
+        """(Hàm nội bộ) Biên dịch công thức, dựng đồ thị phụ thuộc và thứ tự tính một lần."""
+        start = time.perf_counter()
+        precedents = {}
+        for cell, text in self._formulas.items():
+            try:
+                node = parse_formula(text)
+            except FormulaError:
+                node = ('const', NAME)
+            refs = []
+            self._compiled[cell] = self._compile(node, cell[0], refs)
+            precedents[cell] = refs
+            sheet, row, col = cell
+            self._formula_rows.setdefault(sheet, {}).setdefault(col, []).append(row)
+        for columns in self._formula_rows.values():
+            for rows in columns.values():
+                rows.sort()
+        self._formula_cols = {sheet: sorted(cols) for sheet, cols in self._formula_rows.items()}
+
+        for cell, refs in precedents.items():
+            for sheet, r1, c1, r2, c2 in set(refs):
+                if r1 == r2 and c1 == c2:
+                    self._cell_dependents.setdefault((sheet, r1, c1), []).append(cell)
+                elif c2 - c1 < 64:
+                    buckets = self._range_dependents.setdefault(sheet, {})
+                    for col in range(c1, c2 + 1):
+                        buckets.setdefault(col, []).append((r1, r2, c1, c2, cell))
+                else:
+                    self._wide_dependents.setdefault(sheet, []).append((r1, r2, c1, c2, cell))
+
+        self._order = self._topological_order(precedents)
+        self._position = {cell: i for i, cell in enumerate(self._order)}
+        if self.unsupported_functions:
+            logger.warning("Các hàm chưa được hỗ trợ (trả về #NAME?): %s", sorted(self.unsupported_functions))
+        if self.cycles:
+            logger.warning("Có %s ô nằm trong tham chiếu vòng, được tính một lần theo giá trị hiện có.",
+                           len(self.cycles))
+        logger.info("Đã dựng mô hình tính toán: %s sheet, %s công thức sau %.2fs.",
+                    len(self._grids), len(self._formulas), time.perf_counter() - start)
+
+    def _formula_cells_in(self, sheet, r1, c1, r2, c2):
+        """(Hàm nội bộ) Các ô công thức nằm trong một khối (tìm nhị phân theo từng cột)."""
+        cols = self._formula_cols.get(sheet)
+        if not cols:
+            return
+        rows_by_col = self._formula_rows[sheet]
+        for col in cols[bisect_left(cols, c1):bisect_right(cols, c2)]:
+            rows = rows_by_col[col]
+            for row in rows[bisect_left(rows, r1):bisect_right(rows, r2)]:
+                yield (sheet, row, col)
+
+    def _topological_order(self, precedents):
+        """(Hàm nội bộ) Thứ tự tính các ô công thức (DFS không đệ quy), ghi nhận các ô nằm trong vòng."""
+        order, state = [], {}  # state: 1 = đang duyệt, 2 = đã xong
+        for root in precedents:
+            if root in state:
+                continue
+            stack = [(root, None)]
+            while stack:
+                cell, children = stack[-1]
+                if children is None:
+                    state[cell] = 1
+                    children = iter([p for sheet, r1, c1, r2, c2 in precedents[cell]
+                                     for p in self._formula_cells_in(sheet, r1, c1, r2, c2)])
+                    stack[-1] = (cell, children)
+                for child in children:
+                    child_state = state.get(child)
+                    if child_state is None:
+                        stack.append((child, None))
+                        break
+                    if child_state == 1:
+                        self.cycles.add(child)
+                        self.cycles.add(cell)
+                else:
+                    state[cell] = 2
+                    order.append(cell)
+                    stack.pop()
+        return order
+
+    # --- Compilation ---
+    def _resolve_sheet(self, sheet, current):
+        key = (sheet or current).lower()
+        return self._grids.get(key)
+
+    def _compile(self, node, current_sheet, refs, depth=0):
+        """(Hàm nội bộ) Biên dịch cây cú pháp thành hàm không tham số; ghi các vùng tham chiếu vào refs."""
+        kind = node[0]
+        if kind == 'const':
+            value = node[1]
+            return lambda: value
+        if kind == 'missing':
+            return lambda: _MISSING
+        if kind == 'ref':
+            _, sheet, (r1, c1, r2, c2) = node
+            grid = self._resolve_sheet(sheet, current_sheet)
+            if grid is None:
+                return lambda: REF
+            refs.append((grid.name.lower(), r1, c1, r2, c2))
+            if r1 == r2 and c1 == c2:
+                return lambda: grid.get(r1, c1)
+            return lambda: RangeRef(grid, r1, c1, r2, c2)
+        if kind == 'name':
+            _, sheet, name = node
+            scope = (sheet or current_sheet).lower()
+            text = self._names.get((scope, name.lower()))
+            if text is None and sheet is None:
+                text = self._names.get((None, name.lower()))
+            if text is None or depth > 16:
+                return lambda: NAME
+            try:
+                name_node = parse_formula(str(text))
+            except FormulaError:
+                return lambda: NAME
+            return self._compile(name_node, scope if sheet else current_sheet, refs, depth + 1)
+        if kind == 'neg':
+            operand = self._compile(node[1], current_sheet, refs, depth)
+
+            def negate():
+                value = operand()
+                if _is_array(value):
+                    return -_float_array(value)
+                number = _to_number(value)
+                return number if isinstance(number, ExcelError) else -number
+            return negate
+        if kind == 'pct':
+            operand = self._compile(node[1], current_sheet, refs, depth)
+            return lambda: _binary('/', operand(), 100.0)
+        if kind == 'bin':
+            _, op, left, right = node
+            left, right = self._compile(left, current_sheet, refs, depth), self._compile(right, current_sheet, refs, depth)
+            return lambda: _binary(op, left(), right())
+        if kind == 'func':
+            _, name, arg_nodes = node
+            args = [self._compile(arg, current_sheet, refs, depth) for arg in arg_nodes]
+            if name in _LAZY_FUNCTIONS:
+                return self._compile_lazy(name, args)
+            func = FUNCTIONS.get(name)
+            if func is None:
+                self.unsupported_functions.add(name)
+                return lambda: NAME
+
+            def call():
+                try:
+                    return func(*[arg() for arg in args])
+                except TypeError:
+                    return VALUE
+            return call
+        raise FormulaError(f"Nút không hợp lệ: {node!r}")
+
+    @staticmethod
+    def _compile_lazy(name, args):
+        """(Hàm nội bộ) IF/IFERROR/IFNA/CHOOSE: chỉ tính nhánh được chọn."""
+        def value_of(i, absent):
+            if i >= len(args):
+                return absent
+            value = args[i]()
+            return 0.0 if value is _MISSING else value  # Tham số bỏ trống, ví dụ IF(A1,,1)
+
+        if name == 'IF':
+            def if_():
+                condition = _to_bool(args[0]()) if args else VALUE
+                if isinstance(condition, ExcelError):
+                    return condition
+                return value_of(1, True) if condition else value_of(2, False)
+            return if_
+        if name in ('IFERROR', 'IFNA'):
+            def iferror():
+                value = args[0]() if args else VALUE
+                failed = isinstance(_scalar(value), ExcelError) if name == 'IFERROR' else _scalar(value) == NA
+                return value_of(1, '') if failed else value
+            return iferror
+
+        def choose():
+            index = _to_number(args[0]()) if args else VALUE
+            if isinstance(index, ExcelError):
+                return index
+            index = int(index)
+            return args[index]() if 1 <= index < len(args) else VALUE
+        return choose
+
+    # --- Evaluation ---
+    def _evaluate(self, cell):
+        value = self._compiled[cell]()
+        if isinstance(value, RangeRef) or (isinstance(value, np.ndarray)):
+            value = _scalar(value)
+        value = _python_value(value) if value is not _MISSING else 0.0
+        self._grids[cell[0]].set(cell[1], cell[2], value)
+
+    def _dependents_of(self, cell):
+        """(Hàm nội bộ) Các ô công thức tham chiếu trực tiếp tới một ô."""
+        sheet, row, col = cell
+        found = list(self._cell_dependents.get(cell, ()))
+        for r1, r2, c1, c2, dependent in self._range_dependents.get(sheet, {}).get(col, ()):
+            if r1 <= row <= r2:
+                found.append(dependent)
+        for r1, r2, c1, c2, dependent in self._wide_dependents.get(sheet, ()):
+            if r1 <= row <= r2 and c1 <= col <= c2:
+                found.append(dependent)
+        return found
+
+    def recalculate(self, changed=None):
+        """
+        Tính toán lại các công thức.
+
+        Args:
+            changed (iterable, optional): Các ô (sheet lower, dòng, cột) vừa thay đổi. Nếu truyền,
+                                          chỉ các ô công thức phía sau chúng được tính lại;
+                                          mặc định tính lại tất cả.
+
+        Returns:
+            int: Số ô công thức đã tính lại.
+        """
+        start = time.perf_counter()
+        if changed is None:
+            cells = self._order
+        else:
+            dirty = set()
+            pending = list(changed)
+            while pending:
+                for dependent in self._dependents_of(pending.pop()):
+                    if dependent not in dirty:
+                        dirty.add(dependent)
+                        pending.append(dependent)
+            cells = sorted(dirty, key=self._position.__getitem__)
+        for cell in cells:
+            self._evaluate(cell)
+        self.last_recalc = {'cells': len(cells), 'seconds': time.perf_counter() - start}
+        return len(cells)
+
+    # --- Public API ---
+    def _parse_ref(self, ref, sheet=None):
+        """(Hàm nội bộ) 'Sheet1!B3' hoặc ('Sheet1', 'B3') -> (SheetGrid, khối)."""
+        if isinstance(ref, tuple):
+            sheet, ref = ref
+        elif '!' in ref:
+            prefix, ref = ref.rsplit('!', 1)
+            sheet = _unquote_sheet(prefix + '!')
+        if sheet is None:
+            raise ValueError(f"Thiếu tên sheet trong địa chỉ '{ref}'.")
+        grid = self._grids.get(sheet.lower())
+        block = parse_address(ref)
+        if grid is None or block is None:
+            raise KeyError(f"Không tìm thấy vùng '{sheet}!{ref}'.")
+        return grid, block
+
+    @property
+    def sheet_names(self):
+        return list(self._sheet_order)
+
+    def get_value(self, ref):
+        """
+        Đọc giá trị hiện tại: giá trị đơn với một ô, list 2 chiều với một vùng.
+        Lỗi Excel được trả về dưới dạng ExcelError (ví dụ: #N/A).
+        """
+        grid, (r1, c1, r2, c2) = self._parse_ref(ref)
+        if r1 == r2 and c1 == c2:
+            return grid.get(r1, c1)
+        return RangeRef(grid, r1, c1, r2, c2).values(
+            (r2 - r1 + 1, min(c2, grid.ncols) - c1 + 1 if c2 == MAX_COL else c2 - c1 + 1)).tolist()
+
+    def to_numpy(self, ref):
+        """Đọc một vùng thành mảng float (ô không phải số = NaN)."""
+        grid, (r1, c1, r2, c2) = self._parse_ref(ref)
+        return RangeRef(grid, r1, c1, r2, c2).numbers().copy()
+
+    def set_value(self, ref, value):
+        """Ghi giá trị vào một ô/vùng đầu vào và tính lại các ô phía sau. Trả về số ô đã tính lại."""
+        return self.set_values({ref: value})
+
+    def set_values(self, assignments):
+        """
+        Ghi nhiều giá trị đầu vào rồi tính lại một lần các ô phía sau.
+
+        Args:
+            assignments (dict): {địa chỉ ('Sheet1!B3' hoặc ('Sheet1', 'B3:C4')): giá trị hoặc list 2 chiều}.
+                                Ghi đè một ô công thức sẽ biến ô đó thành ô giá trị.
+
+        Returns:
+            int: Số ô công thức đã tính lại.
+        """
+        changed = []
+        for ref, value in assignments.items():
+            grid, (r1, c1, r2, c2) = self._parse_ref(ref)
+            key = grid.name.lower()
+            rows = value if isinstance(value, (list, tuple)) else None
+            if rows is not None and rows and not isinstance(rows[0], (list, tuple)):
+                rows = [rows]
+            for row in range(r1, r2 + 1):
+                for col in range(c1, c2 + 1):
+                    cell_value = rows[row - r1][col - c1] if rows is not None else value
+                    cell = (key, row, col)
+                    if cell in self._compiled:
+                        self._remove_formula(cell)
+                    grid.set(row, col, _normalize(cell_value))
+                    changed.append(cell)
+        return self.recalculate(changed)
+
+    def _remove_formula(self, cell):
+        """(Hàm nội bộ) Biến một ô công thức thành ô giá trị (vẫn giữ vị trí trong đồ thị)."""
+        del self._compiled[cell]
+        del self._formulas[cell]
+        grid, row, col = self._grids[cell[0]], cell[1], cell[2]
+        self._compiled[cell] = lambda: grid.get(row, col)
+
+    def formula(self, ref):
+        """Chuỗi công thức của một ô, None nếu ô không có công thức."""
+        grid, (r1, c1, _, _) = self._parse_ref(ref)
+        return self._formulas.get((grid.name.lower(), r1, c1))
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+File: formula_scanner.py
+Author: Your Name / Tên của bạn
+Description: Quét công thức trực tiếp từ các phần XML bên trong file .xlsx/.xlsm
+             theo kiểu stream (iterparse), không cần Excel hay openpyxl và không
+             nạp toàn bộ workbook vào bộ nhớ.
+
+--- CHANGELOG ---
+Version 0.6.0 (2026-10-17):
+    - rewrite_package(): file kết quả giữ quyền truy cập của file nguồn (file tạm của mkstemp có
+      quyền 0600, trước đây thay thế file gốc với quyền này).
+
+Version 0.5.0 (2026-10-17):
+    - Xóa build_sheet_ref_pattern() và find_formulas_referencing(): không còn được dùng từ khi
+      xóa an toàn chuyển sang chỉ mục phụ thuộc (dependency_index.py).
+
+Version 0.4.0 (2026-10-17):
+    - Thêm hàm rewrite_package(): ghi lại gói .xlsx với một số part được thay thế/loại bỏ,
+      các part còn lại được sao chép nguyên vẹn.
+
+Version 0.3.0 (2026-10-17):
+    - Thêm hàm get_workbook_rels() dùng chung cho các module đọc trực tiếp file.
+
+Version 0.2.0 (2026-10-17):
+    - Thêm hàm iter_defined_names() để đọc định nghĩa Named Range từ workbook.xml.
+    - Công khai các hàm tiện ích column_letter() và column_index().
+
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo module với các hàm: get_sheet_parts(), iter_formulas(),
+      build_sheet_ref_pattern(), find_formulas_referencing().
+-------------------
+"""
+
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+from xml.etree.ElementTree import iterparse, parse
+
+NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+OFFICE_DOCUMENT_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+
+_CELL_REF_RE = re.compile(r'^([A-Za-z]+)(\d+)$')
+
+
+def column_letter(col_idx):
+    """Chuyển số thứ tự cột (1-based) thành chữ cái (1 -> 'A')."""
+    letters = ''
+    while col_idx > 0:
+        col_idx, remainder = divmod(col_idx - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def column_index(letters):
+    """Chuyển chữ cái cột thành số thứ tự (1-based) ('A' -> 1)."""
+    col_idx = 0
+    for ch in letters.upper():
+        col_idx = col_idx * 26 + (ord(ch) - 64)
+    return col_idx
+
+
+def _resolve_target(base_dir, target):
+    """(Hàm nội bộ) Chuẩn hóa đường dẫn Target của một relationship trong gói zip."""
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+def _read_rels(zf, rels_path, base_dir):
+    """(Hàm nội bộ) Đọc một file .rels và trả về dict {Id: (Type, đường dẫn part)}."""
+    try:
+        with zf.open(rels_path) as fh:
+            root = parse(fh).getroot()
+    except KeyError:
+        return {}
+    rels = {}
+    for rel in root.iter(f'{NS_PKG_REL}Relationship'):
+        if rel.get('TargetMode') == 'External':
+            continue
+        rels[rel.get('Id')] = (rel.get('Type'), _resolve_target(base_dir, rel.get('Target', '')))
+    return rels
+
+
+def get_workbook_part(zf):
+    """Trả về đường dẫn của part workbook.xml bên trong gói (thường là 'xl/workbook.xml')."""
+    for rel_type, target in _read_rels(zf, '_rels/.rels', '').values():
+        if rel_type == OFFICE_DOCUMENT_TYPE:
+            return target
+    return 'xl/workbook.xml'
+
+
+def get_workbook_rels(zf):
+    """Đọc các relationship của workbook.xml, trả về dict {Id: (Type, đường dẫn part)}."""
+    workbook_part = get_workbook_part(zf)
+    base_dir = posixpath.dirname(workbook_part)
+    rels_path = posixpath.join(base_dir, '_rels', posixpath.basename(workbook_part) + '.rels')
+    return _read_rels(zf, rels_path, base_dir)
+
+
+def get_sheet_parts(zf):
+    """
+    Đọc danh sách sheet theo đúng thứ tự trong workbook.
+
+    Args:
+        zf (zipfile.ZipFile): File .xlsx đã mở.
+
+    Returns:
+        list: Danh sách tuple (tên sheet, đường dẫn part XML, trạng thái hiển thị).
+              Trạng thái là 'visible', 'hidden' hoặc 'veryHidden'.
+    """
+    workbook_part = get_workbook_part(zf)
+    rels = get_workbook_rels(zf)
+
+    sheets = []
+    with zf.open(workbook_part) as fh:
+        for _, elem in iterparse(fh):
+            if elem.tag == f'{NS_MAIN}sheet':
+                rel = rels.get(elem.get(f'{NS_REL}id'))
+                if rel:
+                    sheets.append((elem.get('name'), rel[1], elem.get('state', 'visible')))
+            elif elem.tag == f'{NS_MAIN}sheets':
+                break
+    return sheets
+
+
+def iter_defined_names(path):
+    """
+    Đọc (stream) tất cả các định nghĩa Named Range trong khối <definedNames> của workbook.xml.
+
+    Args:
+        path (str or Path): Đường dẫn đến file .xlsx/.xlsm.
+
+    Yields:
+        tuple: (tên, tên sheet phạm vi hoặc None nếu là tên toàn cục, chuỗi tham chiếu không có '=').
+    """
+    with zipfile.ZipFile(path) as zf:
+        sheet_names = [name for name, _, _ in get_sheet_parts(zf)]
+        with zf.open(get_workbook_part(zf)) as fh:
+            for _, elem in iterparse(fh):
+                if elem.tag == f'{NS_MAIN}definedName':
+                    local_id = elem.get('localSheetId')
+                    scope = None
+                    if local_id is not None and local_id.isdigit() and int(local_id) < len(sheet_names):
+                        scope = sheet_names[int(local_id)]
+                    yield elem.get('name'), scope, elem.text or ''
+                    elem.clear()
+                elif elem.tag == f'{NS_MAIN}definedNames':
+                    break
+
+
+def iter_formulas(path, sheet_names=None):
+    """
+    Duyệt (stream) tất cả các công thức trong file, chỉ giữ trong bộ nhớ một dòng tại một thời điểm.
+
+    Với công thức dùng chung (shared formula), các ô phụ thuộc nhận lại chuỗi công thức
+    của ô gốc (chưa dịch địa chỉ tương đối) - đủ để nhận diện tham chiếu đến sheet.
+
+    Args:
+        path (str or Path): Đường dẫn đến file .xlsx/.xlsm.
+        sheet_names (iterable, optional): Chỉ quét các sheet có tên trong danh sách này.
+
+    Yields:
+        tuple: (tên sheet, tọa độ ô như 'B3', chuỗi công thức không có dấu '=').
+    """
+    wanted = set(sheet_names) if sheet_names is not None else None
+    tag_row, tag_c, tag_f = f'{NS_MAIN}row', f'{NS_MAIN}c', f'{NS_MAIN}f'
+    tag_sheet_data = f'{NS_MAIN}sheetData'
+
+    with zipfile.ZipFile(path) as zf:
+        for sheet_name, part, _ in get_sheet_parts(zf):
+            if wanted is not None and sheet_name not in wanted:
+                continue
+            try:
+                fh = zf.open(part)
+            except KeyError:
+                continue
+            with fh:
+                shared = {}
+                sheet_data = None
+                row_idx, col_idx, coord = 0, 0, None
+                for event, elem in iterparse(fh, events=('start', 'end')):
+                    tag = elem.tag
+                    if event == 'start':
+                        if tag == tag_c:
+                            ref = elem.get('r')
+                            match = _CELL_REF_RE.match(ref) if ref else None
+                            if match:
+                                col_idx = column_index(match.group(1))
+                                coord = ref
+                            else:
+                                # Thuộc tính 'r' là tùy chọn theo chuẩn, tự suy ra vị trí
+                                col_idx += 1
+                                coord = f'{column_letter(col_idx)}{row_idx}'
+                        elif tag == tag_row:
+                            ref = elem.get('r')
+                            row_idx = int(ref) if ref else row_idx + 1
+                            col_idx = 0
+                        elif tag == tag_sheet_data:
+                            sheet_data = elem
+                        continue
+
+                    if tag == tag_f:
+                        text = elem.text
+                        if elem.get('t') == 'shared':
+                            si = elem.get('si')
+                            if text:
+                                shared[si] = text
+                            else:
+                                text = shared.get(si)
+                        if text:
+                            yield sheet_name, coord, text
+                    elif tag == tag_row and sheet_data is not None:
+                        # Giải phóng dòng đã xử lý để bộ nhớ không tăng theo kích thước sheet
+                        sheet_data.clear()
+                    elif tag == tag_sheet_data:
+                        break
+
+
+def rewrite_package(path, replacements, drop=(), destination=None):
+    """
+    Ghi lại gói .xlsx/.xlsm: thay nội dung một số part và loại bỏ một số part khác.
+
+    Các part còn lại được sao chép nguyên vẹn (giữ nguyên cách nén). Kết quả được ghi ra file tạm
+    cùng thư mục với file đích rồi mới thay thế, file gốc không bị hỏng nếu có lỗi giữa chừng.
+
+    Args:
+        path (str or Path): File nguồn.
+        replacements (dict): {đường dẫn part: nội dung bytes mới}.
+        drop (iterable): Đường dẫn các part cần loại bỏ.
+        destination (str or Path, optional): File kết quả. Mặc định: ghi đè lên file nguồn.
+    """
+    path = Path(path)
+    target = Path(destination) if destination is not None else path
+    drop = set(drop)
+    fd, tmp_path = tempfile.mkstemp(suffix=path.suffix, dir=target.parent)
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(path) as zin, zipfile.ZipFile(tmp_path, 'w') as zout:
+            for info in zin.infolist():
+                if info.filename in drop:
+                    continue
+                if info.filename in replacements:
+                    zout.writestr(info, replacements[info.filename])
+                else:
+                    with zin.open(info) as src, zout.open(info, 'w') as dst:
+                        shutil.copyfileobj(src, dst, 1 << 20)
+        shutil.copymode(path, tmp_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, target)
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+File: log_utils.py
+Author: Your Name / Tên của bạn
+Description: Hệ thống log của thư viện, dựa trên module logging chuẩn của Python.
+
+Cách dùng:
+    - Mỗi module có logger riêng (logging.getLogger(__name__)), tất cả nằm dưới logger gốc của thư viện
+      (LIBRARY_LOGGER_NAME), nên có thể chỉnh mức log cho cả thư viện hoặc từng module.
+    - Thông điệp dùng định dạng trễ kiểu '%s': chuỗi chỉ được tạo khi mức log đang bật.
+    - Các vòng lặp lớn (xóa Named Range, phá vỡ liên kết, ...) chỉ ghi một dòng tổng kết cho mỗi
+      thao tác (OperationLog); chi tiết từng phần tử ở mức DEBUG.
+    - Mặc định thư viện không tự in gì (NullHandler). Gọi configure_logging() để in ra console
+      theo định dạng 'LEVEL: thông điệp' như trước; use_queue=True để việc ghi log (I/O) diễn ra
+      trên một luồng riêng (QueueHandler + QueueListener), không chặn luồng đang xử lý.
+
+Ví dụ:
+    from excel_python.log_utils import configure_logging
+    configure_logging('INFO')                      # In ra console
+    configure_logging('DEBUG', use_queue=True)     # Ghi log trên luồng riêng
+
+--- CHANGELOG ---
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo module với: configure_logging(), shutdown_logging(), OperationLog, mức log SUCCESS.
+-------------------
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+
+LIBRARY_LOGGER_NAME = __name__.rpartition('.')[0] or 'excel_python'
+
+# Mức log cho các thông báo hoàn tất thành công (giữa INFO và WARNING)
+SUCCESS = 25
+logging.addLevelName(SUCCESS, 'SUCCESS')
+
+DEFAULT_FORMAT = '%(levelname)s: %(message)s'
+
+library_logger = logging.getLogger(LIBRARY_LOGGER_NAME)
+library_logger.addHandler(logging.NullHandler())
+
+_handlers = []
+_listener = None
+
+
+def configure_logging(level='INFO', stream=None, fmt=DEFAULT_FORMAT, use_queue=False, handlers=None):
+    """
+    Cấu hình log cho thư viện (gọi lại sẽ thay thế cấu hình trước đó).
+
+    Args:
+        level (str or int): Mức log tối thiểu ('DEBUG', 'INFO', 'SUCCESS', 'WARNING', 'ERROR').
+        stream (optional): Luồng ghi log khi không truyền handlers. Mặc định: sys.stdout.
+        fmt (str): Định dạng thông điệp của StreamHandler mặc định.
+        use_queue (bool): True để các handler chạy trên một luồng nền (QueueListener);
+                          luồng gọi chỉ đưa bản ghi vào hàng đợi.
+        handlers (list, optional): Các handler dùng thay cho StreamHandler mặc định.
+
+    Returns:
+        logging.Logger: Logger gốc của thư viện.
+    """
+    global _listener
+    shutdown_logging()
+    if handlers is None:
+        handler = logging.StreamHandler(stream or sys.stdout)
+        handler.setFormatter(logging.Formatter(fmt))
+        handlers = [handler]
+
+    if use_queue:
+        records = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        attached = [logging.handlers.QueueHandler(records)]
+    else:
+        attached = list(handlers)
+
+    for handler in attached:
+        library_logger.addHandler(handler)
+    _handlers.extend(attached)
+    library_logger.setLevel(logging.getLevelName(level) if isinstance(level, str) else level)
+    library_logger.propagate = False
+    return library_logger
+
+
+def shutdown_logging():
+    """Gỡ các handler do configure_logging() thêm vào và dừng luồng ghi log nền (ghi nốt các bản ghi còn lại)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    while _handlers:
+        handler = _handlers.pop()
+        library_logger.removeHandler(handler)
+        handler.close()
+    library_logger.propagate = True
+
+
+atexit.register(shutdown_logging)
+
+
+class OperationLog:
+    """
+    Tổng kết một thao tác gồm nhiều phần tử: đếm kết quả theo loại, ghi chi tiết từng phần tử ở mức
+    DEBUG và chỉ ghi một dòng tổng kết (kèm vài lỗi đầu tiên) khi kết thúc khối with.
+
+    Ví dụ:
+        with OperationLog(logger, "Xóa Named Range") as op:
+            for name in names:
+                try:
+                    delete(name)
+                    op.count('deleted')
+                except Exception as e:
+                    op.failed(name, e)
+        # -> "WARNING: Xóa Named Range: deleted=120, failed=2 (0.35s). Lỗi:\n  - Ten1: ..."
+    """
+    def __init__(self, logger, operation, max_errors=10):
+        self.logger = logger
+        self.operation = operation
+        self.max_errors = max_errors
+        self.counts = {}
+        self.errors = []
+        self.error_count = 0
+        self.seconds = 0.0
+        self._start = None
+        self._debug = logger.isEnabledFor(logging.DEBUG)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.seconds = time.perf_counter() - self._start
+        if exc_type is not None:
+            self.logger.error("%s: dừng do lỗi sau %.2fs (%s). Lỗi: %s",
+                              self.operation, self.seconds, self._format_counts(), exc_val)
+            return False
+        self.logger.log(logging.WARNING if self.error_count else SUCCESS, "%s: %s (%.2fs).%s",
+                        self.operation, self._format_counts(), self.seconds, _LazyErrors(self))
+        return False
+
+    def count(self, outcome, n=1, item=None):
+        """Ghi nhận n phần tử có kết quả outcome (ví dụ 'deleted'); item được ghi ở mức DEBUG."""
+        self.counts[outcome] = self.counts.get(outcome, 0) + n
+        if item is not None and self._debug:
+            self.logger.debug("%s: %s - %s", self.operation, outcome, item)
+
+    def failed(self, item, error):
+        """Ghi nhận một phần tử bị lỗi (chỉ giữ lại max_errors lỗi đầu tiên cho dòng tổng kết)."""
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((item, error))
+        if self._debug:
+            self.logger.debug("%s: lỗi - %s: %s", self.operation, item, error)
+
+    def _format_counts(self):
+        parts = [f"{outcome}={n}" for outcome, n in self.counts.items()]
+        if self.error_count:
+            parts.append(f"failed={self.error_count}")
+        return ', '.join(parts) or 'không có phần tử nào'
+
+
+class _LazyErrors:
+    """(Nội bộ) Danh sách lỗi của OperationLog, chỉ được định dạng khi bản ghi log thực sự được xuất."""
+    __slots__ = ('op',)
+
+    def __init__(self, op):
+        self.op = op
+
+    def __str__(self):
+        op = self.op
+        if not op.errors:
+            return ''
+        lines = [f"\n  - {item}: {error}" for item, error in op.errors]
+        if op.error_count > len(op.errors):
+            lines.append(f"\n  - ... và {op.error_count - len(op.errors)} lỗi khác.")
+        return ' Lỗi:' + ''.join(lines)
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+File: named_ranges.py
+Author: Your Name / Tên của bạn
+Description: Quản lý Named Range hàng loạt trực tiếp trên file .xlsx/.xlsm: đọc tất cả định nghĩa
+             tên trong một lượt từ workbook.xml, lọc bằng các mẫu regex biên dịch sẵn và xóa
+             hàng loạt bằng cách ghi lại khối <definedNames>.
+
+Lưu ý:
+    - Khối <definedNames> được ghi lại ở mức văn bản (bytes), phần còn lại của workbook.xml và
+      các part khác được giữ nguyên từng byte (không phân tích/ghi lại XML), tránh làm thay đổi
+      tiền tố namespace mà Excel yêu cầu.
+    - Tên có tiền tố '_xlnm.' trong file (ví dụ '_xlnm.Print_Area') được trả về không có tiền tố,
+      giống như Excel hiển thị qua COM.
+
+--- CHANGELOG ---
+Version 0.2.0 (2026-10-17):
+    - remove_defined_names() dùng formula_scanner.rewrite_package() để ghi lại gói.
+
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo module với các hàm: read_names(), select_names(), remove_defined_names().
+-------------------
+"""
+
+import re
+import shutil
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import unescape
+from .formula_scanner import get_workbook_part, get_sheet_parts, rewrite_package
+
+BUILTIN_PREFIX = '_xlnm.'
+
+# Tên được xử lý: định danh hợp lệ, không phải hàm mới của Excel (_xlfn...) và không giống địa chỉ ô
+# (3 chữ cái + số, ví dụ 'ABC1'). Gộp thành một regex biên dịch sẵn thay vì 3 lần so khớp mỗi tên.
+VALID_NAME_PATTERN = re.compile(r'^(?!_xlfn)(?![A-Za-z]{3}\d)[A-Za-z_][A-Za-z0-9_]*$')
+PRINT_NAME_PATTERN = re.compile(r'Print_Area|Print_Titles')
+BROKEN_REF_PATTERN = re.compile(r'#REF!')
+
+_UNQUOTED_SHEET = re.compile(r'^[A-Za-z_][A-Za-z0-9_.]*$')
+_DEFINED_NAMES_BLOCK = re.compile(
+    rb'<((?:[\w.-]+:)?)definedNames\b[^>]*?(?:/>|>(.*?)</\1definedNames>)', re.S)
+_DEFINED_NAME = re.compile(
+    rb'\s*<((?:[\w.-]+:)?)definedName\b([^>]*?)(?:/>|>(.*?)</\1definedName>)', re.S)
+_ATTRIBUTE = re.compile(rb'([\w:]+)\s*=\s*"([^"]*)"')
+
+
+def _qualified_name(scope_sheet, name):
+    """(Hàm nội bộ) Tên hiển thị như Excel: 'Ten' hoặc 'Sheet1!Ten' / "'Sheet 1'!Ten"."""
+    if scope_sheet is None:
+        return name
+    if not _UNQUOTED_SHEET.match(scope_sheet):
+        scope_sheet = "'" + scope_sheet.replace("'", "''") + "'"
+    return f"{scope_sheet}!{name}"
+
+
+def _name_key(qualified_name):
+    """(Hàm nội bộ) Khóa so khớp (sheet phạm vi hoặc None, tên) không phân biệt hoa thường."""
+    scope = None
+    name = qualified_name
+    if '!' in qualified_name:
+        scope, name = qualified_name.rsplit('!', 1)
+        if scope.startswith("'") and scope.endswith("'"):
+            scope = scope[1:-1].replace("''", "'")
+        scope = scope.lower()
+    if name.startswith(BUILTIN_PREFIX):
+        name = name[len(BUILTIN_PREFIX):]
+    return scope, name.lower()
+
+
+def _iter_name_elements(xml, sheet_names):
+    """
+    (Hàm nội bộ) Duyệt các phần tử <definedName> trong khối <definedNames> của workbook.xml.
+
+    Yields:
+        tuple: (match của phần tử, tên, tên sheet phạm vi hoặc None, dict thuộc tính).
+    """
+    block = _DEFINED_NAMES_BLOCK.search(xml)
+    if block is None or block.group(2) is None:
+        return
+    for match in _DEFINED_NAME.finditer(xml, block.start(2), block.end(2)):
+        attrs = {key.decode(): unescape(value.decode('utf-8'), {'&quot;': '"', '&apos;': "'"})
+                 for key, value in _ATTRIBUTE.findall(match.group(2))}
+        local_id = attrs.get('localSheetId')
+        scope = None
+        if local_id is not None and local_id.isdigit() and int(local_id) < len(sheet_names):
+            scope = sheet_names[int(local_id)]
+        name = attrs.get('name', '')
+        if name.startswith(BUILTIN_PREFIX):
+            name = name[len(BUILTIN_PREFIX):]
+        yield match, name, scope, attrs
+
+
+def _read_workbook_xml(zf):
+    """(Hàm nội bộ) Trả về (đường dẫn part workbook.xml, nội dung bytes, danh sách tên sheet)."""
+    workbook_part = get_workbook_part(zf)
+    sheet_names = [name for name, _, _ in get_sheet_parts(zf)]
+    return workbook_part, zf.read(workbook_part), sheet_names
+
+
+def read_names(path):
+    """
+    Đọc tất cả các Named Range trong một lượt trực tiếp từ workbook.xml.
+
+    Args:
+        path (str or Path): Đường dẫn đến file .xlsx/.xlsm.
+
+    Returns:
+        list: Danh sách dict {'name', 'refers_to', 'scope', 'is_visible'} cùng định dạng với
+              BookBackend.get_names(). 'scope' là tên sheet (tên cục bộ) hoặc tên file (tên toàn cục).
+    """
+    path = Path(path)
+    with zipfile.ZipFile(path) as zf:
+        _, xml, sheet_names = _read_workbook_xml(zf)
+    names_list = []
+    for match, name, scope, attrs in _iter_name_elements(xml, sheet_names):
+        names_list.append({
+            'name': _qualified_name(scope, name),
+            'refers_to': '=' + unescape((match.group(3) or b'').decode('utf-8')),
+            'scope': scope if scope is not None else path.name,
+            'is_visible': attrs.get('hidden', '0') not in ('1', 'true'),
+        })
+    return names_list
+
+
+def select_names(names, broken_only=False, keep_print_areas=True):
+    """
+    Lọc danh sách Named Range cần xóa bằng các mẫu regex biên dịch sẵn.
+
+    Args:
+        names (list): Danh sách dict từ get_names()/read_names().
+        broken_only (bool): True để chỉ chọn các tên trỏ tới #REF!.
+        keep_print_areas (bool): True để giữ lại 'Print_Area' và 'Print_Titles'.
+
+    Returns:
+        list: Tên đầy đủ (kể cả phạm vi, ví dụ 'Sheet1!Ten') của các Named Range cần xóa.
+    """
+    is_valid = VALID_NAME_PATTERN.match
+    is_print = PRINT_NAME_PATTERN.search
+    is_broken = BROKEN_REF_PATTERN.search
+    selected = []
+    for name in names:
+        name_str = name['name'].rsplit('!', 1)[-1]  # Lấy tên không bao gồm scope
+        if not is_valid(name_str):
+            continue
+        if broken_only:
+            if is_broken(str(name['refers_to'])):
+                selected.append(name['name'])
+        elif not (keep_print_areas and is_print(name_str)):
+            selected.append(name['name'])
+    return selected
+
+
+def remove_defined_names(path, names, destination=None):
+    """
+    Xóa hàng loạt Named Range khỏi file bằng cách ghi lại khối <definedNames> của workbook.xml.
+
+    Các part khác trong gói được sao chép nguyên vẹn. Khi ghi đè (destination=None), file mới
+    được ghi ra file tạm cùng thư mục rồi thay thế file gốc.
+
+    Args:
+        path (str or Path): Đường dẫn đến file .xlsx/.xlsm (file phải đang không được mở trong Excel).
+        names (iterable): Tên đầy đủ các Named Range cần xóa ('Ten' hoặc 'Sheet1!Ten'),
+                          không phân biệt hoa thường.
+        destination (str or Path, optional): File kết quả. Mặc định: ghi đè lên file gốc.
+
+    Returns:
+        int: Số Named Range đã xóa.
+    """
+    path = Path(path)
+    keys = {_name_key(name) for name in names}
+    with zipfile.ZipFile(path) as zin:
+        workbook_part, xml, sheet_names = _read_workbook_xml(zin)
+
+        kept, removed = [], 0
+        for match, name, scope, _ in _iter_name_elements(xml, sheet_names):
+            if (scope.lower() if scope is not None else None, name.lower()) in keys:
+                removed += 1
+            else:
+                kept.append(match.group(0))
+        if not removed:
+            if destination is not None:
+                shutil.copyfile(path, destination)
+            return 0
+
+        block = _DEFINED_NAMES_BLOCK.search(xml)
+        if kept:
+            prefix = block.group(1)
+            opening = xml[block.start():block.start(2)]
+            new_block = opening + b''.join(kept) + b'</' + prefix + b'definedNames>'
+        else:
+            new_block = b''
+        new_xml = xml[:block.start()] + new_block + xml[block.end():]
+
+    rewrite_package(path, {workbook_part: new_xml}, destination=destination)
+    return removed
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+File: pdf_export.py
+Author: Your Name / Tên của bạn
+Description: Xuất PDF hàng loạt trên nhiều tiến trình Excel chạy song song (ExcelAppPool).
+
+Mỗi job là một dict:
+    {'source': đường dẫn workbook, 'output': file PDF kết quả,
+     'sheets': list tên sheet (tùy chọn, mặc định: cả workbook),
+     'range': địa chỉ vùng (tùy chọn, ví dụ 'A1:H40'; khi đó 'sheets' phải có đúng một sheet),
+     'quality': 'standard' | 'minimum' (tùy chọn)}
+
+Các job cùng một workbook được gom lại và chạy trên cùng một tiến trình Excel, workbook chỉ được mở
+một lần. Không kích hoạt cửa sổ và không chờ cố định: mỗi lần xuất chỉ chờ Excel sẵn sàng.
+
+Ví dụ:
+    report = export_many([
+        {'source': 'sales.xlsx', 'output': 'out/sales.pdf'},
+        {'source': 'sales.xlsx', 'output': 'out/summary.pdf', 'sheets': ['Summary']},
+        {'source': 'kpi.xlsx', 'output': 'out/kpi.pdf', 'sheets': ['KPI'], 'range': 'A1:H40'},
+    ], workers=4)
+
+--- CHANGELOG ---
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo module với hàm export_many() và bộ xuất mặc định export_with_workbook().
+-------------------
+"""
+
+import logging
+import time
+from pathlib import Path
+from .app_pool import ExcelAppPool
+from .log_utils import OperationLog
+
+logger = logging.getLogger(__name__)
+
+
+def export_with_workbook(book, job):
+    """Bộ xuất mặc định: Workbook.to_pdf() (hoặc Range.to_pdf() khi job có 'range')."""
+    quality = job.get('quality') or 'standard'
+    if job.get('range'):
+        book.sheet(job['sheets'][0]).range(job['range']).to_pdf(job['output'], quality=quality)
+    else:
+        book.to_pdf(job['output'], quality=quality, sheets=job.get('sheets'))
+
+
+def _export_group(app, source, jobs, exporter, submitted_at):
+    """
+    (Hàm nội bộ) Chạy trong worker: mở workbook một lần, xuất lần lượt các job của nó và đo thời gian.
+
+    Returns:
+        list: Với mỗi job, tuple (giây xuất, lỗi hoặc None); kèm thời gian chờ và thời gian mở file.
+    """
+    started = time.perf_counter()
+    book = app.open(source, read_only=True)
+    opened = time.perf_counter()
+    outcomes = []
+    try:
+        for job in jobs:
+            start = time.perf_counter()
+            try:
+                exporter(book, job)
+                outcomes.append((time.perf_counter() - start, None))
+            except Exception as e:
+                outcomes.append((time.perf_counter() - start, e))
+    finally:
+        try:
+            book.close()
+        except Exception as e:
+            logger.debug("Không thể đóng '%s' sau khi xuất PDF: %s", source, e)
+    return outcomes, started - submitted_at, opened - started
+
+
+def export_many(jobs, workers=2, exporter=None, pool=None, app_factory=None, engine='xlwings'):
+    """
+    Xuất nhiều file PDF, chia cho các tiến trình Excel chạy song song.
+
+    Args:
+        jobs (iterable): Các job (dict, xem mô tả module).
+        workers (int): Số tiến trình Excel chạy song song (khi không truyền pool).
+        exporter (callable, optional): Hàm exporter(book, job) xuất một job từ workbook đã mở và ném lỗi
+                                       nếu thất bại. Mặc định: export_with_workbook.
+        pool (ExcelAppPool, optional): Pool có sẵn để dùng. Nếu không truyền, một pool tạm thời
+                                       được tạo và đóng sau khi xong.
+        app_factory (callable, optional): Truyền cho ExcelAppPool khi tạo pool tạm thời.
+        engine (str): Engine của pool tạm thời ('xlwings' hoặc 'file').
+
+    Returns:
+        list: Báo cáo theo đúng thứ tự của jobs, mỗi phần tử là dict
+              {'source', 'output', 'sheets', 'range', 'status' ('exported'|'failed'),
+               'seconds' (thời gian xuất), 'open_seconds' (thời gian mở workbook, chia đều cho các job
+               của workbook đó), 'wait_seconds' (thời gian chờ trong hàng đợi của pool), 'error'}.
+    """
+    exporter = exporter or export_with_workbook
+
+    report = []
+    groups = {}
+    outputs = {}
+    for job in jobs:
+        source = Path(job['source']).resolve()
+        output = Path(job['output']).resolve()
+        sheets = list(job['sheets']) if job.get('sheets') else None
+        if output in outputs:
+            raise ValueError(f"Nhiều job cùng ghi ra file '{output}'.")
+        outputs[output] = source
+        if job.get('range') and (not sheets or len(sheets) != 1):
+            raise ValueError(f"Job xuất vùng '{job['range']}' cần đúng một sheet trong 'sheets'.")
+        entry = {'source': source, 'output': output, 'sheets': sheets, 'range': job.get('range'),
+                 'quality': job.get('quality'), 'status': None, 'seconds': 0.0, 'open_seconds': 0.0,
+                 'wait_seconds': 0.0, 'error': None}
+        report.append(entry)
+        if not source.is_file():
+            entry['status'] = 'failed'
+            entry['error'] = "Không tìm thấy file nguồn."
+            continue
+        output.parent.mkdir(parents=True, exist_ok=True)
+        groups.setdefault(source, []).append(entry)
+
+    # Workbook có nhiều job / file lớn được đưa vào hàng đợi trước để các worker kết thúc gần như cùng lúc
+    ordered = sorted(groups.items(), key=lambda item: (len(item[1]), item[0].stat().st_size), reverse=True)
+
+    with OperationLog(logger, "Xuất PDF") as op:
+        own_pool = pool is None and bool(ordered)
+        if own_pool:
+            pool = ExcelAppPool(size=min(workers, len(ordered)), app_factory=app_factory, engine=engine)
+        try:
+            submitted_at = time.perf_counter()
+            futures = [(entries, pool.submit(_export_group, source, entries, exporter, submitted_at))
+                       for source, entries in ordered]
+            for entries, future in futures:
+                try:
+                    outcomes, wait_seconds, open_seconds = future.result()
+                except Exception as e:
+                    outcomes, wait_seconds, open_seconds = [(0.0, e)] * len(entries), 0.0, 0.0
+                for entry, (seconds, error) in zip(entries, outcomes):
+                    entry['seconds'] = seconds
+                    entry['wait_seconds'] = wait_seconds
+                    entry['open_seconds'] = open_seconds / len(entries)
+                    if error is None:
+                        entry['status'] = 'exported'
+                        op.count('exported', item=entry['output'])
+                    else:
+                        entry['status'] = 'failed'
+                        entry['error'] = str(error)
+                        op.failed(entry['output'], error)
+        finally:
+            if own_pool:
+                pool.shutdown()
+        for entry in report:
+            if entry['status'] == 'failed' and entry['source'] not in groups:
+                op.failed(entry['output'], entry['error'])
+    return report
@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""
+File: profiler.py
+Author: Your Name / Tên của bạn
+Description: Chứa class Profiler: đo các lần gọi xuống backend (COM với engine 'xlwings', openpyxl
+             với engine 'file') của ExcelApp, Workbook, Sheet, Range, Shape.
+
+Cách hoạt động:
+    - Khi truyền profiler vào ExcelApp(profiler=...), backend của ứng dụng được bọc bởi một proxy;
+      mọi đối tượng backend lấy ra từ nó (book, sheet, range, shape) cũng được bọc.
+    - Mỗi lần gọi phương thức hoặc đọc/ghi thuộc tính được ghi nhận theo tên thao tác
+      (ví dụ 'Range.get_values', 'Range.value.set', 'Book.delete_names'): số lần gọi, thời gian,
+      số ô dữ liệu truyền qua; với callers=True còn ghi phương thức public của thư viện đã gọi xuống
+      (ví dụ 'Workbook.save').
+    - Không truyền profiler thì không có proxy nào được tạo: không tốn thêm chi phí.
+
+Ví dụ:
+    profiler = Profiler(trace=True)
+    app = ExcelApp(engine='file', profiler=profiler)
+    ...
+    print(profiler.summary())
+    profiler.to_json('profile.json')
+    profiler.to_chrome_trace('trace.json')   # Mở bằng chrome://tracing hoặc https://ui.perfetto.dev
+
+--- CHANGELOG ---
+Version 0.3.0 (2026-10-17):
+    - Giảm chi phí đo: phương thức gọi xuống (caller) được tra theo từng code object và lưu cache,
+      loại đối tượng backend và cách truy cập thuộc tính được lưu cache theo kiểu, tham số chỉ được
+      sao chép khi có proxy cần gỡ bọc.
+    - Ghi lại caller và trace từng lần gọi giờ là tùy chọn (callers=True, trace=True).
+    - _record() được bảo vệ bằng lock: một Profiler dùng chung được cho nhiều luồng (ví dụ ExcelAppPool).
+
+Version 0.2.0 (2026-10-17):
+    - Dùng logging (log_utils.py) thay cho print().
+
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo class Profiler và proxy đo các lần gọi backend.
+-------------------
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import types
+from .backend import AppBackend, BookBackend, SheetBackend, RangeBackend, ShapeBackend
+from .log_utils import SUCCESS
+
+logger = logging.getLogger(__name__)
+
+# Tên thao tác theo loại đối tượng backend
+_KINDS = ((AppBackend, 'App'), (BookBackend, 'Book'), (SheetBackend, 'Sheet'),
+          (RangeBackend, 'Range'), (ShapeBackend, 'Shape'))
+
+# Thao tác đọc dữ liệu (đếm số ô của kết quả) và ghi dữ liệu (đếm số ô của tham số dữ liệu)
+_READ_OPS = {'get_values', 'get_formulas', 'get_array', 'value', 'formula'}
+_WRITE_OPS = {'set_values': 0, 'set_array': 0, 'write_row_block': 2, 'value': 0, 'formula': 0}
+
+# Các file của những class public; phương thức gọi xuống backend được tìm trong các file này
+_WRAPPER_FILES = {os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+                  for name in ('excelapp.py', 'workbook.py', 'sheet.py', 'range.py', 'shape.py')}
+
+
+# Cache theo kiểu: loại đối tượng backend; theo code object: tên phương thức public (None nếu không phải)
+_kind_cache = {}
+_caller_cache = {}
+
+
+def _kind_of(obj):
+    cls = type(obj)
+    kind = _kind_cache.get(cls, False)
+    if kind is False:
+        kind = _kind_cache[cls] = next((kind for base, kind in _KINDS if issubclass(cls, base)), None)
+    return kind
+
+
+def _count_cells(data):
+    """(Hàm nội bộ) Số ô trong dữ liệu đọc/ghi: list 2 chiều, list 1 chiều, mảng NumPy hoặc giá trị đơn."""
+    if data is None:
+        return 0
+    size = getattr(data, 'size', None)
+    if isinstance(size, int) and hasattr(data, 'shape'):
+        return size
+    if isinstance(data, (list, tuple)):
+        return sum(len(row) if isinstance(row, (list, tuple)) else 1 for row in data)
+    return 1
+
+
+def _method_name(code):
+    """(Hàm nội bộ) Tên phương thức public của thư viện ứng với code object, None nếu không phải."""
+    name = _caller_cache.get(code, False)
+    if name is False:
+        name = None
+        if code.co_filename in _WRAPPER_FILES and (not code.co_name.startswith(('_', '<'))
+                                                   or code.co_name == '__init__'):
+            name = getattr(code, 'co_qualname', code.co_name)
+        _caller_cache[code] = name
+    return name
+
+
+def _calling_method():
+    """(Hàm nội bộ) Phương thức public gần nhất của thư viện trên call stack (ví dụ 'Workbook.save')."""
+    frame = sys._getframe(3)
+    while frame is not None:
+        name = _method_name(frame.f_code)
+        if name is not None:
+            return name
+        frame = frame.f_back
+    return None
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q
+    low = int(pos)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (pos - low)
+
+
+class Profiler:
+    """
+    Thu thập thống kê các lần gọi backend.
+
+    Args:
+        trace (bool): True để ghi lại từng lần gọi cho file Chrome trace.
+        max_events (int): Số sự kiện trace tối đa được giữ (các sự kiện sau bị bỏ qua).
+        callers (bool): True để ghi nhận phương thức public đã gọi xuống backend (cột 'Top caller');
+                        cần duyệt call stack ở mỗi lần gọi.
+    """
+    def __init__(self, trace=False, max_events=1000000, callers=False):
+        self.trace = trace
+        self.max_events = max_events
+        self.callers = callers
+        self.enabled = True
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __repr__(self):
+        return f"<Profiler [{len(self._ops)} operations, {sum(op['count'] for op in self._ops.values())} calls]>"
+
+    def reset(self):
+        """Xóa toàn bộ số liệu đã thu thập."""
+        with self._lock:
+            self._ops = {}
+            self._events = []
+            self._dropped_events = 0
+            self._origin = time.perf_counter()
+
+    # --- Wrapping ---
+    def wrap(self, backend):
+        """Bọc một đối tượng backend (thường là AppBackend) để đo các lần gọi của nó."""
+        if isinstance(backend, _ProfiledBackend) or _kind_of(backend) is None:
+            return backend
+        return _ProfiledBackend(backend, self, _kind_of(backend))
+
+    def _wrap_result(self, value):
+        kind = _kind_of(value)
+        if kind is not None:
+            return _ProfiledBackend(value, self, kind)
+        if (type(value) is list or type(value) is tuple) and value:
+            # Danh sách đối tượng backend, hoặc danh sách tuple (sheet, tên, ...) như sheet_metadata()
+            first = value[0]
+            if _kind_of(first) is not None or (isinstance(first, tuple) and first and _kind_of(first[0]) is not None):
+                return type(value)(self._wrap_result(item) for item in value)
+        return value
+
+    # --- Recording ---
+    def _record(self, name, start, end, cells=0, error=False):
+        duration = end - start
+        caller = _calling_method() if self.callers else None
+        with self._lock:
+            op = self._ops.get(name)
+            if op is None:
+                op = self._ops[name] = {'count': 0, 'total': 0.0, 'durations': [], 'cells': 0,
+                                        'errors': 0, 'callers': {}}
+            op['count'] += 1
+            op['total'] += duration
+            op['durations'].append(duration)
+            if cells:
+                op['cells'] += cells
+            if error:
+                op['errors'] += 1
+            if caller is not None:
+                op['callers'][caller] = op['callers'].get(caller, 0) + 1
+            if self.trace:
+                if len(self._events) < self.max_events:
+                    self._events.append((name, start, duration, caller, cells, threading.get_ident()))
+                else:
+                    self._dropped_events += 1
+
+    def _call(self, name, attr, func, args, kwargs):
+        """(Hàm nội bộ) Gọi và đo một phương thức backend."""
+        if not self.enabled:
+            return self._wrap_result(func(*args, **kwargs))
+        for a in args:
+            if type(a) is _ProfiledBackend:
+                args = tuple(_unwrap(a) for a in args)
+                break
+        if kwargs and any(type(v) is _ProfiledBackend for v in kwargs.values()):
+            kwargs = {k: _unwrap(v) for k, v in kwargs.items()}
+        cells = 0
+        position = _WRITE_OPS.get(attr)
+        if position is not None and attr not in ('value', 'formula'):
+            data = args[position] if len(args) > position else next(iter(kwargs.values()), None)
+            cells = _count_cells(data)
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            self._record(name, start, time.perf_counter(), cells, error=True)
+            raise
+        end = time.perf_counter()
+        if isinstance(result, types.GeneratorType):
+            self._record(name, start, end, cells)
+            return self._profile_generator(name + '.next', result)
+        if attr in _READ_OPS:
+            cells = _count_cells(result)
+        self._record(name, start, end, cells)
+        return self._wrap_result(result)
+
+    def _profile_generator(self, name, generator):
+        """(Hàm nội bộ) Đo từng bước của generator (ví dụ đọc stream theo khối)."""
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(generator)
+            except StopIteration:
+                return
+            end = time.perf_counter()
+            if self.enabled:
+                rows = item[1] if isinstance(item, tuple) and len(item) == 2 else item
+                self._record(name, start, end, _count_cells(rows))
+            yield item
+
+    # --- Reports ---
+    def stats(self):
+        """
+        Thống kê theo thao tác, sắp xếp theo tổng thời gian giảm dần.
+
+        Returns:
+            list: dict {'operation', 'calls', 'total_ms', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms',
+                  'max_ms', 'cells', 'errors', 'callers' ({phương thức public: số lần gọi})}.
+        """
+        rows = []
+        for name, op in self._ops.items():
+            durations = sorted(op['durations'])
+            rows.append({
+                'operation': name,
+                'calls': op['count'],
+                'total_ms': op['total'] * 1000,
+                'mean_ms': op['total'] * 1000 / op['count'],
+                'p50_ms': _percentile(durations, 0.50) * 1000,
+                'p95_ms': _percentile(durations, 0.95) * 1000,
+                'p99_ms': _percentile(durations, 0.99) * 1000,
+                'max_ms': durations[-1] * 1000,
+                'cells': op['cells'],
+                'errors': op['errors'],
+                'callers': dict(sorted(op['callers'].items(), key=lambda item: -item[1])),
+            })
+        rows.sort(key=lambda row: -row['total_ms'])
+        return rows
+
+    def summary(self, top=None):
+        """Bảng tổng kết dạng văn bản (top: chỉ hiện top thao tác tốn thời gian nhất)."""
+        rows = self.stats()[:top] if top else self.stats()
+        header = (f"{'Operation':<32} {'Calls':>8} {'Total ms':>10} {'Mean ms':>9} {'p50 ms':>9} "
+                  f"{'p95 ms':>9} {'p99 ms':>9} {'Cells':>10}  Top caller")
+        lines = [header, '-' * len(header)]
+        for row in rows:
+            caller = next(iter(row['callers']), None) or '-'
+            lines.append(f"{row['operation']:<32} {row['calls']:>8} {row['total_ms']:>10.1f} "
+                         f"{row['mean_ms']:>9.3f} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} "
+                         f"{row['p99_ms']:>9.3f} {row['cells']:>10}  {caller}")
+        total_calls = sum(row['calls'] for row in rows)
+        total_ms = sum(row['total_ms'] for row in rows)
+        lines.append(f"Tổng: {total_calls} lần gọi, {total_ms:.1f} ms.")
+        return '\n'.join(lines)
+
+    def to_json(self, path=None):
+        """Báo cáo JSON {'operations': stats(), 'dropped_events'}. Ghi ra file nếu có path, trả về chuỗi JSON."""
+        text = json.dumps({'operations': self.stats(), 'dropped_events': self._dropped_events},
+                          ensure_ascii=False, indent=2, default=str)
+        if path is not None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            logger.log(SUCCESS, "Đã ghi báo cáo profiler ra '%s'.", path)
+        return text
+
+    def to_chrome_trace(self, path):
+        """Ghi file Chrome trace (định dạng Trace Event), mở bằng chrome://tracing hoặc Perfetto."""
+        if not self.trace:
+            logger.warning("Profiler được tạo với trace=False: file trace sẽ không có sự kiện nào.")
+        pid = os.getpid()
+        events = [{'name': name, 'cat': name.split('.', 1)[0], 'ph': 'X', 'pid': pid, 'tid': tid,
+                   'ts': (start - self._origin) * 1e6, 'dur': duration * 1e6,
+                   'args': {'caller': caller, 'cells': cells}}
+                  for name, start, duration, caller, cells, tid in self._events]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        if self._dropped_events:
+            logger.warning("Đã bỏ qua %s sự kiện vượt quá max_events=%s.", self._dropped_events, self.max_events)
+        logger.log(SUCCESS, "Đã ghi %s sự kiện trace ra '%s'.", len(events), path)
+        return path
+
+
+# (kiểu backend, tên thuộc tính) -> (True nếu là property/thuộc tính dữ liệu, tên thao tác)
+_attr_cache = {}
+
+
+def _unwrap(value):
+    """(Hàm nội bộ) Lấy đối tượng backend gốc khi truyền proxy làm tham số (ví dụ copy_to(destination))."""
+    if isinstance(value, _ProfiledBackend):
+        return object.__getattribute__(value, '_target')
+    return value
+
+
+class _ProfiledBackend:
+    """(Nội bộ) Proxy của một đối tượng backend, ghi nhận mọi lần gọi qua Profiler."""
+    __slots__ = ('_target', '_profiler', '_kind', '__weakref__')
+
+    def __init__(self, target, profiler, kind):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_profiler', profiler)
+        object.__setattr__(self, '_kind', kind)
+
+    def __repr__(self):
+        return f"<Profiled {self._target!r}>"
+
+    def __eq__(self, other):
+        return self._target == _unwrap(other)
+
+    def __hash__(self):
+        return hash(self._target)
+
+    def __getattribute__(self, attr):
+        # Thay cho __getattr__: tránh một lần tra cứu thất bại (kèm AttributeError) ở mỗi lần truy cập
+        if attr[0] == '_':
+            try:
+                return object.__getattribute__(self, attr)
+            except AttributeError:
+                return getattr(object.__getattribute__(self, '_target'), attr)
+        target = object.__getattribute__(self, '_target')
+        profiler = object.__getattribute__(self, '_profiler')
+        key = (type(target), attr)
+        cached = _attr_cache.get(key)
+        if cached is None:
+            kind = object.__getattribute__(self, '_kind')
+            descriptor = getattr(key[0], attr, None)
+            is_property = isinstance(descriptor, property) or descriptor is None
+            name = f"{kind}.{attr}.get" if is_property else f"{kind}.{attr}"
+            cached = _attr_cache[key] = (is_property, name)
+        is_property, name = cached
+        if is_property:
+            if not profiler.enabled:
+                return profiler._wrap_result(getattr(target, attr))
+            start = time.perf_counter()
+            try:
+                value = getattr(target, attr)
+            except BaseException:
+                profiler._record(name, start, time.perf_counter(), error=True)
+                raise
+            end = time.perf_counter()
+            profiler._record(name, start, end, _count_cells(value) if attr in _READ_OPS else 0)
+            return profiler._wrap_result(value)
+        bound = getattr(target, attr)
+        if not callable(bound):
+            return bound
+
+        def call(*args, **kwargs):
+            return profiler._call(name, attr, bound, args, kwargs)
+        return call
+
+    def __setattr__(self, attr, value):
+        target, profiler = self._target, self._profiler
+        value = _unwrap(value)
+        if not profiler.enabled or attr.startswith('_'):
+            setattr(target, attr, value)
+            return
+        start = time.perf_counter()
+        try:
+            setattr(target, attr, value)
+        except BaseException:
+            profiler._record(f"{self._kind}.{attr}.set", start, time.perf_counter(), error=True)
+            raise
+        profiler._record(f"{self._kind}.{attr}.set", start, time.perf_counter(),
+                         _count_cells(value) if attr in _WRITE_OPS else 0)
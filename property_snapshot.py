@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+File: property_snapshot.py
+Author: Your Name / Tên của bạn
+Description: Chứa class PropertySnapshot: cache tạm thời cho các thuộc tính vị trí/địa chỉ
+             của Range và Shape, dùng qua `with sheet.snapshot():`.
+
+--- CHANGELOG ---
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo class PropertySnapshot với bộ đếm hits/misses.
+-------------------
+"""
+
+
+class PropertySnapshot:
+    """
+    Cache thuộc tính trong phạm vi một khối `with sheet.snapshot():`.
+
+    Mỗi thuộc tính chỉ được đọc từ backend một lần (miss), các lần sau lấy từ cache (hit).
+    Ghi qua wrapper (ví dụ shape.left = 10) vẫn được gửi xuống backend và cập nhật cache.
+    Cache bị xóa khi thoát khối with; bộ đếm vẫn đọc được sau đó.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._values = {}
+        # Giữ tham chiếu tới các đối tượng đã cache để id() không bị tái sử dụng trong khối with
+        self._owners = {}
+        self._depth = 0
+
+    def __repr__(self):
+        return f"<PropertySnapshot hits={self.hits} misses={self.misses}>"
+
+    @property
+    def stats(self):
+        """Thống kê {'hits', 'misses', 'hit_rate'}."""
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0}
+
+    def get(self, owner, attr, fetch):
+        """Trả về giá trị đã cache của owner.attr, gọi fetch() để đọc nếu chưa có."""
+        key = (id(owner), attr)
+        try:
+            value = self._values[key]
+        except KeyError:
+            self.misses += 1
+            value = fetch()
+            self._values[key] = value
+            self._owners[id(owner)] = owner
+            return value
+        self.hits += 1
+        return value
+
+    def set(self, owner, attr, value):
+        """Cập nhật cache sau khi giá trị đã được ghi xuống backend."""
+        self._values[(id(owner), attr)] = value
+        self._owners[id(owner)] = owner
+
+    def clear(self):
+        """Xóa toàn bộ giá trị đã cache."""
+        self._values.clear()
+        self._owners.clear()
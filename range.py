@@ -5,6 +5,32 @@ Author: Your Name / Tên của bạn
 Description: Chứa class Range để đại diện và thao tác với một ô hoặc một vùng ô.
 
 --- CHANGELOG ---
+Version 0.8.0 (2026-10-17):
+    - Vùng thay đổi được ghi nhận theo kích thước thực của dữ liệu ghi (.from_numpy(), ghi list vào .value)
+      thay vì chỉ ô được dùng để tạo vùng.
+
+Version 0.7.0 (2026-10-17):
+    - Thêm .to_pdf(): xuất vùng ra PDF (chờ Excel sẵn sàng, không kích hoạt cửa sổ).
+
+Version 0.6.0 (2026-10-17):
+    - Ghi giá trị/công thức, .from_numpy(), .clear(), .clear_contents(), .copy_to() được ghi nhận vào
+      danh sách vùng thay đổi của workbook (dùng cho workbook.calculate(scope='dirty')).
+
+Version 0.5.0 (2026-10-17):
+    - Trong khối workbook.batch(), ghi .value/.formula, .style() và .merge() được đưa vào hàng đợi
+      và gửi xuống backend khi kết thúc khối; đọc dữ liệu sẽ gửi các thao tác đang chờ trước.
+
+Version 0.4.0 (2026-10-17):
+    - .address, .row, .column, .shape dùng cache của sheet.snapshot() khi đang bật.
+
+Version 0.3.0 (2026-10-17):
+    - Thêm đọc/ghi cả khối dưới dạng mảng NumPy: .to_numpy(), .from_numpy(), .to_columns().
+    - Thêm thuộc tính .shape.
+
+Version 0.2.0 (2026-10-17):
+    - Range hoạt động trên giao diện backend (self._impl) thay vì gọi trực tiếp xlwings,
+      dùng được với cả engine 'xlwings' và 'file'.
+
 Version 0.1.0 (2025-08-08):
     - Khởi tạo class Range.
     - Properties: .value, .formula, .address, .sheet, .row, .column.
@@ -12,41 +38,108 @@ Version 0.1.0 (2025-08-08):
 -------------------
 """
 
+from .converters import to_typed_array, array_extent
+from .formula_scanner import column_letter
+from .cell_blocks import parse_block
+
+
+def _list_extent(data):
+    """(Hàm nội bộ) (số dòng, số cột) của dữ liệu dạng list khi ghi vào vùng; None với giá trị đơn."""
+    if not isinstance(data, (list, tuple)) or not data:
+        return None
+    if isinstance(data[0], (list, tuple)):
+        return len(data), max(len(row) for row in data)
+    return 1, len(data)
+
+
 class Range:
     """
     Đại diện cho một ô hoặc một vùng ô trong một sheet.
     Cung cấp các phương thức để đọc, ghi và định dạng dữ liệu.
     """
-    def __init__(self, xlw_range, sheet_instance):
-        self._xlw_range = xlw_range
+    def __init__(self, range_impl, sheet_instance, spec=None):
+        self._impl = range_impl
         self._sheet = sheet_instance
+        # Tham số (cell1, cell2) đã dùng để tạo vùng, giúp xác định vị trí mà không cần gọi backend
+        self._spec = spec
 
     def __repr__(self):
         return f"<Range [{self.address}] on Sheet [{self.sheet.name}]>"
 
+    def _cached(self, attr):
+        """(Hàm nội bộ) Đọc thuộc tính của backend, qua cache nếu sheet đang ở chế độ snapshot."""
+        snap = self._sheet._snapshot
+        if snap is None:
+            return getattr(self._impl, attr)
+        return snap.get(self, attr, lambda: getattr(self._impl, attr))
+
+    def _block(self):
+        """(Hàm nội bộ) Vị trí (dòng đầu, cột đầu, dòng cuối, cột cuối) của vùng, None nếu không xác định."""
+        block = parse_block(*self._spec) if self._spec is not None else None
+        if block is None:
+            block = parse_block(self.address)
+        return block
+
+    def _batch(self):
+        """(Hàm nội bộ) WriteBatch đang hoạt động của workbook, None nếu không có."""
+        return self._sheet._workbook._batch
+
+    def _mark_dirty(self, formulas=None, extent=None):
+        """
+        (Hàm nội bộ) Ghi nhận vùng này đã thay đổi; vị trí lấy từ tham số tạo vùng, không gọi backend.
+        extent (số dòng, số cột) là kích thước dữ liệu được ghi bắt đầu từ ô trên cùng bên trái,
+        có thể vượt ra ngoài vùng (ví dụ ghi cả mảng vào một ô).
+        """
+        block = parse_block(*self._spec) if self._spec is not None else None
+        if block is not None and extent is not None:
+            first_row, first_col, last_row, last_col = block
+            block = (first_row, first_col, max(last_row, first_row + extent[0] - 1),
+                     max(last_col, first_col + extent[1] - 1))
+        self._sheet._workbook._mark_dirty(self._sheet, block, formulas)
+
+    def _flush_pending(self):
+        """(Hàm nội bộ) Gửi các thao tác ghi đang chờ trước khi đọc hoặc thao tác trực tiếp."""
+        batch = self._sheet._workbook._batch
+        if batch is not None and batch.has_pending:
+            batch.flush()
+
     # --- Properties ---
     @property
     def value(self):
         """Lấy hoặc đặt giá trị cho vùng."""
-        return self._xlw_range.value
+        self._flush_pending()
+        return self._impl.value
     
     @value.setter
     def value(self, data):
-        self._xlw_range.value = data
+        self._mark_dirty(data if isinstance(data, (str, list, tuple)) else None, _list_extent(data))
+        batch = self._batch()
+        if batch is not None:
+            if batch.queue_values(self, data):
+                return
+            batch.flush()
+        self._impl.value = data
 
     @property
     def formula(self):
         """Lấy hoặc đặt công thức cho vùng."""
-        return self._xlw_range.formula
+        self._flush_pending()
+        return self._impl.formula
 
     @formula.setter
     def formula(self, formula_string):
-        self._xlw_range.formula = formula_string
+        self._mark_dirty(formula_string)
+        batch = self._batch()
+        if batch is not None:
+            if batch.queue_values(self, formula_string):
+                return
+            batch.flush()
+        self._impl.formula = formula_string
 
     @property
     def address(self):
         """Trả về địa chỉ của vùng (ví dụ: '$A$1:$B$10')."""
-        return self._xlw_range.address
+        return self._cached('address')
 
     @property
     def sheet(self):
@@ -56,22 +149,77 @@ class Range:
     @property
     def row(self):
         """Trả về số thứ tự dòng bắt đầu của vùng."""
-        return self._xlw_range.row
+        return self._cached('row')
 
     @property
     def column(self):
         """Trả về số thứ tự cột bắt đầu của vùng."""
-        return self._xlw_range.column
+        return self._cached('column')
+
+    @property
+    def shape(self):
+        """Trả về kích thước của vùng dưới dạng (số dòng, số cột)."""
+        return self._cached('shape')
+
+    # --- Bulk Array Transfer ---
+    def to_numpy(self, dtype=None):
+        """
+        Đọc toàn bộ vùng thành mảng NumPy 2 chiều trong một lần gọi backend.
+
+        Args:
+            dtype (str or numpy.dtype, optional): Kiểu dữ liệu đích (ví dụ: float, 'datetime64[s]').
+                Ô trống: NaN với float, NaT với datetime64, '' với str, None với object.
+                Xem converters.py để biết đầy đủ quy tắc.
+        """
+        self._flush_pending()
+        return to_typed_array(self._impl.get_array(), dtype)
+
+    def from_numpy(self, arr):
+        """
+        Ghi một mảng NumPy bắt đầu từ ô trên cùng bên trái của vùng trong một lần gọi backend.
+        NaN/NaT được ghi thành ô trống. Mảng 1 chiều được ghi thành một dòng,
+        dùng arr.reshape(-1, 1) để ghi thành một cột.
+        """
+        self._flush_pending()
+        self._impl.set_array(arr)
+        self._mark_dirty(extent=array_extent(arr))
+        return self
+
+    def to_columns(self, dtypes=None, header=False):
+        """
+        Đọc vùng theo dạng cột: trả về dict {tên cột: mảng NumPy 1 chiều}.
+
+        Args:
+            dtypes (dtype or dict, optional): Một kiểu cho tất cả các cột, hoặc dict {tên cột: kiểu}.
+            header (bool): Nếu True, dòng đầu tiên là tên cột; nếu False, tên cột là chữ cái cột ('A', 'B', ...).
+        """
+        self._flush_pending()
+        data = self._impl.get_array()
+        if header:
+            names = [str(name) for name in data[0]]
+            data = data[1:]
+        else:
+            names = [column_letter(self.column + j) for j in range(data.shape[1])]
+
+        columns = {}
+        for j, name in enumerate(names):
+            dtype = dtypes.get(name) if isinstance(dtypes, dict) else dtypes
+            columns[name] = to_typed_array(data[:, j:j + 1], dtype)[:, 0]
+        return columns
 
     # --- Content Management ---
     def clear(self):
         """Xóa tất cả nội dung và định dạng của vùng."""
-        self._xlw_range.clear()
+        self._flush_pending()
+        self._impl.clear()
+        self._mark_dirty()
         return self
 
     def clear_contents(self):
         """Chỉ xóa nội dung, giữ lại định dạng."""
-        self._xlw_range.clear_contents()
+        self._flush_pending()
+        self._impl.clear_contents()
+        self._mark_dirty()
         return self
 
     def copy_to(self, destination):
@@ -81,8 +229,20 @@ class Range:
         Args:
             destination (Range or str): Đối tượng Range hoặc địa chỉ ô đích (ví dụ: 'D1').
         """
-        dest_range = destination._xlw_range if isinstance(destination, Range) else self.sheet._xlw_sheet.range(destination)
-        self._xlw_range.copy(dest_range)
+        dest_range = destination._impl if isinstance(destination, Range) else self.sheet._impl.range(destination)
+        self._flush_pending()
+        self._impl.copy_to(dest_range)
+        if isinstance(destination, Range):
+            destination._mark_dirty()
+        else:
+            self._sheet._workbook._mark_dirty(self._sheet)
+        return self
+
+    def to_pdf(self, output_path, quality='standard', ready_timeout=30):
+        """Xuất vùng này ra file PDF (xem Workbook.to_pdf())."""
+        self._flush_pending()
+        self._sheet._workbook.wait_until_ready(ready_timeout)
+        self._impl.export_pdf(output_path, quality=quality)
         return self
 
     # --- Formatting ---
@@ -97,29 +257,32 @@ class Range:
             interior_color (str or tuple, optional): Màu nền.
             number_format (str, optional): Định dạng số (ví dụ: '0.00%', '#,##0').
         """
-        if font_bold is not None:
-            self._xlw_range.font.bold = font_bold
-        if font_italic is not None:
-            self._xlw_range.font.italic = font_italic
-        if font_color:
-            self._xlw_range.font.color = font_color
-        if interior_color:
-            self._xlw_range.color = interior_color
-        if number_format:
-            self._xlw_range.number_format = number_format
+        batch = self._batch()
+        if batch is not None:
+            batch.queue_style(self, font_bold=font_bold, font_italic=font_italic, font_color=font_color,
+                              interior_color=interior_color, number_format=number_format)
+            return self
+        self._impl.apply_style(font_bold=font_bold, font_italic=font_italic, font_color=font_color,
+                               interior_color=interior_color, number_format=number_format)
         return self
 
     def merge(self):
         """Hợp nhất các ô trong vùng này thành một ô duy nhất."""
-        self._xlw_range.merge()
+        batch = self._batch()
+        if batch is not None:
+            batch.queue_merge(self)
+            return self
+        self._impl.merge()
         return self
 
     def unmerge(self):
         """Tách các ô đã được hợp nhất."""
-        self._xlw_range.unmerge()
+        self._flush_pending()
+        self._impl.unmerge()
         return self
 
     def autofit(self):
         """Tự động điều chỉnh độ rộng cột và chiều cao hàng của vùng này."""
-        self._xlw_range.autofit()
+        self._flush_pending()
+        self._impl.autofit()
         return self
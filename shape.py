@@ -5,6 +5,19 @@ Author: Your Name / Tên của bạn
 Description: Chứa class Shape để đại diện và thao tác với các đối tượng đồ họa.
 
 --- CHANGELOG ---
+Version 0.5.0 (2026-10-17):
+    - Dùng logging (log_utils.py) thay cho print().
+
+Version 0.4.0 (2026-10-17):
+    - Trong khối workbook.batch(), ghi .name/.left/.top/.width/.height được đưa vào hàng đợi.
+
+Version 0.3.0 (2026-10-17):
+    - .name, .left, .top, .width, .height dùng cache của sheet.snapshot() khi đang bật;
+      ghi qua các thuộc tính này cập nhật luôn cache.
+
+Version 0.2.0 (2026-10-17):
+    - Shape hoạt động trên giao diện backend (self._impl) thay vì gọi trực tiếp xlwings.
+
 Version 0.1.0 (2025-08-08):
     - Khởi tạo class Shape.
     - Properties: .name, .text, .left, .top, .width, .height, .sheet.
@@ -12,71 +25,101 @@ Version 0.1.0 (2025-08-08):
 -------------------
 """
 
+import logging
+
+logger = logging.getLogger(__name__)
+
+
 class Shape:
     """
     Đại diện cho một đối tượng đồ họa (shape, textbox, picture) trong một sheet.
     """
-    def __init__(self, xlw_shape, sheet_instance):
-        self._xlw_shape = xlw_shape
+    def __init__(self, shape_impl, sheet_instance):
+        self._impl = shape_impl
         self._sheet = sheet_instance
 
     def __repr__(self):
         return f"<Shape [{self.name}] on Sheet [{self.sheet.name}]>"
 
+    def _get(self, attr):
+        """(Hàm nội bộ) Đọc thuộc tính của backend, qua cache nếu sheet đang ở chế độ snapshot."""
+        snap = self._sheet._snapshot
+        if snap is None:
+            return self._read(attr)
+        return snap.get(self, attr, lambda: self._read(attr))
+
+    def _read(self, attr):
+        """(Hàm nội bộ) Đọc thuộc tính từ backend, gửi các thao tác ghi đang chờ trước nếu có."""
+        batch = self._sheet._workbook._batch
+        if batch is not None and batch.has_pending:
+            batch.flush()
+        return getattr(self._impl, attr)
+
+    def _set(self, attr, value):
+        """(Hàm nội bộ) Ghi thuộc tính xuống backend (hoặc hàng đợi của batch) và cập nhật cache nếu có."""
+        batch = self._sheet._workbook._batch
+        if batch is not None:
+            batch.queue_shape(self, attr, value)
+        else:
+            setattr(self._impl, attr, value)
+        snap = self._sheet._snapshot
+        if snap is not None:
+            snap.set(self, attr, value)
+
     # --- Properties ---
     @property
     def name(self):
         """Lấy hoặc đặt tên cho shape."""
-        return self._xlw_shape.name
+        return self._get('name')
     
     @name.setter
     def name(self, new_name):
-        self._xlw_shape.name = new_name
+        self._set('name', new_name)
 
     @property
     def text(self):
         """Lấy hoặc đặt nội dung văn bản của shape (nếu có)."""
-        return self._xlw_shape.text
+        return self._impl.text
     
     @text.setter
     def text(self, new_text):
-        self._xlw_shape.text = new_text
+        self._impl.text = new_text
 
     @property
     def left(self):
         """Vị trí cạnh trái của shape."""
-        return self._xlw_shape.left
+        return self._get('left')
 
     @left.setter
     def left(self, value):
-        self._xlw_shape.left = value
+        self._set('left', value)
 
     @property
     def top(self):
         """Vị trí cạnh trên của shape."""
-        return self._xlw_shape.top
+        return self._get('top')
 
     @top.setter
     def top(self, value):
-        self._xlw_shape.top = value
+        self._set('top', value)
 
     @property
     def width(self):
         """Độ rộng của shape."""
-        return self._xlw_shape.width
+        return self._get('width')
 
     @width.setter
     def width(self, value):
-        self._xlw_shape.width = value
+        self._set('width', value)
 
     @property
     def height(self):
         """Chiều cao của shape."""
-        return self._xlw_shape.height
+        return self._get('height')
 
     @height.setter
     def height(self, value):
-        self._xlw_shape.height = value
+        self._set('height', value)
 
     @property
     def sheet(self):
@@ -86,8 +129,11 @@ class Shape:
     # --- Actions ---
     def delete(self):
         """Xóa shape này."""
-        print(f"INFO: Đang xóa shape '{self.name}'...")
-        self._xlw_shape.delete()
+        logger.info("Đang xóa shape '%s'...", self.name)
+        batch = self._sheet._workbook._batch
+        if batch is not None:
+            batch.flush()
+        self._impl.delete()
         # Sau khi xóa, đối tượng này không còn hợp lệ, không return self
 
     def copy(self):
@@ -95,6 +141,6 @@ class Shape:
         Sao chép shape này vào clipboard.
         Lưu ý: Việc dán (paste) sẽ là một phương thức của Sheet.
         """
-        print(f"INFO: Đang sao chép shape '{self.name}' vào clipboard...")
-        self._xlw_shape.api.Copy()
+        logger.info("Đang sao chép shape '%s' vào clipboard...", self.name)
+        self._impl.copy()
         return self # Có thể return self để nối chuỗi nếu cần
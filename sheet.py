@@ -1,198 +1,356 @@
 # -*- coding: utf-8 -*-
 """
-File: workbook.py
+File: sheet.py
 Author: Your Name / Tên của bạn
-Description: Chứa class Workbook để đại diện và quản lý một file Excel.
+Description: Chứa class Sheet để đại diện và thao tác với một trang tính (worksheet).
 
 --- CHANGELOG ---
-Version 0.2.0 (2025-08-08):
-    - Thêm phương thức .for_each_sheet() để thực thi hành động trên hàng loạt sheet.
-    - Thêm các phương thức quản lý Named Range: .add_named_range(), .get_named_range(), .delete_named_range().
-    - Thêm các phương thức bảo vệ: .protect(), .unprotect().
-    - Thêm phương thức tính toán lại: .calculate().
-
-Version 0.1.0 (2025-08-08):
-    - Khởi tạo class Workbook với các chức năng cơ bản.
-    - Methods: .save(), .save_as(), .close(), .activate(), .sheet(), .add_sheet(), .delete_sheet(), .to_pdf().
+Version 0.11.0 (2026-10-17):
+    - .iter_rows(with_start_row=True) trả về kèm số thứ tự dòng đầu của mỗi khối. Đọc stream (engine 'file',
+      chỉ đọc) và đọc qua vùng trả về cùng các dòng: từ dòng đầu đến dòng cuối của used range.
+
+Version 0.10.0 (2026-10-17):
+    - .append_rows() với DataFrame đi qua converters.array_to_rows() theo từng khối:
+      NaN/NaT trong cột kiểu hỗn hợp được ghi thành ô trống thay vì chữ 'nan'/'NaT'.
+
+Version 0.9.0 (2026-10-17):
+    - Dùng logging (log_utils.py) thay cho print().
+
+Version 0.8.0 (2026-10-17):
+    - .append_rows() và .clear() được ghi nhận vào danh sách vùng thay đổi của workbook.
+
+Version 0.7.0 (2026-10-17):
+    - Thêm .apply_styles() để định dạng hàng loạt: gom địa chỉ theo định dạng, mỗi định dạng áp dụng
+      một lần cho một vùng nhiều phần.
+
+Version 0.6.0 (2026-10-17):
+    - Range tạo từ .range() ghi nhớ tham số địa chỉ để workbook.batch() xác định vị trí không cần gọi COM.
+    - .clear(), .append_rows(), .iter_rows() gửi các thao tác đang chờ của workbook.batch() trước.
+
+Version 0.5.0 (2026-10-17):
+    - Thêm .snapshot(): trong khối with, các thuộc tính vị trí/địa chỉ của Range và Shape
+      (và danh sách .shapes) chỉ được đọc từ Excel một lần.
+
+Version 0.4.0 (2026-10-17):
+    - .name, .index, .visible đọc từ bảng thông tin sheet được Workbook lưu cache (không gọi COM);
+      ghi qua các thuộc tính này cập nhật luôn cache.
+    - .range() trả về cùng một đối tượng Range cho cùng địa chỉ khi đối tượng đó còn được dùng.
+
+Version 0.3.0 (2026-10-17):
+    - Thêm .append_rows() để ghi nối tiếp dữ liệu lớn theo từng khối, tự theo dõi dòng trống kế tiếp.
+
+Version 0.2.0 (2026-10-17):
+    - Thêm .iter_rows() để đọc sheet rất lớn theo từng khối dòng với bộ nhớ giới hạn.
+
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo class Sheet trên nền giao diện backend (xlwings hoặc file).
+    - Properties: .name, .workbook, .index, .visible, .used_range, .shapes.
+    - Methods: .range(), .cell(), .activate(), .delete(), .clear(), .autofit().
 -------------------
 """
 
-from pathlib import Path
-import time
-from .sheet import Sheet
+import logging
+import weakref
+from contextlib import contextmanager
 from .range import Range
+from .shape import Shape
+from .property_snapshot import PropertySnapshot
+from .backend import STYLE_ATTRIBUTES
+from .cell_blocks import parse_block
+from .converters import to_typed_array, array_to_rows
+from .formula_scanner import column_index
+
+logger = logging.getLogger(__name__)
+
+
+def _iter_array_rows(arr, chunk_size):
+    """(Hàm nội bộ) Duyệt các dòng của mảng NumPy, chuyển đổi từng khối (NaN/NaT -> ô trống)."""
+    if arr.ndim != 2:
+        yield from array_to_rows(arr)
+        return
+    for start in range(0, arr.shape[0], chunk_size):
+        yield from array_to_rows(arr[start:start + chunk_size])
+
+
+def _iter_frame_rows(frame, chunk_size):
+    """(Hàm nội bộ) Duyệt các dòng giá trị của DataFrame theo từng khối (NaN/NaT/NA -> ô trống)."""
+    for start in range(0, len(frame), chunk_size):
+        yield from array_to_rows(frame.iloc[start:start + chunk_size].to_numpy(dtype=object))
+
 
-class Workbook:
+class Sheet:
     """
-    Đại diện cho một file Excel (sổ làm việc).
+    Đại diện cho một trang tính trong workbook.
     """
-    def __init__(self, xlw_book, app_instance):
-        self._xlw_book = xlw_book
-        self._app = app_instance
+    def __init__(self, sheet_impl, workbook_instance):
+        self._impl = sheet_impl
+        self._workbook = workbook_instance
+        # Dòng trống kế tiếp cho append_rows(), None nếu chưa xác định
+        self._next_row = None
+        # Thông tin {'name', 'index', 'visible', 'impl'} do Workbook cung cấp, None nếu chưa có
+        self._meta = None
+        self._range_cache = weakref.WeakValueDictionary()
+        # PropertySnapshot đang hoạt động (trong khối with self.snapshot()), None nếu không có
+        self._snapshot = None
 
     def __repr__(self):
-        return f"<Workbook [{self.name}]>"
+        return f"<Sheet [{self.name}] in Workbook [{self.workbook.name}]>"
 
     # --- Properties ---
     @property
     def name(self):
-        return self._xlw_book.name
+        """Lấy hoặc đặt tên cho sheet."""
+        if self._meta is not None:
+            return self._meta['name']
+        return self._impl.name
 
-    @property
-    def path(self):
-        return Path(self._xlw_book.fullname)
+    @name.setter
+    def name(self, new_name):
+        old_name = self.name
+        self._impl.name = new_name
+        self._workbook._on_sheet_renamed(self, old_name, new_name)
 
     @property
-    def app(self):
-        return self._app
+    def workbook(self):
+        """Trả về đối tượng Workbook cha."""
+        return self._workbook
 
     @property
-    def sheets(self):
-        return [Sheet(s, self) for s in self._xlw_book.sheets]
+    def index(self):
+        """Vị trí của sheet trong workbook (bắt đầu từ 1)."""
+        if self._meta is not None:
+            return self._meta['index']
+        return self._impl.index
 
     @property
-    def visible_sheets(self):
-        return [Sheet(s, self) for s in self._xlw_book.sheets if s.api.Visible == -1]
+    def visible(self):
+        """Lấy hoặc đặt trạng thái hiển thị của sheet."""
+        if self._meta is not None:
+            return self._meta['visible']
+        return self._impl.visible
+
+    @visible.setter
+    def visible(self, value):
+        self._impl.visible = value
+        if self._meta is not None:
+            self._meta['visible'] = bool(value)
 
     @property
-    def hidden_sheets(self):
-        return [Sheet(s, self) for s in self._xlw_book.sheets if s.api.Visible != -1]
+    def used_range(self):
+        """Trả về vùng đang được sử dụng của sheet."""
+        return Range(self._impl.used_range, self)
 
     @property
-    def sheet_names(self):
-        return [s.name for s in self._xlw_book.sheets]
+    def shapes(self):
+        """Trả về danh sách các đối tượng Shape trong sheet."""
+        if self._snapshot is not None:
+            return list(self._snapshot.get(self, 'shapes', lambda: [Shape(s, self) for s in self._impl.shapes]))
+        return [Shape(s, self) for s in self._impl.shapes]
 
-    # --- File Lifecycle & Calculation ---
-    def save(self):
-        self._xlw_book.save()
-        return self
+    @contextmanager
+    def snapshot(self):
+        """
+        Bật chế độ cache thuộc tính cho sheet này trong một khối with.
 
-    def save_as(self, new_path):
-        self._xlw_book.save(new_path)
-        return self
+        Trong khối with, .address/.row/.column/.shape của Range và .name/.left/.top/.width/.height
+        của Shape chỉ được đọc từ Excel ở lần đầu; ghi qua các thuộc tính này vẫn được gửi xuống
+        Excel và cập nhật cache. Chỉ dùng khi sheet không bị thay đổi bố cục (chèn/xóa dòng, cột,
+        shape) bằng cách khác trong khối with.
 
-    def close(self, save_changes=False):
-        if save_changes:
-            self.save()
-        self._xlw_book.close()
+        Yields:
+            PropertySnapshot: Đối tượng chứa bộ đếm .hits, .misses và .stats.
 
-    def activate(self):
-        self._xlw_book.activate()
-        return self
+        Ví dụ:
+            with sheet.snapshot() as snap:
+                for shape in sheet.shapes:
+                    shape.left = shape.left + shape.width
+            print(snap.stats)
+        """
+        snap = self._snapshot or PropertySnapshot()
+        self._snapshot = snap
+        snap._depth += 1
+        try:
+            yield snap
+        finally:
+            snap._depth -= 1
+            if snap._depth == 0:
+                snap.clear()
+                self._snapshot = None
 
-    def calculate(self):
-        """Buộc Excel tính toán lại tất cả các công thức trong workbook."""
-        print(f"INFO: Đang tính toán lại công thức cho workbook '{self.name}'...")
-        self._xlw_book.api.Calculate()
-        return self
+    # --- Ranges ---
+    def range(self, cell1, cell2=None):
+        """
+        Lấy một vùng ô.
 
-    # --- Protection ---
-    def protect(self, password=None):
-        """Bảo vệ cấu trúc của workbook (ngăn thêm, xóa, di chuyển sheet)."""
-        print(f"INFO: Đang bảo vệ workbook '{self.name}'...")
-        self._xlw_book.api.Protect(Password=password)
-        return self
+        Args:
+            cell1 (str or tuple): Địa chỉ ('A1', 'A1:C3') hoặc tọa độ (dòng, cột).
+            cell2 (str or tuple, optional): Ô cuối của vùng nếu cell1 chỉ là ô đầu.
+        """
+        key = (cell1, cell2)
+        try:
+            rng = self._range_cache.get(key)
+        except TypeError:
+            # Tham số không hash được (ví dụ list), không dùng cache
+            return Range(self._impl.range(cell1, cell2), self)
+        if rng is None:
+            rng = Range(self._impl.range(cell1, cell2), self, spec=key)
+            self._range_cache[key] = rng
+        return rng
 
-    def unprotect(self, password=None):
-        """Mở khóa bảo vệ cấu trúc của workbook."""
-        print(f"INFO: Đang mở khóa bảo vệ cho workbook '{self.name}'...")
-        self._xlw_book.api.Unprotect(Password=password)
-        return self
+    def cell(self, row, column):
+        """Lấy một ô theo số thứ tự dòng và cột (bắt đầu từ 1)."""
+        return self.range((row, column))
 
-    # --- Sheet Management ---
-    def sheet(self, specifier):
-        try:
-            return Sheet(self._xlw_book.sheets[specifier], self)
-        except Exception:
-            return None
-    
-    def add_sheet(self, name, before=None, after=None):
-        before_sheet = self._xlw_book.sheets[before] if before else None
-        after_sheet = self._xlw_book.sheets[after] if after else None
-        new_xlw_sheet = self._xlw_book.sheets.add(name, before=before_sheet, after=after_sheet)
-        return Sheet(new_xlw_sheet, self)
-
-    def delete_sheet(self, specifier):
-        try:
-            self.app._app.display_alerts = False
-            self._xlw_book.sheets[specifier].delete()
-            self.app._app.display_alerts = True
-        except Exception as e:
-            print(f"ERROR: Không thể xóa sheet '{specifier}'. Lỗi: {e}")
-            self.app._app.display_alerts = True
-        return self
+    def iter_rows(self, chunk_size=1000, columns=None, as_numpy=False, dtype=None, with_start_row=False):
+        """
+        Đọc sheet theo từng khối gồm chunk_size dòng liên tiếp, bộ nhớ chỉ giữ một khối.
 
-    def delete_hidden_sheets(self):
-        hidden_names = [sheet.name for sheet in self.hidden_sheets]
-        if not hidden_names:
-            return self
-        for name in hidden_names:
-            self.delete_sheet(name)
-        return self
+        Với engine 'file' và workbook mở chỉ đọc, dữ liệu được đọc stream trực tiếp từ XML;
+        với Excel, mỗi khối được đọc bằng một lát cắt vùng (một lần gọi cho mỗi nhóm cột liền kề).
+        Cả hai cách đều trải từ dòng đầu đến dòng cuối của used range; dòng không có dữ liệu trong
+        các cột được đọc là dòng toàn None.
+
+        Args:
+            chunk_size (int): Số dòng mỗi khối.
+            columns (list, optional): Chỉ đọc các cột này, theo đúng thứ tự ('A', 'C' hoặc 1, 3).
+            as_numpy (bool): Nếu True, mỗi khối là một mảng NumPy 2 chiều thay vì list các dòng.
+            dtype (optional): Kiểu dữ liệu của mảng khi as_numpy=True (xem Range.to_numpy).
+            with_start_row (bool): Nếu True, mỗi khối được trả về kèm số thứ tự dòng đầu của nó.
 
-    def for_each_sheet(self, action, include=None, exclude=None):
+        Yields:
+            list or numpy.ndarray: Một khối dòng; tuple (dòng đầu, khối) khi with_start_row=True.
         """
-        Thực thi một hành động trên nhiều sheet.
+        self._workbook._flush_batch()
+        for start_row, rows in self._impl.iter_row_blocks(chunk_size=chunk_size, columns=columns):
+            block = to_typed_array(rows, dtype) if as_numpy else rows
+            yield (start_row, block) if with_start_row else block
+
+    def append_rows(self, rows, chunk_size=1000, start_row=None, column=1):
+        """
+        Ghi nối tiếp các dòng vào cuối sheet, gom thành từng khối chunk_size dòng,
+        mỗi khối ghi bằng một lần gọi. Dữ liệu đầu vào được đọc dần nên có thể là generator.
+
+        Dòng trống kế tiếp chỉ được xác định (từ used_range) ở lần gọi đầu tiên, sau đó được
+        sheet này tự ghi nhớ cho các lần append_rows() tiếp theo. Nếu sheet bị ghi ở chỗ khác
+        giữa các lần gọi, hãy truyền start_row.
 
         Args:
-            action (function): Hàm để thực thi, nhận một đối tượng Sheet làm tham số.
-            include (list, optional): Danh sách tên các sheet cần xử lý.
-            exclude (list, optional): Danh sách tên các sheet cần bỏ qua.
+            rows (iterable): Các dòng (list/tuple), mảng NumPy 2 chiều hoặc pandas DataFrame
+                             (chỉ ghi phần giá trị, không ghi tiêu đề và index).
+            chunk_size (int): Số dòng mỗi khối ghi.
+            start_row (int, optional): Dòng bắt đầu ghi. Mặc định: dòng trống đầu tiên.
+            column (int or str): Cột bắt đầu ghi (1 hoặc 'A').
+
+        Returns:
+            int: Số dòng đã ghi.
         """
-        target_sheets = self.sheets
-        
-        if include:
-            target_sheets = [s for s in target_sheets if s.name in include]
-        
-        if exclude:
-            target_sheets = [s for s in target_sheets if s.name not in exclude]
-
-        print(f"INFO: Đang thực thi hành động trên {len(target_sheets)} sheet...")
-        for sheet in target_sheets:
-            try:
-                action(sheet)
-            except Exception as e:
-                print(f"ERROR: Lỗi khi thực thi hành động trên sheet '{sheet.name}'. Lỗi: {e}")
-        
-        return self
+        if chunk_size < 1:
+            raise ValueError("chunk_size phải lớn hơn 0.")
+        self._workbook._flush_batch()
+        if isinstance(column, str):
+            column = column_index(column)
+        if hasattr(rows, 'itertuples'):
+            rows = _iter_frame_rows(rows, chunk_size)
+        elif hasattr(rows, 'ndim'):
+            rows = _iter_array_rows(rows, chunk_size)
+
+        if start_row is not None:
+            next_row = start_row
+        elif self._next_row is not None:
+            next_row = self._next_row
+        else:
+            next_row = self._impl.next_free_row()
 
-    # --- Named Range Management ---
-    def add_named_range(self, name, address):
-        """Tạo một vùng được đặt tên (Named Range)."""
-        print(f"INFO: Đang tạo Named Range '{name}' cho địa chỉ '{address}'...")
-        self._xlw_book.names.add(name, f"='{self.sheets[0].name}'!{address}")
+        first_row = next_row
+        written = 0
+        width = 0
+        block = []
+        for row in rows:
+            block.append(row)
+            width = max(width, len(row))
+            if len(block) == chunk_size:
+                self._impl.write_row_block(next_row, column, block)
+                next_row += len(block)
+                written += len(block)
+                block = []
+        if block:
+            self._impl.write_row_block(next_row, column, block)
+            next_row += len(block)
+            written += len(block)
+
+        self._next_row = next_row
+        if written:
+            self._workbook._mark_dirty(self, (first_row, column, next_row - 1, column + max(width, 1) - 1))
+        return written
+
+    # --- Formatting ---
+    def apply_styles(self, assignments, styles=None):
+        """
+        Định dạng hàng loạt. Các địa chỉ có cùng định dạng được gom lại và mỗi định dạng chỉ được áp dụng
+        một lần cho một vùng nhiều phần ('A1:B2,D5,...'), chia nhỏ theo giới hạn 255 ký tự địa chỉ của Excel.
+        Với engine 'file', các ô dùng chung một bảng style thay vì tạo định dạng riêng cho từng ô.
+
+        Args:
+            assignments (dict): {khóa định dạng: list địa chỉ ('A1', 'A1:C3' hoặc (dòng, cột))}.
+                                Định dạng được áp dụng theo thứ tự của dict.
+            styles (dict, optional): {khóa định dạng: dict tham số của Range.style()}. Nếu không truyền,
+                                     khóa định dạng chính là tuple các cặp (tên tham số, giá trị).
+
+        Returns:
+            dict: Thống kê {'styles', 'ranges', 'backend_calls'}.
+
+        Ví dụ:
+            sheet.apply_styles(
+                {'header': ['A1:H1'], 'negative': ['C5', 'C9', 'E12']},
+                styles={'header': {'font_bold': True, 'interior_color': '#DDEBF7'},
+                        'negative': {'font_color': '#FF0000'}})
+        """
+        groups = {}
+        total_ranges = 0
+        for key, addresses in assignments.items():
+            style = dict(styles[key]) if styles is not None else dict(key)
+            unknown = set(style) - set(STYLE_ATTRIBUTES)
+            if unknown:
+                raise ValueError(f"Thuộc tính định dạng không hợp lệ: {sorted(unknown)}")
+            frozen = tuple(sorted((attr, tuple(value) if isinstance(value, list) else value)
+                                  for attr, value in style.items() if value not in (None, '')))
+            if not frozen:
+                continue
+            if isinstance(addresses, (str, tuple)):
+                addresses = [addresses]
+            blocks = groups.setdefault(frozen, [])
+            for address in addresses:
+                block = parse_block(address)
+                if block is None:
+                    raise ValueError(f"Địa chỉ không hợp lệ: {address!r}")
+                blocks.append(block)
+            total_ranges += len(addresses)
+
+        self._workbook._flush_batch()
+        calls = self._impl.apply_styles([(dict(style), blocks) for style, blocks in groups.items()])
+        logger.info("Đã áp dụng %s định dạng cho %s vùng trên sheet '%s' bằng %s lần gọi.",
+                    len(groups), total_ranges, self.name, calls)
+        return {'styles': len(groups), 'ranges': total_ranges, 'backend_calls': calls}
+
+    # --- Actions ---
+    def activate(self):
+        """Kích hoạt sheet này."""
+        self._impl.activate()
         return self
 
-    def get_named_range(self, name):
-        """Lấy một đối tượng Range từ một tên đã đặt."""
-        try:
-            xlw_range = self._xlw_book.range(name)
-            # Tìm xem range đó thuộc sheet nào
-            sheet_name = xlw_range.sheet.name
-            sheet_obj = self.sheet(sheet_name)
-            return Range(xlw_range, sheet_obj)
-        except Exception:
-            print(f"ERROR: Không tìm thấy Named Range với tên '{name}'.")
-            return None
-
-    def delete_named_range(self, name):
-        """Xóa một vùng được đặt tên."""
-        try:
-            self._xlw_book.names[name].delete()
-            print(f"SUCCESS: Đã xóa Named Range '{name}'.")
-        except Exception:
-            print(f"ERROR: Không tìm thấy Named Range để xóa với tên '{name}'.")
+    def delete(self, safe=False):
+        """Xóa sheet này khỏi workbook (xem Workbook.delete_sheet)."""
+        self._workbook.delete_sheet(self.name, safe=safe)
+
+    def clear(self):
+        """Xóa toàn bộ nội dung và định dạng của sheet."""
+        self._workbook._flush_batch()
+        self._impl.clear()
+        self._next_row = None
+        self._workbook._mark_dirty(self)
         return self
 
-    # --- Conversion & Publishing ---
-    def to_pdf(self, output_path=None, quality='standard'):
-        if not output_path:
-            output_path = self.path.with_suffix('.pdf')
-        else:
-            output_path = Path(output_path)
-        
-        self.activate()
-        time.sleep(1)
-        quality_val = 0 if quality == 'standard' else 1
-        self._xlw_book.api.ExportAsFixedFormat(0, str(output_path), Quality=quality_val)
+    def autofit(self):
+        """Tự động điều chỉnh độ rộng cột và chiều cao hàng của toàn bộ sheet."""
+        self._impl.autofit()
         return self
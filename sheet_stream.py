@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+File: sheet_stream.py
+Author: Your Name / Tên của bạn
+Description: Đọc (stream) dữ liệu của một sheet trực tiếp từ XML bên trong file .xlsx/.xlsm
+             theo từng khối dòng, bộ nhớ sử dụng không phụ thuộc vào số dòng của sheet.
+
+--- CHANGELOG ---
+Version 0.2.0 (2026-10-17):
+    - Thêm sheet_dimension(): đọc vùng dimension (used range) của sheet mà không duyệt dữ liệu.
+    - iter_row_chunks() bắt đầu và kết thúc theo vùng dimension của sheet (giống used_range khi
+      workbook được nạp), kể cả khi chỉ đọc một số cột; các dòng không có dữ liệu là dòng None.
+
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo module với các hàm: load_shared_strings(), load_date_styles(),
+      iter_sheet_rows(), iter_row_chunks().
+-------------------
+"""
+
+import datetime as dt
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse
+from .formula_scanner import NS_MAIN, get_workbook_rels, get_sheet_parts, column_index
+
+_CELL_REF_RE = re.compile(r'^([A-Za-z]+)(\d+)$')
+_RANGE_REF_RE = re.compile(r'^\$?([A-Za-z]+)\$?(\d+)(?::\$?([A-Za-z]+)\$?(\d+))?$')
+_DATE_TOKEN_RE = re.compile(r'[dmyhs]', re.IGNORECASE)
+_DATE_FORMAT_STRIP_RE = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.|_.|\*.')
+
+# Các numFmtId có sẵn của Excel dành cho ngày/giờ
+_BUILTIN_DATE_FORMATS = set(range(14, 23)) | {27, 30, 36, 45, 46, 47, 50, 57}
+
+SHARED_STRINGS_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings'
+STYLES_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles'
+EXCEL_EPOCH = dt.datetime(1899, 12, 30)
+
+
+def _find_part(zf, rel_type, default):
+    """(Hàm nội bộ) Tìm đường dẫn part theo loại relationship."""
+    for found_type, target in get_workbook_rels(zf).values():
+        if found_type == rel_type:
+            return target
+    return default
+
+
+def load_shared_strings(zf):
+    """Đọc bảng chuỗi dùng chung (sharedStrings.xml) thành list. Bỏ qua phần phiên âm (rPh)."""
+    part = _find_part(zf, SHARED_STRINGS_TYPE, 'xl/sharedStrings.xml')
+    strings = []
+    try:
+        fh = zf.open(part)
+    except KeyError:
+        return strings
+    tag_si, tag_t, tag_rph = f'{NS_MAIN}si', f'{NS_MAIN}t', f'{NS_MAIN}rPh'
+    with fh:
+        for _, elem in iterparse(fh):
+            if elem.tag == tag_si:
+                parts = []
+                for child in elem:
+                    if child.tag == tag_t:
+                        parts.append(child.text or '')
+                    elif child.tag != tag_rph:
+                        parts.extend(t.text or '' for t in child.iter(tag_t))
+                strings.append(''.join(parts))
+                elem.clear()
+    return strings
+
+
+def _is_date_format(code):
+    """(Hàm nội bộ) Kiểm tra một chuỗi định dạng số có phải định dạng ngày/giờ hay không."""
+    if not code or code.lower() == 'general':
+        return False
+    stripped = _DATE_FORMAT_STRIP_RE.sub('', code.split(';')[0])
+    return bool(_DATE_TOKEN_RE.search(stripped))
+
+
+def load_date_styles(zf):
+    """Trả về tập chỉ số style (thuộc tính 's' của ô) có định dạng ngày/giờ."""
+    part = _find_part(zf, STYLES_TYPE, 'xl/styles.xml')
+    try:
+        fh = zf.open(part)
+    except KeyError:
+        return set()
+    custom_formats = {}
+    date_styles = set()
+    xf_index = 0
+    in_cell_xfs = False
+    with fh:
+        for event, elem in iterparse(fh, events=('start', 'end')):
+            if event == 'start':
+                if elem.tag == f'{NS_MAIN}cellXfs':
+                    in_cell_xfs = True
+                continue
+            if elem.tag == f'{NS_MAIN}numFmt':
+                custom_formats[int(elem.get('numFmtId'))] = elem.get('formatCode', '')
+            elif elem.tag == f'{NS_MAIN}xf' and in_cell_xfs:
+                fmt_id = int(elem.get('numFmtId', 0))
+                if fmt_id in _BUILTIN_DATE_FORMATS or _is_date_format(custom_formats.get(fmt_id)):
+                    date_styles.add(xf_index)
+                xf_index += 1
+            elif elem.tag == f'{NS_MAIN}cellXfs':
+                break
+    return date_styles
+
+
+def _parse_number(text):
+    """(Hàm nội bộ) Số nguyên giữ kiểu int, còn lại là float (giống openpyxl)."""
+    if '.' in text or 'E' in text or 'e' in text:
+        return float(text)
+    return int(text)
+
+
+def _find_sheet_part(zf, sheet_name):
+    """(Hàm nội bộ) Part XML của sheet theo tên (không phân biệt hoa thường)."""
+    for name, sheet_part, _ in get_sheet_parts(zf):
+        if name.lower() == sheet_name.lower():
+            return sheet_part
+    raise KeyError(f"Không tìm thấy sheet '{sheet_name}'.")
+
+
+def sheet_dimension(path, sheet_name):
+    """
+    Đọc vùng dimension (used range) được lưu ở đầu XML của sheet, dừng trước phần dữ liệu.
+
+    Returns:
+        tuple or None: (dòng đầu, cột đầu, dòng cuối, cột cuối), None nếu sheet không có dimension.
+    """
+    with zipfile.ZipFile(path) as zf:
+        part = _find_sheet_part(zf, sheet_name)
+        tag_dimension, tag_sheet_data = f'{NS_MAIN}dimension', f'{NS_MAIN}sheetData'
+        with zf.open(part) as fh:
+            for event, elem in iterparse(fh, events=('start',)):
+                if elem.tag == tag_sheet_data:
+                    return None
+                if elem.tag == tag_dimension:
+                    match = _RANGE_REF_RE.match(elem.get('ref', ''))
+                    if not match:
+                        return None
+                    first_col, first_row = column_index(match.group(1)), int(match.group(2))
+                    last_col = column_index(match.group(3)) if match.group(3) else first_col
+                    last_row = int(match.group(4)) if match.group(4) else first_row
+                    return first_row, first_col, last_row, last_col
+    return None
+
+
+def iter_sheet_rows(path, sheet_name, columns=None):
+    """
+    Duyệt (stream) từng dòng có dữ liệu của một sheet, chỉ giữ một dòng trong bộ nhớ.
+
+    Args:
+        path (str or Path): Đường dẫn đến file .xlsx/.xlsm.
+        sheet_name (str): Tên sheet (không phân biệt hoa thường).
+        columns (list, optional): Các cột cần đọc, dạng chữ cái ('A', 'C') hoặc số thứ tự (1, 3).
+                                  Mặc định đọc tất cả các cột trong vùng dimension của sheet.
+
+    Yields:
+        tuple: (số thứ tự dòng, list giá trị theo thứ tự các cột được yêu cầu).
+               Ô có công thức trả về giá trị đã được Excel lưu cache.
+    """
+    wanted = [column_index(c) if isinstance(c, str) else int(c) for c in columns] if columns else None
+
+    with zipfile.ZipFile(path) as zf:
+        part = _find_sheet_part(zf, sheet_name)
+        shared_strings = load_shared_strings(zf)
+        date_styles = load_date_styles(zf)
+        tag_row, tag_c, tag_v = f'{NS_MAIN}row', f'{NS_MAIN}c', f'{NS_MAIN}v'
+        tag_is, tag_t = f'{NS_MAIN}is', f'{NS_MAIN}t'
+        tag_dimension, tag_sheet_data = f'{NS_MAIN}dimension', f'{NS_MAIN}sheetData'
+
+        with zf.open(part) as fh:
+            sheet_data = None
+            row_idx, col_idx = 0, 0
+            row_values = {}
+            dimension_cols = None
+            wanted_set = set(wanted) if wanted else None
+            for event, elem in iterparse(fh, events=('start', 'end')):
+                tag = elem.tag
+                if event == 'start':
+                    if tag == tag_row:
+                        ref = elem.get('r')
+                        row_idx = int(ref) if ref else row_idx + 1
+                        col_idx = 0
+                        row_values = {}
+                    elif tag == tag_sheet_data:
+                        sheet_data = elem
+                    continue
+
+                if tag == tag_c:
+                    ref = elem.get('r')
+                    match = _CELL_REF_RE.match(ref) if ref else None
+                    col_idx = column_index(match.group(1)) if match else col_idx + 1
+                    if wanted_set is not None and col_idx not in wanted_set:
+                        continue
+                    cell_type = elem.get('t', 'n')
+                    if cell_type == 'inlineStr':
+                        inline = elem.find(tag_is)
+                        value = ''.join(t.text or '' for t in inline.iter(tag_t)) if inline is not None else None
+                    else:
+                        v = elem.find(tag_v)
+                        text = v.text if v is not None else None
+                        if text is None:
+                            value = None
+                        elif cell_type == 's':
+                            value = shared_strings[int(text)]
+                        elif cell_type == 'b':
+                            value = text == '1'
+                        elif cell_type in ('str', 'e'):
+                            value = text
+                        elif cell_type == 'd':
+                            value = dt.datetime.fromisoformat(text)
+                        else:
+                            value = _parse_number(text)
+                            style = elem.get('s')
+                            if style is not None and int(style) in date_styles:
+                                value = EXCEL_EPOCH + dt.timedelta(days=float(value))
+                    row_values[col_idx] = value
+                elif tag == tag_row:
+                    if row_values:
+                        if wanted is not None:
+                            cols = wanted
+                        elif dimension_cols is not None:
+                            cols = range(dimension_cols[0], max(dimension_cols[1], max(row_values)) + 1)
+                        else:
+                            cols = range(1, max(row_values) + 1)
+                        yield row_idx, [row_values.get(c) for c in cols]
+                    if sheet_data is not None:
+                        sheet_data.clear()
+                elif tag == tag_dimension:
+                    match = _RANGE_REF_RE.match(elem.get('ref', ''))
+                    if match:
+                        last_letter = match.group(3) or match.group(1)
+                        dimension_cols = (column_index(match.group(1)), column_index(last_letter))
+                elif tag == tag_sheet_data:
+                    break
+
+
+def iter_row_chunks(path, sheet_name, chunk_size=1000, columns=None):
+    """
+    Đọc (stream) một sheet theo từng khối gồm đúng chunk_size dòng liên tiếp.
+
+    Các khối trải từ dòng đầu đến dòng cuối của vùng dimension (used range) của sheet, giống
+    SheetBackend.iter_row_blocks() khi workbook được nạp, kể cả khi chỉ đọc một số cột. Các dòng
+    không có dữ liệu trong các cột được đọc là list None, nên mỗi khối luôn tương ứng với một dải
+    dòng liên tục. Nếu sheet không có dimension, các khối trải từ dòng có dữ liệu đầu tiên đến cuối.
+    Khối cuối có thể ngắn hơn.
+
+    Yields:
+        tuple: (số thứ tự dòng đầu của khối, list các dòng).
+    """
+    dimension = sheet_dimension(path, sheet_name)
+    if columns:
+        base_width = len(columns)
+    else:
+        base_width = dimension[3] - dimension[1] + 1 if dimension else 0
+    block, width = [], base_width
+    block_start = next_row = dimension[0] if dimension else None
+
+    def fill_to(row_idx):
+        # Dòng trống (không có trong XML hoặc không có dữ liệu trong các cột được đọc)
+        nonlocal block, block_start, width, next_row
+        while next_row < row_idx:
+            block.append(None)
+            next_row += 1
+            if len(block) == chunk_size:
+                yield block_start, _pad_block(block, width)
+                block, block_start, width = [], next_row, base_width
+
+    for row_idx, values in iter_sheet_rows(path, sheet_name, columns):
+        if block_start is None:
+            block_start = next_row = row_idx
+        elif row_idx < next_row and not block and next_row == block_start:
+            # Dữ liệu nằm trước dòng đầu của dimension (dimension không chính xác)
+            block_start = next_row = row_idx
+        yield from fill_to(row_idx)
+        block.append(values)
+        width = max(width, len(values))
+        next_row = row_idx + 1
+        if len(block) == chunk_size:
+            yield block_start, _pad_block(block, width)
+            block, block_start, width = [], next_row, base_width
+    if dimension is not None and next_row is not None:
+        yield from fill_to(dimension[2] + 1)
+    if block:
+        yield block_start, _pad_block(block, width)
+
+
+def _pad_block(block, width):
+    """(Hàm nội bộ) Chuẩn hóa các dòng trong khối về cùng độ rộng."""
+    return [[None] * width if row is None else row + [None] * (width - len(row)) for row in block]
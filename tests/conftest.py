@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+Cấu hình pytest: thư mục gốc của repo là package 'excel_python' (các module dùng import tương đối,
+không có __init__.py), nên nó được đăng ký dưới tên này để test có thể viết
+`from excel_python.cell_blocks import ...` dù thư mục được clone với tên nào.
+"""
+
+import sys
+import types
+from pathlib import Path
+
+if 'excel_python' not in sys.modules:
+    _package = types.ModuleType('excel_python')
+    _package.__path__ = [str(Path(__file__).resolve().parents[1])]
+    sys.modules['excel_python'] = _package
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Test ExcelAppPool với ứng dụng thay thế (không cần Excel)."""
+
+import pytest
+from excel_python.app_pool import ExcelAppPool
+
+TIMEOUT = 5
+
+
+class StandInApp:
+    """Ứng dụng thay thế: chỉ có các thuộc tính mà pool dùng tới."""
+    created = 0
+
+    def __init__(self):
+        StandInApp.created += 1
+        self.id = StandInApp.created
+        self.dead = False
+        self.quit_called = False
+
+    @property
+    def pid(self):
+        return None
+
+    @property
+    def workbook_names(self):
+        if self.dead:
+            raise RuntimeError("RPC server unavailable")
+        return []
+
+    @property
+    def workbooks(self):
+        if self.dead:
+            raise RuntimeError("RPC server unavailable")
+        return []
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture(autouse=True)
+def reset_counter():
+    StandInApp.created = 0
+
+
+def failing_factory(failures):
+    """Factory ném lỗi ở failures lần gọi đầu tiên rồi mới tạo được ứng dụng."""
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise OSError("Excel không khởi động được")
+        return StandInApp()
+    return factory
+
+
+def test_jobs_run_on_stand_in_app():
+    with ExcelAppPool(size=2, app_factory=StandInApp) as pool:
+        assert pool.map(lambda app, x: x * 2, range(10), timeout=TIMEOUT) == list(range(0, 20, 2))
+    assert pool.stats['apps_started'] == 2
+
+
+def test_startup_failure_fails_job_without_killing_worker():
+    pool = ExcelAppPool(size=1, app_factory=failing_factory(1), warm=False)
+    try:
+        first = pool.submit(lambda app: app.id)
+        second = pool.submit(lambda app: app.id)
+        with pytest.raises(OSError):
+            first.result(timeout=TIMEOUT)
+        assert second.result(timeout=TIMEOUT) == 1
+    finally:
+        pool.shutdown()
+    assert pool.stats['failed'] == 1
+
+
+def test_factory_that_always_fails_resolves_every_future():
+    pool = ExcelAppPool(size=1, app_factory=failing_factory(100), warm=False)
+    try:
+        results = pool.map(lambda app, x: x, range(3), return_exceptions=True, timeout=TIMEOUT)
+    finally:
+        pool.shutdown()
+    assert all(isinstance(r, OSError) for r in results)
+
+
+def test_app_dying_after_successful_job_is_replaced():
+    apps = []
+
+    def job(app):
+        apps.append(app)
+        app.dead = True  # Excel chết sau khi job đã hoàn thành
+        return app.id
+
+    with ExcelAppPool(size=1, app_factory=StandInApp) as pool:
+        assert pool.submit(job).result(timeout=TIMEOUT) == 1
+        assert pool.submit(lambda app: app.id).result(timeout=TIMEOUT) == 2
+    assert apps[0].quit_called
+    assert pool.stats['crashes'] == 1
+
+
+def test_failed_job_keeps_live_app_and_recycles_after_limit():
+    def boom(app):
+        raise ValueError("lỗi trong job")
+
+    with ExcelAppPool(size=1, max_jobs_per_app=2, app_factory=StandInApp) as pool:
+        with pytest.raises(ValueError):
+            pool.submit(boom).result(timeout=TIMEOUT)
+        ids = [pool.submit(lambda app: app.id).result(timeout=TIMEOUT) for _ in range(3)]
+    assert ids == [1, 2, 2]
+    assert pool.stats['recycled'] == 2
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Test AsyncExcelApp: thứ tự theo độ ưu tiên, lỗi khởi động, lan truyền lỗi (engine 'file')."""
+
+import asyncio
+import threading
+import pytest
+from excel_python.async_app import AsyncExcelApp, AsyncRange, PRIORITY_HIGH, PRIORITY_LOW
+
+TIMEOUT = 5
+
+
+class StandInApp:
+    """Ứng dụng thay thế: chỉ có quit()."""
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def _block_worker(excel):
+    """Giữ luồng worker bận cho tới khi event được set, để các thao tác sau xếp hàng."""
+    started, release = threading.Event(), threading.Event()
+
+    def hold(app):
+        started.set()
+        release.wait(TIMEOUT)
+    blocker = excel.submit(hold)
+    assert started.wait(TIMEOUT)
+    return blocker, release
+
+
+def test_higher_priority_runs_first():
+    excel = AsyncExcelApp(app_factory=StandInApp)
+    order = []
+    blocker, release = _block_worker(excel)
+    futures = [excel.submit(lambda app: order.append('low'), priority=PRIORITY_LOW),
+               excel.submit(lambda app: order.append('normal')),
+               excel.submit(lambda app: order.append('high'), priority=PRIORITY_HIGH)]
+    release.set()
+    for future in [blocker] + futures:
+        future.result(TIMEOUT)
+    excel.shutdown()
+    assert order == ['high', 'normal', 'low']
+
+
+def test_same_priority_keeps_submission_order():
+    excel = AsyncExcelApp(app_factory=StandInApp)
+    order = []
+    blocker, release = _block_worker(excel)
+    futures = [excel.submit(lambda app, i=i: order.append(i)) for i in range(10)]
+    release.set()
+    for future in [blocker] + futures:
+        future.result(TIMEOUT)
+    excel.shutdown()
+    assert order == list(range(10))
+    assert excel.stats['operations'] == 11
+
+
+def test_startup_failure_raises_and_stops_worker():
+    def failing_factory():
+        raise RuntimeError("Excel không khởi động được")
+
+    with pytest.raises(RuntimeError, match="không khởi động được"):
+        AsyncExcelApp(app_factory=failing_factory)
+
+
+def test_submit_after_shutdown_raises_and_app_is_quit():
+    app = StandInApp()
+    excel = AsyncExcelApp(app_factory=lambda: app)
+    excel.shutdown()
+    assert app.quit_called
+    with pytest.raises(RuntimeError):
+        excel.submit(lambda app: None)
+
+
+def test_errors_propagate_and_worker_keeps_running():
+    async def main():
+        async with AsyncExcelApp(app_factory=StandInApp) as excel:
+            with pytest.raises(ZeroDivisionError):
+                await excel.call(lambda app: 1 / 0)
+            assert await excel.call(lambda app: 'ok') == 'ok'
+            return excel.stats
+
+    stats = asyncio.run(main())
+    assert stats['operations'] == 2
+    assert stats['failed'] == 1
+
+
+def test_workbook_round_trip_on_file_engine():
+    async def main():
+        async with AsyncExcelApp(engine='file') as excel:
+            book = await excel.new()
+            sheet = book.sheet(0)
+            rng = sheet.range('A1')
+            assert isinstance(rng, AsyncRange)
+            await rng.set_value([[1, 2], [3, 4]])
+            return await sheet.range('A1:B2').get_value()
+
+    assert asyncio.run(main()) == [[1, 2], [3, 4]]
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Test convert_many() với ứng dụng và bộ chuyển đổi thay thế (không cần Excel)."""
+
+import os
+import threading
+import pytest
+from excel_python.app_pool import ExcelAppPool
+from excel_python.batch_convert import convert_many
+
+
+class StandInApp:
+    """Ứng dụng thay thế: thuộc tính mà pool dùng tới và convert_to_xlsx() ghi nhận tham số."""
+    def __init__(self):
+        self.convert_calls = []
+
+    pid = None
+    workbook_names = []
+    workbooks = []
+
+    def convert_to_xlsx(self, source, destination, reopen=True):
+        self.convert_calls.append((source, destination, reopen))
+        destination.write_bytes(source.read_bytes())
+        return destination
+
+    def quit(self):
+        pass
+
+
+class StandInConverter:
+    """Bộ chuyển đổi thay thế: ghi file đích, lỗi với file có 'bad' trong tên, ghi nhận các file đã xử lý."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sources = []
+
+    def __call__(self, app, source, destination):
+        with self.lock:
+            self.sources.append(source.name)
+        if 'bad' in source.name:
+            raise RuntimeError(f"không đọc được {source.name}")
+        destination.write_bytes(source.read_bytes())
+
+
+def _touch(path, size=1, mtime=None):
+    path.write_bytes(b'x' * size)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_report_has_status_and_timing_per_file(tmp_path):
+    sources = [_touch(tmp_path / 'a.xls'), _touch(tmp_path / 'bad.xls'), tmp_path / 'missing.xls']
+    converter = StandInConverter()
+
+    report = convert_many(sources, tmp_path / 'out', workers=2, converter=converter, app_factory=StandInApp)
+
+    assert [job['source'].name for job in report] == ['a.xls', 'bad.xls', 'missing.xls']
+    assert [job['status'] for job in report] == ['converted', 'failed', 'failed']
+    assert report[0]['destination'] == (tmp_path / 'out' / 'a.xlsx').resolve()
+    assert report[0]['destination'].read_bytes() == b'x'
+    assert report[0]['seconds'] > 0 and report[0]['error'] is None
+    assert 'bad.xls' in report[1]['error']
+    assert report[2]['seconds'] == 0.0 and report[2]['error']
+    assert sorted(converter.sources) == ['a.xls', 'bad.xls']
+
+
+def test_outputs_newer_than_input_are_skipped(tmp_path):
+    out = tmp_path / 'out'
+    out.mkdir()
+    fresh = _touch(tmp_path / 'fresh.xls', mtime=1_000_000)
+    stale = _touch(tmp_path / 'stale.xls', mtime=2_000_000)
+    _touch(out / 'fresh.xlsx', mtime=1_500_000)
+    _touch(out / 'stale.xlsx', mtime=1_500_000)
+    converter = StandInConverter()
+
+    with ExcelAppPool(size=1, app_factory=StandInApp) as pool:
+        report = convert_many([fresh, stale], out, converter=converter, pool=pool)
+        assert [job['status'] for job in report] == ['skipped', 'converted']
+        assert converter.sources == ['stale.xls']
+
+        report = convert_many([fresh, stale], out, converter=converter, pool=pool, overwrite=True)
+    assert [job['status'] for job in report] == ['converted', 'converted']
+
+
+def test_nothing_to_convert_starts_no_pool(tmp_path, monkeypatch):
+    out = tmp_path / 'out'
+    out.mkdir()
+    source = _touch(tmp_path / 'a.xls', mtime=1_000_000)
+    _touch(out / 'a.xlsx', mtime=2_000_000)
+    monkeypatch.setattr('excel_python.batch_convert.ExcelAppPool', None)
+
+    assert [job['status'] for job in convert_many([source], out)] == ['skipped']
+
+
+def test_default_converter_does_not_reopen_result(tmp_path):
+    source = _touch(tmp_path / 'a.xls', size=3)
+    apps = []
+
+    def factory():
+        apps.append(StandInApp())
+        return apps[-1]
+
+    report = convert_many([source], tmp_path / 'out', workers=1, app_factory=factory)
+
+    assert report[0]['status'] == 'converted'
+    destination = (tmp_path / 'out' / 'a.xlsx').resolve()
+    assert [call for app in apps for call in app.convert_calls] == [(source.resolve(), destination, False)]
+
+
+def test_same_output_name_is_rejected(tmp_path):
+    (tmp_path / 'x').mkdir()
+    sources = [_touch(tmp_path / 'a.xls'), _touch(tmp_path / 'x' / 'a.xlsm')]
+    with pytest.raises(ValueError):
+        convert_many(sources, tmp_path / 'out', converter=StandInConverter(), app_factory=StandInApp)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Test freeze_formula_cells(): số lần gọi backend khi thay công thức bằng giá trị theo khối."""
+
+from excel_python.cell_blocks import freeze_formula_cells
+
+
+class RecordingRange:
+    def __init__(self, sheet, first, last):
+        self.sheet, self.first, self.last = sheet, first, last
+
+    def get_values(self):
+        self.sheet.calls.append(('get_values', self.first, self.last))
+        if self.first in self.sheet.broken:
+            raise RuntimeError("COM error")
+        return [[f'v{r},{c}' for c in range(self.first[1], self.last[1] + 1)]
+                for r in range(self.first[0], self.last[0] + 1)]
+
+    def set_values(self, rows):
+        self.sheet.calls.append(('set_values', self.first, self.last))
+        self.sheet.written.append((self.first, rows))
+
+
+class RecordingSheet:
+    def __init__(self, broken=()):
+        self.calls, self.written, self.broken = [], [], set(broken)
+
+    def range(self, cell1, cell2=None):
+        return RecordingRange(self, cell1, cell2 or cell1)
+
+
+class RecordingBook:
+    def __init__(self, **sheets):
+        self.sheets = sheets
+        self.get_sheet_calls = []
+
+    def get_sheet(self, name):
+        self.get_sheet_calls.append(name)
+        return self.sheets[name]
+
+
+def _cells(sheet, coords):
+    return [{'sheet': sheet, 'coord': coord} for coord in coords]
+
+
+def _recorded_calls(book):
+    """Số lần gọi backend mà bản giả đã ghi nhận: get_sheet + get_values/set_values."""
+    return len(book.get_sheet_calls) + sum(len(sheet.calls) for sheet in book.sheets.values())
+
+
+def test_rectangle_is_read_and_written_once():
+    book = RecordingBook(Data=RecordingSheet())
+    coords = [f'{col}{row}' for row in range(1, 101) for col in 'ABC']
+
+    stats = freeze_formula_cells(book, _cells('Data', coords))
+
+    assert stats['cells'] == 300
+    assert stats['blocks'] == 1
+    assert stats['com_calls'] == _recorded_calls(book) == 3  # get_sheet + get_values + set_values
+    assert book.sheets['Data'].calls == [('get_values', (1, 1), (100, 3)), ('set_values', (1, 1), (100, 3))]
+    assert len(stats['fixed']) == 300 and not stats['failed']
+
+
+def test_disjoint_runs_become_separate_blocks_per_sheet():
+    book = RecordingBook(A=RecordingSheet(), B=RecordingSheet())
+    cells = _cells('A', ['A1', 'A2', 'A3', 'C1', 'C2', 'E10']) + _cells('B', ['B5', 'C5', 'D5'])
+
+    stats = freeze_formula_cells(book, cells)
+
+    assert book.get_sheet_calls == ['A', 'B']
+    assert stats['blocks'] == 4  # A1:A3, C1:C2, E10 trên A; B5:D5 trên B
+    assert stats['com_calls'] == _recorded_calls(book) == 2 + 2 * 4
+    assert len(book.sheets['A'].calls) == 6 and len(book.sheets['B'].calls) == 2
+    # Giá trị được ghi lại đúng như đã đọc
+    first, rows = book.sheets['B'].written[0]
+    assert first == (5, 2) and rows == [['v5,2', 'v5,3', 'v5,4']]
+
+
+def test_failed_block_is_reported_without_stopping_others():
+    book = RecordingBook(Data=RecordingSheet(broken=[(1, 1)]))
+
+    stats = freeze_formula_cells(book, _cells('Data', ['A1', 'A2', 'C7']))
+
+    assert stats['blocks'] == 2
+    assert sorted(c['coord'] for c in stats['failed']) == ['A1', 'A2']
+    assert [c['coord'] for c in stats['fixed']] == ['C7']
+    # Khối A1:A2 lỗi khi đọc nên không có lần ghi: get_sheet + 1 lần đọc lỗi + đọc/ghi C7
+    assert book.sheets['Data'].calls == [('get_values', (1, 1), (2, 1)), ('get_values', (7, 3), (7, 3)),
+                                         ('set_values', (7, 3), (7, 3))]
+    assert stats['com_calls'] == _recorded_calls(book) == 4
+
+
+def test_no_cells_makes_no_calls():
+    book = RecordingBook(Data=RecordingSheet())
+    stats = freeze_formula_cells(book, [])
+    assert stats == {'cells': 0, 'blocks': 0, 'com_calls': 0, 'fixed': [], 'failed': []}
+    assert book.get_sheet_calls == []
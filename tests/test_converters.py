@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Test ghi mảng NumPy: NaN/NaT -> ô trống và vùng thay đổi được ghi nhận đúng kích thước."""
+
+import datetime as dt
+
+import numpy as np
+import pytest
+from excel_python.converters import array_to_rows, array_extent
+from excel_python.excelapp import ExcelApp
+
+
+def test_float_nan_becomes_empty():
+    assert array_to_rows(np.array([[1.0, np.nan]])) == [[1.0, None]]
+
+
+def test_object_array_nan_and_nat_become_empty():
+    arr = np.array([['a', np.nan, 1], [float('nan'), np.datetime64('NaT'), dt.date(2024, 1, 2)]], dtype=object)
+    assert array_to_rows(arr) == [['a', None, 1], [None, None, dt.date(2024, 1, 2)]]
+
+
+@pytest.mark.parametrize('arr, extent', [
+    (np.zeros((3, 4)), (3, 4)),
+    (np.zeros(5), (1, 5)),
+    (np.float64(1.0), (1, 1)),
+])
+def test_array_extent(arr, extent):
+    assert array_extent(arr) == extent
+
+
+def test_from_numpy_marks_written_extent_dirty(tmp_path):
+    app = ExcelApp(visible=False, engine='file')
+    try:
+        book = app.new()
+        sheet = book.sheets[0]
+        arr = np.array([[1, np.nan, 'x'], [2, 3, None]], dtype=object)
+        sheet.range('B2').from_numpy(arr)
+        sheet.range('E5').value = [[1, 2], [3, 4]]
+        assert book.dirty_ranges[sheet.name] == ['B2:D3', 'E5:F6']
+        assert sheet.range('C2').value is None
+    finally:
+        app.quit()
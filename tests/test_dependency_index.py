@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Test SheetDependencyIndex: nhận diện tham chiếu giữa các sheet và cập nhật tăng dần."""
+
+from excel_python.dependency_index import SheetDependencyIndex
+
+SHEETS = ['Data', 'S1', 'S2', 'S3', "Bob's Sheet", 'My Data', 'Summary']
+
+
+def _coords(cells):
+    return sorted((cell['sheet'], cell['coord']) for cell in cells)
+
+
+def test_quoted_and_plain_names():
+    index = SheetDependencyIndex(SHEETS)
+    assert index.referenced_sheets("='My Data'!A1+Data!B2") == {'my data', 'data'}
+    assert index.referenced_sheets("='Bob''s Sheet'!A1") == {"bob's sheet"}
+    assert index.referenced_sheets("=SUM(data!A:A)") == {'data'}
+
+
+def test_3d_references_expand_by_sheet_order():
+    index = SheetDependencyIndex(SHEETS)
+    assert index.referenced_sheets('=SUM(S1:S3!A1)') == {'s1', 's2', 's3'}
+    assert index.referenced_sheets('=SUM(S3:S1!A1)') == {'s1', 's2', 's3'}
+    assert index.referenced_sheets("=SUM('S1:S2'!B2)") == {'s1', 's2'}
+
+
+def test_string_literals_and_external_refs_do_not_match():
+    index = SheetDependencyIndex(SHEETS)
+    assert index.referenced_sheets('="Data!A1"&"x"') == set()
+    assert index.referenced_sheets('=[1]Data!A1') == set()
+    assert index.referenced_sheets("='[prices.xlsx]Data'!A1") == set()
+    assert index.referenced_sheets('=SUM(A1:B2)') == set()
+
+
+def test_named_ranges_resolve_through_nested_names():
+    names = [('Rate', None, 'Data!$B$1'),
+             ('Scaled', None, 'Rate*2'),
+             ('Label', None, '"Summary!A1"'),
+             ('Loop', None, 'Loop+1'),
+             ('Local', 'S2', "'My Data'!$A$1")]
+    index = SheetDependencyIndex(SHEETS, names)
+    assert index.referenced_sheets('=Rate+1') == {'data'}
+    assert index.referenced_sheets('=Scaled') == {'data'}
+    assert index.referenced_sheets('=Label') == set()
+    assert index.referenced_sheets('=Loop') == set()
+    assert index.referenced_sheets('=LOCAL*2') == {'my data'}
+    assert index.referenced_sheets('=RATE(1,2,3)') == set()   # Hàm trùng tên với Named Range
+
+
+def test_cells_referencing_and_dependent_sheets():
+    formulas = [('Summary', 'A1', 'Data!A1'), ('Summary', 'A2', 'SUM(S1:S3!A1)'),
+                ('S1', 'B1', 'Data!A1+S1!A2'), ('Data', 'C1', 'Data!A1*2'), ('S2', 'A1', 'S1!B1')]
+    index = SheetDependencyIndex.build(formulas, SHEETS)
+    assert len(index) == 4                                  # Data!C1 chỉ tham chiếu chính sheet của nó
+    assert _coords(index.cells_referencing('data')) == [('S1', 'B1'), ('Summary', 'A1')]
+    assert _coords(index.cells_referencing(['S1', 'S2'])) == [('Summary', 'A2')]
+    assert _coords(index.cells_referencing(['S1', 'S2'], exclude_targets=False)) == [('S2', 'A1'), ('Summary', 'A2')]
+    assert index.dependent_sheets('S1') == {'Summary', 'S2'}
+
+
+def test_discard_cells_and_remove_sheets_update_incrementally():
+    formulas = [('Summary', 'A1', 'Data!A1'), ('Summary', 'A2', 'S2!A1'),
+                ('S2', 'A1', 'Data!A2'), ('S3', 'A1', 'SUM(S1:S3!B1)')]
+    index = SheetDependencyIndex.build(formulas, SHEETS)
+
+    index.discard_cells([{'sheet': 'Summary', 'coord': 'A1'}])
+    assert _coords(index.cells_referencing('Data')) == [('S2', 'A1')]
+
+    index.remove_sheets(['S2'])
+    assert index.cells_referencing('Data') == []            # Các ô trên S2 đã bị xóa cùng sheet
+    assert index.cells_referencing('S2') == []
+    assert _coords(index.cells_referencing('S1')) == [('S3', 'A1')]
+    # Thứ tự sheet được cập nhật: S1:S3 giờ chỉ gồm S1 và S3
+    assert index.referenced_sheets('=SUM(S1:S3!A1)') == {'s1', 's3'}
+
+    index.add_formula('Summary', 'A2', 'Data!A5')           # Cập nhật công thức của một ô đã có
+    assert _coords(index.cells_referencing('Data')) == [('Summary', 'A2')]
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Test Workbook.calculate(scope='dirty'): thứ tự sheet theo phụ thuộc và các trường hợp tính toán lại toàn bộ."""
+
+import pytest
+from openpyxl import Workbook as OpenpyxlWorkbook
+from excel_python.excelapp import ExcelApp
+from excel_python.file_backend import FileBook, FileSheet
+
+SHEETS = ['Input', 'Calc', 'Report', 'Loop1', 'Loop2', 'Notes', 'Misc', 'Archive']
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Backend 'file' ghi nhận các lần tính toán thay vì báo không hỗ trợ."""
+    recorded = []
+    monkeypatch.setattr(FileBook, 'calculate', lambda self: recorded.append('full'), raising=False)
+    monkeypatch.setattr(FileSheet, 'calculate', lambda self: recorded.append(self.name), raising=False)
+    return recorded
+
+
+@pytest.fixture
+def book(tmp_path, calls):
+    wb = OpenpyxlWorkbook()
+    for index, name in enumerate(SHEETS):
+        ws = wb.active if index == 0 else wb.create_sheet(name)
+        ws.title = name
+        ws['A1'] = 1
+    wb['Calc']['B1'] = '=Input!A1*2'
+    wb['Report']['B1'] = '=Calc!B1+Input!A1'      # Report phụ thuộc cả Input lẫn Calc
+    wb['Loop1']['B1'] = '=Loop2!A1'
+    wb['Loop2']['B1'] = '=Loop1!A1'
+    path = tmp_path / 'model.xlsx'
+    wb.save(path)
+    app = ExcelApp(visible=False, engine='file')
+    yield app.open(path)
+    app.quit()
+
+
+def test_nothing_written_calculates_nothing(book, calls):
+    book.calculate(scope='dirty')
+    assert book.last_calculation['scope'] == 'none' and calls == []
+
+
+def test_dirty_sheets_are_calculated_in_dependency_order(book, calls):
+    book.sheet('Report').range('C1').value = 5
+    book.sheet('Input').range('A1').value = 10
+
+    book.calculate(scope='dirty')
+
+    assert calls == ['Input', 'Calc', 'Report']
+    assert book.last_calculation['scope'] == 'dirty'
+    assert book.last_calculation['sheets'] == ['Input', 'Calc', 'Report']
+    assert book.dirty_ranges == {}
+
+    book.sheet('Notes').range('A2').value = 'x'   # Sheet không có sheet phụ thuộc
+    book.calculate(scope='dirty')
+    assert calls[3:] == ['Notes']
+
+
+def test_formula_written_through_library_updates_dependencies(book, calls):
+    book.sheet('Notes').range('B1').formula = '=Misc!A1'
+    book.sheet('Misc').range('A1').value = 3
+
+    book.calculate(scope='dirty')
+    assert calls == ['Misc', 'Notes']
+
+
+def test_structural_change_falls_back_to_full(book, calls):
+    book.sheet('Input').range('A1').value = 2
+    book.add_sheet('Extra')
+
+    book.calculate(scope='dirty')
+    assert calls == ['full'] and book.last_calculation['scope'] == 'full'
+
+
+def test_cycle_falls_back_to_full(book, calls):
+    book.sheet('Loop1').range('A1').value = 2
+
+    book.calculate(scope='dirty')
+    assert calls == ['full'] and book.last_calculation['sheets'] == []
+
+
+def test_most_sheets_affected_falls_back_to_full(book, calls):
+    for name in ('Input', 'Notes', 'Misc'):        # Input kéo theo Calc và Report: 5/8 sheet
+        book.sheet(name).range('A2').value = 1
+
+    book.calculate(scope='dirty')
+    assert calls == ['full']
+
+
+def test_manual_calculation_recalculates_once(book, calls):
+    with book.manual_calculation():
+        book.sheet('Input').range('A1').value = 4
+        book.sheet('Input').range('A2').value = 5
+        assert calls == []
+    assert calls == ['Input', 'Calc', 'Report']
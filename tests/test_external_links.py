@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Test break_links_in_file() trên gói .xlsx có part externalLink được dựng sẵn."""
+
+import os
+import stat
+import sys
+import zipfile
+import pytest
+from openpyxl import load_workbook
+from excel_python.external_links import list_external_links, break_links_in_file
+
+MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PKG = 'http://schemas.openxmlformats.org/package/2006/relationships'
+CT = 'http://schemas.openxmlformats.org/package/2006/content-types'
+
+PARTS = {
+    '[Content_Types].xml': f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="{CT}"><Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/xl/externalLinks/externalLink1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.externalLink+xml"/>
+<Override PartName="/xl/calcChain.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.calcChain+xml"/>
+</Types>''',
+    '_rels/.rels': f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="{PKG}"><Relationship Id="rId1" Type="{REL}/officeDocument" Target="xl/workbook.xml"/></Relationships>''',
+    'xl/workbook.xml': f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="{MAIN}" xmlns:r="{REL}"><sheets><sheet name="Data" sheetId="1" r:id="rId1"/></sheets>
+<externalReferences><externalReference r:id="rId2"/></externalReferences>
+<definedNames><definedName name="Remote">[1]Prices!$A$1:$A$10</definedName><definedName name="Local">Data!$A$1</definedName></definedNames>
+</workbook>''',
+    'xl/_rels/workbook.xml.rels': f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="{PKG}"><Relationship Id="rId1" Type="{REL}/worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="{REL}/externalLink" Target="externalLinks/externalLink1.xml"/>
+<Relationship Id="rId3" Type="{REL}/calcChain" Target="calcChain.xml"/></Relationships>''',
+    'xl/worksheets/sheet1.xml': f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<worksheet xmlns="{MAIN}"><sheetData>
+<row r="1"><c r="A1"><v>5</v></c><c r="B1"><f>[1]Prices!A1*2</f><v>42</v></c><c r="C1" t="str"><f>[1]Prices!B1&amp;"x"</f><v>abcx</v></c></row>
+<row r="2"><c r="A2"><f>A1+1</f><v>6</v></c><c r="B2"><f t="shared" ref="B2:B3" si="0">[1]Prices!A2</f><v>7</v></c></row>
+<row r="3"><c r="B3"><f t="shared" si="0"/><v>8</v></c></row>
+</sheetData></worksheet>''',
+    'xl/externalLinks/externalLink1.xml': f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<externalLink xmlns="{MAIN}" xmlns:r="{REL}"><externalBook r:id="rId1"/></externalLink>''',
+    'xl/externalLinks/_rels/externalLink1.xml.rels': f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="{PKG}"><Relationship Id="rId1" Type="{REL}/externalLinkPath" Target="prices.xlsx" TargetMode="External"/></Relationships>''',
+    'xl/calcChain.xml': f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<calcChain xmlns="{MAIN}"><c r="B1" i="1"/><c r="A2"/></calcChain>''',
+}
+
+
+@pytest.fixture
+def linked(tmp_path):
+    path = tmp_path / 'linked.xlsx'
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, text in PARTS.items():
+            zf.writestr(name, text)
+    os.chmod(path, 0o644)
+    return path
+
+
+def test_list_external_links(linked):
+    assert list_external_links(linked) == [{'index': 1, 'part': 'xl/externalLinks/externalLink1.xml',
+                                            'rel_id': 'rId2', 'target': 'prices.xlsx'}]
+
+
+def test_break_links_freezes_formulas_and_names(linked):
+    result = break_links_in_file(linked)
+    assert result == {'links': ['prices.xlsx'], 'formulas': 4, 'names': 1}
+
+    wb = load_workbook(linked)
+    ws = wb['Data']
+    assert ws['B1'].value == 42
+    assert ws['C1'].value == 'abcx'                  # Kết quả chuỗi (t="str") -> chuỗi nội tuyến
+    assert ws['B2'].value == 7 and ws['B3'].value == 8
+    assert ws['A2'].value == '=A1+1'                 # Công thức nội bộ được giữ nguyên
+    assert wb.defined_names['Remote'].attr_text == '#REF!'
+    assert wb.defined_names['Local'].attr_text == 'Data!$A$1'
+
+
+def test_break_links_removes_link_parts_rels_and_content_types(linked):
+    break_links_in_file(linked)
+    with zipfile.ZipFile(linked) as zf:
+        names = set(zf.namelist())
+        workbook = zf.read('xl/workbook.xml')
+        rels = zf.read('xl/_rels/workbook.xml.rels')
+        content_types = zf.read('[Content_Types].xml')
+    assert not any('externalLink' in name or 'calcChain' in name for name in names)
+    assert b'externalReferences' not in workbook
+    assert b'externalLink' not in rels and b'calcChain' not in rels and b'worksheets/sheet1.xml' in rels
+    assert b'externalLink' not in content_types and b'calcChain' not in content_types
+    assert list_external_links(linked) == []
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="Quyền truy cập kiểu POSIX")
+def test_rewrite_keeps_file_mode(linked, tmp_path):
+    break_links_in_file(linked)
+    assert stat.S_IMODE(os.stat(linked).st_mode) == 0o644
+
+
+def test_destination_leaves_source_untouched(linked, tmp_path):
+    original = linked.read_bytes()
+    destination = tmp_path / 'out.xlsx'
+    break_links_in_file(linked, destination)
+    assert linked.read_bytes() == original
+    assert list_external_links(destination) == []
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Test Workbook.for_each_sheet(): chế độ song song (process pool, engine 'file') cho cùng kết quả như tuần tự."""
+
+import multiprocessing
+import pytest
+from openpyxl import Workbook as OpenpyxlWorkbook
+from excel_python.excelapp import ExcelApp
+
+# Tiến trình con nhận action qua pickle và cần package 'excel_python' mà conftest.py đã đăng ký
+pytestmark = pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                                reason="Tiến trình con chỉ thấy package 'excel_python' khi được fork")
+
+
+def column_total(sheet):
+    """Action ở cấp module: tổng cột A, đọc stream theo khối."""
+    if sheet.name == 'Broken':
+        raise ValueError(f"sheet {sheet.name} không hợp lệ")
+    return sum(row[0] or 0 for block in sheet.iter_rows(chunk_size=7, columns=['A']) for row in block)
+
+
+@pytest.fixture
+def book(tmp_path):
+    wb = OpenpyxlWorkbook()
+    for index, name in enumerate(['North', 'South', 'Broken', 'Empty']):
+        ws = wb.active if index == 0 else wb.create_sheet(name)
+        ws.title = name
+        if name != 'Empty':
+            for row in range(1, 21 * (index + 1)):
+                ws.cell(row=row, column=1, value=row * (index + 1))
+    path = tmp_path / 'regions.xlsx'
+    wb.save(path)
+    app = ExcelApp(visible=False, engine='file')
+    book = app.open(path)
+    yield book
+    app.quit()
+
+
+def _comparable(outcome):
+    errors = {name: (error['type'], error['message']) for name, error in outcome['errors'].items()}
+    return outcome['results'], errors
+
+
+def test_parallel_matches_sequential(book):
+    assert book.for_each_sheet(column_total, parallel=True, workers=2) is book
+    parallel = book.last_for_each
+    book.for_each_sheet(column_total)
+    sequential = book.last_for_each
+
+    assert parallel['results'] == {'North': sum(range(1, 21)), 'South': 2 * sum(range(1, 42)), 'Empty': 0}
+    assert set(parallel['errors']) == {'Broken'}
+    assert parallel['errors']['Broken']['type'] == 'ValueError'
+    assert 'column_total' in parallel['errors']['Broken']['traceback']
+    assert _comparable(parallel) == _comparable(sequential)
+    assert parallel['seconds'] >= 0
+
+
+def test_parallel_honours_include_and_exclude(book):
+    book.for_each_sheet(column_total, include=['North', 'Broken', 'South'], exclude=['Broken'], parallel=True)
+    assert book.last_for_each['results'] == {'North': sum(range(1, 21)), 'South': 2 * sum(range(1, 42))}
+    assert book.last_for_each['errors'] == {}
+
+
+def test_parallel_rejects_unpicklable_action(book):
+    with pytest.raises(TypeError):
+        book.for_each_sheet(lambda sheet: sheet.name, parallel=True)
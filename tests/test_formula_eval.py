@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Test FormulaModel trên workbook tạo bằng openpyxl (không có giá trị cache của công thức)."""
+
+import pytest
+from openpyxl import Workbook as OpenpyxlWorkbook
+from openpyxl.workbook.defined_name import DefinedName
+from excel_python.formula_eval import FormulaModel, NA
+
+
+@pytest.fixture
+def model(tmp_path):
+    wb = OpenpyxlWorkbook()
+    data = wb.active
+    data.title = 'Data'
+    rows = [('Code', 'Price', 'Qty', 'Region'),
+            ('A', 10, 2, 'North'),
+            ('B', 20, 3, 'South'),
+            ('C', 30, 4, 'North'),
+            ('D', 40, 5, 'South')]
+    for row in rows:
+        data.append(row)
+
+    inputs = wb.create_sheet('My Inputs')
+    inputs['A1'] = 0.1      # thuế suất
+    inputs['A2'] = 'B'      # mã cần tra
+
+    calc = wb.create_sheet('Calc')
+    calc['A1'] = '=SUM(Data!B2:B5)'
+    calc['A2'] = '=IF(A1>50,"big","small")'
+    calc['A3'] = "=VLOOKUP('My Inputs'!A2,Data!A2:C5,2,FALSE)"
+    calc['A4'] = "=INDEX(Data!C2:C5,MATCH('My Inputs'!A2,Data!A2:A5,0))"
+    calc['A5'] = '=SUMIFS(Data!B:B,Data!D:D,"North",Data!C:C,">2")'
+    calc['A6'] = '=-2^2'
+    calc['A7'] = '=5%*200'
+    calc['A8'] = '="Total: "&A1'
+    calc['A9'] = '=1+2*3^2'
+    calc['A10'] = '=A1*(1+TaxRate)'
+    calc['A11'] = '=SUM(Data!C:C)'
+    calc['A12'] = '=A10+A11'
+    calc['A13'] = '=VLOOKUP("Z",Data!A2:B5,2,FALSE)'
+    calc['A14'] = '=Calc!A1*2'
+    wb.defined_names['TaxRate'] = DefinedName('TaxRate', attr_text="'My Inputs'!$A$1")
+
+    path = tmp_path / 'model.xlsx'
+    wb.save(path)
+    return FormulaModel.from_file(str(path))
+
+
+def test_from_file_calculates_formulas_without_cached_values(model):
+    assert model.get_value('Calc!A1') == 100
+    assert model.get_value('Calc!A12') == pytest.approx(124)
+
+
+def test_functions(model):
+    assert model.get_value('Calc!A2') == 'big'
+    assert model.get_value('Calc!A3') == 20
+    assert model.get_value('Calc!A4') == 3
+    assert model.get_value('Calc!A5') == 30
+    assert model.get_value('Calc!A13') == NA
+    assert not model.unsupported_functions
+
+
+def test_operator_precedence(model):
+    assert model.get_value('Calc!A6') == 4       # Phủ định được tính trước lũy thừa, như Excel
+    assert model.get_value('Calc!A7') == pytest.approx(10)
+    assert model.get_value('Calc!A8') == 'Total: 100'
+    assert model.get_value('Calc!A9') == 19
+
+
+def test_quoted_sheet_refs_named_ranges_and_whole_columns(model):
+    assert model.get_value('Calc!A10') == pytest.approx(110)
+    assert model.get_value('Calc!A11') == 14
+    assert model.get_value("'My Inputs'!A1") == pytest.approx(0.1)
+
+
+def test_set_value_recalculates_only_dependents(model):
+    recalculated = model.set_value("'My Inputs'!A1", 0.2)
+    assert recalculated == 2                     # A10 và A12
+    assert model.get_value('Calc!A10') == pytest.approx(120)
+    assert model.get_value('Calc!A12') == pytest.approx(134)
+
+    model.set_value('My Inputs!A2', 'D')
+    assert model.get_value('Calc!A3') == 40
+    assert model.get_value('Calc!A4') == 5
+
+    model.set_value('Data!C2', 5)                # Vùng cả cột Data!C:C và điều kiện SUMIFS trên cột C
+    assert model.get_value('Calc!A11') == 17
+    assert model.get_value('Calc!A5') == 40
+    assert model.get_value('Calc!A12') == pytest.approx(137)
+
+
+def test_overriding_a_formula_cell_turns_it_into_an_input(model):
+    model.set_value('Calc!A1', 1000)
+    assert model.formula('Calc!A1') is None
+    assert model.get_value('Calc!A1') == 1000
+    assert model.get_value('Calc!A2') == 'big'
+    assert model.get_value('Calc!A14') == 2000
+    assert model.get_value('Calc!A10') == pytest.approx(1100)
+
+    model.set_value('Data!B2', 1)                # A1 không còn là công thức: giữ nguyên giá trị đã ghi
+    assert model.get_value('Calc!A1') == 1000
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Test formula_scanner: đọc danh sách sheet, công thức, Named Range và ghi lại gói trên file .xlsx tạo sẵn."""
+
+import zipfile
+import pytest
+from openpyxl import Workbook as OpenpyxlWorkbook, load_workbook
+from openpyxl.workbook.defined_name import DefinedName
+from excel_python.formula_scanner import (column_index, column_letter, get_sheet_parts, iter_defined_names,
+                                          iter_formulas, rewrite_package)
+
+# Sheet có công thức dùng chung (openpyxl không ghi shared formula) và ô không có thuộc tính 'r'
+SHARED_SHEET = b'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>
+<row r="1"><c r="A1"><v>1</v></c><c r="B1"><f t="shared" ref="B1:B3" si="0">'My Sheet'!A1*2</f><v>2</v></c></row>
+<row r="2"><c r="B2"><f t="shared" si="0"/><v>4</v></c></row>
+<row r="3"><c><v>3</v></c><c><f>SUM(A1:A3)</f><v>6</v></c></row>
+</sheetData></worksheet>'''
+
+
+@pytest.fixture
+def path(tmp_path):
+    wb = OpenpyxlWorkbook()
+    data = wb.active
+    data.title = 'Data'
+    data['A1'] = 10
+    data['B1'] = '=A1*2'
+    data['C5'] = "='My Sheet'!A1+Summary!B2"
+    hidden = wb.create_sheet('My Sheet')
+    hidden.sheet_state = 'hidden'
+    hidden['A1'] = 1
+    summary = wb.create_sheet('Summary')
+    summary.sheet_state = 'veryHidden'
+    summary['B2'] = '=SUM(Data!A1:A10)'
+    wb.defined_names['Total'] = DefinedName('Total', attr_text='Summary!$B$2')
+    hidden.defined_names['Local'] = DefinedName('Local', attr_text="'My Sheet'!$A$1")
+    result = tmp_path / 'scan.xlsx'
+    wb.save(result)
+    return result
+
+
+@pytest.fixture
+def shared_path(path, tmp_path):
+    result = tmp_path / 'shared.xlsx'
+    with zipfile.ZipFile(path) as zf:
+        part = dict((name, part) for name, part, _ in get_sheet_parts(zf))['My Sheet']
+    rewrite_package(path, {part: SHARED_SHEET}, destination=result)
+    return result
+
+
+def test_column_helpers():
+    assert [column_letter(i) for i in (1, 26, 27, 702, 16384)] == ['A', 'Z', 'AA', 'ZZ', 'XFD']
+    assert [column_index(s) for s in ('A', 'z', 'AA', 'ZZ', 'XFD')] == [1, 26, 27, 702, 16384]
+
+
+def test_get_sheet_parts_keeps_order_and_visibility(path):
+    with zipfile.ZipFile(path) as zf:
+        parts = get_sheet_parts(zf)
+        assert [(name, state) for name, _, state in parts] == [
+            ('Data', 'visible'), ('My Sheet', 'hidden'), ('Summary', 'veryHidden')]
+        assert all(part in zf.namelist() for _, part, _ in parts)
+
+
+def test_iter_formulas_streams_every_formula(path):
+    assert list(iter_formulas(path)) == [
+        ('Data', 'B1', 'A1*2'),
+        ('Data', 'C5', "'My Sheet'!A1+Summary!B2"),
+        ('Summary', 'B2', 'SUM(Data!A1:A10)'),
+    ]
+    assert list(iter_formulas(path, sheet_names=['Summary'])) == [('Summary', 'B2', 'SUM(Data!A1:A10)')]
+
+
+def test_iter_formulas_shared_and_implicit_coordinates(shared_path):
+    assert list(iter_formulas(shared_path, sheet_names=['My Sheet'])) == [
+        ('My Sheet', 'B1', "'My Sheet'!A1*2"),
+        ('My Sheet', 'B2', "'My Sheet'!A1*2"),   # Ô phụ thuộc nhận công thức của ô gốc
+        ('My Sheet', 'B3', 'SUM(A1:A3)'),
+    ]
+
+
+def test_iter_defined_names_with_scope(path):
+    assert sorted(iter_defined_names(path), key=lambda n: n[0]) == [
+        ('Local', 'My Sheet', "'My Sheet'!$A$1"),
+        ('Total', None, 'Summary!$B$2'),
+    ]
+
+
+def test_rewrite_package_replaces_drops_and_copies(path, tmp_path):
+    destination = tmp_path / 'out.xlsx'
+    with zipfile.ZipFile(path) as zf:
+        original = {name: zf.read(name) for name in zf.namelist()}
+    rewrite_package(path, {'docProps/core.xml': original['docProps/core.xml']}, drop=['docProps/app.xml'],
+                    destination=destination)
+    with zipfile.ZipFile(destination) as zf:
+        names = zf.namelist()
+        assert 'docProps/app.xml' not in names
+        assert all(zf.read(name) == original[name] for name in names)
+    assert set(names) == set(original) - {'docProps/app.xml'}
+    assert load_workbook(destination)['Data']['B1'].value == '=A1*2'
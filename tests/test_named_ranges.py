@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""Test named_ranges (đọc/xóa Named Range trên file) và XlwingsBook.delete_names() với các đối tượng xlwings giả."""
+
+import zipfile
+import pytest
+from openpyxl import Workbook as OpenpyxlWorkbook, load_workbook
+from openpyxl.workbook.defined_name import DefinedName
+from excel_python.backend import BULK_NAME_THRESHOLD, XlwingsBook
+from excel_python.named_ranges import read_names, remove_defined_names, select_names
+
+
+@pytest.fixture
+def path(tmp_path):
+    wb = OpenpyxlWorkbook()
+    data = wb.active
+    data.title = 'Data'
+    data.print_area = 'A1:C10'
+    data.print_title_rows = '1:1'
+    other = wb.create_sheet('My Sheet')
+    other.print_area = 'A1:B2'
+    wb.defined_names['Total'] = DefinedName('Total', attr_text='Data!$B$2')
+    wb.defined_names['Broken'] = DefinedName('Broken', attr_text='#REF!$A$1')
+    wb.defined_names['Secret'] = DefinedName('Secret', attr_text='Data!$A$1', hidden=True)
+    data.defined_names['Rate'] = DefinedName('Rate', attr_text='Data!$A$1')
+    other.defined_names['Rate'] = DefinedName('Rate', attr_text="'My Sheet'!$A$1")
+    result = tmp_path / 'names.xlsx'
+    wb.save(result)
+    return result
+
+
+def _by_name(names):
+    return {n['name']: n for n in names}
+
+
+def test_read_names_scopes_builtins_and_visibility(path):
+    names = _by_name(read_names(path))
+    assert set(names) == {'Total', 'Broken', 'Secret', 'Data!Rate', "'My Sheet'!Rate",
+                          'Data!Print_Area', 'Data!Print_Titles', "'My Sheet'!Print_Area"}
+    assert names['Total'] == {'name': 'Total', 'refers_to': '=Data!$B$2', 'scope': 'names.xlsx',
+                              'is_visible': True}
+    assert names["'My Sheet'!Rate"]['scope'] == 'My Sheet'
+    assert names["'My Sheet'!Rate"]['refers_to'] == "='My Sheet'!$A$1"
+    assert names['Data!Print_Area']['refers_to'].endswith('$A$1:$C$10')
+    assert names['Secret']['is_visible'] is False
+
+
+def test_select_names_keeps_print_areas(path):
+    names = read_names(path)
+    assert sorted(select_names(names)) == sorted(['Total', 'Broken', 'Secret', 'Data!Rate', "'My Sheet'!Rate"])
+    assert select_names(names, broken_only=True) == ['Broken']
+    assert 'Data!Print_Titles' in select_names(names, keep_print_areas=False)
+
+
+def test_remove_defined_names_by_scope_keeps_others(path, tmp_path):
+    destination = tmp_path / 'out.xlsx'
+    removed = remove_defined_names(path, ['total', "'MY SHEET'!rate", 'Data!Print_Area', 'Missing'],
+                                   destination=destination)
+
+    assert removed == 3
+    assert set(_by_name(read_names(destination))) == {'Broken', 'Secret', 'Data!Rate', 'Data!Print_Titles',
+                                                      "'My Sheet'!Print_Area"}
+    assert len(read_names(path)) == 8                      # File gốc không bị thay đổi
+    wb = load_workbook(destination)
+    assert wb['My Sheet'].print_area and not wb['Data'].print_area
+    with zipfile.ZipFile(path) as src, zipfile.ZipFile(destination) as dst:
+        assert src.read('xl/worksheets/sheet1.xml') == dst.read('xl/worksheets/sheet1.xml')
+
+
+def test_remove_every_name_in_place(path):
+    assert remove_defined_names(path, [n['name'] for n in read_names(path)]) == 8
+    assert read_names(path) == []
+    with zipfile.ZipFile(path) as zf:
+        assert b'definedNames' not in zf.read('xl/workbook.xml')
+    assert remove_defined_names(path, ['Total']) == 0
+
+
+# --- XlwingsBook với các đối tượng xlwings giả ---
+class FakeName:
+    def __init__(self, book, name):
+        self.book, self.name = book, name
+
+    def Delete(self):
+        if self.name not in self.book.com_names:
+            raise KeyError(self.name)
+        self.book.com_names.remove(self.name)
+        self.book.calls.append(('Delete', self.name))
+
+
+class FakeApi:
+    def __init__(self, book):
+        self.book = book
+        self.ReadOnly = False
+        self.Saved = True
+
+    def Names(self, name):
+        return FakeName(self.book, name)
+
+
+class FakeXlwSheet:
+    def __init__(self, name):
+        self.name = name
+
+    def range(self, cell1, cell2=None):
+        return FakeXlwRange(self, cell1)
+
+
+class FakeXlwRange:
+    def __init__(self, sheet, address):
+        self.sheet, self.address = sheet, address
+
+
+class FakeBooks:
+    def __init__(self, app):
+        self.app = app
+
+    def open(self, path, **kwargs):
+        self.app.calls.append(('open', path, kwargs))
+        return FakeXlwBook(self.app, path)
+
+
+class FakeXlwApp:
+    def __init__(self):
+        self.calls = []
+        self.books = FakeBooks(self)
+
+
+class FakeXlwBook:
+    def __init__(self, app, path, com_names=()):
+        self.app, self.fullname = app, str(path)
+        self.api = FakeApi(self)
+        self.com_names = set(com_names)
+        self.calls = app.calls
+        self.sheets = {name: FakeXlwSheet(name) for name in ('Data', 'My Sheet')}
+
+    def close(self):
+        self.calls.append(('close',))
+
+
+def _bulk_file(tmp_path, count):
+    wb = OpenpyxlWorkbook()
+    wb.active.title = 'Data'
+    wb.create_sheet('My Sheet')
+    wb.active.print_area = 'A1:B5'
+    for i in range(count):
+        wb.defined_names[f'N{i}'] = DefinedName(f'N{i}', attr_text=f'Data!$A${i + 1}')
+    wb['My Sheet'].defined_names['Local'] = DefinedName('Local', attr_text="'My Sheet'!$A$1")
+    path = tmp_path / 'bulk.xlsx'
+    wb.save(path)
+    return path
+
+
+def test_delete_names_below_threshold_uses_com_per_name(tmp_path):
+    app = FakeXlwApp()
+    book = XlwingsBook(FakeXlwBook(app, tmp_path / 'x.xlsx', com_names=['A', 'B']))
+    failed = book.delete_names(['A', 'Missing', 'B'])
+    assert [name for name, _ in failed] == ['Missing']
+    assert app.calls == [('Delete', 'A'), ('Delete', 'B')]
+
+
+def test_delete_names_bulk_rewrites_file_and_reopens(tmp_path):
+    path = _bulk_file(tmp_path, BULK_NAME_THRESHOLD)
+    app = FakeXlwApp()
+    xlw_book = FakeXlwBook(app, path)
+    book = XlwingsBook(xlw_book, password='pw')
+    sheet = book.get_sheet('My Sheet')
+    rng = sheet.range('B2')
+
+    names = select_names(book.get_names())                  # Đọc từ file vì workbook đã lưu
+    assert len(names) == BULK_NAME_THRESHOLD + 1
+    assert book.delete_names(names) == []
+
+    assert app.calls == [('close',), ('open', str(path), {'password': 'pw', 'read_only': False,
+                                                           'ignore_read_only_recommended': True})]
+    assert [n['name'] for n in read_names(path)] == ['Data!Print_Area']
+    # Sheet và vùng lấy trước đó được trỏ sang book vừa mở lại
+    assert book._xlw_book is not xlw_book
+    assert sheet._xlw_sheet is book._xlw_book.sheets['My Sheet']
+    assert rng._xlw_range.sheet is sheet._xlw_sheet and rng._xlw_range.address == 'B2'
+
+
+def test_delete_names_bulk_falls_back_when_book_has_unsaved_changes(tmp_path):
+    path = _bulk_file(tmp_path, BULK_NAME_THRESHOLD)
+    app = FakeXlwApp()
+    names = [f'N{i}' for i in range(BULK_NAME_THRESHOLD)]
+    xlw_book = FakeXlwBook(app, path, com_names=names)
+    xlw_book.api.Saved = False
+    book = XlwingsBook(xlw_book)
+
+    assert book.delete_names(names) == []
+    assert len(app.calls) == BULK_NAME_THRESHOLD and ('close',) not in app.calls
+    assert len(read_names(path)) == BULK_NAME_THRESHOLD + 2   # File không bị ghi lại
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Test export_many() với bộ xuất thay thế trên engine 'file', và XlwingsBook.is_ready() với COM giả."""
+
+import threading
+from types import SimpleNamespace
+import pytest
+from excel_python.excelapp import ExcelApp
+from excel_python.backend import XlwingsBook, _XL_CALCULATION_MANUAL
+from excel_python.pdf_export import export_many
+
+XL_CALCULATION_AUTOMATIC = -4105
+XL_PENDING = 2
+
+
+@pytest.fixture
+def sources(tmp_path):
+    app = ExcelApp(visible=False, engine='file')
+    paths = []
+    for name in ('a.xlsx', 'b.xlsx'):
+        book = app.new()
+        book.sheets[0].range('A1').value = name
+        book.save_as(str(tmp_path / name))
+        book.close()
+        paths.append(tmp_path / name)
+    app.quit()
+    return paths
+
+
+class RecordingExporter:
+    """Bộ xuất thay thế: ghi lại (workbook, tên file, luồng) và ghi một file giả."""
+    def __init__(self, fail_on=()):
+        self.calls = []
+        self.fail_on = set(fail_on)
+        self._lock = threading.Lock()
+
+    def __call__(self, book, job):
+        with self._lock:
+            self.calls.append((book.name, job['output'].name, threading.get_ident()))
+        if job['output'].name in self.fail_on:
+            raise RuntimeError("export failed")
+        job['output'].write_bytes(b'%PDF')
+
+
+def test_jobs_of_one_workbook_share_one_open_and_one_worker(sources, tmp_path):
+    a, b = sources
+    exporter = RecordingExporter()
+    jobs = [{'source': a, 'output': tmp_path / 'out' / 'a1.pdf'},
+            {'source': b, 'output': tmp_path / 'out' / 'b1.pdf'},
+            {'source': a, 'output': tmp_path / 'out' / 'a2.pdf', 'sheets': ['Sheet']}]
+    report = export_many(jobs, workers=2, exporter=exporter, engine='file')
+
+    assert [entry['output'].name for entry in report] == ['a1.pdf', 'b1.pdf', 'a2.pdf']
+    assert all(entry['status'] == 'exported' for entry in report)
+    assert all((tmp_path / 'out' / name).is_file() for name in ('a1.pdf', 'a2.pdf', 'b1.pdf'))
+    a_calls = [call for call in exporter.calls if call[0] == 'a.xlsx']
+    assert [call[1] for call in a_calls] == ['a1.pdf', 'a2.pdf']
+    assert len({call[2] for call in a_calls}) == 1
+    for entry in report:
+        assert entry['seconds'] >= 0 and entry['open_seconds'] >= 0 and entry['wait_seconds'] >= 0
+
+
+def test_missing_source_and_exporter_errors_are_reported(sources, tmp_path):
+    a, _ = sources
+    exporter = RecordingExporter(fail_on={'bad.pdf'})
+    jobs = [{'source': tmp_path / 'missing.xlsx', 'output': tmp_path / 'missing.pdf'},
+            {'source': a, 'output': tmp_path / 'bad.pdf'},
+            {'source': a, 'output': tmp_path / 'good.pdf'}]
+    report = export_many(jobs, exporter=exporter, engine='file')
+
+    assert [entry['status'] for entry in report] == ['failed', 'failed', 'exported']
+    assert report[0]['error']
+    assert 'export failed' in report[1]['error']
+    assert report[2]['error'] is None
+    assert [call[1] for call in exporter.calls] == ['bad.pdf', 'good.pdf']
+
+
+def test_invalid_jobs_raise_before_any_export(sources, tmp_path):
+    a, b = sources
+    exporter = RecordingExporter()
+    with pytest.raises(ValueError):
+        export_many([{'source': a, 'output': tmp_path / 'x.pdf'},
+                     {'source': b, 'output': tmp_path / 'x.pdf'}], exporter=exporter, engine='file')
+    with pytest.raises(ValueError):
+        export_many([{'source': a, 'output': tmp_path / 'r.pdf', 'range': 'A1:B2'}],
+                    exporter=exporter, engine='file')
+    with pytest.raises(ValueError):
+        export_many([{'source': a, 'output': tmp_path / 'r.pdf', 'range': 'A1:B2', 'sheets': ['S1', 'S2']}],
+                    exporter=exporter, engine='file')
+    assert exporter.calls == []
+
+
+def _book_with_app_api(**api):
+    return XlwingsBook(SimpleNamespace(app=SimpleNamespace(api=SimpleNamespace(**api))))
+
+
+def test_is_ready_ignores_pending_calculation_in_manual_mode():
+    assert _book_with_app_api(Ready=True, Calculation=_XL_CALCULATION_MANUAL, CalculationState=XL_PENDING).is_ready()
+    assert not _book_with_app_api(Ready=False, Calculation=_XL_CALCULATION_MANUAL, CalculationState=0).is_ready()
+
+
+def test_is_ready_waits_for_calculation_in_automatic_mode():
+    assert not _book_with_app_api(Ready=True, Calculation=XL_CALCULATION_AUTOMATIC,
+                                  CalculationState=XL_PENDING).is_ready()
+    assert _book_with_app_api(Ready=True, Calculation=XL_CALCULATION_AUTOMATIC, CalculationState=0).is_ready()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Test Profiler: đếm lần gọi từ nhiều luồng, caller và trace là tùy chọn."""
+
+import threading
+from excel_python.excelapp import ExcelApp
+from excel_python.profiler import Profiler
+
+
+def _write_cells(profiler, count=50):
+    app = ExcelApp(visible=False, engine='file', profiler=profiler)
+    sheet = app.new().sheets[0]
+    profiler.reset()
+    for i in range(1, count + 1):
+        sheet.range(f'A{i}').value = i
+    return app
+
+
+def test_defaults_skip_callers_and_trace():
+    profiler = Profiler()
+    _write_cells(profiler).quit()
+    stats = {row['operation']: row for row in profiler.stats()}
+    assert stats['Range.value.set']['calls'] == 50
+    assert stats['Range.value.set']['callers'] == {}
+    assert profiler._events == []
+
+
+def test_callers_and_trace_when_enabled():
+    profiler = Profiler(trace=True, callers=True)
+    _write_cells(profiler).quit()
+    stats = {row['operation']: row for row in profiler.stats()}
+    assert stats['Range.value.set']['callers'] == {'Range.value': 50}
+    assert stats['Sheet.range']['callers'] == {'Sheet.range': 50}
+    assert sum(1 for event in profiler._events if event[0] == 'Range.value.set') == 50
+
+
+def test_shared_profiler_counts_every_call_across_threads():
+    profiler = Profiler(trace=True)
+    apps = [ExcelApp(visible=False, engine='file', profiler=profiler) for _ in range(4)]
+    sheets = [app.new().sheets[0] for app in apps]
+    profiler.reset()
+    barrier = threading.Barrier(len(sheets))
+
+    def work(sheet):
+        barrier.wait()
+        for i in range(1, 201):
+            sheet.range(f'A{i}').value = i
+
+    threads = [threading.Thread(target=work, args=(sheet,)) for sheet in sheets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for app in apps:
+        app.quit()
+
+    stats = {row['operation']: row for row in profiler.stats()}
+    assert stats['Range.value.set']['calls'] == 800
+    assert len(profiler._ops['Range.value.set']['durations']) == 800
+    assert len({event[5] for event in profiler._events if event[0] == 'Range.value.set'}) == 4
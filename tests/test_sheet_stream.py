@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Test Sheet.iter_rows(): đọc stream (workbook chỉ đọc) và đọc qua vùng cho cùng kết quả."""
+
+import pytest
+from openpyxl import Workbook as OpenpyxlWorkbook
+from excel_python.excelapp import ExcelApp
+from excel_python.sheet_stream import sheet_dimension
+
+
+@pytest.fixture
+def path(tmp_path):
+    wb = OpenpyxlWorkbook()
+    ws = wb.active
+    ws.title = 'Data'
+    ws['A1'], ws['B1'], ws['C1'] = 'id', 'name', 'note'   # Cột D không có tiêu đề
+    for i in range(2, 2502):
+        ws.cell(i, 1, i - 1)
+        ws.cell(i, 2, f'item {i - 1}')
+        if i % 7 == 0:
+            ws.cell(i, 3, 'x')
+        ws.cell(i, 4, float(i))
+    for i in range(2300, 2502):                             # Dòng cuối chỉ có dữ liệu ở cột A, B
+        ws.cell(i, 4).value = None
+    ws.cell(2505, 2, 'footer')
+    result = tmp_path / 'rows.xlsx'
+    wb.save(result)
+    return result
+
+
+def _read(path, read_only, **kwargs):
+    app = ExcelApp(visible=False, engine='file')
+    try:
+        sheet = app.open(str(path), read_only=read_only).sheet('Data')
+        return list(sheet.iter_rows(with_start_row=True, **kwargs))
+    finally:
+        app.quit()
+
+
+@pytest.mark.parametrize('columns', [None, [4], ['C', 'A'], [2]])
+def test_streamed_and_loaded_rows_match(path, columns):
+    streamed = _read(path, True, chunk_size=400, columns=columns)
+    loaded = _read(path, False, chunk_size=400, columns=columns)
+    assert [start for start, _ in streamed] == [start for start, _ in loaded]
+    assert streamed == loaded
+    rows = [row for _, block in streamed for row in block]
+    assert len(rows) == 2505
+    assert streamed[0][0] == 1
+    assert all(len(row) == (len(columns) if columns else 4) for row in rows)
+
+
+def test_blocks_line_up_with_sheet_rows(path):
+    for start, block in _read(path, True, chunk_size=1000, columns=[4]):
+        for offset, (value,) in enumerate(block):
+            row = start + offset
+            assert value == (float(row) if 2 <= row < 2300 else None)
+
+
+def test_sheet_dimension(path):
+    assert sheet_dimension(str(path), 'data') == (1, 1, 2505, 4)
+    with pytest.raises(KeyError):
+        sheet_dimension(str(path), 'Missing')
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Test ExcelApp.wait_for_workbook(): thời gian chờ tăng dần, kết hợp điều kiện, phiên bản asyncio."""
+
+import asyncio
+import pytest
+from excel_python.excelapp import ExcelApp
+from excel_python.file_backend import FileApp, FileBook
+
+
+class StandInApp(FileApp):
+    """Backend 'file' mà các book xuất hiện sau một số lần kiểm tra, ghi nhận số lần đọc danh sách book."""
+    def __init__(self, schedule=()):
+        super().__init__()
+        self.schedule = sorted(schedule)   # [(số lần đếm book, tên book)]
+        self.count_calls = 0
+        self.list_calls = 0
+
+    def book_count(self):
+        self.count_calls += 1
+        while self.schedule and self.schedule[0][0] <= self.count_calls:
+            _, name = self.schedule.pop(0)
+            self._books.append(FileBook(self, name=name))
+        return super().book_count()
+
+    @property
+    def books(self):
+        self.list_calls += 1
+        return list(self._books)
+
+
+def _app(schedule=()):
+    backend = StandInApp(schedule)
+    app = ExcelApp(visible=False, engine=backend)
+    backend.count_calls = backend.list_calls = 0
+    return app, backend
+
+
+def test_delay_doubles_up_to_max_and_names_are_reread_only_when_needed():
+    app, backend = _app()
+    poll = app._poll_workbook('never', None, 60, None, None, None, 0.005, 0.5)
+    delays = [next(poll) for _ in range(10)]
+    assert delays == pytest.approx([0.005, 0.01, 0.02, 0.04, 0.08, 0.16, 0.32, 0.5, 0.5, 0.5])
+    assert backend.count_calls == 10
+    # Lần đầu, rồi mỗi lần kiểm tra khi đã ở mức max_delay (book có thể được đổi tên)
+    assert backend.list_calls == 1 + 3
+
+
+def test_combined_conditions_must_all_match():
+    app, backend = _app([(2, 'Book1'), (3, 'report_draft'), (5, 'report_final')])
+    book = app.wait_for_workbook(title_contains='report', name_pattern=r'final$', min_count=2,
+                                 timeout=5, initial_delay=0.001)
+    assert book is not None and book.name == 'report_final'
+    assert backend.count_calls == 5
+
+
+def test_min_count_alone_returns_latest_book():
+    app, _ = _app([(3, 'Book1'), (3, 'Book2')])
+    book = app.wait_for_workbook(min_count=2, timeout=5, initial_delay=0.001)
+    assert book.name == 'Book2'
+
+
+def test_invalid_conditions_and_timeout():
+    app, _ = _app()
+    with pytest.raises(ValueError):
+        app.wait_for_workbook(min_count=0, timeout=0)
+    with pytest.raises(ValueError):
+        app.wait_for_workbook(timeout=0)
+    assert app.wait_for_workbook(min_count=1, timeout=0.02, initial_delay=0.001) is None
+
+
+def test_async_version_yields_to_the_event_loop():
+    app, backend = _app([(4, 'Sales 2026')])
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        book = await app.wait_for_workbook_async(name_pattern=r'^Sales', timeout=5, initial_delay=0.001)
+        task.cancel()
+        return book, ticks
+
+    book, ticks = asyncio.run(main())
+    assert book.name == 'Sales 2026'
+    assert backend.count_calls == 4
+    assert ticks > 0
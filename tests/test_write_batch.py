@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Test WriteBatch: gom thao tác ghi và thống kê số lần gọi tiết kiệm được, với backend giả lập đếm lần gọi."""
+
+from excel_python.excelapp import ExcelApp
+from excel_python.write_batch import WriteBatch
+
+
+class CountingSheetImpl:
+    def __init__(self):
+        self.calls = []
+
+    def range(self, cell1, cell2=None):
+        sheet = self
+
+        class _Range:
+            def set_values(self, rows):
+                sheet.calls.append(('set_values', cell1, cell2, rows))
+        return _Range()
+
+    def union_range(self, blocks):
+        sheet = self
+
+        class _Union:
+            def merge(self):
+                sheet.calls.append(('merge', tuple(blocks)))
+        return _Union()
+
+    def apply_styles(self, assignments):
+        for style, blocks in assignments:
+            self.calls.append(('apply_style', style, tuple(blocks)))
+        return len(assignments)
+
+
+class FakeSheet:
+    def __init__(self):
+        self._impl = CountingSheetImpl()
+
+
+class FakeRange:
+    def __init__(self, sheet, block):
+        self.sheet = sheet
+        self.block = block
+
+    def _block(self):
+        return self.block
+
+
+def cell(sheet, row, col):
+    return FakeRange(sheet, (row, col, row, col))
+
+
+def test_adjacent_cell_writes_become_one_call():
+    sheet = FakeSheet()
+    batch = WriteBatch(workbook=None)
+    for row in range(1, 101):
+        for col in (1, 2):
+            batch.queue_values(cell(sheet, row, col), row * col)
+
+    assert batch.flush() == 1
+    (name, first, last, rows), = sheet._impl.calls
+    assert (name, first, last) == ('set_values', (1, 1), (100, 2))
+    assert rows[9] == [10, 20]
+    assert batch.stats == {'queued_calls': 200, 'backend_calls': 1, 'calls_saved': 199}
+
+
+def test_last_write_wins_and_gaps_split_blocks():
+    sheet = FakeSheet()
+    batch = WriteBatch(workbook=None)
+    batch.queue_values(cell(sheet, 1, 1), 'old')
+    batch.queue_values(cell(sheet, 1, 1), 'new')
+    batch.queue_values(cell(sheet, 5, 1), 'x')
+
+    assert batch.flush() == 2
+    written = {(c[1], c[2]): c[3] for c in sheet._impl.calls}
+    assert written[((1, 1), (1, 1))] == [['new']]
+    assert batch.stats['calls_saved'] == 1
+
+
+def test_one_style_call_per_distinct_final_style():
+    sheet = FakeSheet()
+    batch = WriteBatch(workbook=None)
+    for row in range(1, 51):
+        batch.queue_style(cell(sheet, row, 1), font_bold=True)
+        batch.queue_style(cell(sheet, row, 2), font_bold=True, interior_color=(255, 0, 0))
+    batch.queue_style(cell(sheet, 10, 1), interior_color=(255, 0, 0))  # Ô A10 có cùng định dạng với cột B
+
+    assert batch.flush() == 2
+    styles = {tuple(sorted(c[1].items())): c[2] for c in sheet._impl.calls}
+    assert set(styles) == {(('font_bold', True),),
+                           (('font_bold', True), ('interior_color', (255, 0, 0)))}
+    assert batch.stats == {'queued_calls': 101, 'backend_calls': 2, 'calls_saved': 99}
+
+
+def rect(sheet, first_row, first_col, last_row, last_col):
+    return FakeRange(sheet, (first_row, first_col, last_row, last_col))
+
+
+def _written_cells(calls):
+    """Các ô đã ghi qua set_values, báo lỗi nếu một ô bị ghi hai lần."""
+    cells = {}
+    for _, (first_row, first_col), _, rows in calls:
+        for i, row_values in enumerate(rows):
+            for j, value in enumerate(row_values):
+                assert (first_row + i, first_col + j) not in cells
+                cells[(first_row + i, first_col + j)] = value
+    return cells
+
+
+def test_overlapping_value_rectangles_write_each_cell_once():
+    sheet = FakeSheet()
+    batch = WriteBatch(workbook=None)
+    batch.queue_values(rect(sheet, 1, 1, 2, 2), [[1, 2], [3, 4]])   # A1:B2
+    batch.queue_values(rect(sheet, 2, 2, 3, 3), [[5, 6], [7, 8]])   # B2:C3, đè lên B2
+
+    assert batch.flush() == 3  # Các dòng A1:B1, A2:C2, B3:C3 có khoảng cột khác nhau
+    assert [(c[1], c[2]) for c in sheet._impl.calls] == [((1, 1), (1, 2)), ((2, 1), (2, 3)), ((3, 2), (3, 3))]
+    assert _written_cells(sheet._impl.calls) == {(1, 1): 1, (1, 2): 2, (2, 1): 3, (2, 2): 5, (2, 3): 6,
+                                                 (3, 2): 7, (3, 3): 8}
+
+
+def test_adjacent_value_rectangles_merge_into_one_block():
+    sheet = FakeSheet()
+    batch = WriteBatch(workbook=None)
+    batch.queue_values(rect(sheet, 1, 1, 2, 1), [[1], [2]])         # A1:A2
+    batch.queue_values(rect(sheet, 1, 2, 2, 2), [[3], [4]])         # B1:B2, kề bên phải
+    batch.queue_values(rect(sheet, 3, 1, 3, 2), 0)                  # A3:B3, kề bên dưới
+
+    assert batch.flush() == 1
+    assert sheet._impl.calls == [('set_values', (1, 1), (3, 2), [[1, 3], [2, 4], [0, 0]])]
+    assert batch.stats['calls_saved'] == 2
+
+
+def test_overlapping_and_adjacent_style_rectangles():
+    sheet = FakeSheet()
+    batch = WriteBatch(workbook=None)
+    batch.queue_style(rect(sheet, 1, 1, 2, 2), font_bold=True)      # A1:B2
+    batch.queue_style(rect(sheet, 2, 2, 3, 3), font_italic=True)    # B2:C3, chồng lên B2
+    batch.queue_style(rect(sheet, 1, 3, 1, 4), font_bold=True)      # C1:D1, kề A1:B1
+
+    assert batch.flush() == 3
+    styles = {tuple(sorted(c[1].items())): c[2] for c in sheet._impl.calls}
+    assert styles == {
+        (('font_bold', True),): ((1, 1, 1, 4), (2, 1, 2, 1)),
+        (('font_bold', True), ('font_italic', True)): ((2, 2, 2, 2),),
+        (('font_italic', True),): ((2, 3, 2, 3), (3, 2, 3, 3)),
+    }
+
+
+def test_identical_merges_are_deduplicated():
+    sheet = FakeSheet()
+    batch = WriteBatch(workbook=None)
+    for _ in range(3):
+        batch.queue_merge(FakeRange(sheet, (1, 1, 2, 3)))
+    batch.queue_merge(FakeRange(sheet, (5, 1, 5, 4)))
+
+    assert batch.flush() == 1
+    assert sheet._impl.calls == [('merge', ((1, 1, 2, 3), (5, 1, 5, 4)))]
+
+
+def test_workbook_batch_reports_saved_calls_on_file_engine():
+    app = ExcelApp(visible=False, engine='file')
+    try:
+        book = app.new()
+        sheet = book.sheets[0]
+        with book.batch() as batch:
+            for row in range(1, 21):
+                sheet.range(f'A{row}').value = row
+                sheet.range(f'B{row}').formula = f'=A{row}*2'
+                sheet.range(f'A{row}:B{row}').style(font_bold=True)
+        assert batch.stats == {'queued_calls': 60, 'backend_calls': 2, 'calls_saved': 58}
+        assert sheet.range('A1:A3').value == [1, 2, 3]
+        assert sheet.range('B3').formula == '=A3*2'
+    finally:
+        app.quit()
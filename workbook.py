@@ -5,6 +5,86 @@ Author: Your Name / Tên của bạn
 Description: Chứa class Workbook để đại diện và quản lý một file Excel.
 
 --- CHANGELOG ---
+Version 0.22.0 (2026-10-17):
+    - calculate(scope='dirty') tính toán lại toàn bộ khi quá nửa số sheet bị ảnh hưởng (trước đây chỉ
+      khi tất cả các sheet bị ảnh hưởng), đúng như mô tả trong docstring.
+
+Version 0.21.0 (2026-10-17):
+    - Xóa _break_links_to_sheet_slow(): không còn được gọi từ khi xóa an toàn dùng chỉ mục phụ thuộc.
+
+Version 0.20.0 (2026-10-17):
+    - .for_each_sheet() trả về self ở cả hai chế độ (tuần tự và parallel=True); kết quả luôn nằm trong
+      .last_for_each với cùng dạng {'results', 'errors', 'seconds'}, nên có thể đổi chế độ mà không
+      phải sửa code gọi.
+
+Version 0.19.0 (2026-10-17):
+    - .to_pdf() không còn kích hoạt workbook và chờ cố định 1 giây: chờ Excel sẵn sàng
+      (không bận, không còn tính toán dở) với thời gian chờ tăng dần, tối đa ready_timeout giây.
+    - .to_pdf() nhận thêm tham số sheets để chỉ xuất các sheet được chọn.
+
+Version 0.18.0 (2026-10-17):
+    - Dùng logging (log_utils.py) thay cho print(), định dạng thông điệp trễ.
+    - .delete_all_named_ranges(), .break_external_links(), .for_each_sheet() ghi một dòng tổng kết
+      cho mỗi thao tác (OperationLog) thay vì một dòng cho mỗi tên/liên kết/sheet;
+      chi tiết từng phần tử ở mức DEBUG.
+
+Version 0.17.0 (2026-10-17):
+    - .for_each_sheet(parallel=True, workers=N): với engine 'file', các sheet được chia cho một
+      process pool; mỗi tiến trình mở file ở chế độ chỉ đọc (đọc stream sheet của mình) một lần.
+      Trả về dict {'results', 'errors', 'seconds'} với kết quả theo tên sheet và lỗi có cấu trúc.
+    - Chế độ tuần tự vẫn trả về self, kết quả/lỗi được lưu trong .last_for_each.
+
+Version 0.16.0 (2026-10-17):
+    - Thêm .formula_model(): nạp workbook vào bộ tính công thức thuần Python (formula_eval.py) để
+      chạy nhiều kịch bản đầu vào mà không cần Excel.
+
+Version 0.15.0 (2026-10-17):
+    - Theo dõi các vùng đã ghi kể từ lần tính toán trước (.dirty_ranges).
+    - .calculate(scope='dirty'): chỉ tính toán lại các sheet bị ghi và các sheet phụ thuộc vào chúng
+      (theo chỉ mục phụ thuộc), theo thứ tự phụ thuộc; quay về tính toán toàn bộ khi cần.
+    - Thêm .manual_calculation(): chuyển sang chế độ tính toán thủ công trong khối with và chỉ
+      tính toán lại một lần khi kết thúc khối.
+
+Version 0.14.0 (2026-10-17):
+    - Quản lý Named Range hàng loạt (named_ranges.py): danh sách tên được đọc một lượt (từ workbook.xml
+      khi file trên đĩa không có thay đổi), lọc bằng các regex biên dịch sẵn và xóa bằng một lần gọi
+      BookBackend.delete_names(). Không còn in từng tên đã xóa, chỉ in tổng kết.
+
+Version 0.13.0 (2026-10-17):
+    - Thêm .batch(): gom các thao tác ghi (giá trị, công thức, định dạng, merge, shape) và gửi xuống
+      backend với số lần gọi ít nhất khi kết thúc khối with (xem write_batch.py).
+
+Version 0.12.0 (2026-10-17):
+    - Bảng thông tin sheet (tên, vị trí, trạng thái hiển thị) được đọc một lượt và lưu cache;
+      .sheets, .visible_sheets, .hidden_sheets, .sheet_names, .sheet() không gọi COM khi lặp lại.
+    - Đối tượng Sheet được giữ (tham chiếu yếu) để cùng một sheet luôn trả về cùng một đối tượng.
+    - Cache bị hủy khi thêm/xóa/đổi tên sheet hoặc khi gọi .invalidate_sheet_cache().
+
+Version 0.11.0 (2026-10-17):
+    - .save_as() và .close() cập nhật chỉ mục workbook của ExcelApp.
+
+Version 0.10.0 (2026-10-17):
+    - Workbook hoạt động trên giao diện backend (self._impl) thay vì gọi trực tiếp xlwings,
+      dùng được với cả engine 'xlwings' (Excel thật) và 'file' (không cần Excel).
+    - Thêm phương thức .get_named_range().
+
+Version 0.9.0 (2026-10-17):
+    - Khi phá vỡ liên kết, các ô được gom thành các khối hình chữ nhật liền kề trên mỗi sheet
+      và mỗi khối chỉ được đọc một lần, ghi một lần (cell_blocks.freeze_formula_cells).
+      Số lần gọi COM được báo cáo sau khi hoàn tất.
+
+Version 0.8.0 (2026-10-17):
+    - Thêm chỉ mục phụ thuộc giữa các sheet (SheetDependencyIndex), xây dựng một lần
+      cho mỗi Workbook và cập nhật tăng dần khi xóa sheet. Xóa N sheet ẩn chỉ cần một lần quét.
+    - Chỉ mục bị hủy khi .save(), .save_as(), .add_sheet() hoặc khi gọi .invalidate_dependency_index().
+    - _break_links_to_sheet_slow() đọc công thức của cả used_range trong một lần gọi thay vì từng ô.
+
+Version 0.7.0 (2026-10-17):
+    - Chế độ xóa an toàn không còn dùng openpyxl.load_workbook() để quét công thức.
+      Thay vào đó quét stream trực tiếp XML của các sheet (formula_scanner), chỉ lấy
+      các phần tử <f>. Việc so khớp tham chiếu tới các sheet mục tiêu nay nằm trong
+      chỉ mục phụ thuộc (dependency_index.SheetDependencyIndex, xem 0.8.0).
+
 Version 0.6.0 (2025-08-08):
     - Tối ưu hóa hiệu suất cho chế độ xóa an toàn (safe=True) bằng cách kết hợp
       openpyxl để tìm công thức và xlwings để thay thế giá trị, tránh treo máy với file lớn.
@@ -27,25 +107,80 @@ Version 0.1.0 (2025-08-08):
 """
 
 from pathlib import Path
+import logging
+import pickle
 import time
-import re
+import traceback
+import weakref
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from .sheet import Sheet
 from .range import Range
-# Thêm thư viện openpyxl để tối ưu hóa việc đọc file
-try:
-    from openpyxl import load_workbook
-except ImportError:
-    print("WARNING: 'openpyxl' is not installed. The safe delete feature will be slower. Please install it using: pip install openpyxl")
-    load_workbook = None
+from .formula_scanner import iter_formulas, iter_defined_names, get_sheet_parts, column_letter
+from .dependency_index import SheetDependencyIndex
+from .cell_blocks import freeze_formula_cells, block_address
+from .write_batch import WriteBatch
+from .named_ranges import VALID_NAME_PATTERN, select_names
+from .log_utils import SUCCESS, OperationLog
+
+logger = logging.getLogger(__name__)
+
+
+# Số khối tối đa được ghi nhận cho mỗi sheet trước khi coi cả sheet đã thay đổi
+_MAX_DIRTY_BLOCKS = 1000
+
+# calculate(scope='dirty') tính toán lại toàn bộ khi tỉ lệ sheet bị ảnh hưởng vượt quá ngưỡng này
+_FULL_CALC_SHEET_RATIO = 0.5
+
+# Workbook chỉ đọc được mở một lần trong mỗi tiến trình con của for_each_sheet(parallel=True)
+_worker_app = None
+_worker_book = None
+
+
+def _init_sheet_worker(path):
+    """(Hàm nội bộ) Khởi tạo tiến trình con: mở workbook ở chế độ chỉ đọc bằng engine 'file'."""
+    global _worker_app, _worker_book
+    from .excelapp import ExcelApp
+    _worker_app = ExcelApp(visible=False, screen_updating=False, display_alerts=False, engine='file')
+    _worker_book = _worker_app.open(path, read_only=True)
+
+
+def _error_info(error):
+    """(Hàm nội bộ) Thông tin lỗi có cấu trúc (có thể pickle) của một exception."""
+    return {'type': type(error).__name__, 'message': str(error),
+            'traceback': ''.join(traceback.format_exception(type(error), error, error.__traceback__))}
+
+
+def _run_sheet_action(sheet_name, action):
+    """(Hàm nội bộ) Thực thi action trên một sheet trong tiến trình con. Trả về (ok, kết quả hoặc lỗi, giây)."""
+    start = time.perf_counter()
+    try:
+        if _worker_book is None:
+            raise RuntimeError("Tiến trình con không mở được workbook.")
+        result = action(_worker_book.sheet(sheet_name))
+        pickle.dumps(result)  # Báo lỗi ngay tại sheet này nếu kết quả không gửi về được
+        return True, result, time.perf_counter() - start
+    except Exception as e:
+        return False, _error_info(e), time.perf_counter() - start
 
 
 class Workbook:
     """
     Đại diện cho một file Excel (sổ làm việc).
     """
-    def __init__(self, xlw_book, app_instance):
-        self._xlw_book = xlw_book
+    def __init__(self, book_impl, app_instance):
+        self._impl = book_impl
         self._app = app_instance
+        self._dependency_index = None
+        self._sheet_meta = None
+        self._sheet_wrappers = weakref.WeakValueDictionary()
+        self._batch = None
+        self._dirty = {}          # tên sheet (lower) -> (tên sheet, list khối đã ghi hoặc None = cả sheet)
+        self._dirty_all = False   # True nếu thay đổi cấu trúc, cần tính toán lại toàn bộ
+        self._manual_calc_depth = 0
+        self.last_calculation = None
+        self.last_for_each = None
 
     def __repr__(self):
         return f"<Workbook [{self.name}]>"
@@ -53,11 +188,11 @@ class Workbook:
     # --- Properties ---
     @property
     def name(self):
-        return self._xlw_book.name
+        return self._impl.name
 
     @property
     def path(self):
-        return Path(self._xlw_book.fullname)
+        return Path(self._impl.fullname)
 
     @property
     def app(self):
@@ -65,76 +200,345 @@ class Workbook:
 
     @property
     def sheets(self):
-        return [Sheet(s, self) for s in self._xlw_book.sheets]
+        return [self._wrap_sheet(meta) for meta in self._get_sheet_meta()]
 
     @property
     def visible_sheets(self):
         """Trả về một danh sách chỉ các sheet đang được hiển thị."""
-        return [Sheet(s, self) for s in self._xlw_book.sheets if s.api.Visible == -1]
+        return [self._wrap_sheet(meta) for meta in self._get_sheet_meta() if meta['visible']]
 
     @property
     def hidden_sheets(self):
         """Trả về một danh sách chỉ các sheet đang bị ẩn."""
-        return [Sheet(s, self) for s in self._xlw_book.sheets if s.api.Visible != -1]
+        return [self._wrap_sheet(meta) for meta in self._get_sheet_meta() if not meta['visible']]
 
     @property
     def sheet_names(self):
         """Trả về một list tên của tất cả các sheet."""
-        return [s.name for s in self._xlw_book.sheets]
+        return [meta['name'] for meta in self._get_sheet_meta()]
+
+    # --- Write Batching ---
+    @contextmanager
+    def batch(self):
+        """
+        Gom các thao tác ghi trong khối with và gửi xuống backend khi kết thúc khối.
+
+        Ghi .value/.formula, .style(), .merge() của Range và vị trí/kích thước/tên của Shape được
+        đưa vào hàng đợi; các thao tác trùng/liền kề được gộp lại (xem write_batch.py). Đọc dữ liệu
+        hoặc thao tác không gom được (clear, copy_to, save, ...) sẽ gửi các thao tác đang chờ trước.
+        Nếu có lỗi trong khối with, các thao tác chưa gửi sẽ bị bỏ.
+
+        Yields:
+            WriteBatch: Đối tượng chứa thống kê .stats (queued_calls, backend_calls, calls_saved).
+
+        Ví dụ:
+            with wb.batch() as batch:
+                for r in range(1, 1001):
+                    sheet.cell(r, 1).value = r
+                    sheet.cell(r, 1).style(font_bold=True)
+            print(batch.stats)
+        """
+        batch = self._batch or WriteBatch(self)
+        self._batch = batch
+        batch._depth += 1
+        try:
+            yield batch
+            if batch._depth == 1:
+                batch.flush()
+                stats = batch.stats
+                logger.info("Batch ghi: %s thao tác được gửi bằng %s lần gọi backend (tiết kiệm %s).",
+                            stats['queued_calls'], stats['backend_calls'], stats['calls_saved'])
+        except BaseException:
+            if batch._depth == 1:
+                batch.discard()
+            raise
+        finally:
+            batch._depth -= 1
+            if batch._depth == 0:
+                self._batch = None
+
+    def _flush_batch(self):
+        """(Hàm nội bộ) Gửi các thao tác ghi đang chờ (nếu có) xuống backend."""
+        if self._batch is not None and self._batch.has_pending:
+            self._batch.flush()
 
     # --- File Lifecycle & Calculation ---
     def save(self):
-        self._xlw_book.save()
+        self._flush_batch()
+        self._impl.save()
+        self._dependency_index = None
         return self
         
     def save_as(self, new_path):
         """Lưu workbook với một tên mới."""
-        print(f"INFO: Đang lưu workbook thành '{new_path}'...")
-        self._xlw_book.save(new_path)
+        logger.info("Đang lưu workbook thành '%s'...", new_path)
+        self._flush_batch()
+        old_fullname = self._impl.fullname
+        self._impl.save(new_path)
+        self._dependency_index = None
+        self._app._on_book_renamed(old_fullname, self._impl)
         return self
 
     def close(self, save_changes=False):
         """Đóng workbook."""
-        print(f"INFO: Đang đóng workbook '{self.name}'...")
+        logger.info("Đang đóng workbook '%s'...", self.name)
+        self._flush_batch()
         if save_changes:
             self.save()
-        self._xlw_book.close()
+        fullname = self._impl.fullname
+        self._impl.close()
+        self._app._on_book_closed(fullname)
 
     def activate(self):
         """Kích hoạt (đưa lên phía trước) workbook này."""
-        print(f"INFO: Đang kích hoạt workbook '{self.name}'...")
-        self._xlw_book.activate()
+        logger.info("Đang kích hoạt workbook '%s'...", self.name)
+        self._impl.activate()
         return self
 
-    def calculate(self):
-        """Buộc Excel tính toán lại tất cả các công thức trong workbook."""
-        print(f"INFO: Đang tính toán lại công thức cho workbook '{self.name}'...")
-        self._xlw_book.api.Calculate()
+    def calculate(self, scope='full'):
+        """
+        Buộc Excel tính toán lại các công thức trong workbook.
+
+        Args:
+            scope (str): 'full' để tính toán lại toàn bộ workbook.
+                         'dirty' để chỉ tính toán lại các sheet đã bị ghi qua thư viện kể từ lần
+                         tính toán trước và các sheet phụ thuộc vào chúng (theo thứ tự phụ thuộc).
+                         Tự động quay về 'full' khi cấu trúc workbook thay đổi (thêm/xóa/đổi tên sheet,
+                         Named Range), khi các sheet phụ thuộc vòng lẫn nhau hoặc khi phần lớn các sheet
+                         bị ảnh hưởng.
+
+        Kết quả được lưu trong .last_calculation: {'scope' ('full'|'dirty'|'none'), 'sheets', 'seconds'}.
+        """
+        if scope not in ('full', 'dirty'):
+            raise ValueError("scope phải là 'full' hoặc 'dirty'.")
+        self._flush_batch()
+        start = time.perf_counter()
+
+        sheets = None
+        if scope == 'dirty':
+            if not self._dirty and not self._dirty_all:
+                logger.info("Workbook '%s' không có vùng nào thay đổi kể từ lần tính toán trước.", self.name)
+                self.last_calculation = {'scope': 'none', 'sheets': [], 'seconds': 0.0}
+                return self
+            sheets = self._plan_dirty_calculation()
+
+        if sheets is None:
+            logger.info("Đang tính toán lại công thức cho workbook '%s'...", self.name)
+            self._impl.calculate()
+            scope = 'full'
+        else:
+            logger.info("Đang tính toán lại %s sheet bị ảnh hưởng của workbook '%s': %s",
+                        len(sheets), self.name, sheets)
+            for sheet_name in sheets:
+                self.sheet(sheet_name)._impl.calculate()
+
+        self._dirty.clear()
+        self._dirty_all = False
+        self.last_calculation = {'scope': scope, 'sheets': sheets or [], 'seconds': time.perf_counter() - start}
         return self
 
+    @contextmanager
+    def manual_calculation(self, scope='dirty'):
+        """
+        Chuyển Excel sang chế độ tính toán thủ công trong khối with và tính toán lại đúng một lần
+        (mặc định chỉ các vùng bị ảnh hưởng) khi kết thúc khối, sau đó khôi phục chế độ cũ.
+        Nếu khối with ném lỗi, bỏ qua bước tính toán; các vùng đã ghi vẫn được ghi nhận cho lần sau.
+
+        Ví dụ:
+            with wb.manual_calculation():
+                wb.sheet('Input').range('B2').value = 0.05
+                wb.sheet('Input').range('B3').value = 12
+            # Chỉ 'Input' và các sheet phụ thuộc được tính toán lại, một lần.
+        """
+        outer = self._manual_calc_depth == 0
+        if outer:
+            previous = self.app.calculation
+            self.app.calculation = 'manual'
+        self._manual_calc_depth += 1
+        try:
+            yield self
+            if outer:
+                self.calculate(scope=scope)
+        finally:
+            self._manual_calc_depth -= 1
+            if outer:
+                self.app.calculation = previous
+
+    def formula_model(self):
+        """
+        Tạo mô hình tính toán thuần Python (FormulaModel) từ công thức và giá trị hiện tại của workbook.
+        Mô hình độc lập với workbook: thay đổi đầu vào trên mô hình không ghi ngược vào file.
+
+        Ví dụ:
+            model = wb.formula_model()
+            for rate in (0.03, 0.04, 0.05):
+                model.set_value('Input!B2', rate)
+                print(rate, model.get_value('Summary!C10'))
+        """
+        from .formula_eval import FormulaModel
+        logger.info("Đang dựng mô hình tính toán cho workbook '%s'...", self.name)
+        return FormulaModel.from_workbook(self)
+
+    @property
+    def dirty_ranges(self):
+        """Các vùng đã ghi kể từ lần tính toán trước: {tên sheet: list địa chỉ, hoặc None nếu cả sheet}."""
+        return {name: [block_address(b) for b in blocks] if blocks is not None else None
+                for name, blocks in self._dirty.values()}
+
+    def _mark_dirty(self, sheet, block=None, formulas=None):
+        """
+        (Hàm nội bộ) Ghi nhận một vùng vừa được ghi trên sheet (block None = cả sheet).
+        Nếu formulas được truyền và chỉ mục phụ thuộc đã có, chỉ mục được cập nhật tăng dần.
+        """
+        name = sheet.name
+        key = name.lower()
+        entry = self._dirty.get(key)
+        if entry is None:
+            self._dirty[key] = (name, [block] if block is not None else None)
+        elif entry[1] is not None:
+            if block is None or len(entry[1]) >= _MAX_DIRTY_BLOCKS:
+                self._dirty[key] = (name, None)
+            else:
+                entry[1].append(block)
+
+        if formulas is not None and block is not None and self._dependency_index is not None:
+            rows = formulas if isinstance(formulas, (list, tuple)) else [[formulas]]
+            if rows and not isinstance(rows[0], (list, tuple)):
+                rows = [rows]
+            for i, row in enumerate(rows):
+                for j, formula in enumerate(row):
+                    if isinstance(formula, str) and formula.startswith('='):
+                        coord = f"{column_letter(block[1] + j)}{block[0] + i}"
+                        self._dependency_index.add_formula(name, coord, formula[1:])
+
+    def _mark_all_dirty(self):
+        """(Hàm nội bộ) Ghi nhận thay đổi cấu trúc: lần tính toán 'dirty' kế tiếp sẽ tính toán toàn bộ."""
+        self._dirty_all = True
+
+    def _plan_dirty_calculation(self):
+        """
+        (Hàm nội bộ) Danh sách sheet cần tính toán lại theo thứ tự phụ thuộc,
+        hoặc None nếu cần tính toán lại toàn bộ workbook.
+        """
+        if self._dirty_all:
+            logger.info("Cấu trúc workbook đã thay đổi, tính toán lại toàn bộ.")
+            return None
+        try:
+            index = self._get_dependency_index(save=False)
+        except Exception as e:
+            logger.warning("Không thể xác định phụ thuộc giữa các sheet, tính toán lại toàn bộ. Lỗi: %s", e)
+            return None
+
+        # Các sheet bị ảnh hưởng: sheet đã ghi và (bắc cầu) các sheet tham chiếu đến chúng
+        affected = {key: name for key, (name, _) in self._dirty.items()}
+        edges = {}
+        pending = list(affected.values())
+        while pending:
+            source = pending.pop()
+            for dependent in index.dependent_sheets(source):
+                edges.setdefault(source.lower(), set()).add(dependent.lower())
+                if dependent.lower() not in affected:
+                    affected[dependent.lower()] = dependent
+                    pending.append(dependent)
+
+        sheet_count = len(self.sheet_names)
+        if len(affected) > _FULL_CALC_SHEET_RATIO * sheet_count:
+            logger.info("Phần lớn các sheet (%s/%s) bị ảnh hưởng, tính toán lại toàn bộ.", len(affected), sheet_count)
+            return None
+
+        # Sắp xếp topo: sheet nguồn được tính trước các sheet phụ thuộc
+        incoming = {key: 0 for key in affected}
+        for targets in edges.values():
+            for target in targets:
+                incoming[target] += 1
+        ready = [key for key in affected if incoming[key] == 0]
+        order = []
+        while ready:
+            key = ready.pop()
+            order.append(affected[key])
+            for target in edges.get(key, ()):
+                incoming[target] -= 1
+                if incoming[target] == 0:
+                    ready.append(target)
+        if len(order) != len(affected):
+            logger.info("Các sheet bị ảnh hưởng phụ thuộc vòng lẫn nhau, tính toán lại toàn bộ.")
+            return None
+        return order
+
     # --- Protection ---
     def protect(self, password=None):
         """Bảo vệ cấu trúc của workbook (ngăn thêm, xóa, di chuyển sheet)."""
-        print(f"INFO: Đang bảo vệ workbook '{self.name}'...")
-        self._xlw_book.api.Protect(Password=password)
+        logger.info("Đang bảo vệ workbook '%s'...", self.name)
+        self._impl.protect(password)
         return self
 
     def unprotect(self, password=None):
         """Mở khóa bảo vệ cấu trúc của workbook."""
-        print(f"INFO: Đang mở khóa bảo vệ cho workbook '{self.name}'...")
-        self._xlw_book.api.Unprotect(Password=password)
+        logger.info("Đang mở khóa bảo vệ cho workbook '%s'...", self.name)
+        self._impl.unprotect(password)
+        return self
+
+    # --- Sheet Cache ---
+    def invalidate_sheet_cache(self):
+        """
+        Hủy bảng thông tin sheet đã lưu cache. Gọi hàm này nếu sheet được thêm, xóa, đổi tên
+        hoặc ẩn/hiện bên ngoài thư viện; bảng sẽ được đọc lại ở lần truy cập kế tiếp.
+        """
+        self._sheet_meta = None
+        for sheet in list(self._sheet_wrappers.values()):
+            sheet._meta = None
         return self
 
+    def _get_sheet_meta(self):
+        """(Hàm nội bộ) Bảng thông tin các sheet, đọc một lượt từ backend khi chưa có."""
+        if self._sheet_meta is None:
+            self._sheet_meta = [
+                {'name': name, 'index': i, 'visible': bool(visible), 'impl': impl}
+                for i, (impl, name, visible) in enumerate(self._impl.sheet_metadata(), start=1)
+            ]
+        return self._sheet_meta
+
+    def _wrap_sheet(self, meta):
+        """(Hàm nội bộ) Trả về đối tượng Sheet duy nhất ứng với một dòng trong bảng thông tin sheet."""
+        key = meta['name'].lower()
+        sheet = self._sheet_wrappers.get(key)
+        if sheet is None:
+            sheet = Sheet(meta['impl'], self)
+            self._sheet_wrappers[key] = sheet
+        sheet._meta = meta
+        return sheet
+
+    def _on_sheet_renamed(self, sheet, old_name, new_name):
+        """(Hàm nội bộ) Cập nhật cache sau khi một sheet được đổi tên."""
+        self._sheet_wrappers.pop(old_name.lower(), None)
+        self._sheet_wrappers[new_name.lower()] = sheet
+        if sheet._meta is not None:
+            sheet._meta['name'] = new_name
+        self._dependency_index = None
+        self._mark_all_dirty()
+
     # --- Sheet Management ---
     def sheet(self, specifier):
-        try:
-            return Sheet(self._xlw_book.sheets[specifier], self)
-        except Exception:
-            return None
+        """Lấy một sheet theo tên (không phân biệt hoa thường) hoặc index (0-based). None nếu không có."""
+        sheet_meta = self._get_sheet_meta()
+        if isinstance(specifier, int):
+            try:
+                return self._wrap_sheet(sheet_meta[specifier])
+            except IndexError:
+                return None
+        for meta in sheet_meta:
+            if meta['name'].lower() == str(specifier).lower():
+                return self._wrap_sheet(meta)
+        return None
     
     def add_sheet(self, name, before=None, after=None):
-        new_xlw_sheet = self._xlw_book.sheets.add(name, before=self._xlw_book.sheets[before] if before else None, after=self._xlw_book.sheets[after] if after else None)
-        return Sheet(new_xlw_sheet, self)
+        new_sheet_impl = self._impl.add_sheet(name, before=before, after=after)
+        self._dependency_index = None  # Thứ tự sheet thay đổi, tham chiếu 3-D cần tính lại
+        self._mark_all_dirty()
+        self.invalidate_sheet_cache()
+        sheet = Sheet(new_sheet_impl, self)
+        self._sheet_wrappers[new_sheet_impl.name.lower()] = sheet
+        return sheet
 
     def delete_sheet(self, specifier, safe=False):
         """
@@ -146,8 +550,9 @@ class Workbook:
                                    tham chiếu đến sheet này trước khi xóa.
                                    Mặc định là False.
         """
+        self._flush_batch()
         try:
-            sheet_to_delete = self._xlw_book.sheets[specifier]
+            sheet_to_delete = self._impl.get_sheet(specifier)
             sheet_name_to_delete = sheet_to_delete.name
 
             if safe:
@@ -156,9 +561,14 @@ class Workbook:
             self.app._app.display_alerts = False
             sheet_to_delete.delete()
             self.app._app.display_alerts = True
-            print(f"SUCCESS: Đã xóa thành công sheet '{sheet_name_to_delete}'.")
+            if self._dependency_index is not None:
+                self._dependency_index.remove_sheets([sheet_name_to_delete])
+            self._sheet_wrappers.pop(sheet_name_to_delete.lower(), None)
+            self._mark_all_dirty()
+            self.invalidate_sheet_cache()
+            logger.log(SUCCESS, "Đã xóa thành công sheet '%s'.", sheet_name_to_delete)
         except Exception as e:
-            print(f"ERROR: Không thể xóa sheet '{specifier}'. Lỗi: {e}")
+            logger.error("Không thể xóa sheet '%s'. Lỗi: %s", specifier, e)
             self.app._app.display_alerts = True
         return self
 
@@ -166,10 +576,10 @@ class Workbook:
         """Xóa tất cả các sheet đang bị ẩn."""
         hidden_names = [sheet.name for sheet in self.hidden_sheets]
         if not hidden_names:
-            print("INFO: Không có sheet ẩn nào để xóa.")
+            logger.info("Không có sheet ẩn nào để xóa.")
             return self
 
-        print(f"INFO: Chuẩn bị xóa {len(hidden_names)} sheet ẩn. Chế độ an toàn: {safe}.")
+        logger.info("Chuẩn bị xóa %s sheet ẩn. Chế độ an toàn: %s.", len(hidden_names), safe)
 
         if safe:
             self._break_links_to_sheet_optimized(hidden_names)
@@ -177,174 +587,242 @@ class Workbook:
         for name in hidden_names:
             self.delete_sheet(name, safe=False)
         
-        print(f"SUCCESS: Đã hoàn tất việc xóa các sheet ẩn.")
+        logger.log(SUCCESS, "Đã hoàn tất việc xóa các sheet ẩn.")
         return self
         
-    def _break_links_to_sheet_optimized(self, sheets_to_delete_names):
+    # --- Sheet Dependency Index ---
+    def invalidate_dependency_index(self):
         """
-        (Hàm nội bộ tối ưu) Sử dụng openpyxl để nhanh chóng tìm các công thức
-        tham chiếu đến các sheet sắp bị xóa, sau đó dùng xlwings để thay thế chúng.
+        Hủy chỉ mục phụ thuộc giữa các sheet. Gọi hàm này nếu công thức đã được
+        thay đổi bên ngoài thư viện; chỉ mục sẽ được xây dựng lại ở lần xóa an toàn kế tiếp.
         """
-        if not load_workbook:
-            print("WARNING: Không thể thực hiện xóa an toàn tối ưu vì thiếu 'openpyxl'. Chuyển sang phương thức chậm hơn.")
-            # Nếu không có openpyxl, dùng lại cách cũ
-            if isinstance(sheets_to_delete_names, str):
-                sheets_to_delete_names = [sheets_to_delete_names]
-            for name in sheets_to_delete_names:
-                 self._break_links_to_sheet_slow(name)
-            return
+        self._dependency_index = None
+        return self
 
-        print("INFO (Safe Mode Optimized): Đang tìm và phá vỡ các liên kết...")
-        
+    def _get_dependency_index(self, save=True):
+        """
+        (Hàm nội bộ) Trả về chỉ mục phụ thuộc, xây dựng nếu chưa có.
+        Ưu tiên quét stream file đã lưu; nếu file không ở định dạng Open XML thì đọc trực tiếp từ Excel.
+
+        Args:
+            save (bool): True để lưu workbook trước khi quét file. Nếu False, file chỉ được quét khi
+                         workbook không có thay đổi chưa lưu, ngược lại công thức được đọc từ Excel.
+        """
+        if self._dependency_index is not None:
+            return self._dependency_index
+
+        if save:
+            # Lưu file để bộ quét đọc được trạng thái mới nhất
+            self.save()
+        is_package = self.path.is_file() and zipfile.is_zipfile(self.path)
+        if is_package and (save or self._impl.saved):
+            with zipfile.ZipFile(self.path) as zf:
+                sheet_order = [name for name, _, _ in get_sheet_parts(zf)]
+            self._dependency_index = SheetDependencyIndex.build(
+                iter_formulas(self.path), sheet_order, iter_defined_names(self.path))
+        else:
+            if self.path.is_file() and not is_package:
+                logger.warning("File không ở định dạng Open XML (.xlsx/.xlsm), không thể quét nhanh. Đọc công thức trực tiếp từ Excel.")
+            self._dependency_index = self._build_dependency_index_live()
+        return self._dependency_index
+
+    def _build_dependency_index_live(self):
+        """(Hàm nội bộ) Xây dựng chỉ mục bằng cách đọc công thức của từng used_range trong một lần gọi."""
+        sheet_impls = self._impl.sheets
+        sheet_order = [s.name for s in sheet_impls]
+
+        def iter_live_formulas():
+            for sheet_name, sheet_impl in zip(sheet_order, sheet_impls):
+                used = sheet_impl.used_range
+                formulas = used.get_formulas()
+                first_row, first_col = used.row, used.column
+                for i, row in enumerate(formulas):
+                    for j, formula in enumerate(row):
+                        if isinstance(formula, str) and formula.startswith('='):
+                            yield sheet_name, f"{column_letter(first_col + j)}{first_row + i}", formula[1:]
+
+        defined_names = [(n['name'].split('!')[-1], None, n['refers_to']) for n in self._impl.get_names()]
+        return SheetDependencyIndex.build(iter_live_formulas(), sheet_order, defined_names)
+
+    def _break_links_to_sheet_optimized(self, sheets_to_delete_names):
+        """
+        (Hàm nội bộ tối ưu) Dùng chỉ mục phụ thuộc (xây dựng một lần bằng cách quét stream XML
+        của file đã lưu) để tìm các công thức tham chiếu đến các sheet sắp bị xóa,
+        sau đó dùng xlwings để thay thế chúng.
+        """
         if isinstance(sheets_to_delete_names, str):
             sheets_to_delete_names = [sheets_to_delete_names]
 
+        logger.info("(Safe Mode Optimized) Đang tìm và phá vỡ các liên kết...")
         try:
-            # Lưu file tạm thời để openpyxl đọc được trạng thái mới nhất
-            self.save()
-            
-            # Dùng openpyxl để quét file
-            wb_op = load_workbook(self.path, data_only=False)
-            cells_to_fix = []
-            
-            sheets_to_keep_names = [s.title for s in wb_op.worksheets if s.title not in sheets_to_delete_names]
-
-            for sheet_name in sheets_to_keep_names:
-                ws = wb_op[sheet_name]
-                for row in ws.iter_rows():
-                    for cell in row:
-                        if cell.data_type == 'f': # Chỉ kiểm tra ô có công thức
-                            formula_str = str(cell.value)
-                            for name_to_delete in sheets_to_delete_names:
-                                # Kiểm tra xem tên sheet sắp xóa có trong công thức không
-                                if f"'{name_to_delete}'!" in formula_str or f"{name_to_delete}!" in formula_str:
-                                    cells_to_fix.append({'sheet': sheet_name, 'coord': cell.coordinate})
-                                    break # Đã tìm thấy, không cần kiểm tra các tên khác cho ô này
-
-            if not cells_to_fix:
-                print("INFO: Không tìm thấy công thức nào cần phá vỡ liên kết.")
-                return
-
-            # Dùng xlwings để thay thế giá trị
-            print(f"INFO: Tìm thấy {len(cells_to_fix)} công thức cần phá vỡ. Bắt đầu thay thế...")
-            for item in cells_to_fix:
-                try:
-                    cell_to_fix = self.sheet(item['sheet']).range(item['coord'])
-                    cell_to_fix.value = cell_to_fix.value
-                    print(f"  - Đã thay thế công thức tại {item['sheet']}!{item['coord']}")
-                except Exception as e:
-                    print(f"  - Lỗi khi thay thế tại {item['sheet']}!{item['coord']}: {e}")
-
+            index = self._get_dependency_index()
+            return self._replace_formulas_with_values(index, index.cells_referencing(sheets_to_delete_names))
         except Exception as e:
-            print(f"ERROR: Đã xảy ra lỗi trong quá trình xóa an toàn tối ưu. Lỗi: {e}")
+            logger.error("Đã xảy ra lỗi trong quá trình xóa an toàn tối ưu. Lỗi: %s", e)
+            return None
 
-    def _break_links_to_sheet_slow(self, sheet_name_to_delete):
-        """(Hàm dự phòng) Dùng xlwings thuần túy để phá vỡ liên kết. Chậm hơn."""
-        print(f"INFO (Safe Mode Slow): Đang tìm và phá vỡ các liên kết đến sheet '{sheet_name_to_delete}'...")
-        sheets_to_keep = [s for s in self.sheets if s.name != sheet_name_to_delete]
-        
-        for sheet in sheets_to_keep:
-            for cell in sheet.used_range._xlw_range:
-                if cell.has_formula:
-                    if f"'{sheet_name_to_delete}'!" in cell.formula or f"{sheet_name_to_delete}!" in cell.formula:
-                        cell.value = cell.value
-
-    def for_each_sheet(self, action, include=None, exclude=None):
-        """Thực thi một hành động trên nhiều sheet."""
+    def _replace_formulas_with_values(self, index, cells_to_fix):
+        """
+        (Hàm nội bộ) Thay các công thức bằng giá trị hiện tại theo từng khối liền kề và cập nhật chỉ mục.
+
+        Returns:
+            dict or None: Thống kê từ freeze_formula_cells(), None nếu không có ô nào cần xử lý.
+        """
+        if not cells_to_fix:
+            logger.info("Không tìm thấy công thức nào cần phá vỡ liên kết.")
+            return None
+
+        logger.info("Tìm thấy %s công thức cần phá vỡ. Bắt đầu thay thế...", len(cells_to_fix))
+        stats = freeze_formula_cells(self._impl, cells_to_fix)
+        index.discard_cells(stats['fixed'])
+        logger.info("Đã thay thế %s/%s ô trong %s khối (%s lần gọi COM, thất bại: %s).",
+                    len(stats['fixed']), stats['cells'], stats['blocks'], stats['com_calls'], len(stats['failed']))
+        return stats
+
+    def for_each_sheet(self, action, include=None, exclude=None, parallel=False, workers=None):
+        """
+        Thực thi một hành động trên nhiều sheet.
+
+        Args:
+            action (callable): Hàm nhận một Sheet. Giá trị trả về được gom theo tên sheet.
+            include (list, optional): Chỉ chạy trên các sheet có tên trong danh sách này.
+            exclude (list, optional): Bỏ qua các sheet có tên trong danh sách này.
+            parallel (bool): Chỉ hỗ trợ engine 'file'. True để chia các sheet cho một process pool,
+                             mỗi tiến trình mở file trên đĩa ở chế độ chỉ đọc (thay đổi chưa lưu
+                             không được nhìn thấy). action và kết quả của nó phải pickle được
+                             (ví dụ: hàm định nghĩa ở cấp module) và chỉ nên đọc dữ liệu;
+                             nên dùng sheet.iter_rows() để đọc stream thay vì nạp cả workbook.
+            workers (int, optional): Số tiến trình khi parallel=True. Mặc định: số CPU.
+
+        Returns:
+            Workbook: self. Kết quả (cùng dạng ở cả hai chế độ) được lưu trong .last_for_each:
+                      {'results': {tên sheet: kết quả},
+                       'errors': {tên sheet: {'type', 'message', 'traceback'}}, 'seconds': thời gian}.
+        """
         target_sheets = self.sheets
-        
+
         if include:
             target_sheets = [s for s in target_sheets if s.name in include]
-        
+
         if exclude:
             target_sheets = [s for s in target_sheets if s.name not in exclude]
 
-        print(f"INFO: Đang thực thi hành động trên {len(target_sheets)} sheet...")
-        for sheet in target_sheets:
-            try:
-                action(sheet)
-            except Exception as e:
-                print(f"ERROR: Lỗi khi thực thi hành động trên sheet '{sheet.name}'. Lỗi: {e}")
-        
+        if parallel and self.app.engine != 'file':
+            logger.warning("parallel=True chỉ hỗ trợ engine 'file'. Chuyển sang chạy tuần tự.")
+            parallel = False
+        if parallel:
+            self.last_for_each = self._for_each_sheet_parallel(action, [s.name for s in target_sheets], workers)
+            return self
+
+        logger.info("Đang thực thi hành động trên %s sheet...", len(target_sheets))
+        results, errors = {}, {}
+        with OperationLog(logger, "Thực thi hành động trên các sheet") as op:
+            for sheet in target_sheets:
+                try:
+                    results[sheet.name] = action(sheet)
+                    op.count('ok', item=sheet.name)
+                except Exception as e:
+                    errors[sheet.name] = _error_info(e)
+                    op.failed(sheet.name, e)
+
+        self.last_for_each = {'results': results, 'errors': errors, 'seconds': op.seconds}
         return self
 
+    def _for_each_sheet_parallel(self, action, sheet_names, workers):
+        """(Hàm nội bộ) for_each_sheet(parallel=True): mỗi sheet là một job trong process pool."""
+        try:
+            pickle.dumps(action)
+        except Exception as e:
+            raise TypeError(f"action phải pickle được để chạy song song (ví dụ: hàm ở cấp module). Lỗi: {e}")
+        self._flush_batch()
+        if not self.path.is_file():
+            raise FileNotFoundError(f"Workbook '{self.name}' chưa được lưu ra file, không thể chạy song song.")
+        if not self._impl.saved:
+            logger.warning("Workbook '%s' có thay đổi chưa lưu; các tiến trình con chỉ đọc file trên đĩa.", self.name)
+
+        logger.info("Đang thực thi hành động song song trên %s sheet (%s tiến trình)...",
+                    len(sheet_names), workers or 'số CPU')
+        results, errors = {}, {}
+        with OperationLog(logger, "Thực thi hành động song song trên các sheet") as op:
+            if sheet_names:
+                workers = min(workers, len(sheet_names)) if workers else None
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_sheet_worker,
+                                         initargs=(str(self.path),)) as executor:
+                    futures = [(name, executor.submit(_run_sheet_action, name, action)) for name in sheet_names]
+                    for name, future in futures:
+                        try:
+                            ok, value, _ = future.result()
+                        except Exception as e:  # Tiến trình con bị dừng đột ngột, ...
+                            ok, value = False, _error_info(e)
+                        if ok:
+                            results[name] = value
+                            op.count('ok', item=name)
+                        else:
+                            errors[name] = value
+                            op.failed(name, f"{value['type']}: {value['message']}")
+
+        return {'results': results, 'errors': errors, 'seconds': op.seconds}
+
     # --- Named Range & Link Management ---
     def _is_valid_named_range(self, name_str):
         """(Hàm nội bộ) Kiểm tra xem một tên có hợp lệ để xử lý hay không."""
-        if name_str.startswith('_xlfn'):
-            return False
-        if not bool(re.match(r'^[A-Za-z_][A-Za-z0-9_]*$', name_str)):
-            return False
-        if re.match(r'^[A-Za-z]{3}\d', name_str):
-            return False
-        return True
+        return VALID_NAME_PATTERN.match(name_str) is not None
 
     def get_named_ranges(self):
         """Lấy danh sách chi tiết tất cả các Named Range trong workbook."""
-        names_list = []
-        for name in self._xlw_book.api.Names:
-            name_info = {
-                'name': name.Name,
-                'refers_to': name.RefersTo,
-                'scope': name.Parent.Name,
-                'is_visible': name.Visible
-            }
-            names_list.append(name_info)
-        return names_list
+        return self._impl.get_names()
+
+    def get_named_range(self, name):
+        """Lấy một đối tượng Range từ một tên đã đặt."""
+        try:
+            range_impl = self._impl.resolve_name(name)
+            return Range(range_impl, self.sheet(range_impl.sheet_name))
+        except Exception:
+            logger.error("Không tìm thấy Named Range với tên '%s'.", name)
+            return None
 
     def delete_all_named_ranges(self, broken_only=False, keep_print_areas=True):
         """
         Xóa nhiều Named Range cùng lúc với các bộ lọc thông minh.
 
+        Danh sách tên được đọc một lượt, lọc bằng các regex biên dịch sẵn và xóa hàng loạt.
+        Với engine 'xlwings' và từ 500 tên trở lên, workbook được lưu, đóng, ghi lại khối
+        <definedNames> trong file rồi mở lại; các đối tượng Sheet/Range lấy trước đó cần được lấy lại.
+
         Args:
             broken_only (bool): Nếu True, chỉ xóa các Named Range bị lỗi #REF!.
             keep_print_areas (bool): Nếu True, sẽ không xóa các Named Range của hệ thống
                                      như 'Print_Area' và 'Print_Titles'.
         """
         if broken_only:
-            print("INFO: Đang xóa các Named Range bị lỗi (#REF!)...")
+            logger.info("Đang xóa các Named Range bị lỗi (#REF!)...")
         else:
-            print("WARNING: Đang xóa các Named Range hợp lệ...")
-
-        names_to_delete = []
-        for name in self._xlw_book.api.Names:
-            name_str = name.Name.split('!')[-1] # Lấy tên không bao gồm scope
-            refers_to_str = str(name.RefersTo)
-            
-            # Điều kiện để thêm vào danh sách xóa
-            should_delete = False
-            if self._is_valid_named_range(name_str):
-                if broken_only:
-                    if '#REF!' in refers_to_str:
-                        should_delete = True
-                else: # Xóa tất cả (trừ vùng in nếu được yêu cầu)
-                    if keep_print_areas and ("Print_Area" in name_str or "Print_Titles" in name_str):
-                        pass # Bỏ qua, không xóa
-                    else:
-                        should_delete = True
-            
-            if should_delete:
-                names_to_delete.append(name.Name)
+            logger.warning("Đang xóa các Named Range hợp lệ...")
+
+        self._flush_batch()
+        names = self._impl.get_names()
+        names_to_delete = select_names(names, broken_only=broken_only, keep_print_areas=keep_print_areas)
 
         if not names_to_delete:
-            print("INFO: Không tìm thấy Named Range nào để xóa.")
+            logger.info("Không tìm thấy Named Range nào để xóa.")
             return self
 
-        print(f"INFO: Tìm thấy {len(names_to_delete)} Named Range để xóa. Bắt đầu xóa...")
-        for name_str in names_to_delete:
-            try:
-                self._xlw_book.api.Names(name_str).Delete()
-                print(f"  - Đã xóa: {name_str}")
-            except Exception as e:
-                print(f"  - Lỗi khi xóa {name_str}: {e}")
-        
+        logger.info("Tìm thấy %s/%s Named Range để xóa. Bắt đầu xóa...", len(names_to_delete), len(names))
+        with OperationLog(logger, "Xóa Named Range") as op:
+            failed = self._impl.delete_names(names_to_delete)
+            self._sheet_wrappers.clear()
+            self.invalidate_sheet_cache()
+            self.invalidate_dependency_index()
+            self._mark_all_dirty()
+            op.count('deleted', len(names_to_delete) - len(failed))
+            for name_str, error in failed:
+                op.failed(name_str, error)
         return self
 
     def get_external_links(self):
         """Lấy danh sách các nguồn liên kết ngoài."""
         try:
-            links = self._xlw_book.api.LinkSources(1) # 1 = xlExcelLinks
-            return list(links) if links else []
+            return self._impl.link_sources()
         except Exception:
             return []
 
@@ -352,37 +830,61 @@ class Workbook:
         """
         Tìm và phá vỡ tất cả các liên kết đến các file Excel khác một cách an toàn.
         """
-        print("INFO: Đang tìm và phá vỡ các liên kết ngoài...")
+        logger.info("Đang tìm và phá vỡ các liên kết ngoài...")
         links = self.get_external_links()
         
         if not links:
-            print("INFO: Không tìm thấy liên kết ngoài nào.")
+            logger.info("Không tìm thấy liên kết ngoài nào.")
             return self
 
-        successful_breaks = []
-        unsuccessful_breaks = []
-        
-        for link in links:
-            try:
-                self._xlw_book.api.BreakLink(Name=link, Type=1)
-                print(f"  - Đã phá vỡ liên kết đến: {link}")
-                successful_breaks.append(link)
-            except Exception as e:
-                print(f"  - Lỗi khi phá vỡ liên kết {link}: {e}")
-                unsuccessful_breaks.append(link)
-        
-        print(f"SUCCESS: Hoàn tất. Thành công: {len(successful_breaks)}, Thất bại: {len(unsuccessful_breaks)}.")
+        broken = 0
+        with OperationLog(logger, "Phá vỡ liên kết ngoài") as op:
+            for link in links:
+                try:
+                    self._impl.break_link(link)
+                    op.count('broken', item=link)
+                    broken += 1
+                except Exception as e:
+                    op.failed(link, e)
+        if broken:
+            self._mark_all_dirty()
         return self
 
     # --- Conversion & Publishing ---
-    def to_pdf(self, output_path=None, quality='standard'):
+    def to_pdf(self, output_path=None, quality='standard', sheets=None, ready_timeout=30):
+        """
+        Xuất workbook ra file PDF mà không kích hoạt cửa sổ.
+
+        Args:
+            output_path (str or Path, optional): File PDF kết quả. Mặc định: cùng tên với workbook.
+            quality (str): 'standard' hoặc 'minimum'.
+            sheets (list, optional): Tên các sheet cần xuất. Mặc định: tất cả các sheet đang hiển thị.
+            ready_timeout (float): Thời gian chờ tối đa (giây) để Excel sẵn sàng trước khi xuất.
+        """
         if not output_path:
             output_path = self.path.with_suffix('.pdf')
         else:
             output_path = Path(output_path)
-        
-        self.activate()
-        time.sleep(1)
-        quality_val = 0 if quality == 'standard' else 1
-        self._xlw_book.api.ExportAsFixedFormat(0, str(output_path), Quality=quality_val)
+
+        self._flush_batch()
+        self.wait_until_ready(ready_timeout)
+        self._impl.export_pdf(output_path, quality=quality, sheets=list(sheets) if sheets else None)
+        return self
+
+    def wait_until_ready(self, timeout=30, initial_delay=0.005, max_delay=0.25):
+        """
+        Chờ tới khi Excel sẵn sàng nhận lệnh (không bận, không còn tính toán dở), với thời gian
+        chờ tăng dần. Trả về ngay nếu Excel đã sẵn sàng.
+
+        Raises:
+            TimeoutError: Nếu Excel chưa sẵn sàng sau timeout giây.
+        """
+        deadline = time.monotonic() + timeout
+        delay = initial_delay
+        while not self._impl.is_ready():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Excel chưa sẵn sàng sau {timeout} giây (workbook '{self.name}').")
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
         return self
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+File: write_batch.py
+Author: Your Name / Tên của bạn
+Description: Chứa class WriteBatch: gom các thao tác ghi (giá trị, công thức, định dạng, merge,
+             vị trí/kích thước shape) trong khối `with workbook.batch():` và gửi xuống backend
+             với số lần gọi ít nhất khi kết thúc khối.
+
+Quy tắc gom:
+    - Giá trị/công thức: ghi sau cùng trên một ô được giữ lại; các ô liền kề được gom thành
+      khối hình chữ nhật và mỗi khối ghi bằng một lần gọi.
+    - Định dạng: mỗi ô giữ giá trị sau cùng của từng thuộc tính; các ô có cùng định dạng cuối cùng
+      được áp dụng bằng một vùng nhiều phần (union) cho mỗi định dạng khác nhau.
+    - Merge: các vùng trùng nhau được bỏ bớt, gom thành vùng nhiều phần.
+    - Shape: mỗi thuộc tính chỉ ghi giá trị sau cùng.
+    Thứ tự gửi xuống: giá trị -> merge -> định dạng -> shape.
+
+--- CHANGELOG ---
+Version 0.2.0 (2026-10-17):
+    - Định dạng được gửi qua SheetBackend.apply_styles() (engine 'file' dùng bảng style dùng chung).
+
+Version 0.1.0 (2026-10-17):
+    - Khởi tạo class WriteBatch.
+-------------------
+"""
+
+import datetime as dt
+import numbers
+from .backend import STYLE_ATTRIBUTES
+from .cell_blocks import group_cells_into_blocks, chunk_union_addresses
+from .converters import array_to_rows
+
+
+def _rows_for_range(data):
+    """
+    (Hàm nội bộ) Chuẩn hóa dữ liệu ghi theo quy ước của xlwings: list 2 chiều tính từ ô trên cùng
+    bên trái, None nếu data là giá trị đơn, False nếu không hỗ trợ gom (ví dụ DataFrame).
+    """
+    if isinstance(data, (list, tuple)):
+        if not data:
+            return False
+        if all(isinstance(row, (list, tuple)) for row in data):
+            return [list(row) for row in data]
+        return [list(data)]
+    if hasattr(data, 'ndim') and hasattr(data, 'dtype'):
+        return array_to_rows(data)
+    if data is None or isinstance(data, (str, numbers.Number, dt.date)):
+        return None
+    return False
+
+
+class WriteBatch:
+    """
+    Hàng đợi các thao tác ghi của một Workbook. Tạo qua `with workbook.batch() as batch:`.
+
+    Thuộc tính:
+        queued_calls (int): Số lần gọi backend nếu các thao tác được thực hiện ngay.
+        backend_calls (int): Số lần gọi backend thực tế khi gửi xuống.
+    """
+    def __init__(self, workbook):
+        self._workbook = workbook
+        self._values = {}   # Sheet -> {(dòng, cột): giá trị}
+        self._styles = {}   # Sheet -> {(dòng, cột): {thuộc tính: giá trị}}
+        self._merges = {}   # Sheet -> {khối: None} (giữ thứ tự)
+        self._shapes = {}   # Shape -> {thuộc tính: giá trị}
+        self.queued_calls = 0
+        self.backend_calls = 0
+        self._depth = 0
+
+    def __repr__(self):
+        return f"<WriteBatch queued={self.queued_calls} backend_calls={self.backend_calls}>"
+
+    @property
+    def stats(self):
+        """Thống kê {'queued_calls', 'backend_calls', 'calls_saved'}."""
+        return {'queued_calls': self.queued_calls, 'backend_calls': self.backend_calls,
+                'calls_saved': self.queued_calls - self.backend_calls}
+
+    @property
+    def has_pending(self):
+        """True nếu còn thao tác chưa được gửi xuống backend."""
+        return bool(self._values or self._styles or self._merges or self._shapes)
+
+    # --- Queue ---
+    @staticmethod
+    def _block_of(rng):
+        """(Hàm nội bộ) Khối (dòng đầu, cột đầu, dòng cuối, cột cuối) của một Range."""
+        block = rng._block()
+        if block is None:
+            raise ValueError(f"Không xác định được vị trí của vùng {rng!r}.")
+        return block
+
+    def queue_values(self, rng, data):
+        """
+        Đưa một thao tác ghi giá trị/công thức vào hàng đợi.
+
+        Returns:
+            bool: False nếu dữ liệu không gom được (người gọi cần ghi trực tiếp).
+        """
+        rows = _rows_for_range(data)
+        if rows is False:
+            return False
+        first_row, first_col, last_row, last_col = self._block_of(rng)
+        cells = self._values.setdefault(rng.sheet, {})
+        if rows is None:
+            for row in range(first_row, last_row + 1):
+                for col in range(first_col, last_col + 1):
+                    cells[(row, col)] = data
+        else:
+            for i, row_values in enumerate(rows):
+                for j, value in enumerate(row_values):
+                    cells[(first_row + i, first_col + j)] = value
+        self.queued_calls += 1
+        return True
+
+    def queue_style(self, rng, **style):
+        """Đưa một thao tác định dạng vào hàng đợi (chỉ các thuộc tính khác None/rỗng)."""
+        style = {attr: tuple(value) if isinstance(value, list) else value
+                 for attr, value in style.items() if attr in STYLE_ATTRIBUTES and value not in (None, '')}
+        if not style:
+            return
+        first_row, first_col, last_row, last_col = self._block_of(rng)
+        cells = self._styles.setdefault(rng.sheet, {})
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                cells.setdefault((row, col), {}).update(style)
+        self.queued_calls += 1
+
+    def queue_merge(self, rng):
+        """Đưa một thao tác merge vào hàng đợi."""
+        self._merges.setdefault(rng.sheet, {})[self._block_of(rng)] = None
+        self.queued_calls += 1
+
+    def queue_shape(self, shape, attr, value):
+        """Đưa một thao tác ghi thuộc tính shape vào hàng đợi."""
+        self._shapes.setdefault(shape, {})[attr] = value
+        self.queued_calls += 1
+
+    # --- Flush ---
+    def flush(self):
+        """Gửi tất cả thao tác đang chờ xuống backend. Trả về số lần gọi backend đã thực hiện."""
+        calls = 0
+        values, self._values = self._values, {}
+        merges, self._merges = self._merges, {}
+        styles, self._styles = self._styles, {}
+        shapes, self._shapes = self._shapes, {}
+
+        for sheet, cells in values.items():
+            for first_row, first_col, last_row, last_col in group_cells_into_blocks(cells):
+                rows = [[cells[(row, col)] for col in range(first_col, last_col + 1)]
+                        for row in range(first_row, last_row + 1)]
+                sheet._impl.range((first_row, first_col), (last_row, last_col)).set_values(rows)
+                calls += 1
+
+        for sheet, blocks in merges.items():
+            for chunk in chunk_union_addresses(list(blocks)):
+                sheet._impl.union_range(chunk).merge()
+                calls += 1
+
+        for sheet, cells in styles.items():
+            by_style = {}
+            for cell, style in cells.items():
+                by_style.setdefault(tuple(sorted(style.items())), []).append(cell)
+            calls += sheet._impl.apply_styles([(dict(style), group_cells_into_blocks(style_cells))
+                                               for style, style_cells in by_style.items()])
+
+        for shape, attrs in shapes.items():
+            for attr, value in attrs.items():
+                setattr(shape._impl, attr, value)
+                calls += 1
+
+        self.backend_calls += calls
+        return calls
+
+    def discard(self):
+        """Bỏ tất cả thao tác đang chờ."""
+        self._values.clear()
+        self._merges.clear()
+        self._styles.clear()
+        self._shapes.clear()